@@ -54,10 +54,27 @@ flac_detective.repair.fixer : FLAC file repair functionality
 flac_detective.reporting.text_reporter : Report generation
 """
 
+import importlib
+
 from .__version__ import __version__
-from .analysis import FLACAnalyzer
-from .tracker import ProgressTracker
-from .utils import LOGO, find_flac_files
+
+# Exports imported on first access: the analyzer pulls in numpy and scipy,
+# which the CLI parent (scan, progress, report) never needs
+_LAZY_EXPORTS = {
+    "FLACAnalyzer": ".analysis",
+    "ProgressTracker": ".tracker",
+    "LOGO": ".utils",
+    "find_flac_files": ".utils",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "FLACAnalyzer",
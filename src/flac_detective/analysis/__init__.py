@@ -4,6 +4,16 @@ This module provides tools to analyze FLAC file quality
 and detect potential MP3 transcoding.
 """
 
-from .analyzer import FLACAnalyzer
+import importlib
 
 __all__ = ["FLACAnalyzer"]
+
+
+def __getattr__(name):
+    # Imported on first access: submodules such as diagnostic_tracker are
+    # used by the CLI parent, which must not load the DSP stack
+    if name == "FLACAnalyzer":
+        value = importlib.import_module(".analyzer", __name__).FLACAnalyzer
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -4,17 +4,19 @@ PHASE 1 OPTIMIZATION: Uses AudioCache to avoid multiple file reads.
 """
 
 import logging
-import shutil
-import tempfile
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
 
+from ..config import TriageConfig, analysis_config, triage_config
+from .. import metrics
+from ..staging import StagedFile, stage_copy, verify_copy
+from ..tracing import span
 from .audio_cache import AudioCache
-from .diagnostic_tracker import get_tracker
+from .diagnostic_tracker import IssueType, get_tracker
 from .metadata import check_duration_consistency, read_metadata
-from .new_scoring import estimate_mp3_bitrate, new_calculate_score
+from .new_scoring import estimate_mp3_bitrate, new_calculate_score, triage_calculate_score
 from .quality import analyze_audio_quality
-from .spectrum import analyze_spectrum
+from .spectrum import analyze_spectrum, analyze_spectrum_excerpts
 
 logger = logging.getLogger(__name__)
 
@@ -22,21 +24,110 @@ logger = logging.getLogger(__name__)
 class FLACAnalyzer:
     """FLAC file analyzer to detect MP3 transcoding."""
 
-    def __init__(self, sample_duration: float = 30.0):
+    def __init__(self, sample_duration: float = 30.0, triage: Optional[TriageConfig] = None):
         """Initializes the analyzer.
 
         Args:
             sample_duration: Duration in seconds to analyze (default 30s).
+            triage: Triage stage settings (defaults to the global triage_config).
+                Stored on the analyzer so worker processes receive them.
         """
         self.sample_duration = sample_duration
+        self.triage = triage or triage_config
 
-    def analyze_file(self, filepath: Path) -> Dict:
+    def triage_file(self, filepath: Path) -> Dict:
+        """Runs the cheap triage stage on a FLAC file.
+
+        Uses metadata, the container bitrate and a few short decoded excerpts
+        to run the fast scoring rules, reading the source file directly
+        (no temp copy, no full decode, no quality detectors).
+
+        Args:
+            filepath: Path to FLAC file to analyze.
+
+        Returns:
+            Dict with a "triage" key: "resolved" for a complete result that
+            does not need the full analysis, "escalated" otherwise.
+        """
+        escalated = {"filepath": str(filepath), "filename": filepath.name, "triage": "escalated"}
+
+        try:
+            metadata = read_metadata(filepath)
+            duration_check = check_duration_consistency(filepath, metadata)
+
+            # A duration mismatch hints at corruption: leave it to the full analysis
+            if duration_check["mismatch"]:
+                return escalated
+
+            cutoff_freq, energy_ratio, cutoff_std = analyze_spectrum_excerpts(
+                filepath, self.triage.EXCERPT_POSITIONS, self.triage.EXCERPT_DURATION
+            )
+            score, verdict, confidence, reason, resolved = triage_calculate_score(
+                cutoff_freq,
+                metadata,
+                filepath,
+                cutoff_std,
+                energy_ratio,
+                authentic_below=self.triage.AUTHENTIC_BELOW,
+                fake_at=self.triage.FAKE_AT,
+            )
+        except Exception as e:
+            logger.debug("Triage error %s, escalating: %s", filepath.name, e)
+            return escalated
+
+        if not resolved:
+            return escalated
+
+        return {
+            "filepath": str(filepath),
+            "filename": filepath.name,
+            "score": score,
+            "verdict": verdict,
+            "confidence": confidence,
+            "reason": reason,
+            "cutoff_freq": cutoff_freq,
+            "sample_rate": metadata.get("sample_rate", "N/A"),
+            "bit_depth": metadata.get("bit_depth", "N/A"),
+            "encoder": metadata.get("encoder", "N/A"),
+            "duration_mismatch": duration_check["mismatch"],
+            "duration_metadata": duration_check["metadata_duration"],
+            "duration_real": duration_check["real_duration"],
+            "duration_diff": duration_check["diff_samples"],
+            # Quality detectors only run in the full analysis
+            "has_clipping": False,
+            "clipping_severity": "n/a",
+            "clipping_percentage": 0.0,
+            "has_dc_offset": False,
+            "dc_offset_severity": "n/a",
+            "dc_offset_value": 0.0,
+            "is_corrupted": False,
+            "corruption_error": None,
+            "partial_analysis": False,
+            "is_partial_analysis": False,
+            "has_silence_issue": False,
+            "silence_issue_type": "n/a",
+            "is_fake_high_res": False,
+            "estimated_bit_depth": 0,
+            "is_upsampled": False,
+            "suspected_original_rate": 0,
+            "estimated_mp3_bitrate": estimate_mp3_bitrate(cutoff_freq),
+            "repair_candidate": False,
+            "triage": "resolved",
+        }
+
+    def analyze_file(
+        self, filepath: Path, staged: Optional[StagedFile] = None, recopy: bool = True
+    ) -> Dict:
         """Analyzes a FLAC file and determines if it is authentic.
 
         PHASE 1 OPTIMIZATION: Creates AudioCache once and reuses it for all analyses.
 
         Args:
             filepath: Path to FLAC file to analyze.
+            staged: Local copy of the file already staged by the parent's
+                prefetcher (see staging.py), deleted after the analysis.
+            recopy: Copy the file again and start over if the staged copy
+                turns out to differ from the source.
 
         Returns:
             Dict with: filepath, filename, score, reason, cutoff_freq, metadata,
@@ -44,66 +135,103 @@ class FLACAnalyzer:
         """
         # I/O STABILITY STRATEGY: "Copy-to-Temp"
         # Copy file to local temp dir to avoid external drive I/O errors during analysis
-        temp_path = None
+        # (STAGING = "direct" reads the source in place, for fast local storage)
+        temp_copy = staged
+        read_path = staged.path if staged else filepath
 
         try:
-            # Create a named temp file (but we want to control the path/extension)
-            # We create a temp file, close it, and overwrite it with copy
-            with tempfile.NamedTemporaryFile(suffix=".flac", delete=False) as tmp:
-                temp_path = Path(tmp.name)
-
-            # Copy source to temp
-            # Using copy2 to preserve metadata (timestamps) although typically not critical for analysis content
-            logger.debug(f"I/O STABILITY: Copying {filepath.name} to local temp {temp_path}")
-            shutil.copy2(filepath, temp_path)
+            if staged is None and analysis_config.STAGING == "copy":
+                # Copy source to the staging area (sequential reads, see staging.py);
+                # read in place if the staging budget has no room
+                logger.debug("I/O STABILITY: Copying %s to local temp", filepath.name)
+                with span("temp_copy"):
+                    temp_copy = stage_copy(filepath)
+                read_path = temp_copy.path if temp_copy else filepath
+            metrics.inc("bytes_read_total", read_path.stat().st_size)
 
             # PHASE 1 OPTIMIZATION: Create cache using the LOCAL TEMP copy
             # All subsequent reads will hit this local file (SSD/HDD) instead of USB/Network
             # AudioCache now handles partial loading internally
             # Pass original filepath for diagnostic tracking
-            cache = AudioCache(temp_path, original_filepath=filepath)
-            logger.debug(f"⚡ OPTIMIZATION: Created AudioCache for {filepath.name}")
+            cache = AudioCache(read_path, original_filepath=filepath)
+            logger.debug("⚡ OPTIMIZATION: Created AudioCache for %s", filepath.name)
 
             # Check if cache loaded partial data
             is_partial_analysis = cache.is_partial()
 
             # Read metadata
-            metadata = read_metadata(filepath)
+            with span("metadata"):
+                metadata = read_metadata(filepath)
 
             # Duration consistency check (FTF criterion)
             # Use ORIGINAL filepath for reporting, but TEMP path for reading could be safer?
             # Duration check uses Mutagen/Soundfile. Let's use TEMP path for safety.
-            duration_check = check_duration_consistency(temp_path, metadata)
+            with span("duration_check"):
+                duration_check = check_duration_consistency(read_path, metadata)
 
             # Spectral analysis (OPTIMIZED: uses cache -> points to TEMP)
-            cutoff_freq, energy_ratio, cutoff_std = analyze_spectrum(
-                temp_path, self.sample_duration, cache=cache
-            )
+            with span("spectrum"):
+                cutoff_freq, energy_ratio, cutoff_std = analyze_spectrum(
+                    read_path, self.sample_duration, cache=cache
+                )
 
             # Audio quality analysis (OPTIMIZED: uses cache -> points to TEMP)
-            quality_analysis = analyze_audio_quality(temp_path, metadata, cutoff_freq, cache=cache)
+            with span("quality"):
+                quality_analysis = analyze_audio_quality(
+                    read_path, metadata, cutoff_freq, cache=cache
+                )
 
             # NEW SCORING SYSTEM: 6-rule system (0-100 points, higher = more fake)
             # We must pass 'filepath' (original) for logging/reporting purposes,
             # but ensure 'context.cache' (temp) is used for heavy lifting.
-            logger.debug(f"Analyzing file: {filepath.name} | Cutoff: {cutoff_freq:.0f} Hz")
-            score, verdict, confidence, reason = new_calculate_score(
-                cutoff_freq,
-                metadata,
-                duration_check,
-                temp_path,
-                cutoff_std,
-                energy_ratio,
-                cache=cache,
-            )
+            logger.debug("Analyzing file: %s | Cutoff: %.0f Hz", filepath.name, cutoff_freq)
+            with span("scoring"):
+                score, verdict, confidence, reason = new_calculate_score(
+                    cutoff_freq,
+                    metadata,
+                    duration_check,
+                    read_path,
+                    cutoff_std,
+                    energy_ratio,
+                    cache=cache,
+                )
+
+            # INTEGRITY: decoded audio against the STREAMINFO MD5. A copy that
+            # fails it or did not decode is compared with the source again:
+            # a flaky read must not pass for corruption (nor get the source repaired)
+            if analysis_config.VERIFY_MD5:
+                with span("verify"):
+                    md5_ok = cache.verify_md5()
+                    suspect = (
+                        md5_ok is False
+                        or cache.is_partial()
+                        or get_tracker().has_issue(str(filepath), IssueType.REPAIR_PENDING)
+                    )
+                    good_copy = temp_copy is None or not suspect or verify_copy(filepath, temp_copy)
+                if not good_copy and recopy:
+                    logger.warning(
+                        "Staged copy of %s differs from the source, copying it again",
+                        filepath.name,
+                    )
+                    get_tracker().record_issue(
+                        filepath=str(filepath),
+                        issue_type=IssueType.BAD_COPY,
+                        message="Staged copy differed from the source (flaky read)",
+                    )
+                    cache.clear()
+                    temp_copy.path.unlink(missing_ok=True)
+                    return self.analyze_file(filepath, recopy=False)
+                if md5_ok is False:
+                    get_tracker().record_issue(
+                        filepath=str(filepath),
+                        issue_type=IssueType.MD5_MISMATCH,
+                        message="Decoded audio does not match the STREAMINFO MD5",
+                    )
 
             # Add note if analysis was partial
             if is_partial_analysis:
                 reason += " (analysé à partir d'une lecture partielle du fichier)"
 
-            # Increment files analyzed counter
-            get_tracker().increment_files_analyzed()
-
             return {
                 "filepath": str(filepath),
                 "filename": filepath.name,
@@ -141,10 +269,14 @@ class FLACAnalyzer:
                     "suspected_original_rate"
                 ],
                 "estimated_mp3_bitrate": estimate_mp3_bitrate(cutoff_freq),
+                # Read failures are repaired by the repair stage after the scan
+                "repair_candidate": get_tracker().has_issue(
+                    str(filepath), IssueType.REPAIR_PENDING
+                ),
             }
 
         except Exception as e:
-            logger.error(f"Analysis error {filepath.name}: {e}")
+            logger.error("Analysis error %s: %s", filepath.name, e)
             return {
                 "filepath": str(filepath),
                 "filename": filepath.name,
@@ -174,17 +306,20 @@ class FLACAnalyzer:
                 "estimated_bit_depth": 0,
                 "is_upsampled": False,
                 "suspected_original_rate": 0,
+                "repair_candidate": get_tracker().has_issue(
+                    str(filepath), IssueType.REPAIR_PENDING
+                ),
             }
         finally:
             # Cleanup resources
             if "cache" in locals():
                 cache.clear()
-                logger.debug(f"⚡ OPTIMIZATION: Cleared AudioCache for {filepath.name}")
+                logger.debug("⚡ OPTIMIZATION: Cleared AudioCache for %s", filepath.name)
 
             # Delete temp file
-            if temp_path and temp_path.exists():
+            if temp_copy and temp_copy.path.exists():
                 try:
-                    temp_path.unlink()
-                    logger.debug(f"I/O STABILITY: Deleted temp file {temp_path}")
+                    temp_copy.path.unlink()
+                    logger.debug("I/O STABILITY: Deleted temp file %s", temp_copy.path)
                 except Exception as e:
-                    logger.warning(f"Could not delete temp file {temp_path}: {e}")
+                    logger.warning("Could not delete temp file %s: %s", temp_copy.path, e)
@@ -1,18 +1,33 @@
 """Audio cache for optimized file reading and spectral analysis.
 
 Phase 3 Optimization: Avoid multiple file reads and spectrum calculations.
+The full audio is decoded into a buffer leased from the buffer pool, given
+back by ``clear()``. Audio larger than ``LARGE_FILE_MB`` (hour-long mixes,
+concerts, audiobooks) is decoded into a memory-mapped temporary file instead:
+the decoder writes it frame by frame and the analysis slices it like an
+in-memory array, without ever holding the whole file in RAM. In the "stream"
+``LARGE_FILE_MODE`` such files are not decoded whole at all: the analyses
+use the results of a single streaming pass (``get_stream``).
 """
 
 import logging
 from threading import Lock
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import TYPE_CHECKING, Optional, Tuple
 import numpy as np
 import soundfile as sf
-from scipy.fft import rfft, rfftfreq, set_workers
 
-from .window_cache import get_hann_window
+from .. import metrics
+from ..config import analysis_config
+from ..streaminfo import read_streaminfo
+from ..tracing import span
+from .audio_md5 import md5_matches
+from .buffer_pool import get_buffer_pool, spill_buffer
 from .new_scoring.audio_loader import load_audio_with_retry, sf_blocks_partial
+from .parallel_decode import decode_parallel, decode_threads
+
+if TYPE_CHECKING:
+    from .streaming import StreamAnalysis
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +53,10 @@ class AudioCache:
         self._cutoff: Optional[float] = None
         self._lock = Lock()
         self._is_partial = False  # Track if audio data is partial
+        self._lease: Optional[np.ndarray] = None  # Pooled decode buffer
+        self._spill: Optional[np.memmap] = None  # Memory-mapped decode buffer
+        self._streaming: Optional[bool] = None
+        self._stream: Optional["StreamAnalysis"] = None
 
     def get_full_audio(self) -> Tuple[np.ndarray, int]:
         """Get full audio data (cached).
@@ -48,20 +67,20 @@ class AudioCache:
         if self._full_audio is None:
             with self._lock:
                 if self._full_audio is None:  # Double-check pattern
-                    logger.debug(f"CACHE: Loading full audio from {self.filepath.name}")
-                    data, sr = load_audio_with_retry(
-                        str(self.filepath),
-                        always_2d=True,
-                        original_filepath=str(self.original_filepath),
-                    )
+                    logger.debug("CACHE: Loading full audio from %s", self.filepath.name)
+                    with span("decode"):
+                        data, sr = self._decode_full()
 
                     if data is None:
                         # Full load failed - try partial load
                         logger.warning(
-                            f"CACHE: Full load failed for {self.filepath.name}, attempting partial load"
+                            "CACHE: Full load failed for %s, attempting partial load",
+                            self.filepath.name,
                         )
                         data_partial, sr_partial, is_complete = sf_blocks_partial(
-                            str(self.filepath), original_filepath=str(self.original_filepath)
+                            str(self.filepath),
+                            original_filepath=str(self.original_filepath),
+                            out=self._spill,
                         )
 
                         if data_partial is None:
@@ -79,21 +98,132 @@ class AudioCache:
                         self._is_partial = not is_complete
 
                         logger.info(
-                            f"CACHE: Loaded partial audio: {len(data)} frames ({'complete' if is_complete else 'partial'})"
+                            "CACHE: Loaded partial audio: %s frames (%s)",
+                            len(data),
+                            "complete" if is_complete else "partial",
                         )
 
+                    metrics.inc("decoded_bytes_total", data.nbytes)
                     self._full_audio = (data, sr)
         else:
-            logger.debug(f"CACHE: Using cached full audio for {self.filepath.name}")
+            logger.debug("CACHE: Using cached full audio for %s", self.filepath.name)
 
         return self._full_audio
 
+    def _decode_full(self) -> Tuple[Optional[np.ndarray], Optional[int]]:
+        """Decode the whole file, into a pooled or memory-mapped buffer.
+
+        Long files are decoded by several threads (``parallel_decode``),
+        falling back to the sequential decode if a range fails.
+        """
+        out = None
+        threads = 1
+        try:
+            info = sf.info(str(self.filepath))
+            if info.frames > 0:
+                out = self._decode_buffer((info.frames, info.channels))
+                threads = decode_threads(info.frames, info.samplerate)
+        except Exception as e:
+            logger.debug("CACHE: No stream info for %s (%s), decoding unpooled", self.filepath, e)
+
+        data, sr = None, None
+        if threads > 1:
+            with span("parallel_decode", threads=threads):
+                if decode_parallel(str(self.filepath), out, threads):
+                    data, sr = out, info.samplerate
+        if data is None:
+            data, sr = load_audio_with_retry(
+                str(self.filepath),
+                always_2d=True,
+                original_filepath=str(self.original_filepath),
+                out=out,
+            )
+        if out is not None and out is not self._spill:
+            if data is None:
+                get_buffer_pool().release(out)
+            else:
+                self._lease = out
+        return data, sr
+
+    def _decode_buffer(self, shape: Tuple[int, int]) -> np.ndarray:
+        """Get the buffer to decode ``shape`` float64 frames into.
+
+        Memory-mapped above ``LARGE_FILE_MB`` (kept for the partial
+        reads fallback), leased from the buffer pool otherwise.
+        """
+        if _is_large(*shape):
+            nbytes = shape[0] * shape[1] * np.dtype(np.float64).itemsize
+            logger.info(
+                "CACHE: Decoding %s (%.0f MB) into a memory-mapped file",
+                self.filepath.name,
+                nbytes / 1e6,
+            )
+            self._spill = spill_buffer(shape)
+            metrics.inc("decode_spills_total")
+            return self._spill
+        return get_buffer_pool().acquire(shape)
+
+    def is_streaming(self) -> bool:
+        """Check if the file is analyzed in one streaming pass instead of decoded whole.
+
+        True for large files (``LARGE_FILE_MB``) in the "stream" ``LARGE_FILE_MODE``.
+        """
+        if self._streaming is None:
+            streaming = False
+            if analysis_config.LARGE_FILE_MODE == "stream":
+                try:
+                    info = sf.info(str(self.filepath))
+                    streaming = _is_large(info.frames, info.channels)
+                except Exception as e:
+                    logger.debug("CACHE: No stream info for %s (%s)", self.filepath, e)
+            self._streaming = streaming
+        return self._streaming
+
+    def get_stream(self) -> "StreamAnalysis":
+        """Get the results of the single streaming pass over the file (cached)."""
+        if self._stream is None:
+            with self._lock:
+                if self._stream is None:
+                    from .streaming import analyze_stream
+
+                    logger.info("CACHE: Analyzing %s in one streaming pass", self.filepath.name)
+                    with span("stream"):
+                        self._stream = analyze_stream(self.filepath)
+        return self._stream
+
+    def verify_md5(self) -> Optional[bool]:
+        """Check the audio decoded so far against the STREAMINFO MD5 of the file.
+
+        Uses the full decode or the streaming pass if one was made; never
+        decodes the file for it.
+
+        Returns:
+            True if it matches, False if not, None if unknown (no MD5 in the
+            header, partial read or nothing decoded).
+        """
+        if self.is_partial():
+            return None
+        info = read_streaminfo(self.filepath)
+        if info is None or not any(info.md5):
+            return None
+        if self._stream is not None:
+            matches = None if self._stream.md5 is None else self._stream.md5 == info.md5
+        elif self._full_audio is not None:
+            matches = md5_matches(self._full_audio[0], info)
+        else:
+            matches = None
+        if matches is not None:
+            metrics.inc("md5_checks_total", outcome="match" if matches else "mismatch")
+        return matches
+
     def is_partial(self) -> bool:
         """Check if cached audio is partial (incomplete read).
 
         Returns:
             True if audio data is partial, False otherwise
         """
+        if self._stream is not None and not self._stream.complete:
+            return True
         return self._is_partial
 
     def get_segment(self, start_frame: int, frames: int) -> Tuple[np.ndarray, int]:
@@ -112,7 +242,10 @@ class AudioCache:
             with self._lock:
                 if key not in self._segments:  # Double-check pattern
                     logger.debug(
-                        f"CACHE: Loading segment {start_frame}-{start_frame+frames} from {self.filepath.name}"
+                        "CACHE: Loading segment %s-%s from %s",
+                        start_frame,
+                        start_frame + frames,
+                        self.filepath.name,
                     )
                     data, sr = load_audio_with_retry(
                         str(self.filepath),
@@ -129,7 +262,7 @@ class AudioCache:
                         )
                     self._segments[key] = (data, sr)
         else:
-            logger.debug(f"CACHE: Using cached segment {start_frame}-{start_frame+frames}")
+            logger.debug("CACHE: Using cached segment %s-%s", start_frame, start_frame + frames)
 
         return self._segments[key]
 
@@ -147,7 +280,7 @@ class AudioCache:
             Tuple of (frequencies, magnitude_db, sample_rate)
         """
         if self._spectrum is None:
-            logger.debug(f"CACHE: Computing spectrum for {self.filepath.name}")
+            logger.debug("CACHE: Computing spectrum for %s", self.filepath.name)
 
             data, sr = self.get_full_audio()
 
@@ -156,32 +289,17 @@ class AudioCache:
             if len(data) > frames_to_use:
                 data = data[:frames_to_use]
 
-            # Convert to mono
-            if data.shape[1] > 1:
-                data = np.mean(data, axis=1)
-            else:
-                data = data[:, 0]
+            # PHASE 2/3 OPTIMIZATION: Cached window, parallel FFT, scratch buffers
+            from .spectrum import windowed_spectrum
 
-            # Windowing
-            # PHASE 2 OPTIMIZATION: Use cached window
-            window = get_hann_window(len(data))
-            data_windowed = data * window
-
-            # FFT
-            # PHASE 3 OPTIMIZATION: Use parallel FFT
-            with set_workers(1):
-                fft_vals = rfft(data_windowed)
-            fft_freq = rfftfreq(len(data_windowed), 1 / sr)
-
-            magnitude = np.abs(fft_vals)
-            magnitude_db = 20 * np.log10(magnitude + 1e-10)
-
-            magnitude_db = 20 * np.log10(magnitude + 1e-10)
+            fft_freq, _, magnitude_db = windowed_spectrum(data, sr)
+            # Kept beyond this call: copy out of the scratch buffer
+            magnitude_db = magnitude_db.copy()
 
             with self._lock:
                 self._spectrum = (fft_freq, magnitude_db, sr)
         else:
-            logger.debug(f"CACHE: Using cached spectrum for {self.filepath.name}")
+            logger.debug("CACHE: Using cached spectrum for %s", self.filepath.name)
 
         return self._spectrum
 
@@ -196,20 +314,34 @@ class AudioCache:
         if self._cutoff is None:
             from ..spectrum import detect_cutoff
 
-            logger.debug(f"CACHE: Computing cutoff for {self.filepath.name}")
+            logger.debug("CACHE: Computing cutoff for %s", self.filepath.name)
             frequencies, magnitude_db, _ = self.get_spectrum()
             cutoff = detect_cutoff(frequencies, magnitude_db)
             with self._lock:
                 self._cutoff = cutoff
         else:
-            logger.debug(f"CACHE: Using cached cutoff for {self.filepath.name}")
+            logger.debug("CACHE: Using cached cutoff for %s", self.filepath.name)
 
         return self._cutoff
 
     def clear(self):
-        """Clear all cached data."""
-        logger.debug(f"CACHE: Clearing cache for {self.filepath.name}")
+        """Clear all cached data (and give the decode buffer back to the pool).
+
+        A memory-mapped buffer's file is deleted once no view of it is left.
+        """
+        logger.debug("CACHE: Clearing cache for %s", self.filepath.name)
         self._full_audio = None
+        if self._lease is not None:
+            get_buffer_pool().release(self._lease)
+            self._lease = None
+        self._spill = None
+        self._stream = None
         self._segments.clear()
         self._spectrum = None
         self._cutoff = None
+
+
+def _is_large(frames: int, channels: int) -> bool:
+    """Check if a file decodes to more than ``LARGE_FILE_MB``."""
+    threshold = analysis_config.LARGE_FILE_MB * 1024 * 1024
+    return bool(threshold) and frames * channels * np.dtype(np.float64).itemsize > threshold
@@ -0,0 +1,71 @@
+"""MD5 of the decoded audio, as stored in the STREAMINFO block.
+
+FLAC encoders store the MD5 of the original samples: signed little-endian
+integers of ``ceil(bits_per_sample / 8)`` bytes, channels interleaved. The
+decoder returns floats scaled by ``2 ** (bits_per_sample - 1)``, which
+convert back to the integers exactly, so the analysis can check the audio it
+already decoded against the header without reading the file again.
+"""
+
+import hashlib
+from typing import Optional
+
+import numpy as np
+
+from ..streaminfo import StreamInfo
+
+# Frames converted to integers at once
+CHUNK_FRAMES = 1 << 18
+
+
+class AudioMD5:
+    """Incremental MD5 of decoded audio blocks."""
+
+    def __init__(self, bits_per_sample: int):
+        """Initialize the hash.
+
+        Args:
+            bits_per_sample: Bit depth of the stream (from STREAMINFO).
+        """
+        self.width = (bits_per_sample + 7) // 8
+        self._scale = float(1 << (bits_per_sample - 1))
+        self._md5 = hashlib.md5()
+
+    def update(self, block: np.ndarray):
+        """Add decoded frames, shape (frames, channels) or (frames,)."""
+        for start in range(0, len(block), CHUNK_FRAMES):
+            ints = np.rint(block[start : start + CHUNK_FRAMES] * self._scale).astype("<i4")
+            if self.width == 3:
+                samples = ints.view(np.uint8).reshape(-1, 4)[:, :3]
+            elif self.width == 4:
+                samples = ints
+            else:
+                samples = ints.astype(f"<i{self.width}")
+            self._md5.update(np.ascontiguousarray(samples))
+
+    def digest(self) -> bytes:
+        """Get the MD5 of the frames added so far."""
+        return self._md5.digest()
+
+
+def audio_md5(data: np.ndarray, bits_per_sample: int) -> bytes:
+    """Compute the STREAMINFO MD5 of decoded audio."""
+    md5 = AudioMD5(bits_per_sample)
+    md5.update(data)
+    return md5.digest()
+
+
+def md5_matches(data: np.ndarray, info: StreamInfo) -> Optional[bool]:
+    """Check decoded audio against the MD5 of its STREAMINFO block.
+
+    Args:
+        data: The whole decoded stream.
+        info: STREAMINFO of the file.
+
+    Returns:
+        True if the MD5 matches, False if not, None if the header has no MD5
+        (all zeros) or ``data`` is not the whole stream.
+    """
+    if not any(info.md5) or (info.total_samples and len(data) != info.total_samples):
+        return None
+    return audio_md5(data, info.bits_per_sample) == info.md5
@@ -0,0 +1,172 @@
+"""Reusable arrays for the per-file analysis.
+
+Each file used to allocate fresh arrays for its decoded audio, mono mixes,
+windowed copies and spectra, several hundred MB per album track. Freed and
+reallocated file after file, they fragment the heap (worker RSS creeps up)
+and cost page faults. Two kinds of reuse replace them:
+
+- ``BufferPool``: decode buffers leased for the lifetime of a file (the
+  ``AudioCache`` leases one for the full audio and releases it in
+  ``clear()``), kept for the next file up to ``BUFFER_POOL_MB``.
+- ``scratch_buffer``: per-thread arrays for the temporaries of one call
+  (windowed data, magnitudes), valid until the next call in the same thread.
+
+Audio too large for RAM (hour-long mixes, concerts, audiobooks) is decoded
+into a ``spill_buffer`` instead: an array mapped onto a temporary file, which
+the kernel pages in and out as the analysis slices it.
+"""
+
+import logging
+import tempfile
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..config import analysis_config
+
+logger = logging.getLogger(__name__)
+
+# Per-thread scratch buffers, by name (rules run in threads)
+_scratch = threading.local()
+
+
+class BufferPool:
+    """Free list of flat buffers, leased as arrays of a given shape.
+
+    ``acquire`` returns a C-contiguous view of a pooled buffer (growing one,
+    or allocating, when none is large enough); ``release`` gives it back.
+    Released buffers are kept while their total size stays within
+    ``max_bytes``; the leased arrays must not be used after release.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, max_buffers: int = 2):
+        """Initialize the pool.
+
+        Args:
+            max_bytes: Total size of the kept buffers (default ``BUFFER_POOL_MB``).
+            max_buffers: Number of kept buffers.
+        """
+        if max_bytes is None:
+            max_bytes = analysis_config.BUFFER_POOL_MB * 1024 * 1024
+        self.max_bytes = max_bytes
+        self.max_buffers = max_buffers
+        self._free: List[np.ndarray] = []
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def acquire(self, shape: Tuple[int, ...], dtype=np.float64) -> np.ndarray:
+        """Lease an uninitialized array.
+
+        Args:
+            shape: Array shape.
+            dtype: Array dtype.
+
+        Returns:
+            C-contiguous array backed by a pooled buffer.
+        """
+        dtype = np.dtype(dtype)
+        nbytes = int(np.prod(shape)) * dtype.itemsize
+        with self._lock:
+            # Smallest free buffer that is large enough
+            candidates = [b for b in self._free if b.nbytes >= nbytes]
+            if candidates:
+                buffer = min(candidates, key=lambda b: b.nbytes)
+                self._free.remove(buffer)
+                self.hits += 1
+            else:
+                buffer = None
+                self.misses += 1
+        if buffer is None:
+            buffer = np.empty(nbytes, dtype=np.uint8)
+        return buffer[:nbytes].view(dtype).reshape(shape)
+
+    def release(self, array: np.ndarray):
+        """Give back an array returned by ``acquire``."""
+        buffer = array
+        while buffer.base is not None:
+            buffer = buffer.base
+        if not isinstance(buffer, np.ndarray) or buffer.dtype != np.uint8 or buffer.ndim != 1:
+            return
+        with self._lock:
+            if any(b is buffer for b in self._free):
+                return
+            self._free.append(buffer)
+            # Keep the largest buffers within the limits, skipping those that
+            # do not fit rather than dropping every smaller one with them
+            self._free.sort(key=lambda b: b.nbytes, reverse=True)
+            kept: List[np.ndarray] = []
+            kept_bytes = 0
+            for b in self._free:
+                if len(kept) < self.max_buffers and kept_bytes + b.nbytes <= self.max_bytes:
+                    kept.append(b)
+                    kept_bytes += b.nbytes
+            self._free = kept
+
+    def clear(self):
+        """Drop the kept buffers."""
+        with self._lock:
+            self._free.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get pool statistics."""
+        with self._lock:
+            return {
+                "free_buffers": len(self._free),
+                "free_bytes": sum(b.nbytes for b in self._free),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_pool: Optional[BufferPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_buffer_pool() -> BufferPool:
+    """Get the process-wide buffer pool."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = BufferPool()
+    return _pool
+
+
+def spill_buffer(
+    shape: Tuple[int, ...], dtype=np.float64, directory: Optional[str] = None
+) -> np.memmap:
+    """Allocate an array backed by a temporary file.
+
+    The file is anonymous (deleted when the last view of the array is
+    garbage collected), so nothing is left behind by crashed workers.
+
+    Args:
+        shape: Array shape.
+        dtype: Array dtype.
+        directory: Directory of the file (default ``SPILL_DIR``, or the
+            system temporary directory).
+
+    Returns:
+        Zero-filled memory-mapped array.
+    """
+    directory = directory or analysis_config.SPILL_DIR or None
+    with tempfile.TemporaryFile(prefix="flac_detective_", suffix=".pcm", dir=directory) as handle:
+        # The mapping keeps its own handle on the file
+        return np.memmap(handle, dtype=dtype, mode="w+", shape=shape)
+
+
+def scratch_buffer(size: int, name: str = "window") -> np.ndarray:
+    """Get this thread's float64 scratch buffer ``name``, as a view of ``size`` values.
+
+    The buffer grows to the largest size requested and is reused by the next
+    call in the same thread: callers must be done with the view by then.
+    """
+    buffers = getattr(_scratch, "buffers", None)
+    if buffers is None:
+        buffers = _scratch.buffers = {}
+    buffer = buffers.get(name)
+    if buffer is None or len(buffer) < size:
+        buffer = buffers[name] = np.empty(size)
+    return buffer[:size]
@@ -2,12 +2,17 @@
 
 This module tracks all issues encountered during file analysis to provide
 a detailed diagnostic report at the end.
+
+Each process has its own tracker. Issues recorded in analysis workers are
+streamed to the parent with each task (see ``worker_pool``) and merged into
+the parent's tracker with ``add_issues``; per-type counters keep the
+statistics O(number of issue types) whatever the library size.
 """
 
 import logging
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Set
 from enum import Enum
 
 logger = logging.getLogger(__name__)
@@ -19,10 +24,18 @@ class IssueType(Enum):
     PARTIAL_READ = "partial_read"  # File was read but incomplete
     REPAIR_ATTEMPTED = "repair_attempted"  # File required repair attempt
     REPAIR_FAILED = "repair_failed"  # Repair was unsuccessful
+    REPAIR_PENDING = "repair_pending"  # Repair deferred to the repair stage
     READ_FAILED = "read_failed"  # Complete read failure after all retries
     DECODER_SYNC_LOST = "decoder_sync_lost"  # FLAC decoder lost sync
     SEEK_FAILED = "seek_failed"  # Internal seek failure
     CORRUPTED = "corrupted"  # File appears corrupted
+    TIMEOUT = "timeout"  # Analysis exceeded its deadline and was aborted
+    MD5_MISMATCH = "md5_mismatch"  # Decoded audio differs from the STREAMINFO MD5
+    BAD_COPY = "bad_copy"  # Staged copy differed from the source, analyzed again
+
+
+# Issue types marking a file as a critical failure
+CRITICAL_ISSUE_TYPES = frozenset({IssueType.READ_FAILED, IssueType.CORRUPTED, IssueType.TIMEOUT})
 
 
 @dataclass
@@ -46,6 +59,10 @@ class DiagnosticTracker:
         self._issues: Dict[str, List[FileIssue]] = {}
         self._files_analyzed: int = 0
         self._files_with_issues: int = 0
+        self._issue_counts: Dict[IssueType, int] = {}
+        self._critical_files: Set[str] = set()
+        # Optional callback receiving each issue as it is recorded
+        self.listener: Optional[Callable[[FileIssue], None]] = None
 
     def record_issue(
         self,
@@ -78,12 +95,57 @@ class DiagnosticTracker:
             timestamp=datetime.now().strftime("%H:%M:%S"),
         )
 
-        if filepath not in self._issues:
-            self._issues[filepath] = []
+        self._add(issue)
+        if self.listener is not None:
+            self.listener(issue)
+        logger.debug(f"DIAGNOSTIC: Recorded {issue_type.value} for {Path(filepath).name}")
+
+    def add_issues(self, issues: List[FileIssue]):
+        """Add issues recorded elsewhere (e.g. by a worker process).
+
+        Args:
+            issues: Issues to add, with their original timestamps
+        """
+        for issue in issues:
+            self._add(issue)
+
+    def _add(self, issue: FileIssue):
+        """Store an issue and update the counters."""
+        if issue.issue_type == IssueType.BAD_COPY:
+            # The issues came from a spoiled copy, not from the file
+            self._discard(issue.filepath)
+        file_issues = self._issues.get(issue.filepath)
+        if file_issues is None:
+            file_issues = self._issues[issue.filepath] = []
             self._files_with_issues += 1
+        file_issues.append(issue)
+
+        self._issue_counts[issue.issue_type] = self._issue_counts.get(issue.issue_type, 0) + 1
+        if issue.issue_type in CRITICAL_ISSUE_TYPES:
+            self._critical_files.add(issue.filepath)
+
+    def _discard(self, filepath: str):
+        """Forget the issues recorded for a file."""
+        file_issues = self._issues.pop(filepath, [])
+        if file_issues:
+            self._files_with_issues -= 1
+        for issue in file_issues:
+            self._issue_counts[issue.issue_type] -= 1
+            if not self._issue_counts[issue.issue_type]:
+                del self._issue_counts[issue.issue_type]
+        self._critical_files.discard(filepath)
+
+    def has_issue(self, filepath: str, issue_type: IssueType) -> bool:
+        """Check if an issue of the given type was recorded for a file.
 
-        self._issues[filepath].append(issue)
-        logger.debug(f"DIAGNOSTIC: Recorded {issue_type.value} for {Path(filepath).name}")
+        Args:
+            filepath: Path to the file
+            issue_type: Type of issue to look for
+
+        Returns:
+            True if at least one such issue was recorded
+        """
+        return any(issue.issue_type == issue_type for issue in self._issues.get(filepath, []))
 
     def increment_files_analyzed(self):
         """Increment the counter of files analyzed."""
@@ -117,11 +179,7 @@ class DiagnosticTracker:
         Returns:
             True if file has critical issues
         """
-        if filepath not in self._issues:
-            return False
-
-        critical_types = {IssueType.READ_FAILED, IssueType.CORRUPTED}
-        return any(issue.issue_type in critical_types for issue in self._issues[filepath])
+        return filepath in self._critical_files
 
     def get_statistics(self) -> Dict:
         """Get diagnostic statistics.
@@ -133,22 +191,12 @@ class DiagnosticTracker:
             "total_files": self._files_analyzed,
             "files_with_issues": self._files_with_issues,
             "clean_files": self._files_analyzed - self._files_with_issues,
-            "issue_types": {},
-            "critical_failures": 0,
+            "issue_types": {
+                issue_type.value: count for issue_type, count in self._issue_counts.items()
+            },
+            "critical_failures": len(self._critical_files),
         }
 
-        # Count issues by type
-        for filepath, issues in self._issues.items():
-            for issue in issues:
-                issue_type_name = issue.issue_type.value
-                stats["issue_types"][issue_type_name] = (
-                    stats["issue_types"].get(issue_type_name, 0) + 1
-                )
-
-            # Count critical failures
-            if self.has_critical_issues(filepath):
-                stats["critical_failures"] += 1
-
         return stats
 
     def generate_report(self) -> str:
@@ -226,6 +274,8 @@ class DiagnosticTracker:
         self._issues.clear()
         self._files_analyzed = 0
         self._files_with_issues = 0
+        self._issue_counts.clear()
+        self._critical_files.clear()
 
 
 # Global instance for tracking across the application
@@ -72,12 +72,12 @@ class FileReadCache:
         key = str(filepath)
 
         if key not in self._full_reads:
-            logger.debug(f"CACHE MISS: Reading full file {filepath.name}")
+            logger.debug("CACHE MISS: Reading full file %s", filepath.name)
             data, sr = sf.read(str(filepath), **kwargs)
             self._full_reads[key] = (data, sr)
-            logger.debug(f"CACHE: Stored full file {filepath.name} ({data.shape}, {sr} Hz)")
+            logger.debug("CACHE: Stored full file %s (%s, %s Hz)", filepath.name, data.shape, sr)
         else:
-            logger.debug(f"CACHE HIT: Using cached full file {filepath.name}")
+            logger.debug("CACHE HIT: Using cached full file %s", filepath.name)
 
         return self._full_reads[key]
 
@@ -101,14 +101,22 @@ class FileReadCache:
         key = (str(filepath), start, frames)
 
         if key not in self._segment_reads:
-            logger.debug(f"CACHE MISS: Reading segment {filepath.name}[{start}:{start+frames}]")
+            logger.debug(
+                "CACHE MISS: Reading segment %s[%s:%s]", filepath.name, start, start + frames
+            )
             data, sr = sf.read(str(filepath), start=start, frames=frames, **kwargs)
             self._segment_reads[key] = (data, sr)
             logger.debug(
-                f"CACHE: Stored segment {filepath.name}[{start}:{start+frames}] ({data.shape})"
+                "CACHE: Stored segment %s[%s:%s] (%s)",
+                filepath.name,
+                start,
+                start + frames,
+                data.shape,
             )
         else:
-            logger.debug(f"CACHE HIT: Using cached segment {filepath.name}[{start}:{start+frames}]")
+            logger.debug(
+                "CACHE HIT: Using cached segment %s[%s:%s]", filepath.name, start, start + frames
+            )
 
         return self._segment_reads[key]
 
@@ -30,7 +30,7 @@ from .bitrate import (
 )
 from .verdict import determine_verdict
 from .metadata import parse_metadata
-from .calculator import new_calculate_score
+from .calculator import new_calculate_score, triage_calculate_score
 
 __all__ = [
     # Models
@@ -54,4 +54,5 @@ __all__ = [
     "determine_verdict",
     "parse_metadata",
     "new_calculate_score",
+    "triage_calculate_score",
 ]
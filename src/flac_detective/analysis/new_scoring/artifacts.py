@@ -15,6 +15,7 @@ import soundfile as sf
 from scipy import signal
 from scipy.fft import fft, fftfreq
 
+from ..window_cache import get_butter_sos
 from .audio_loader import load_audio_segment, load_audio_with_retry
 
 logger = logging.getLogger(__name__)
@@ -40,7 +41,8 @@ def detect_preecho_artifacts(
     max_samples = int(30 * sample_rate)  # 30 seconds max
     if len(audio_data) > max_samples:
         logger.debug(
-            f"ARTIFACTS: Limiting pre-echo analysis to first 30s (audio is {len(audio_data)/sample_rate:.1f}s)"
+            "ARTIFACTS: Limiting pre-echo analysis to first 30s (audio is %.1fs)",
+            len(audio_data) / sample_rate,
         )
         audio_data = audio_data[:max_samples]
 
@@ -96,9 +98,7 @@ def detect_preecho_artifacts(
         return 0.0, num_transients, 0
 
     # Bandpass filter 10-20 kHz
-    sos = signal.butter(
-        4, [10000, min(20000, nyquist - 100)], "bandpass", fs=sample_rate, output="sos"
-    )
+    sos = get_butter_sos(4, (10000, min(20000, nyquist - 100)), "bandpass", sample_rate)
     audio_hf = signal.sosfilt(sos, audio_data)
 
     # Calculate baseline HF energy (from quiet sections)
@@ -123,8 +123,10 @@ def detect_preecho_artifacts(
     percentage_affected = (num_with_preecho / num_transients) * 100 if num_transients > 0 else 0.0
 
     logger.debug(
-        f"ARTIFACTS: Pre-echo analysis: {num_with_preecho}/{num_transients} transients affected "
-        f"({percentage_affected:.1f}%)"
+        "ARTIFACTS: Pre-echo analysis: %s/%s transients affected (%.1f%%)",
+        num_with_preecho,
+        num_transients,
+        percentage_affected,
     )
 
     return percentage_affected, num_transients, num_with_preecho
@@ -147,7 +149,8 @@ def detect_hf_aliasing(audio_data: np.ndarray, sample_rate: int) -> float:
     max_samples = int(30 * sample_rate)  # 30 seconds max
     if len(audio_data) > max_samples:
         logger.debug(
-            f"ARTIFACTS: Limiting aliasing analysis to first 30s (audio is {len(audio_data)/sample_rate:.1f}s)"
+            "ARTIFACTS: Limiting aliasing analysis to first 30s (audio is %.1fs)",
+            len(audio_data) / sample_rate,
         )
         audio_data = audio_data[:max_samples]
 
@@ -163,12 +166,12 @@ def detect_hf_aliasing(audio_data: np.ndarray, sample_rate: int) -> float:
         return 0.0
 
     # Extract band A: 10-15 kHz
-    sos_a = signal.butter(4, [10000, 15000], "bandpass", fs=sample_rate, output="sos")
+    sos_a = get_butter_sos(4, (10000, 15000), "bandpass", sample_rate)
     band_a = signal.sosfilt(sos_a, audio_data)
 
     # Extract band B: 15-20 kHz (or up to Nyquist)
     upper_freq = min(20000, nyquist - 100)
-    sos_b = signal.butter(4, [15000, upper_freq], "bandpass", fs=sample_rate, output="sos")
+    sos_b = get_butter_sos(4, (15000, upper_freq), "bandpass", sample_rate)
     band_b = signal.sosfilt(sos_b, audio_data)
 
     # Invert band B
@@ -207,7 +210,7 @@ def detect_hf_aliasing(audio_data: np.ndarray, sample_rate: int) -> float:
     # Use median correlation
     correlation = np.median(correlations)
 
-    logger.debug(f"ARTIFACTS: HF aliasing correlation: {correlation:.3f}")
+    logger.debug("ARTIFACTS: HF aliasing correlation: %.3f", correlation)
 
     return float(correlation)
 
@@ -229,7 +232,8 @@ def detect_mp3_noise_pattern(audio_data: np.ndarray, sample_rate: int) -> bool:
     max_samples = int(30 * sample_rate)  # 30 seconds max
     if len(audio_data) > max_samples:
         logger.debug(
-            f"ARTIFACTS: Limiting MP3 noise analysis to first 30s (audio is {len(audio_data)/sample_rate:.1f}s)"
+            "ARTIFACTS: Limiting MP3 noise analysis to first 30s (audio is %.1fs)",
+            len(audio_data) / sample_rate,
         )
         audio_data = audio_data[:max_samples]
 
@@ -246,7 +250,7 @@ def detect_mp3_noise_pattern(audio_data: np.ndarray, sample_rate: int) -> bool:
 
     # Extract high-frequency noise band (16-20 kHz)
     upper_freq = min(20000, nyquist - 100)
-    sos = signal.butter(4, [16000, upper_freq], "bandpass", fs=sample_rate, output="sos")
+    sos = get_butter_sos(4, (16000, upper_freq), "bandpass", sample_rate)
     noise_band = signal.sosfilt(sos, audio_data)
 
     # Analyze segments
@@ -297,14 +301,15 @@ def detect_mp3_noise_pattern(audio_data: np.ndarray, sample_rate: int) -> bool:
 
         if peak_value > noise_floor * 2:  # Peak is 2x above noise floor
             detected_peaks += 1
-            logger.debug(f"ARTIFACTS: MP3 noise peak detected at {local_freqs[peak_idx]:.1f} Hz")
+            logger.debug("ARTIFACTS: MP3 noise peak detected at %.1f Hz", local_freqs[peak_idx])
 
     # If we detect at least 2 out of 3 harmonics, it's likely MP3
     pattern_detected = detected_peaks >= 2
 
     logger.debug(
-        f"ARTIFACTS: MP3 noise pattern: {detected_peaks}/3 peaks detected "
-        f"({'DETECTED' if pattern_detected else 'NOT DETECTED'})"
+        "ARTIFACTS: MP3 noise pattern: %s/3 peaks detected (%s)",
+        detected_peaks,
+        "DETECTED" if pattern_detected else "NOT DETECTED",
     )
 
     return pattern_detected
@@ -316,6 +321,7 @@ def analyze_compression_artifacts(
     mp3_bitrate_detected: Optional[int],
     audio_data: Optional[np.ndarray] = None,
     sample_rate: Optional[int] = None,
+    preecho: Optional[Tuple[float, int, int]] = None,
 ) -> Tuple[int, list, dict]:
     """Analyze file for psychoacoustic compression artifacts (Rule 9).
 
@@ -330,6 +336,8 @@ def analyze_compression_artifacts(
         mp3_bitrate_detected: MP3 bitrate from Rule 1 (or None)
         audio_data: Optional pre-loaded audio data
         sample_rate: Optional sample rate of pre-loaded data
+        preecho: Optional Test 9A result computed beforehand (streaming
+            analysis of a large file), as ``detect_preecho_artifacts`` returns it
 
     Returns:
         Tuple of (score_delta, list_of_reasons, details_dict)
@@ -347,7 +355,7 @@ def analyze_compression_artifacts(
     should_activate = cutoff_freq < 21000 or mp3_bitrate_detected is not None
 
     if not should_activate:
-        logger.debug(f"RULE 9: Skipped (cutoff {cutoff_freq:.0f} Hz >= 21000 and no MP3 signature)")
+        logger.debug("RULE 9: Skipped (cutoff %.0f Hz >= 21000 and no MP3 signature)", cutoff_freq)
         return score, reasons, details
 
     logger.info("RULE 9: Activation - Analyzing compression artifacts...")
@@ -373,23 +381,22 @@ def analyze_compression_artifacts(
                     audio_data, sample_rate = load_audio_with_retry(file_path)
 
             except Exception as e:
-                logger.error(f"RULE 9: Could not get audio info or load segment: {e}")
+                logger.error("RULE 9: Could not get audio info or load segment: %s", e)
                 return 0, [], details
         else:
             logger.info("RULE 9: Using pre-loaded audio data (cached)")
 
         if audio_data is None or sample_rate is None:
             logger.error(
-                f"RULE 9: Failed to load audio after retries. "
-                f"Returning 0 points (no penalty for temporary decoder issues)."
+                "RULE 9: Failed to load audio after retries. Returning 0 points (no penalty for temporary decoder issues)."
             )
             return 0, [], details
 
         # Test 9A: Pre-echo detection
         try:
-            preecho_pct, num_transients, num_affected = detect_preecho_artifacts(
-                audio_data, sample_rate
-            )
+            if preecho is None:
+                preecho = detect_preecho_artifacts(audio_data, sample_rate)
+            preecho_pct, num_transients, num_affected = preecho
             details["preecho_percentage"] = preecho_pct
             details["tests_run"].append("9A")
 
@@ -398,16 +405,16 @@ def analyze_compression_artifacts(
                 reasons.append(
                     f"R9A: Pré-echo détecté ({preecho_pct:.1f}% transitoires affectées) (+15pts)"
                 )
-                logger.info(f"RULE 9A: +15 points (pre-echo {preecho_pct:.1f}% > 10%)")
+                logger.info("RULE 9A: +15 points (pre-echo %.1f%% > 10%%)", preecho_pct)
             elif preecho_pct >= 5:
                 score += 10
                 reasons.append(f"R9A: Pré-echo modéré ({preecho_pct:.1f}% transitoires) (+10pts)")
-                logger.info(f"RULE 9A: +10 points (pre-echo {preecho_pct:.1f}% >= 5%)")
+                logger.info("RULE 9A: +10 points (pre-echo %.1f%% >= 5%%)", preecho_pct)
             else:
-                logger.debug(f"RULE 9A: 0 points (pre-echo {preecho_pct:.1f}% < 5%)")
+                logger.debug("RULE 9A: 0 points (pre-echo %.1f%% < 5%%)", preecho_pct)
 
         except Exception as e:
-            logger.warning(f"RULE 9A: Pre-echo analysis failed: {e}")
+            logger.warning("RULE 9A: Pre-echo analysis failed: %s", e)
 
         # Test 9B: HF aliasing detection
         try:
@@ -418,16 +425,16 @@ def analyze_compression_artifacts(
             if aliasing_corr > 0.5:
                 score += 15
                 reasons.append(f"R9B: Aliasing HF fort (corr={aliasing_corr:.2f}) (+15pts)")
-                logger.info(f"RULE 9B: +15 points (aliasing {aliasing_corr:.2f} > 0.5)")
+                logger.info("RULE 9B: +15 points (aliasing %.2f > 0.5)", aliasing_corr)
             elif aliasing_corr >= 0.3:
                 score += 10
                 reasons.append(f"R9B: Aliasing HF modéré (corr={aliasing_corr:.2f}) (+10pts)")
-                logger.info(f"RULE 9B: +10 points (aliasing {aliasing_corr:.2f} >= 0.3)")
+                logger.info("RULE 9B: +10 points (aliasing %.2f >= 0.3)", aliasing_corr)
             else:
-                logger.debug(f"RULE 9B: 0 points (aliasing {aliasing_corr:.2f} < 0.3)")
+                logger.debug("RULE 9B: 0 points (aliasing %.2f < 0.3)", aliasing_corr)
 
         except Exception as e:
-            logger.warning(f"RULE 9B: Aliasing analysis failed: {e}")
+            logger.warning("RULE 9B: Aliasing analysis failed: %s", e)
 
         # Test 9C: MP3 noise pattern detection
         try:
@@ -443,14 +450,14 @@ def analyze_compression_artifacts(
                 logger.debug("RULE 9C: 0 points (no MP3 noise pattern)")
 
         except Exception as e:
-            logger.warning(f"RULE 9C: MP3 noise pattern analysis failed: {e}")
+            logger.warning("RULE 9C: MP3 noise pattern analysis failed: %s", e)
 
     except Exception as e:
-        logger.error(f"RULE 9: Failed to load audio file: {e}")
+        logger.error("RULE 9: Failed to load audio file: %s", e)
         return score, reasons, details
 
     if score > 0:
-        logger.info(f"RULE 9: Total +{score} points from artifact detection")
+        logger.info("RULE 9: Total +%s points from artifact detection", score)
     else:
         logger.info("RULE 9: No compression artifacts detected")
 
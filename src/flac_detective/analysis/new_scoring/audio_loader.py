@@ -11,6 +11,8 @@ import shutil
 import subprocess
 import os
 
+from ... import metrics
+from ...config import repair_config
 from ..diagnostic_tracker import get_tracker, IssueType
 
 # Type variable for mutagen availability
@@ -25,6 +27,11 @@ except ImportError:
 
 logger: logging.Logger = logging.getLogger(__name__)
 
+# Timeouts of the flac steps of a repair (seconds)
+DECODE_TIMEOUT = 120
+ENCODE_TIMEOUT = 120
+VERIFY_TIMEOUT = 60
+
 
 def is_temporary_decoder_error(error_message: str) -> bool:
     """Check if an error is a temporary decoder error that should be retried.
@@ -80,11 +87,11 @@ def load_audio_with_retry(
 
     for attempt in range(1, max_attempts + 1):
         try:
-            logger.debug(f"Loading audio (attempt {attempt}/{max_attempts}): {file_path}")
+            logger.debug("Loading audio (attempt %s/%s): %s", attempt, max_attempts, file_path)
             audio_data, sample_rate = sf.read(file_path, **kwargs)
 
             if attempt > 1:
-                logger.info(f"✅ Audio loaded successfully on attempt {attempt}")
+                logger.info("✅ Audio loaded successfully on attempt %s", attempt)
 
             return audio_data, sample_rate
 
@@ -95,12 +102,13 @@ def load_audio_with_retry(
             # Check if this is a temporary error
             if is_temporary_decoder_error(error_msg):
                 if attempt < max_attempts:
-                    logger.debug(f"Temporary error on attempt {attempt}: {error_msg}")
-                    logger.debug(f"Retrying in {delay:.1f}s...")
+                    logger.debug("Temporary error on attempt %s: %s", attempt, error_msg)
+                    logger.debug("Retrying in %.1fs...", delay)
+                    metrics.inc("decode_retries_total")
                     time.sleep(delay)
                     delay *= backoff_multiplier
                 else:
-                    logger.warning(f"Failed after {max_attempts} attempts: {error_msg}")
+                    logger.warning("Failed after %s attempts: %s", max_attempts, error_msg)
                     # Track this issue
                     get_tracker().record_issue(
                         filepath=tracking_path,
@@ -114,7 +122,7 @@ def load_audio_with_retry(
                     )
             else:
                 # Not a temporary error, don't retry
-                logger.warning(f"Non-temporary error, not retrying: {error_msg}")
+                logger.warning("Non-temporary error, not retrying: %s", error_msg)
                 get_tracker().record_issue(
                     filepath=tracking_path,
                     issue_type=IssueType.READ_FAILED,
@@ -123,8 +131,18 @@ def load_audio_with_retry(
                 )
                 break
 
+    if repair_config.DEFERRED:
+        # Leave the repair to the repair stage; the caller continues with partial data
+        logger.debug("All attempts to load %s failed. Queuing repair...", file_path)
+        get_tracker().record_issue(
+            filepath=tracking_path,
+            issue_type=IssueType.REPAIR_PENDING,
+            message="Repair deferred to the repair stage after read failures",
+        )
+        return None, None
+
     # All attempts failed, try to repair and load again
-    logger.debug(f"All attempts to load {file_path} failed. Attempting repair...")
+    logger.debug("All attempts to load %s failed. Attempting repair...", file_path)
     get_tracker().record_issue(
         filepath=tracking_path,
         issue_type=IssueType.REPAIR_ATTEMPTED,
@@ -140,11 +158,11 @@ def load_audio_with_retry(
     if repaired_path:
         try:
             audio_data, sample_rate = sf.read(repaired_path, **kwargs)
-            logger.info(f"✅ Successfully loaded repaired file: {repaired_path}")
+            logger.info("✅ Successfully loaded repaired file: %s", repaired_path)
             os.remove(repaired_path)
             return audio_data, sample_rate
         except Exception as e:
-            logger.warning(f"Failed to load repaired file {repaired_path}: {e}")
+            logger.warning("Failed to load repaired file %s: %s", repaired_path, e)
             get_tracker().record_issue(
                 filepath=tracking_path,
                 issue_type=IssueType.REPAIR_FAILED,
@@ -185,21 +203,27 @@ def load_audio_segment(
             if is_temporary_decoder_error(error_msg):
                 if attempt < max_attempts:
                     logger.debug(
-                        f"Temporary error loading segment on attempt {attempt}: {error_msg}"
+                        "Temporary error loading segment on attempt %s: %s", attempt, error_msg
                     )
-                    logger.debug(f"Retrying in {delay:.1f}s...")
+                    logger.debug("Retrying in %.1fs...", delay)
                     time.sleep(delay)
                     delay *= backoff_multiplier
                 else:
                     logger.error(
-                        f"❌ Failed to load audio segment after {max_attempts} attempts: {error_msg}"
+                        "❌ Failed to load audio segment after %s attempts: %s",
+                        max_attempts,
+                        error_msg,
                     )
             else:
-                logger.error(f"Non-temporary error loading audio segment: {error_msg}")
+                logger.error("Non-temporary error loading audio segment: %s", error_msg)
                 break
 
+    if repair_config.DEFERRED:
+        # Full-file loads queue the repair; segment readers just give up
+        return None, None
+
     # All attempts failed, try to repair and load again
-    logger.debug(f"All attempts to load segment from {file_path} failed. Attempting repair...")
+    logger.debug("All attempts to load segment from %s failed. Attempting repair...", file_path)
     # Note: load_audio_segment doesn't have original_filepath, so no source replacement here
     repaired_path = repair_flac_file(corrupted_path=file_path)
 
@@ -211,11 +235,11 @@ def load_audio_segment(
                 frames_to_read = int(duration_sec * sr)
                 f.seek(start_frame)
                 data = f.read(frames_to_read)
-                logger.info(f"✅ Successfully loaded segment from repaired file: {repaired_path}")
+                logger.info("✅ Successfully loaded segment from repaired file: %s", repaired_path)
                 os.remove(repaired_path)
                 return data, sr
         except Exception as e:
-            logger.error(f"❌ Failed to load segment from repaired file {repaired_path}: {e}")
+            logger.error("❌ Failed to load segment from repaired file %s: %s", repaired_path, e)
             os.remove(repaired_path)
 
     return None, None
@@ -279,12 +303,12 @@ def _extract_metadata(flac_path: str) -> Optional[Dict[str, Any]]:
         # Extract all pictures (album art)
         pictures: List[Picture] = list(audio.pictures) if audio.pictures else []
 
-        logger.debug(f"  Extracted {len(tags)} tag types and {len(pictures)} picture(s)")
+        logger.debug("  Extracted %s tag types and %s picture(s)", len(tags), len(pictures))
 
         return {"tags": tags, "pictures": pictures}
 
     except Exception as e:
-        logger.warning(f"Failed to extract metadata: {e}")
+        logger.warning("Failed to extract metadata: %s", e)
         return None
 
 
@@ -370,14 +394,34 @@ def _restore_metadata(flac_path: str, metadata: Optional[Dict[str, Any]]) -> boo
 
         audio.save()
 
-        logger.debug(f"  Restored {len(tags)} tag types and {len(pictures)} picture(s)")
+        logger.debug("  Restored %s tag types and %s picture(s)", len(tags), len(pictures))
         return True
 
     except Exception as e:
-        logger.error(f"Failed to restore metadata: {e}")
+        logger.error("Failed to restore metadata: %s", e)
         return False
 
 
+def _replace_file(new_path: str, target_path: str):
+    """Replace a file with a copy of another, atomically.
+
+    The copy is written next to the target and renamed over it, so that an
+    interruption (e.g. the repair stage deadline) never leaves it truncated.
+    """
+    directory = os.path.dirname(os.path.abspath(target_path))
+    fd, temp_path = tempfile.mkstemp(prefix=".flac_detective_repair_", suffix=".tmp", dir=directory)
+    os.close(fd)
+    try:
+        shutil.copy2(new_path, temp_path)
+        os.replace(temp_path, target_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
 def repair_flac_file(
     corrupted_path: str, source_path: Optional[str] = None, replace_source: bool = False
 ) -> Optional[str]:
@@ -412,20 +456,20 @@ def repair_flac_file(
         display_name: str = (
             os.path.basename(source_path) if source_path else os.path.basename(corrupted_path)
         )
-        logger.info(f"Attempting to repair {display_name}")
+        logger.info("Attempting to repair %s", display_name)
 
         # Step 0: Extract metadata from original file
-        logger.debug(f"  Step 0: Extracting metadata")
+        logger.debug("  Step 0: Extracting metadata")
         metadata = _extract_metadata(corrupted_path)
         if metadata:
             tag_count = len(metadata.get("tags", {}))
             pic_count = len(metadata.get("pictures", []))
-            logger.debug(f"  ✅ Extracted {tag_count} tags, {pic_count} picture(s)")
+            logger.debug("  ✅ Extracted %s tags, %s picture(s)", tag_count, pic_count)
         else:
-            logger.warning(f"  ⚠️  Could not extract metadata (will be lost)")
+            logger.warning("  ⚠️  Could not extract metadata (will be lost)")
 
         # Step 1: Decode FLAC to WAV with error recovery
-        logger.debug(f"  Step 1: Decoding with error recovery to {os.path.basename(wav_path)}")
+        logger.debug("  Step 1: Decoding with error recovery to %s", os.path.basename(wav_path))
         decode_command = [
             "flac",
             "--decode",
@@ -437,19 +481,19 @@ def repair_flac_file(
         ]
 
         decode_result = subprocess.run(
-            decode_command, capture_output=True, text=True, check=False, timeout=120
+            decode_command, capture_output=True, text=True, check=False, timeout=DECODE_TIMEOUT
         )
 
         # Check if WAV was created (even if there were errors during decoding)
         if not os.path.exists(wav_path) or os.path.getsize(wav_path) == 0:
-            logger.error(f"  ❌ Failed to decode: no WAV output created")
+            logger.error("  ❌ Failed to decode: no WAV output created")
             return None
 
         wav_size_mb = os.path.getsize(wav_path) / (1024 * 1024)
-        logger.debug(f"  ✅ Decoded to WAV ({wav_size_mb:.1f} MB)")
+        logger.debug("  ✅ Decoded to WAV (%.1f MB)", wav_size_mb)
 
         # Step 2: Re-encode WAV to FLAC
-        logger.debug(f"  Step 2: Re-encoding to FLAC")
+        logger.debug("  Step 2: Re-encoding to FLAC")
         encode_command = [
             "flac",
             "--best",
@@ -461,70 +505,70 @@ def repair_flac_file(
         ]
 
         encode_result = subprocess.run(
-            encode_command, capture_output=True, text=True, check=False, timeout=120
+            encode_command, capture_output=True, text=True, check=False, timeout=ENCODE_TIMEOUT
         )
 
         if encode_result.returncode != 0:
-            logger.error(f"  ❌ Failed to re-encode WAV to FLAC")
-            logger.debug(f"     Error: {encode_result.stderr}")
+            logger.error("  ❌ Failed to re-encode WAV to FLAC")
+            logger.debug("     Error: %s", encode_result.stderr)
             return None
 
         # Step 3: Restore metadata to repaired file
-        logger.debug(f"  Step 3: Restoring metadata")
+        logger.debug("  Step 3: Restoring metadata")
         if metadata:
             if _restore_metadata(repaired_path, metadata):
-                logger.debug(f"  ✅ Metadata restored successfully")
+                logger.debug("  ✅ Metadata restored successfully")
             else:
-                logger.warning(f"  ⚠️  Failed to restore metadata")
+                logger.warning("  ⚠️  Failed to restore metadata")
         else:
-            logger.debug(f"  ⚠️  No metadata to restore")
+            logger.debug("  ⚠️  No metadata to restore")
 
         # Step 4: Verify repaired FLAC integrity
-        logger.debug(f"  Step 4: Verifying repaired FLAC")
+        logger.debug("  Step 4: Verifying repaired FLAC")
         verify_command = ["flac", "--test", "--silent", repaired_path]
 
         verify_result = subprocess.run(
-            verify_command, capture_output=True, text=True, check=False, timeout=60
+            verify_command, capture_output=True, text=True, check=False, timeout=VERIFY_TIMEOUT
         )
 
         if verify_result.returncode != 0:
-            logger.warning(f"  ⚠️  Repaired FLAC still has issues")
-            logger.debug(f"     Error: {verify_result.stderr}")
+            logger.warning("  ⚠️  Repaired FLAC still has issues")
+            logger.debug("     Error: %s", verify_result.stderr)
             return None
 
         repaired_size_mb = os.path.getsize(repaired_path) / (1024 * 1024)
-        logger.info(f"  ✅ Successfully repaired and verified ({repaired_size_mb:.1f} MB)")
+        logger.info("  ✅ Successfully repaired and verified (%.1f MB)", repaired_size_mb)
 
         # Step 5: Replace source file if requested
         if replace_source and source_path and os.path.exists(source_path):
             try:
                 # Create backup of original corrupted file
                 backup_path = source_path + ".corrupted.bak"
-                logger.info(f"  💾 Creating backup: {os.path.basename(backup_path)}")
+                logger.info("  💾 Creating backup: %s", os.path.basename(backup_path))
                 shutil.copy2(source_path, backup_path)
 
                 # Replace original with repaired version
-                logger.info(f"  🔄 Replacing original file with repaired version")
-                shutil.copy2(repaired_path, source_path)
+                logger.info("  🔄 Replacing original file with repaired version")
+                _replace_file(repaired_path, source_path)
 
-                logger.info(f"  ✅ Original file replaced successfully")
+                logger.info("  ✅ Original file replaced successfully")
                 get_tracker().record_issue(
                     filepath=source_path,
                     issue_type=IssueType.REPAIR_ATTEMPTED,
                     message=f"File successfully repaired and replaced (backup: {os.path.basename(backup_path)})",
                 )
             except Exception as replace_error:
-                logger.error(f"  ❌ Failed to replace source file: {replace_error}")
+                logger.error("  ❌ Failed to replace source file: %s", replace_error)
                 # Don't fail the whole repair - we still have the repaired temp file
 
         return repaired_path
 
-    except subprocess.TimeoutExpired:
-        logger.error(f"  ❌ Repair timeout (>120s)")
+    except subprocess.TimeoutExpired as e:
+        logger.error("  ❌ Repair timeout (>%ss)", e.timeout)
         return None
 
     except Exception as e:
-        logger.error(f"  ❌ Repair exception: {e}")
+        logger.error("  ❌ Repair exception: %s", e)
         return None
 
     finally:
@@ -543,14 +587,15 @@ def sf_blocks(
     max_attempts: int = 5,
     initial_delay: float = 0.2,
     backoff_multiplier: float = 2.0,
+    out: Optional[np.ndarray] = None,
 ) -> Generator[NDArray[np.float32], None, None]:
     """Read audio in chunks with a retry mechanism for temporary errors.
 
     This function reads audio in chunks to avoid loading the entire file into
-    memory at once. It includes a retry mechanism to handle temporary I/O
-    issues during chunk-based reads. It reopens the file and seeks to the last
-    known position on retries to ensure the file handle is not in a corrupted
-    state.
+    memory at once. The file is read sequentially through one handle; it
+    includes a retry mechanism to handle temporary I/O issues during
+    chunk-based reads, which reopens the file and seeks to the last known
+    position to ensure the file handle is not in a corrupted state.
 
     Args:
         file_path: Path to the audio file.
@@ -559,6 +604,8 @@ def sf_blocks(
         max_attempts: Maximum number of retry attempts.
         initial_delay: Initial delay between retries.
         backoff_multiplier: Multiplier for exponential backoff.
+        out: Array of shape (blocksize, channels) to read every chunk into
+            (the chunks are views of it, valid until the next one).
 
     Returns:
         Generator yielding audio chunks as numpy arrays.
@@ -567,51 +614,53 @@ def sf_blocks(
     try:
         total_frames: int = sf.info(file_path).frames
     except Exception as e:
-        logger.error(f"Could not open or read info from {file_path}: {e}")
+        logger.error("Could not open or read info from %s: %s", file_path, e)
         return
 
+    attempt: int = 1
+    delay: float = initial_delay
     while current_frame < total_frames:
-        delay: float = initial_delay
-        read_successful: bool = False
-        for attempt in range(1, max_attempts + 1):
-            try:
-                with sf.SoundFile(file_path, "r") as f:
+        try:
+            with sf.SoundFile(file_path, "r") as f:
+                if current_frame:
                     f.seek(current_frame)
-                    chunk = f.read(blocksize, dtype=dtype)
-
+                while current_frame < total_frames:
+                    chunk = f.read(blocksize, dtype=dtype, out=out)
                     if len(chunk) == 0:
                         current_frame = total_frames
-                        read_successful = True
                         break
-
                     yield chunk
                     current_frame = f.tell()
-                    read_successful = True
-                    break
-
-            except Exception as e:
-                error_msg = str(e)
-                if is_temporary_decoder_error(error_msg):
-                    if attempt < max_attempts:
-                        logger.debug(
-                            f"Temporary error on attempt {attempt} reading from frame {current_frame}: {error_msg}"
-                        )
-                        logger.debug(f"Retrying in {delay:.1f}s...")
-                        time.sleep(delay)
-                        delay *= backoff_multiplier
-                    else:
-                        logger.error(
-                            f"❌ Failed to read from frame {current_frame} after {max_attempts} attempts: {error_msg}"
-                        )
-                else:
-                    logger.error(
-                        f"Non-temporary error reading from frame {current_frame}, not retrying: {error_msg}"
-                    )
-                    current_frame = total_frames
-                    break
+                    # Progress: a later error gets a fresh set of attempts
+                    attempt, delay = 1, initial_delay
 
-        if not read_successful:
-            break
+        except Exception as e:
+            error_msg = str(e)
+            if not is_temporary_decoder_error(error_msg):
+                logger.error(
+                    "Non-temporary error reading from frame %s, not retrying: %s",
+                    current_frame,
+                    error_msg,
+                )
+                return
+            if attempt >= max_attempts:
+                logger.error(
+                    "❌ Failed to read from frame %s after %s attempts: %s",
+                    current_frame,
+                    max_attempts,
+                    error_msg,
+                )
+                return
+            logger.debug(
+                "Temporary error on attempt %s reading from frame %s: %s",
+                attempt,
+                current_frame,
+                error_msg,
+            )
+            logger.debug("Retrying in %.1fs...", delay)
+            time.sleep(delay)
+            delay *= backoff_multiplier
+            attempt += 1
 
 
 def sf_blocks_partial(
@@ -622,6 +671,7 @@ def sf_blocks_partial(
     initial_delay: float = 0.2,
     backoff_multiplier: float = 2.0,
     original_filepath: Optional[str] = None,
+    out: Optional[np.ndarray] = None,
 ) -> Tuple[Optional[NDArray[np.float32]], Optional[int], bool]:
     """Read audio in chunks, returning partial data if full read fails.
 
@@ -637,10 +687,13 @@ def sf_blocks_partial(
         initial_delay: Initial delay between retries.
         backoff_multiplier: Multiplier for exponential backoff.
         original_filepath: Original file path for diagnostic reporting (default: None).
+        out: Array of shape (frames, channels) to read the chunks into, in
+            place of concatenating them (its dtype overrides ``dtype``).
 
     Returns:
         Tuple of (audio_data, sample_rate, is_complete):
-        - audio_data: Concatenated audio chunks (None if no data read)
+        - audio_data: Concatenated audio chunks, or the filled part of ``out``
+          (None if no data read)
         - sample_rate: Sample rate of the audio file (None if cannot read info)
         - is_complete: True if entire file was read, False if partial
     """
@@ -650,16 +703,17 @@ def sf_blocks_partial(
     chunks: List[NDArray[np.float32]] = []
     sample_rate: Optional[int] = None
     current_frame: int = 0
+    frames_read: int = 0
 
     try:
         info = sf.info(file_path)
         sample_rate = info.samplerate
         total_frames: int = info.frames
     except Exception as e:
-        logger.error(f"Cannot read file info from {file_path}: {e}")
+        logger.error("Cannot read file info from %s: %s", file_path, e)
         return None, None, False
 
-    logger.debug(f"Starting partial block read of {file_path} ({total_frames} frames)")
+    logger.debug("Starting partial block read of %s (%s frames)", file_path, total_frames)
 
     # Read chunks until we hit an error or reach end
     while current_frame < total_frames:
@@ -670,16 +724,18 @@ def sf_blocks_partial(
             try:
                 with sf.SoundFile(file_path, "r") as f:
                     f.seek(current_frame)
-                    chunk = f.read(blocksize, dtype=dtype)
+                    block_out = None if out is None else out[current_frame:][:blocksize]
+                    chunk = f.read(blocksize, dtype=dtype, out=block_out)
 
                     if len(chunk) == 0:
                         # Reached end of file
-                        logger.debug(f"Reached end of file at frame {current_frame}")
+                        logger.debug("Reached end of file at frame %s", current_frame)
                         current_frame = total_frames
                         read_successful = True
                         break
 
                     chunks.append(chunk)
+                    frames_read += len(chunk)
                     current_frame = f.tell()
                     read_successful = True
                     break
@@ -690,19 +746,27 @@ def sf_blocks_partial(
                 if is_temporary_decoder_error(error_msg):
                     if attempt < max_attempts:
                         logger.debug(
-                            f"Temporary error on attempt {attempt} reading from frame {current_frame}: {error_msg}"
+                            "Temporary error on attempt %s reading from frame %s: %s",
+                            attempt,
+                            current_frame,
+                            error_msg,
                         )
-                        logger.debug(f"Retrying in {delay:.1f}s...")
+                        logger.debug("Retrying in %.1fs...", delay)
                         time.sleep(delay)
                         delay *= backoff_multiplier
                     else:
                         # Max attempts reached - return what we have
                         logger.debug(
-                            f"Failed to read from frame {current_frame} after {max_attempts} attempts"
+                            "Failed to read from frame %s after %s attempts",
+                            current_frame,
+                            max_attempts,
                         )
                         if chunks:
                             logger.debug(
-                                f"Returning partial data: {current_frame}/{total_frames} frames ({len(chunks)} chunks)"
+                                "Returning partial data: %s/%s frames (%s chunks)",
+                                current_frame,
+                                total_frames,
+                                len(chunks),
                             )
                             get_tracker().record_issue(
                                 filepath=tracking_path,
@@ -712,7 +776,7 @@ def sf_blocks_partial(
                                 total_frames=total_frames,
                                 retry_count=max_attempts,
                             )
-                            combined = np.concatenate(chunks)
+                            combined = np.concatenate(chunks) if out is None else out[:frames_read]
                             return combined, sample_rate, False  # Not complete
                         else:
                             logger.warning("No data could be read before error")
@@ -728,11 +792,11 @@ def sf_blocks_partial(
                 else:
                     # Non-temporary error
                     logger.debug(
-                        f"Non-temporary error reading from frame {current_frame}: {error_msg}"
+                        "Non-temporary error reading from frame %s: %s", current_frame, error_msg
                     )
                     if chunks:
                         logger.debug(
-                            f"Returning partial data: {current_frame}/{total_frames} frames"
+                            "Returning partial data: %s/%s frames", current_frame, total_frames
                         )
                         issue_type = (
                             IssueType.SEEK_FAILED
@@ -747,7 +811,7 @@ def sf_blocks_partial(
                             total_frames=total_frames,
                             retry_count=attempt,
                         )
-                        combined = np.concatenate(chunks)
+                        combined = np.concatenate(chunks) if out is None else out[:frames_read]
                         return combined, sample_rate, False  # Not complete
                     else:
                         get_tracker().record_issue(
@@ -766,10 +830,15 @@ def sf_blocks_partial(
 
     # Successfully read entire file
     if chunks:
-        final_combined: NDArray[np.float32] = np.concatenate(chunks)
+        final_combined: NDArray[np.float32] = (
+            np.concatenate(chunks) if out is None else out[:frames_read]
+        )
         is_complete: bool = current_frame >= total_frames
         logger.debug(
-            f"Read {current_frame}/{total_frames} frames ({'complete' if is_complete else 'partial'})"
+            "Read %s/%s frames (%s)",
+            current_frame,
+            total_frames,
+            "complete" if is_complete else "partial",
         )
         return final_combined, sample_rate, is_complete
     else:
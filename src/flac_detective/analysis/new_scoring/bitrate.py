@@ -63,19 +63,22 @@ def calculate_real_bitrate(filepath: Path, duration: float) -> float:
         file_size_bytes = filepath.stat().st_size
         if duration <= 0:
             logger.warning(
-                f"Invalid duration {duration}s for {filepath.name}, cannot calculate bitrate"
+                "Invalid duration %ss for %s, cannot calculate bitrate", duration, filepath.name
             )
             return 0
 
         # Bitrate = (file_size_bytes × 8) / (duration_seconds × 1000)
         bitrate_kbps = (file_size_bytes * 8) / (duration * 1000)
         logger.debug(
-            f"Real bitrate: {bitrate_kbps:.1f} kbps (size: {file_size_bytes} bytes, duration: {duration:.1f}s)"
+            "Real bitrate: %.1f kbps (size: %s bytes, duration: %.1fs)",
+            bitrate_kbps,
+            file_size_bytes,
+            duration,
         )
         return bitrate_kbps
 
     except Exception as e:
-        logger.error(f"Error calculating real bitrate: {e}")
+        logger.error("Error calculating real bitrate: %s", e)
         return 0
 
 
@@ -146,5 +149,5 @@ def calculate_bitrate_variance(
         return 0.0
 
     except Exception as e:
-        logger.debug(f"Error calculating bitrate variance: {e}")
+        logger.debug("Error calculating bitrate variance: %s", e)
         return 0.0
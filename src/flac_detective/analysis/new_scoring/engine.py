@@ -0,0 +1,505 @@
+"""Declarative rule engine for the scoring system.
+
+The engine schedules ``ScoringRule`` strategies from their declarations
+(inputs, outputs, activation predicates, score bounds and cost) instead of a
+hard-coded execution order:
+
+- Rules whose static predicate fails are dropped before anything runs.
+- A rule becomes ready once every rule producing one of its ``inputs`` has
+  either run or been dropped; its dynamic predicate is checked at that point.
+- Among ready rules, those needed by the next short-circuit stage run first,
+  then the cheapest according to the measured cost model.
+- Before each expensive rule, the engine bounds the final score with the
+  ``score_bounds`` of the remaining rules and stops as soon as the verdict
+  can no longer change (branch-and-bound; ``prune=False`` runs them anyway,
+  to check that pruning never changes a verdict).
+- Ready expensive rules are independent of each other by construction, so
+  they are evaluated together in a small thread pool on a read-only view of
+  the shared audio buffer (numpy/scipy release the GIL for the heavy work).
+
+Execution order and merge order are decoupled: results are always folded into
+the score in the canonical order of the rule list, so the score (which is
+clamped at 0 after each rule) does not depend on the schedule.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from ...config import analysis_config
+from ... import metrics
+from ...tracing import instant, span
+from .audio_loader import load_audio_with_retry
+from .constants import SCORE_FAKE_CERTAIN
+from .models import RuleResult, ScoringContext
+from .strategies import ScoringRule
+from .verdict import determine_verdict
+
+logger = logging.getLogger(__name__)
+
+# Rules with a declared cost at or above this value (ms) are "expensive":
+# they only run once the fast short-circuits had a chance to fire.
+EXPENSIVE_RULE_COST_MS = 10.0
+
+# Pseudo-input meaning "after every other scoring rule"
+SCORE_INPUT = "current_score"
+
+FAST_STAGE = "fast"  # All cheap rules (and their prerequisites) resolved
+FINAL_STAGE = "final"  # All rules except those reading the score resolved
+
+
+class ShortCircuit(NamedTuple):
+    """Verdict decision taken as soon as a stage of the schedule is complete."""
+
+    name: str
+    stage: str
+    predicate: Callable[[ScoringContext], bool]
+    reason: Optional[str] = None
+
+
+DEFAULT_SHORT_CIRCUITS: Tuple[ShortCircuit, ...] = (
+    ShortCircuit(
+        "fast_fake_certain",
+        FAST_STAGE,
+        lambda ctx: ctx.current_score >= SCORE_FAKE_CERTAIN,
+        "⚡ Analyse rapide : FAKE_CERTAIN détecté sans règles coûteuses",
+    ),
+    ShortCircuit(
+        "fast_authentic",
+        FAST_STAGE,
+        lambda ctx: ctx.current_score < 10 and ctx.mp3_bitrate_detected is None,
+        "⚡ Analyse rapide : AUTHENTIC détecté sans règles coûteuses",
+    ),
+    ShortCircuit(
+        "fake_certain",
+        FINAL_STAGE,
+        lambda ctx: ctx.current_score >= SCORE_FAKE_CERTAIN,
+    ),
+)
+
+
+class RuleCostModel:
+    """Measured rule costs (exponential moving average, in milliseconds).
+
+    Seeded with each rule's declared ``cost`` until a measurement exists.
+    One instance lives per process, so estimates converge over a scan.
+    """
+
+    def __init__(self, smoothing: float = 0.2):
+        """Initialize the cost model.
+
+        Args:
+            smoothing: Weight of the newest measurement in the moving average.
+        """
+        self.smoothing = smoothing
+        self._costs: Dict[str, float] = {}
+
+    def estimate(self, rule: ScoringRule) -> float:
+        """Get the expected cost of a rule in milliseconds."""
+        return self._costs.get(rule.rule_id, rule.cost)
+
+    def observe(self, rule_id: str, elapsed_ms: float):
+        """Record a measured execution time."""
+        previous = self._costs.get(rule_id)
+        if previous is None:
+            self._costs[rule_id] = elapsed_ms
+        else:
+            self._costs[rule_id] = previous + self.smoothing * (elapsed_ms - previous)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Get a copy of the current estimates."""
+        return dict(self._costs)
+
+
+_cost_model = RuleCostModel()
+
+
+def get_cost_model() -> RuleCostModel:
+    """Get the per-process rule cost model."""
+    return _cost_model
+
+
+_rule_pool: Optional[ThreadPoolExecutor] = None
+_rule_pool_size = 0
+_rule_pool_lock = threading.Lock()
+
+
+def _get_rule_pool(max_workers: int) -> ThreadPoolExecutor:
+    """Get the per-process thread pool used for concurrent rules."""
+    global _rule_pool, _rule_pool_size
+    with _rule_pool_lock:
+        if _rule_pool is None or _rule_pool_size < max_workers:
+            if _rule_pool is not None:
+                _rule_pool.shutdown(wait=False)
+            _rule_pool = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="flac-detective-rule"
+            )
+            _rule_pool_size = max_workers
+        return _rule_pool
+
+
+def _timed_evaluate(rule: ScoringRule, context: ScoringContext) -> Tuple[RuleResult, float]:
+    """Evaluate a rule and freeze its result.
+
+    Returns:
+        Tuple of (frozen_result, elapsed_ms)
+    """
+    start = time.perf_counter()
+    with span(f"rule.{rule.rule_id}") as rule_span:
+        result = rule.evaluate(context)
+        rule_span.annotate(score=result.score)
+    elapsed_ms = (time.perf_counter() - start) * 1000.0
+    frozen = RuleResult(result.score, tuple(result.reasons), MappingProxyType(dict(result.outputs)))
+    return frozen, elapsed_ms
+
+
+class RuleEngine:
+    """Cost-based scheduler for declarative scoring rules."""
+
+    def __init__(
+        self,
+        rules: Sequence[ScoringRule],
+        short_circuits: Sequence[ShortCircuit] = DEFAULT_SHORT_CIRCUITS,
+        cost_model: Optional[RuleCostModel] = None,
+        max_workers: Optional[int] = None,
+        max_rule_cost: Optional[float] = None,
+        prune: bool = True,
+    ):
+        """Initialize the engine.
+
+        Args:
+            rules: Rules in canonical merge order.
+            short_circuits: Stage-level verdict decisions.
+            cost_model: Cost model (defaults to the per-process model).
+            max_workers: Threads for concurrent expensive rules
+                (defaults to ``analysis_config.RULE_WORKERS``, 1 = sequential).
+            max_rule_cost: Stop before the first rule with a declared cost at or
+                above this value (ms), leaving the result provisional.
+            prune: Skip expensive rules once the verdict is settled
+                (branch-and-bound); short-circuits are not affected.
+        """
+        self.rules = list(rules)
+        self.short_circuits = list(short_circuits)
+        self.cost_model = cost_model or get_cost_model()
+        self.max_workers = max_workers if max_workers is not None else analysis_config.RULE_WORKERS
+        self.max_rule_cost = max_rule_cost
+        self.prune = prune
+
+        self._by_id = {rule.rule_id: rule for rule in self.rules}
+        self._order = {rule.rule_id: index for index, rule in enumerate(self.rules)}
+        self._producers: Dict[str, List[str]] = {}
+        for rule in self.rules:
+            for output in rule.outputs:
+                self._producers.setdefault(output, []).append(rule.rule_id)
+
+    # ------------------------------------------------------------------
+    # Graph helpers
+    # ------------------------------------------------------------------
+
+    def _prerequisites(self, rule: ScoringRule) -> Set[str]:
+        """Rule ids that must be resolved before ``rule`` can run."""
+        required: Set[str] = set()
+        for field_name in rule.inputs:
+            if field_name == SCORE_INPUT:
+                required.update(
+                    other.rule_id
+                    for other in self.rules
+                    if other is not rule and SCORE_INPUT not in other.inputs
+                )
+            else:
+                required.update(self._producers.get(field_name, ()))
+        required.discard(rule.rule_id)
+        return required
+
+    def _closure(self, rule_ids: Set[str]) -> Set[str]:
+        """Add transitive prerequisites to a set of rule ids."""
+        closure = set(rule_ids)
+        stack = list(rule_ids)
+        while stack:
+            for prerequisite in self._prerequisites(self._by_id[stack.pop()]):
+                if prerequisite not in closure:
+                    closure.add(prerequisite)
+                    stack.append(prerequisite)
+        return closure
+
+    def _stage_rules(self, active_ids: Set[str]) -> Dict[str, Set[str]]:
+        """Rules each stage waits for, among the statically active ones."""
+        cheap = {
+            rule_id for rule_id in active_ids if self._by_id[rule_id].cost < EXPENSIVE_RULE_COST_MS
+        }
+        final = {
+            rule_id for rule_id in active_ids if SCORE_INPUT not in self._by_id[rule_id].inputs
+        }
+        return {
+            FAST_STAGE: self._closure(cheap) & active_ids,
+            FINAL_STAGE: self._closure(final) & active_ids,
+        }
+
+    # ------------------------------------------------------------------
+    # Score merging and bounds
+    # ------------------------------------------------------------------
+
+    def _merge(
+        self, context: ScoringContext, results: Dict[str, RuleResult], extra_reasons: List[str]
+    ):
+        """Fold results into the context in canonical rule order."""
+        score = 0
+        reasons: List[str] = []
+        for rule in self.rules:
+            result = results.get(rule.rule_id)
+            if result is None:
+                continue
+            score = max(0, score + result.score)
+            reasons.extend(result.reasons)
+        context.current_score = score
+        context.reasons = reasons + extra_reasons
+
+    def _verdict_settled(
+        self,
+        context: ScoringContext,
+        pending: Dict[str, ScoringRule],
+        results: Dict[str, RuleResult],
+    ) -> bool:
+        """Check whether the remaining rules can still change the verdict."""
+        low = high = context.current_score
+        for rule in pending.values():
+            low += rule.score_bounds[0]
+            high += rule.score_bounds[1]
+
+        # Results that may still be refined can move anywhere within their bounds
+        for rule_id, result in results.items():
+            rule = self._by_id[rule_id]
+            if any(
+                producer in pending
+                for field_name in rule.refine_inputs
+                for producer in self._producers.get(field_name, ())
+            ):
+                low += rule.score_bounds[0] - result.score
+                high += rule.score_bounds[1] - result.score
+
+        low = max(0, low)
+        return determine_verdict(low)[0] == determine_verdict(high)[0]
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    def _ensure_audio(self, context: ScoringContext):
+        """Load the full audio buffer once for rules that need it."""
+        if context.audio_data is not None:
+            return
+        if context.cache is not None and context.cache.is_streaming():
+            # Large file: the rules get the start of the file kept by the streaming pass
+            stream = context.cache.get_stream()
+            audio_data, sample_rate = stream.head.audio, stream.sample_rate
+        elif context.cache is not None:
+            logger.debug("OPTIMIZATION: Using shared AudioCache for audio-based rules")
+            audio_data, sample_rate = context.cache.get_full_audio()
+        else:
+            logger.debug("OPTIMIZATION: No shared cache, loading from file")
+            audio_data, sample_rate = load_audio_with_retry(str(context.filepath))
+
+        # Rules may run concurrently on the same buffer: share it read-only
+        if isinstance(audio_data, np.ndarray):
+            audio_data = audio_data.view()
+            audio_data.flags.writeable = False
+        context.audio_data = audio_data
+        context.loaded_sample_rate = sample_rate
+
+    def _publish(
+        self, rule: ScoringRule, result: RuleResult, elapsed_ms: float, context: ScoringContext
+    ):
+        """Publish a rule's outputs and record its cost."""
+        self.cost_model.observe(rule.rule_id, elapsed_ms)
+        metrics.inc("rule_executions_total", rule=rule.rule_id)
+        for name, value in result.outputs.items():
+            setattr(context, name, value)
+        context.executed_rules.append(rule.rule_id)
+
+    def _execute(self, rule: ScoringRule, context: ScoringContext) -> RuleResult:
+        """Evaluate a rule, publish its outputs and record its cost."""
+        if rule.needs_audio:
+            self._ensure_audio(context)
+        result, elapsed_ms = _timed_evaluate(rule, context)
+        self._publish(rule, result, elapsed_ms, context)
+        return result
+
+    def _execute_batch(
+        self, batch: List[ScoringRule], context: ScoringContext
+    ) -> Dict[str, RuleResult]:
+        """Evaluate independent rules concurrently, then publish in rule order.
+
+        Rules only read the context while the batch is running; outputs are
+        published once every rule is done, so the outcome does not depend on
+        thread scheduling.
+        """
+        if any(rule.needs_audio for rule in batch):
+            self._ensure_audio(context)
+
+        batch = sorted(batch, key=lambda r: self._order[r.rule_id])
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "OPTIMIZATION: Running expensive rules concurrently: %s",
+                ", ".join(rule.rule_id for rule in batch),
+            )
+        pool = _get_rule_pool(self.max_workers)
+        futures = [pool.submit(_timed_evaluate, rule, context) for rule in batch]
+
+        timed = [future.result() for future in futures]
+        results: Dict[str, RuleResult] = {}
+        for rule, (result, elapsed_ms) in zip(batch, timed):
+            self._publish(rule, result, elapsed_ms, context)
+            results[rule.rule_id] = result
+        return results
+
+    def _refine(
+        self,
+        produced: RuleResult,
+        context: ScoringContext,
+        results: Dict[str, RuleResult],
+    ):
+        """Re-evaluate executed rules whose refine inputs were just produced."""
+        for field_name in produced.outputs:
+            for rule in self.rules:
+                if (
+                    rule.rule_id in results
+                    and field_name in rule.refine_inputs
+                    and rule.needs_refinement(context)
+                ):
+                    logger.debug("OPTIMIZATION: Refining %s with %s", rule.rule_id, field_name)
+                    results[rule.rule_id] = self._execute(rule, context)
+
+    def _fire_short_circuit(self, stage: str, context: ScoringContext) -> Optional[ShortCircuit]:
+        for short_circuit in self.short_circuits:
+            if short_circuit.stage == stage and short_circuit.predicate(context):
+                return short_circuit
+        return None
+
+    def run(self, context: ScoringContext) -> Tuple[int, List[str]]:
+        """Run the scheduled rules on a context.
+
+        Args:
+            context: The scoring context containing all necessary data.
+
+        Returns:
+            Tuple of (total_score, list_of_reasons)
+        """
+        pending: Dict[str, ScoringRule] = {}
+        for rule in self.rules:
+            if rule.applies_to(context):
+                pending[rule.rule_id] = rule
+            else:
+                logger.debug("OPTIMIZATION: %s not applicable, skipped", rule.rule_id)
+
+        stage_rules = self._stage_rules(set(pending))
+        stages = [FAST_STAGE, FINAL_STAGE]
+        results: Dict[str, RuleResult] = {}
+        extra_reasons: List[str] = []
+        self._merge(context, results, extra_reasons)
+
+        while True:
+            # Short-circuits fire as soon as their stage is complete
+            while stages and not (stage_rules[stages[0]] & set(pending)):
+                stage = stages.pop(0)
+                instant(
+                    "stage_complete",
+                    stage=stage,
+                    score=context.current_score,
+                    mp3_detected=context.mp3_bitrate_detected is not None,
+                )
+                short_circuit = self._fire_short_circuit(stage, context)
+                if short_circuit is not None:
+                    logger.info(
+                        "OPTIMIZATION: Short-circuit '%s' at score %s",
+                        short_circuit.name,
+                        context.current_score,
+                    )
+                    context.short_circuit = short_circuit.name
+                    instant("short_circuit", name=short_circuit.name, score=context.current_score)
+                    metrics.inc("short_circuits_total", kind=short_circuit.name)
+                    if short_circuit.reason:
+                        extra_reasons.append(short_circuit.reason)
+                        self._merge(context, results, extra_reasons)
+                    instant("scoring_done", score=context.current_score)
+                    return context.current_score, context.reasons
+
+            ready = [
+                rule for rule in pending.values() if not (self._prerequisites(rule) & set(pending))
+            ]
+            if not ready:
+                break
+
+            inactive = [rule for rule in ready if not rule.is_active(context)]
+            if inactive:
+                for rule in inactive:
+                    logger.debug("OPTIMIZATION: %s inactive, skipped", rule.rule_id)
+                    del pending[rule.rule_id]
+                continue
+
+            next_stage = stage_rules[stages[0]] if stages else set()
+            rule = min(
+                ready,
+                key=lambda r: (
+                    r.rule_id not in next_stage,
+                    self.cost_model.estimate(r),
+                    self._order[r.rule_id],
+                ),
+            )
+
+            if self.max_rule_cost is not None and rule.cost >= self.max_rule_cost:
+                logger.debug(
+                    "OPTIMIZATION: Cost budget reached before %s, provisional score %s",
+                    rule.rule_id,
+                    context.current_score,
+                )
+                instant("cost_budget", before=rule.rule_id, score=context.current_score)
+                metrics.inc("short_circuits_total", kind="cost_budget")
+                break
+
+            if (
+                self.prune
+                and rule.cost >= EXPENSIVE_RULE_COST_MS
+                and self._verdict_settled(context, pending, results)
+            ):
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(
+                        "OPTIMIZATION: Verdict settled at score %s, skipping %s",
+                        context.current_score,
+                        ", ".join(sorted(pending, key=self._order.get)),
+                    )
+                instant("verdict_settled", skipped=len(pending), score=context.current_score)
+                metrics.inc("short_circuits_total", kind="verdict_settled")
+                break
+
+            batch = [rule]
+            if rule.cost >= EXPENSIVE_RULE_COST_MS and self.max_workers > 1:
+                # Ready rules never depend on each other
+                batch += [
+                    other
+                    for other in ready
+                    if other is not rule
+                    and other.cost >= EXPENSIVE_RULE_COST_MS
+                    and (self.max_rule_cost is None or other.cost < self.max_rule_cost)
+                    and (other.rule_id in next_stage) == (rule.rule_id in next_stage)
+                ]
+
+            for batch_rule in batch:
+                del pending[batch_rule.rule_id]
+            if len(batch) == 1:
+                new_results = {rule.rule_id: self._execute(rule, context)}
+            else:
+                new_results = self._execute_batch(batch, context)
+            results.update(new_results)
+            for rule_id in sorted(new_results, key=self._order.get):
+                self._refine(new_results[rule_id], context, results)
+            self._merge(context, results, extra_reasons)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("OPTIMIZATION: Rules executed: %s", ", ".join(context.executed_rules))
+        instant("scoring_done", score=context.current_score)
+        return context.current_score, context.reasons
@@ -2,7 +2,7 @@
 
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, NamedTuple, Optional
+from typing import Any, List, Mapping, NamedTuple, Optional, Sequence
 
 
 class BitrateMetrics(NamedTuple):
@@ -22,6 +22,19 @@ class AudioMetadata(NamedTuple):
     duration: float
 
 
+class RuleResult(NamedTuple):
+    """Outcome of a single scoring rule evaluation.
+
+    Rules compute a result without touching the running score; the rule engine
+    freezes it and merges results into the context in canonical rule order,
+    which lets independent rules run concurrently.
+    """
+
+    score: int
+    reasons: Sequence[str]
+    outputs: Mapping[str, Any] = {}
+
+
 @dataclass
 class ScoringContext:
     """Context holding all data for the scoring process."""
@@ -37,8 +50,11 @@ class ScoringContext:
     mp3_bitrate_detected: Optional[int] = None
     silence_ratio: Optional[float] = None
     mp3_pattern_detected: bool = False
+    cassette_detected: bool = False
     current_score: int = 0
     reasons: List[str] = field(default_factory=list)
+    executed_rules: List[str] = field(default_factory=list)
+    short_circuit: Optional[str] = None
 
     # Cache for heavy rules (Rule 9/11) - Avoids reloading file
     audio_data: Optional[object] = None  # Using object to avoid numpy dependency in models
@@ -51,3 +67,9 @@ class ScoringContext:
         self.reasons.extend(new_reasons)
         # Ensure score doesn't go below 0
         self.current_score = max(0, self.current_score)
+
+    def apply_result(self, result: RuleResult):
+        """Merge a rule result into the running score and publish its outputs."""
+        self.add_score(result.score, list(result.reasons))
+        for name, value in result.outputs.items():
+            setattr(self, name, value)
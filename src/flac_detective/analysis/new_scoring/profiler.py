@@ -0,0 +1,209 @@
+"""Rule cost and short-circuit profiler.
+
+Built on the timing spans of the rule engine (see ``tracing``): each
+``rule.<id>`` span carries the rule's wall time, CPU time and score, and the
+engine marks stage completions, short-circuits and the end of scoring with
+instant events. ``RuleProfiler`` groups the spans of each scoring run and
+reports, per rule, activation rate x mean cost = share of the total rule
+time, plus "what if" estimates of the time saved (and verdicts changed) if
+the fast-stage short-circuit thresholds moved.
+"""
+
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from ...tracing import Span
+from .engine import FAST_STAGE
+from .verdict import determine_verdict
+
+
+class RuleCall(NamedTuple):
+    """One rule execution."""
+
+    rule_id: str
+    wall_ms: float
+    cpu_ms: float
+    score: int
+
+
+class ScoringRun(NamedTuple):
+    """The rule executions and decisions of one scoring run (one file)."""
+
+    calls: List[RuleCall]
+    fast_score: Optional[int]  # Score when the fast stage completed
+    fast_mp3_detected: bool
+    after_fast_ms: float  # Rule time spent after the fast stage
+    short_circuit: Optional[str]
+    budget_stopped: bool  # Stopped by a cost budget (triage)
+    final_score: int
+
+
+class RuleProfiler:
+    """Aggregates scoring runs from the spans shipped back by the workers."""
+
+    def __init__(self):
+        """Initialize an empty profiler."""
+        self.runs: List[ScoringRun] = []
+
+    def add(self, spans: Sequence[Span]):
+        """Add the spans of one task (one or more scoring runs)."""
+        calls: List[RuleCall] = []
+        fast_score = None
+        fast_mp3 = False
+        after_fast_ms = 0.0
+        short_circuit = None
+        budget_stopped = False
+
+        for s in spans:
+            args = s.args or {}
+            if s.kind == "X" and s.name.startswith("rule."):
+                call = RuleCall(
+                    s.name[len("rule.") :],
+                    s.duration_us / 1000.0,
+                    s.cpu_us / 1000.0,
+                    args.get("score", 0),
+                )
+                calls.append(call)
+                if fast_score is not None:
+                    after_fast_ms += call.wall_ms
+            elif s.name == "stage_complete" and args.get("stage") == FAST_STAGE:
+                fast_score = args.get("score")
+                fast_mp3 = bool(args.get("mp3_detected"))
+            elif s.name == "short_circuit":
+                short_circuit = args.get("name")
+            elif s.name in ("verdict_settled", "cost_budget"):
+                short_circuit = short_circuit or s.name
+                budget_stopped = budget_stopped or s.name == "cost_budget"
+            elif s.name == "scoring_done":
+                self.runs.append(
+                    ScoringRun(
+                        calls,
+                        fast_score,
+                        fast_mp3,
+                        after_fast_ms,
+                        short_circuit,
+                        budget_stopped,
+                        args.get("score", 0),
+                    )
+                )
+                calls = []
+                fast_score = None
+                fast_mp3 = False
+                after_fast_ms = 0.0
+                short_circuit = None
+                budget_stopped = False
+
+    def rule_table(self) -> Dict[str, Dict[str, float]]:
+        """Per-rule statistics: activation rate, mean costs, cost share, contribution."""
+        total_ms = sum(call.wall_ms for run in self.runs for call in run.calls) or 1.0
+        per_rule: Dict[str, List[RuleCall]] = {}
+        for run in self.runs:
+            for call in run.calls:
+                per_rule.setdefault(call.rule_id, []).append(call)
+
+        table = {}
+        for rule_id, calls in per_rule.items():
+            wall = sum(call.wall_ms for call in calls)
+            table[rule_id] = {
+                "runs": len(calls),
+                "activation_rate": len(calls) / len(self.runs),
+                "mean_wall_ms": wall / len(calls),
+                "mean_cpu_ms": sum(call.cpu_ms for call in calls) / len(calls),
+                "cost_share": wall / total_ms,
+                "mean_score": sum(call.score for call in calls) / len(calls),
+                "nonzero_rate": sum(1 for call in calls if call.score) / len(calls),
+            }
+        return table
+
+    def short_circuit_rates(self) -> Dict[str, float]:
+        """Fraction of scoring runs ended early, per short-circuit."""
+        counts: Dict[str, int] = {}
+        for run in self.runs:
+            if run.short_circuit:
+                counts[run.short_circuit] = counts.get(run.short_circuit, 0) + 1
+        return {name: count / len(self.runs) for name, count in counts.items()}
+
+    def what_if(self, kind: str, threshold: int) -> Tuple[int, float, int]:
+        """Estimate the effect of a fast-stage short-circuit at another threshold.
+
+        Args:
+            kind: "fake" (stop when the fast score >= threshold) or
+                "authentic" (stop when it is < threshold and no MP3 bitrate
+                was detected).
+            threshold: Score threshold to evaluate.
+
+        Returns:
+            Tuple (files stopping earlier, rule time saved in ms, verdicts changed).
+        """
+        files = 0
+        saved_ms = 0.0
+        changed = 0
+        for run in self.runs:
+            if run.fast_score is None or run.budget_stopped or run.after_fast_ms == 0.0:
+                continue
+            if kind == "fake":
+                stops = run.fast_score >= threshold
+            else:
+                stops = run.fast_score < threshold and not run.fast_mp3_detected
+            if stops:
+                files += 1
+                saved_ms += run.after_fast_ms
+                if determine_verdict(run.fast_score)[0] != determine_verdict(run.final_score)[0]:
+                    changed += 1
+        return files, saved_ms, changed
+
+    def format_report(
+        self,
+        fake_thresholds: Sequence[int] = (61, 70, 80),
+        authentic_thresholds: Sequence[int] = (15, 20, 31),
+    ) -> str:
+        """Format the profile as a text report.
+
+        Args:
+            fake_thresholds: Fast FAKE_CERTAIN thresholds to evaluate.
+            authentic_thresholds: Fast AUTHENTIC thresholds to evaluate.
+
+        Returns:
+            Formatted report as string
+        """
+        lines = [f"RULE PROFILE - {len(self.runs)} scoring runs"]
+        if not self.runs:
+            return "\n".join(lines)
+
+        total_ms = sum(call.wall_ms for run in self.runs for call in run.calls)
+        lines.append(f"Total rule time: {total_ms / 1000.0:.2f} s")
+        lines.append("")
+        lines.append(
+            f"{'rule':<6} {'runs':>7} {'active':>7} {'wall':>9} {'cpu':>9} {'share':>7} "
+            f"{'score':>6} {'nonzero':>8}"
+        )
+        table = self.rule_table()
+        for rule_id in sorted(table, key=lambda r: -table[r]["cost_share"]):
+            row = table[rule_id]
+            lines.append(
+                f"{rule_id:<6} {row['runs']:>7} {row['activation_rate']:>7.1%} "
+                f"{row['mean_wall_ms']:>7.1f}ms {row['mean_cpu_ms']:>7.1f}ms "
+                f"{row['cost_share']:>7.1%} {row['mean_score']:>+6.1f} {row['nonzero_rate']:>8.1%}"
+            )
+
+        lines.append("")
+        lines.append("Short-circuits:")
+        rates = self.short_circuit_rates()
+        for name in sorted(rates, key=lambda n: -rates[n]):
+            lines.append(f"  {name:<20} {rates[name]:>7.1%}")
+        if not rates:
+            lines.append("  none")
+
+        lines.append("")
+        lines.append("What if (fast-stage short-circuit thresholds):")
+        scenarios = [("fake", t, f"FAKE_CERTAIN at fast score >= {t}") for t in fake_thresholds]
+        scenarios += [
+            ("authentic", t, f"AUTHENTIC at fast score < {t}") for t in authentic_thresholds
+        ]
+        for kind, threshold, label in scenarios:
+            files, saved_ms, changed = self.what_if(kind, threshold)
+            share = saved_ms / total_ms if total_ms else 0.0
+            lines.append(
+                f"  {label:<34} {files:>6} files  saves {saved_ms / 1000.0:>8.2f} s "
+                f"({share:>5.1%})  {changed} verdict change(s)"
+            )
+        return "\n".join(lines)
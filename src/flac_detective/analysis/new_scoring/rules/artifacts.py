@@ -11,6 +11,7 @@ def apply_rule_9_compression_artifacts(
     mp3_bitrate_detected: Optional[int],
     audio_data: Optional[object] = None,
     sample_rate: Optional[int] = None,
+    preecho: Optional[Tuple[float, int, int]] = None,
 ) -> Tuple[int, List[str], dict]:
     """Apply Rule 9: Psychoacoustic Compression Artifacts Detection.
 
@@ -44,6 +45,7 @@ def apply_rule_9_compression_artifacts(
         mp3_bitrate_detected: Detected MP3 bitrate from Rule 1 (or None)
         audio_data: Optional pre-loaded audio data (numpy array)
         sample_rate: Optional sample rate of pre-loaded data
+        preecho: Optional Test 9A result computed beforehand (large files)
 
     Returns:
         Tuple of (score_delta, list_of_reasons, details_dict)
@@ -51,7 +53,12 @@ def apply_rule_9_compression_artifacts(
     # analyze_compression_artifacts is imported at module level
 
     score, reasons, details = analyze_compression_artifacts(
-        file_path, cutoff_freq, mp3_bitrate_detected, audio_data=audio_data, sample_rate=sample_rate
+        file_path,
+        cutoff_freq,
+        mp3_bitrate_detected,
+        audio_data=audio_data,
+        sample_rate=sample_rate,
+        preecho=preecho,
     )
 
     return score, reasons, details
@@ -43,7 +43,9 @@ def apply_rule_3_source_vs_container(
             f"R3: Source {mp3_bitrate_detected} kbps vs conteneur {bitrate_conteneur:.0f} kbps"
         )
         logger.info(
-            f"RULE 3: +50 points (source {mp3_bitrate_detected} kbps vs container {bitrate_conteneur:.0f} kbps)"
+            "RULE 3: +50 points (source %s kbps vs container %.0f kbps)",
+            mp3_bitrate_detected,
+            bitrate_conteneur,
         )
 
     return score, reasons
@@ -102,7 +104,7 @@ def apply_rule_4_24bit_suspect(
 
     if is_vinyl_rip:
         logger.debug(
-            f"RULE 4: Skipped (vinyl rip detected: silence_ratio {silence_ratio:.2f} < 0.15)"
+            "RULE 4: Skipped (vinyl rip detected: silence_ratio %.2f < 0.15)", silence_ratio
         )
         return score, reasons
 
@@ -113,8 +115,11 @@ def apply_rule_4_24bit_suspect(
             f"R4: 24-bit avec bitrate source {mp3_bitrate_detected} kbps et cutoff {cutoff_freq:.0f} Hz (upscale suspect)"
         )
         logger.info(
-            f"RULE 4: +30 points (24-bit with MP3 source {mp3_bitrate_detected} kbps < {MIN_24BIT_BITRATE} "
-            f"and cutoff {cutoff_freq:.0f} Hz < {MAX_SUSPICIOUS_CUTOFF})"
+            "RULE 4: +30 points (24-bit with MP3 source %s kbps < %s and cutoff %.0f Hz < %s)",
+            mp3_bitrate_detected,
+            MIN_24BIT_BITRATE,
+            cutoff_freq,
+            MAX_SUSPICIOUS_CUTOFF,
         )
     else:
         # Log why the rule didn't trigger
@@ -124,8 +129,9 @@ def apply_rule_4_24bit_suspect(
             logger.debug("RULE 4: Skipped (no low MP3 source detected)")
         elif not has_low_cutoff:
             logger.debug(
-                f"RULE 4: Skipped (cutoff {cutoff_freq:.0f} Hz >= {MAX_SUSPICIOUS_CUTOFF} Hz, "
-                f"acceptable for 24-bit)"
+                "RULE 4: Skipped (cutoff %.0f Hz >= %s Hz, acceptable for 24-bit)",
+                cutoff_freq,
+                MAX_SUSPICIOUS_CUTOFF,
             )
 
     return score, reasons
@@ -163,8 +169,11 @@ def apply_rule_5_high_variance(
             f"variance {bitrate_variance:.0f} kbps (-40 pts)"
         )
         logger.debug(
-            f"RULE 5: -40 points (bitrate {real_bitrate:.0f} > {HIGH_BITRATE_THRESHOLD} "
-            f"and variance {bitrate_variance:.0f} > {VARIANCE_THRESHOLD})"
+            "RULE 5: -40 points (bitrate %.0f > %s and variance %.0f > %s)",
+            real_bitrate,
+            HIGH_BITRATE_THRESHOLD,
+            bitrate_variance,
+            VARIANCE_THRESHOLD,
         )
 
     return score, reasons
@@ -219,8 +228,13 @@ def apply_rule_6_variable_bitrate_protection(
             f"cutoff {cutoff_freq:.0f} Hz, variance {bitrate_variance:.0f} kbps) → Authentique (-30pts)"
         )
         logger.info(
-            f"RULE 6: -30 points (high quality: bitrate {bitrate_conteneur:.0f} > {BITRATE_THRESHOLD}, "
-            f"cutoff {cutoff_freq:.0f} >= {CUTOFF_THRESHOLD}, variance {bitrate_variance:.0f} > {VARIANCE_THRESHOLD})"
+            "RULE 6: -30 points (high quality: bitrate %.0f > %s, cutoff %.0f >= %s, variance %.0f > %s)",
+            bitrate_conteneur,
+            BITRATE_THRESHOLD,
+            cutoff_freq,
+            CUTOFF_THRESHOLD,
+            bitrate_variance,
+            VARIANCE_THRESHOLD,
         )
     else:
         # Log why the rule didn't trigger
@@ -228,13 +242,13 @@ def apply_rule_6_variable_bitrate_protection(
             logger.debug("RULE 6: Skipped (MP3 signature detected)")
         elif not is_high_bitrate:
             logger.debug(
-                f"RULE 6: Skipped (bitrate {bitrate_conteneur:.0f} <= {BITRATE_THRESHOLD})"
+                "RULE 6: Skipped (bitrate %.0f <= %s)", bitrate_conteneur, BITRATE_THRESHOLD
             )
         elif not has_hf_content:
-            logger.debug(f"RULE 6: Skipped (cutoff {cutoff_freq:.0f} < {CUTOFF_THRESHOLD})")
+            logger.debug("RULE 6: Skipped (cutoff %.0f < %s)", cutoff_freq, CUTOFF_THRESHOLD)
         elif not has_variance:
             logger.debug(
-                f"RULE 6: Skipped (variance {bitrate_variance:.0f} <= {VARIANCE_THRESHOLD})"
+                "RULE 6: Skipped (variance %.0f <= %s)", bitrate_variance, VARIANCE_THRESHOLD
             )
 
     return score, reasons
@@ -48,7 +48,7 @@ def apply_rule_11_cassette_detection(
     reasons = []
 
     if cutoff_freq >= 19000:
-        logger.debug(f"RULE 11: Skipped (cutoff {cutoff_freq:.0f} >= 19000)")
+        logger.debug("RULE 11: Skipped (cutoff %.0f >= 19000)", cutoff_freq)
         return 0, reasons
 
     try:
@@ -107,7 +107,7 @@ def apply_rule_11_cassette_detection(
                             f"R11A: Bruit de bande détecté ({noise_energy_db:.1f} dB, aléatoire) (Prob. Cassette)"
                         )
                         logger.info(
-                            f"RULE 11A: Tape hiss detected ({noise_energy_db:.1f} dB, random)"
+                            "RULE 11A: Tape hiss detected (%.1f dB, random)", noise_energy_db
                         )
 
         # TEST 11B: Progressive Roll-off
@@ -134,13 +134,13 @@ def apply_rule_11_cassette_detection(
                 reasons.append(
                     f"R11B: Roll-off naturel cassette ({slope:.1f} dB/kHz) (Prob. Cassette)"
                 )
-                logger.info(f"RULE 11B: Natural cassette roll-off ({slope:.1f} dB/kHz)")
+                logger.info("RULE 11B: Natural cassette roll-off (%.1f dB/kHz)", slope)
             elif slope < -10:  # Sharp cut
                 cassette_score -= 20
                 reasons.append(
                     f"R11B: Coupure nette numérique ({slope:.1f} dB/kHz) (Prob. Numérique)"
                 )
-                logger.info(f"RULE 11B: Sharp digital cut ({slope:.1f} dB/kHz)")
+                logger.info("RULE 11B: Sharp digital cut (%.1f dB/kHz)", slope)
 
         # TEST 11C: No MP3 Pattern
         # ================================
@@ -156,19 +156,19 @@ def apply_rule_11_cassette_detection(
             reasons.append(
                 f"R11D: Variation cutoff naturelle ({cutoff_std:.0f} Hz, wow/flutter) (Prob. Cassette)"
             )
-            logger.info(f"RULE 11D: Natural cutoff variation ({cutoff_std:.0f} Hz, wow/flutter)")
+            logger.info("RULE 11D: Natural cutoff variation (%.0f Hz, wow/flutter)", cutoff_std)
         elif cutoff_std < 30:  # Very stable (digital silence/CBR)
             cassette_score -= 10
             reasons.append(
                 f"R11D: Cutoff très stable ({cutoff_std:.0f} Hz, suspect digital) (Prob. Numérique)"
             )
-            logger.info(f"RULE 11D: Cutoff very stable ({cutoff_std:.0f} Hz, suspect digital)")
+            logger.info("RULE 11D: Cutoff very stable (%.0f Hz, suspect digital)", cutoff_std)
         elif cutoff_std < 50:
             # 30-50 Hz: Neutral zone (stable cassette deck is possible)
-            logger.debug(f"RULE 11D: Cutoff stable but acceptable ({cutoff_std:.0f} Hz) - Neutral")
+            logger.debug("RULE 11D: Cutoff stable but acceptable (%.0f Hz) - Neutral", cutoff_std)
 
     except Exception as e:
-        logger.error(f"RULE 11: Analysis error: {e}")
+        logger.error("RULE 11: Analysis error: %s", e)
         return 0, reasons
 
     return max(0, cassette_score), reasons
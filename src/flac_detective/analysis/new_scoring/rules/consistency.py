@@ -44,7 +44,7 @@ def apply_rule_10_multi_segment_consistency(
 
     # Activation condition
     if current_score <= 30:
-        logger.debug(f"RULE 10: Skipped (current score {current_score} <= 30)")
+        logger.debug("RULE 10: Skipped (current score %s <= 30)", current_score)
         return score, reasons
 
     logger.info("RULE 10: Activation - Analyzing multi-segment consistency...")
@@ -77,7 +77,7 @@ def apply_rule_10_multi_segment_consistency(
             problematic_segments += 1
 
     logger.info(
-        f"RULE 10: Segment analysis: {', '.join(segment_details)} | Variance: {variance:.1f} Hz"
+        "RULE 10: Segment analysis: %s | Variance: %.1f Hz", ", ".join(segment_details), variance
     )
 
     # Apply penalties/bonuses
@@ -88,7 +88,7 @@ def apply_rule_10_multi_segment_consistency(
         reasons.append(
             f"R10: Cutoff variance élevée ({variance:.0f} Hz) -> Mastering dynamique probable (-20pts)"
         )
-        logger.info(f"RULE 10: -20 points (High variance {variance:.0f} Hz)")
+        logger.info("RULE 10: -20 points (High variance %.0f Hz)", variance)
 
     # 2. Local artifact (only 1 segment is problematic)
     elif problematic_segments == 1:
@@ -102,6 +102,6 @@ def apply_rule_10_multi_segment_consistency(
     elif variance < 500 and problematic_segments >= 3:
         # No score change, but confirms the diagnosis
         reasons.append(f"R10: Anomalie cohérente sur tout le fichier (Variance {variance:.0f} Hz)")
-        logger.info(f"RULE 10: 0 points (Consistent anomaly, variance {variance:.0f} Hz)")
+        logger.info("RULE 10: 0 points (Consistent anomaly, variance %.0f Hz)", variance)
 
     return score, reasons
@@ -4,13 +4,19 @@ import logging
 from typing import List, Optional, Tuple
 import soundfile as sf
 
-from ..silence import analyze_silence_ratio, detect_vinyl_noise, detect_clicks_and_pops
+from ..silence import (
+    analyze_silence_ratio,
+    analyze_silence_ratio_from_stream,
+    detect_clicks_and_pops,
+    detect_vinyl_noise,
+    detect_vinyl_noise_from_stream,
+)
 
 logger = logging.getLogger(__name__)
 
 
 def apply_rule_7_silence_analysis(
-    file_path: str, cutoff_freq: float, sample_rate: int
+    file_path: str, cutoff_freq: float, sample_rate: int, stream=None
 ) -> Tuple[int, List[str], Optional[float]]:
     """Apply Rule 7: Silence Analysis and Vinyl Noise Detection (IMPROVED - 3 PHASES).
 
@@ -45,6 +51,7 @@ def apply_rule_7_silence_analysis(
         file_path: Path to the FLAC file
         cutoff_freq: Detected cutoff frequency in Hz
         sample_rate: Sample rate in Hz
+        stream: ``StreamAnalysis`` of a large file, used instead of decoding it
 
     Returns:
         Tuple of (score_delta, list_of_reasons, silence_ratio)
@@ -60,8 +67,10 @@ def apply_rule_7_silence_analysis(
 
     if not (MIN_AMBIGUOUS_FREQ <= cutoff_freq <= MAX_AMBIGUOUS_FREQ):
         logger.debug(
-            f"RULE 7: Skipped (cutoff {cutoff_freq:.0f} Hz outside ambiguous range "
-            f"{MIN_AMBIGUOUS_FREQ}-{MAX_AMBIGUOUS_FREQ} Hz)"
+            "RULE 7: Skipped (cutoff %.0f Hz outside ambiguous range %s-%s Hz)",
+            cutoff_freq,
+            MIN_AMBIGUOUS_FREQ,
+            MAX_AMBIGUOUS_FREQ,
         )
         return score, reasons, ratio
 
@@ -70,10 +79,13 @@ def apply_rule_7_silence_analysis(
     # ========== PHASE 1: DITHER TEST ==========
     # analyze_silence_ratio is imported at module level
 
-    ratio, status, _, _ = analyze_silence_ratio(file_path)
+    if stream is not None:
+        ratio, status, _, _ = analyze_silence_ratio_from_stream(stream)
+    else:
+        ratio, status, _, _ = analyze_silence_ratio(file_path)
 
     if ratio is None:
-        logger.info(f"RULE 7 Phase 1: Analysis failed or skipped ({status})")
+        logger.info("RULE 7 Phase 1: Analysis failed or skipped (%s)", status)
         return score, reasons, ratio
 
     # Interpret ratio
@@ -82,27 +94,31 @@ def apply_rule_7_silence_analysis(
         reasons.append(
             f"R7-P1: Dither artificiel détecté dans les silences (Ratio {ratio:.2f} > 0.3) (+50pts)"
         )
-        logger.info(f"RULE 7 Phase 1: +50 points (TRANSCODE - Ratio {ratio:.2f} > 0.3)")
+        logger.info("RULE 7 Phase 1: +50 points (TRANSCODE - Ratio %.2f > 0.3)", ratio)
         return score, reasons, ratio  # Stop here, clear transcode
 
     elif ratio < 0.15:
         score -= 50
         reasons.append(f"R7-P1: Silence naturel propre (Ratio {ratio:.2f} < 0.15) (-50pts)")
-        logger.info(f"RULE 7 Phase 1: -50 points (AUTHENTIC - Ratio {ratio:.2f} < 0.15)")
+        logger.info("RULE 7 Phase 1: -50 points (AUTHENTIC - Ratio %.2f < 0.15)", ratio)
         return score, reasons, ratio  # Stop here, clear authentic
 
     else:
         # UNCERTAIN ZONE (0.15 <= ratio <= 0.3) -> Continue to Phase 2
         logger.info(
-            f"RULE 7 Phase 1: Ratio {ratio:.2f} in uncertain zone (0.15-0.3) -> Proceeding to Phase 2"
+            "RULE 7 Phase 1: Ratio %.2f in uncertain zone (0.15-0.3) -> Proceeding to Phase 2",
+            ratio,
         )
 
     # ========== PHASE 2: VINYL NOISE DETECTION ==========
     # detect_vinyl_noise is imported at module level
 
     try:
-        audio_data, sr = sf.read(file_path)
-        is_vinyl, vinyl_details = detect_vinyl_noise(audio_data, sr, cutoff_freq)
+        if stream is not None:
+            is_vinyl, vinyl_details = detect_vinyl_noise_from_stream(stream, cutoff_freq)
+        else:
+            audio_data, sr = sf.read(file_path)
+            is_vinyl, vinyl_details = detect_vinyl_noise(audio_data, sr, cutoff_freq)
 
         if is_vinyl:
             # Vinyl noise detected -> Authentic vinyl rip
@@ -112,14 +128,17 @@ def apply_rule_7_silence_analysis(
                 f"autocorr={vinyl_details['autocorr']:.2f}) (-40pts)"
             )
             logger.info(
-                f"RULE 7 Phase 2: -40 points (VINYL DETECTED - "
-                f"energy={vinyl_details['energy_db']:.1f}dB)"
+                "RULE 7 Phase 2: -40 points (VINYL DETECTED - energy=%.1fdB)",
+                vinyl_details["energy_db"],
             )
 
             # ========== PHASE 3: CLICKS & POPS (OPTIONAL) ==========
             # detect_clicks_and_pops is imported at module level
 
-            num_clicks, clicks_per_min = detect_clicks_and_pops(audio_data, sr)
+            if stream is not None:
+                num_clicks, clicks_per_min = stream.clicks.result()
+            else:
+                num_clicks, clicks_per_min = detect_clicks_and_pops(audio_data, sr)
 
             if 5 <= clicks_per_min <= 50:
                 # Typical vinyl click rate -> Confirms vinyl
@@ -128,13 +147,12 @@ def apply_rule_7_silence_analysis(
                     f"R7-P3: Clicks vinyle détectés ({clicks_per_min:.1f} clicks/min) (-10pts)"
                 )
                 logger.info(
-                    f"RULE 7 Phase 3: -10 points (VINYL CONFIRMED - "
-                    f"{clicks_per_min:.1f} clicks/min)"
+                    "RULE 7 Phase 3: -10 points (VINYL CONFIRMED - %.1f clicks/min)", clicks_per_min
                 )
             else:
                 logger.debug(
-                    f"RULE 7 Phase 3: No vinyl clicks confirmation "
-                    f"({clicks_per_min:.1f} clicks/min outside 5-50 range)"
+                    "RULE 7 Phase 3: No vinyl clicks confirmation (%.1f clicks/min outside 5-50 range)",
+                    clicks_per_min,
                 )
 
         elif vinyl_details["energy_db"] < -70:
@@ -145,8 +163,8 @@ def apply_rule_7_silence_analysis(
                 f"-> Upsampling digital suspect (+20pts)"
             )
             logger.info(
-                f"RULE 7 Phase 2: +20 points (NO NOISE - "
-                f"digital upsample suspect, energy={vinyl_details['energy_db']:.1f}dB)"
+                "RULE 7 Phase 2: +20 points (NO NOISE - digital upsample suspect, energy=%.1fdB)",
+                vinyl_details["energy_db"],
             )
 
         else:
@@ -156,15 +174,15 @@ def apply_rule_7_silence_analysis(
                 f"-> Incertain (0pts)"
             )
             logger.info(
-                f"RULE 7 Phase 2: 0 points (UNCERTAIN - "
-                f"noise with pattern, autocorr={vinyl_details['autocorr']:.2f})"
+                "RULE 7 Phase 2: 0 points (UNCERTAIN - noise with pattern, autocorr=%.2f)",
+                vinyl_details["autocorr"],
             )
 
     except Exception as e:
-        logger.error(f"RULE 7 Phase 2/3: Error during vinyl analysis: {e}")
+        logger.error("RULE 7 Phase 2/3: Error during vinyl analysis: %s", e)
         # If Phase 2 fails, just return Phase 1 result (0 points)
         reasons.append("R7-P2: Analyse vinyle échouée (0pts)")
 
-    logger.info(f"RULE 7: Total score = {score:+d} points")
+    logger.info("RULE 7: Total score = %+d points", score)
 
     return score, reasons, ratio
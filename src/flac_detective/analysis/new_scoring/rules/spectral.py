@@ -45,8 +45,9 @@ def apply_rule_1_mp3_bitrate(
 
     if cutoff_freq >= nyquist_threshold:
         logger.debug(
-            f"RULE 1: Skipped (cutoff {cutoff_freq:.0f} Hz >= 95% Nyquist {nyquist_threshold:.0f} Hz, "
-            f"likely anti-aliasing filter)"
+            "RULE 1: Skipped (cutoff %.0f Hz >= 95%% Nyquist %.0f Hz, likely anti-aliasing filter)",
+            cutoff_freq,
+            nyquist_threshold,
         )
         return (score, reasons), None
 
@@ -60,7 +61,7 @@ def apply_rule_1_mp3_bitrate(
         # Test 1 : Énergie résiduelle au-dessus de 20 kHz (HIGH_FREQ_THRESHOLD)
         # Seuil minimal pour détecter présence d'énergie HF
         if energy_ratio > 0.000001:
-            logger.info(f"RULE 1: Cutoff 20 kHz mais énergie HF = {energy_ratio:.6f}")
+            logger.info("RULE 1: Cutoff 20 kHz mais énergie HF = %.6f", energy_ratio)
             logger.info("RULE 1: Probablement arrondi FFT, pas MP3 320k - SKIP")
             return (0, []), None
 
@@ -76,7 +77,9 @@ def apply_rule_1_mp3_bitrate(
 
     if cutoff_freq > HIGH_QUALITY_CUTOFF_THRESHOLD:
         logger.debug(
-            f"RULE 1: Skipped (cutoff {cutoff_freq:.0f} Hz > {HIGH_QUALITY_CUTOFF_THRESHOLD} Hz, likely authentic FLAC)"
+            "RULE 1: Skipped (cutoff %.0f Hz > %s Hz, likely authentic FLAC)",
+            cutoff_freq,
+            HIGH_QUALITY_CUTOFF_THRESHOLD,
         )
         return (score, reasons), None
 
@@ -87,7 +90,9 @@ def apply_rule_1_mp3_bitrate(
 
     if cutoff_std > CUTOFF_VARIANCE_THRESHOLD:
         logger.debug(
-            f"RULE 1: Skipped (cutoff std {cutoff_std:.1f} > {CUTOFF_VARIANCE_THRESHOLD}, variable spectrum)"
+            "RULE 1: Skipped (cutoff std %.1f > %s, variable spectrum)",
+            cutoff_std,
+            CUTOFF_VARIANCE_THRESHOLD,
         )
         return (score, reasons), None
 
@@ -119,8 +124,9 @@ def apply_rule_1_mp3_bitrate(
 
             if cutoff_freq >= nyquist_limit_percent:
                 logger.debug(
-                    f"RULE 1: Skipped 320 kbps detection (cutoff {cutoff_freq:.0f} Hz >= 94% Nyquist "
-                    f"{nyquist_limit_percent:.0f} Hz, likely legitimate high-quality file)"
+                    "RULE 1: Skipped 320 kbps detection (cutoff %.0f Hz >= 94%% Nyquist %.0f Hz, likely legitimate high-quality file)",
+                    cutoff_freq,
+                    nyquist_limit_percent,
                 )
                 return (score, reasons), None
 
@@ -129,14 +135,21 @@ def apply_rule_1_mp3_bitrate(
             score += 50
             reasons.append(f"Constant MP3 bitrate detected (Spectral): {estimated_bitrate} kbps")
             logger.info(
-                f"RULE 1: +50 points (cutoff {cutoff_freq:.0f} Hz ~= {estimated_bitrate} kbps MP3, "
-                f"container {container_bitrate:.0f} kbps in range {min_br}-{max_br})"
+                "RULE 1: +50 points (cutoff %.0f Hz ~= %s kbps MP3, container %.0f kbps in range %s-%s)",
+                cutoff_freq,
+                estimated_bitrate,
+                container_bitrate,
+                min_br,
+                max_br,
             )
             return (score, reasons), estimated_bitrate
         else:
             logger.debug(
-                f"RULE 1: Skipped (cutoff suggests {estimated_bitrate} kbps MP3, "
-                f"but container bitrate {container_bitrate:.0f} kbps outside range {min_br}-{max_br})"
+                "RULE 1: Skipped (cutoff suggests %s kbps MP3, but container bitrate %.0f kbps outside range %s-%s)",
+                estimated_bitrate,
+                container_bitrate,
+                min_br,
+                max_br,
             )
 
     return (score, reasons), None
@@ -172,8 +185,10 @@ def apply_rule_2_cutoff(cutoff_freq: float, sample_rate: int) -> Tuple[int, List
             f"R2: Cutoff {cutoff_freq:.0f} Hz < {cutoff_threshold:.0f} Hz (+{cutoff_penalty:.0f}pts)"
         )
         logger.debug(
-            f"RULE 2: +{cutoff_penalty:.0f} points "
-            f"(cutoff {cutoff_freq:.0f} <threshold {cutoff_threshold:.0f})"
+            "RULE 2: +%.0f points (cutoff %.0f <threshold %.0f)",
+            cutoff_penalty,
+            cutoff_freq,
+            cutoff_threshold,
         )
 
     return score, reasons
@@ -232,7 +247,9 @@ def apply_rule_8_nyquist_exception(
     else:
         # No bonus for cutoff < 95% of Nyquist
         logger.debug(
-            f"RULE 8: No bonus (cutoff {cutoff_freq:.0f} Hz = {cutoff_ratio*100:.1f}% of Nyquist, < 95%)"
+            "RULE 8: No bonus (cutoff %.0f Hz = %.1f%% of Nyquist, < 95%%)",
+            cutoff_freq,
+            cutoff_ratio * 100,
         )
         return score, reasons
 
@@ -249,8 +266,9 @@ def apply_rule_8_nyquist_exception(
                 f"dither suspect {silence_ratio:.2f} > 0.2)"
             )
             logger.info(
-                f"RULE 8: Bonus CANCELLED (MP3 {mp3_bitrate_detected} kbps + "
-                f"silence ratio {silence_ratio:.2f} > 0.2)"
+                "RULE 8: Bonus CANCELLED (MP3 %s kbps + silence ratio %.2f > 0.2)",
+                mp3_bitrate_detected,
+                silence_ratio,
             )
         elif silence_ratio is not None and silence_ratio > 0.15:
             # Zone grise - REDUCE bonus
@@ -261,8 +279,9 @@ def apply_rule_8_nyquist_exception(
                 f"(MP3 signature + zone grise) (-15pts)"
             )
             logger.info(
-                f"RULE 8: Bonus REDUCED to -15 points (MP3 {mp3_bitrate_detected} kbps + "
-                f"silence ratio {silence_ratio:.2f} in grey zone)"
+                "RULE 8: Bonus REDUCED to -15 points (MP3 %s kbps + silence ratio %.2f in grey zone)",
+                mp3_bitrate_detected,
+                silence_ratio,
             )
         else:
             # Silence ratio <= 0.15 or None - APPLY bonus (authentic)
@@ -272,8 +291,10 @@ def apply_rule_8_nyquist_exception(
                 f"({base_bonus}pts, MP3 signature mais silence authentique)"
             )
             logger.info(
-                f"RULE 8: {base_bonus} points (cutoff {cutoff_freq:.0f} Hz >= "
-                f"{cutoff_ratio*100:.0f}% of Nyquist, MP3 signature but authentic silence)"
+                "RULE 8: %s points (cutoff %.0f Hz >= %.0f%% of Nyquist, MP3 signature but authentic silence)",
+                base_bonus,
+                cutoff_freq,
+                cutoff_ratio * 100,
             )
     else:
         # No MP3 signature - APPLY bonus unconditionally
@@ -282,8 +303,10 @@ def apply_rule_8_nyquist_exception(
             f"({cutoff_freq:.0f}/{nyquist_freq:.0f} Hz) → {bonus_description} ({base_bonus}pts)"
         )
         logger.info(
-            f"RULE 8: {base_bonus} points (cutoff {cutoff_freq:.0f} Hz >= "
-            f"{cutoff_ratio*100:.0f}% of Nyquist)"
+            "RULE 8: %s points (cutoff %.0f Hz >= %.0f%% of Nyquist)",
+            base_bonus,
+            cutoff_freq,
+            cutoff_ratio * 100,
         )
 
     score = final_bonus
@@ -14,6 +14,7 @@ from pathlib import Path
 from typing import List, Tuple, Optional
 
 from .silence_utils import (
+    band_sos,
     filter_band,
     calculate_energy_db,
     calculate_autocorrelation,
@@ -22,6 +23,7 @@ from .silence_utils import (
 )
 from scipy.fft import rfft, rfftfreq, set_workers
 from ...analysis.window_cache import get_hanning_window
+from ...threads import fft_workers
 
 logger = logging.getLogger(__name__)
 
@@ -94,8 +96,9 @@ def calculate_spectral_energy(
     # Use a window to reduce spectral leakage
     # PHASE 2 OPTIMIZATION: Use cached window
     window = get_hanning_window(len(audio_segment))
-    # PHASE 3 OPTIMIZATION: Use parallel FFT
-    with set_workers(-1):
+    # PHASE 3 OPTIMIZATION: Use parallel FFT (within the thread budget, the
+    # process shares the CPUs with the other workers)
+    with set_workers(fft_workers()):
         fft_result = rfft(audio_segment * window)
     fft_freqs = rfftfreq(len(audio_segment), 1 / sample_rate)
 
@@ -155,7 +158,7 @@ def analyze_silence_ratio(file_path: Path, cache=None) -> Tuple[Optional[float],
         total_silence_sec = total_silence_samples / sample_rate
 
         if total_silence_sec < 2.0:
-            logger.info(f"Rule 7: Insufficient silence ({total_silence_sec:.2f}s < 2.0s)")
+            logger.info("Rule 7: Insufficient silence (%.2fs < 2.0s)", total_silence_sec)
             return None, "INSUFFICIENT_SILENCE", 0.0, 0.0
 
         # 2. Extract audio segments
@@ -202,18 +205,58 @@ def analyze_silence_ratio(file_path: Path, cache=None) -> Tuple[Optional[float],
         ratio = energy_silence / (energy_music + 1e-10)
 
         logger.info(
-            f"Rule 7 Analysis: Silence={total_silence_sec:.2f}s, "
-            f"Energy(Silence)={energy_silence:.2e}, Energy(Music)={energy_music:.2e}, "
-            f"Ratio={ratio:.4f}"
+            "Rule 7 Analysis: Silence=%.2fs, Energy(Silence)=%.2e, Energy(Music)=%.2e, Ratio=%.4f",
+            total_silence_sec,
+            energy_silence,
+            energy_music,
+            ratio,
         )
 
         return ratio, "OK", energy_silence, energy_music
 
     except Exception as e:
-        logger.error(f"Error in Rule 7 analysis: {e}")
+        logger.error("Error in Rule 7 analysis: %s", e)
         return None, "ERROR", 0.0, 0.0
 
 
+def analyze_silence_ratio_from_stream(stream) -> Tuple[Optional[float], str, float, float]:
+    """Analyze the HF energy ratio between silence and music of a streaming analysis.
+
+    Same decisions as ``analyze_silence_ratio``, from the silent runs and band
+    energies accumulated in one pass over a large file.
+
+    Args:
+        stream: ``StreamAnalysis`` of the file
+
+    Returns:
+        Tuple of (ratio, verdict_code, silence_energy, music_energy)
+    """
+    silence = stream.silence
+    if not silence.runs:
+        logger.info("Rule 7: No silence detected")
+        return None, "NO_SILENCE", 0.0, 0.0
+
+    total_silence_sec = silence.silence_samples / stream.sample_rate
+    if total_silence_sec < 2.0:
+        logger.info("Rule 7: Insufficient silence (%.2fs < 2.0s)", total_silence_sec)
+        return None, "INSUFFICIENT_SILENCE", 0.0, 0.0
+
+    energy_silence = silence.silence_energy
+    energy_music = silence.music_energy
+    ratio = energy_silence / (energy_music + 1e-10)
+
+    logger.info(
+        "Rule 7 Analysis (stream): Silence=%.2fs, Energy(Silence)=%.2e, Energy(Music)=%.2e, "
+        "Ratio=%.4f",
+        total_silence_sec,
+        energy_silence,
+        energy_music,
+        ratio,
+    )
+
+    return ratio, "OK", energy_silence, energy_music
+
+
 def detect_vinyl_noise(
     audio_data: np.ndarray, sample_rate: int, cutoff_freq: float
 ) -> Tuple[bool, dict]:
@@ -247,9 +290,44 @@ def detect_vinyl_noise(
 
     # 1. Measure average energy in dB
     energy_db = calculate_energy_db(noise_band)
+    return _classify_vinyl_noise(noise_band, sample_rate, energy_db, details)
+
+
+def detect_vinyl_noise_from_stream(stream, cutoff_freq: float) -> Tuple[bool, dict]:
+    """Detect vinyl surface noise above the cutoff from a streaming analysis.
+
+    The noise energy comes from the whole-file Welch spectrum; the texture
+    (autocorrelation, temporal variance), which ``detect_vinyl_noise`` only
+    measures at the start of the file, from the first seconds kept by the pass.
+
+    Args:
+        stream: ``StreamAnalysis`` of the file
+        cutoff_freq: Musical cutoff frequency in Hz
+
+    Returns:
+        Tuple of (is_vinyl, details_dict)
+    """
+    details = {"energy_db": -100.0, "autocorr": 0.0, "temporal_variance": 0.0, "is_vinyl": False}
+    sample_rate = stream.sample_rate
+
+    # The texture measures look at the first 5 seconds at most
+    head = stream.head.audio[: 5 * sample_rate]
+    noise_band = filter_band(np.mean(head, axis=1), sample_rate, cutoff_freq)
+    if noise_band is None:
+        return False, details
+
+    mean_square = stream.spectrum.band_mean_square(band_sos(sample_rate, cutoff_freq))
+    energy_db = float(20 * np.log10(np.sqrt(mean_square) + 1e-10))
+    return _classify_vinyl_noise(noise_band, sample_rate, energy_db, details)
+
+
+def _classify_vinyl_noise(
+    noise_band: np.ndarray, sample_rate: int, energy_db: float, details: dict
+) -> Tuple[bool, dict]:
+    """Classify the noise above the cutoff from its energy and texture."""
     details["energy_db"] = energy_db
 
-    logger.debug(f"VINYL: Noise energy = {energy_db:.1f} dB")
+    logger.debug("VINYL: Noise energy = %.1f dB", energy_db)
 
     # Vinyl noise should be present (> -70dB)
     if energy_db < -70:
@@ -259,12 +337,12 @@ def detect_vinyl_noise(
     # 2. Calculate autocorrelation (texture analysis)
     autocorr = calculate_autocorrelation(noise_band, sample_rate)
     details["autocorr"] = autocorr
-    logger.debug(f"VINYL: Autocorrelation = {autocorr:.3f}")
+    logger.debug("VINYL: Autocorrelation = %.3f", autocorr)
 
     # 3. Measure temporal constancy
     temporal_variance = calculate_temporal_variance(noise_band, sample_rate)
     details["temporal_variance"] = temporal_variance
-    logger.debug(f"VINYL: Temporal variance = {temporal_variance:.2f} dB")
+    logger.debug("VINYL: Temporal variance = %.2f dB", temporal_variance)
 
     # Decision criteria for vinyl noise:
     # 1. Energy > -70dB (noise present)
@@ -277,13 +355,17 @@ def detect_vinyl_noise(
 
     if is_vinyl:
         logger.info(
-            f"VINYL: Detected vinyl noise (energy={energy_db:.1f}dB, "
-            f"autocorr={details['autocorr']:.3f}, variance={details['temporal_variance']:.2f}dB)"
+            "VINYL: Detected vinyl noise (energy=%.1fdB, autocorr=%.3f, variance=%.2fdB)",
+            energy_db,
+            details["autocorr"],
+            details["temporal_variance"],
         )
     else:
         logger.debug(
-            f"VINYL: Not vinyl noise (energy={energy_db:.1f}dB, "
-            f"autocorr={details['autocorr']:.3f}, variance={details['temporal_variance']:.2f}dB)"
+            "VINYL: Not vinyl noise (energy=%.1fdB, autocorr=%.3f, variance=%.2fdB)",
+            energy_db,
+            details["autocorr"],
+            details["temporal_variance"],
         )
 
     return is_vinyl, details
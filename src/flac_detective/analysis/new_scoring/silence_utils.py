@@ -10,6 +10,8 @@ from typing import Optional, Tuple
 import numpy as np
 from scipy import signal
 
+from ..window_cache import get_butter_sos
+
 logger = logging.getLogger(__name__)
 
 
@@ -33,17 +35,19 @@ def filter_band(
         logger.debug("VINYL: Cutoff too close to Nyquist for noise analysis")
         return None
 
-    # Bandpass filter: cutoff_freq to Nyquist - 100Hz
-    upper_freq = nyquist - 100
-
     try:
-        sos = signal.butter(4, [cutoff_freq, upper_freq], "bandpass", fs=sample_rate, output="sos")
-        return signal.sosfilt(sos, audio_mono)
+        return signal.sosfilt(band_sos(sample_rate, cutoff_freq), audio_mono)
     except Exception as e:
-        logger.warning(f"VINYL: Filtering failed: {e}")
+        logger.warning("VINYL: Filtering failed: %s", e)
         return None
 
 
+def band_sos(sample_rate: int, cutoff_freq: float) -> np.ndarray:
+    """Design the bandpass filter of ``filter_band`` (cutoff to Nyquist - 100 Hz)."""
+    upper_freq = sample_rate / 2 - 100
+    return signal.butter(4, [cutoff_freq, upper_freq], "bandpass", fs=sample_rate, output="sos")
+
+
 def calculate_energy_db(audio_data: np.ndarray) -> float:
     """Calculate RMS energy in dB.
 
@@ -147,10 +151,10 @@ def detect_transients(audio_data: np.ndarray, sample_rate: int) -> Tuple[int, fl
 
     # High-pass filter to remove low-frequency content
     try:
-        sos = signal.butter(4, 1000, "highpass", fs=sample_rate, output="sos")
+        sos = get_butter_sos(4, 1000, "highpass", sample_rate)
         audio_hp = signal.sosfilt(sos, audio_mono)
     except Exception as e:
-        logger.warning(f"CLICKS: Filtering failed: {e}")
+        logger.warning("CLICKS: Filtering failed: %s", e)
         return 0, 0.0
 
     # Envelope detection
@@ -176,15 +180,17 @@ def detect_transients(audio_data: np.ndarray, sample_rate: int) -> Tuple[int, fl
     try:
         peaks, _ = signal.find_peaks(envelope_smooth, height=threshold, distance=min_distance)
     except Exception as e:
-        logger.warning(f"CLICKS: Peak detection failed: {e}")
+        logger.warning("CLICKS: Peak detection failed: %s", e)
         return 0, 0.0
 
     num_clicks = len(peaks)
     clicks_per_minute = (num_clicks / duration_sec) * 60
 
     logger.debug(
-        f"CLICKS: Detected {num_clicks} clicks in {duration_sec:.1f}s "
-        f"({clicks_per_minute:.1f} clicks/min)"
+        "CLICKS: Detected %s clicks in %.1fs (%.1f clicks/min)",
+        num_clicks,
+        duration_sec,
+        clicks_per_minute,
     )
 
     return num_clicks, clicks_per_minute
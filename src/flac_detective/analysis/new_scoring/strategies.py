@@ -1,9 +1,24 @@
-"""Strategy pattern implementation for scoring rules."""
+"""Strategy pattern implementation for scoring rules.
+
+Each rule declares what the rule engine needs to schedule it:
+
+- ``inputs``: context fields produced by other rules that must be final before
+  the rule runs (``current_score`` means "after every other scoring rule").
+- ``refine_inputs``: fields the rule reads opportunistically; if one of them is
+  produced after the rule ran, the rule is re-evaluated (see Rule 8).
+- ``outputs``: context fields the rule publishes besides its score.
+- ``score_bounds``: (min, max) score delta the rule can contribute.
+- ``cost``: prior cost estimate in milliseconds, refined by measurements.
+- ``applies_to``: activation predicate on the initial measurements only.
+- ``is_active``: activation predicate evaluated right before execution.
+"""
 
 import logging
 from abc import ABC, abstractmethod
+from typing import Tuple
 
-from .models import ScoringContext
+from .bitrate import get_cutoff_threshold
+from .models import RuleResult, ScoringContext
 from .rules import (
     apply_rule_1_mp3_bitrate,
     apply_rule_2_cutoff,
@@ -20,13 +35,54 @@ from .rules import (
 
 logger = logging.getLogger(__name__)
 
+# Cassette score above which the MP3 signature of Rule 1 is ignored
+CASSETTE_SCORE_THRESHOLD = 30
+CASSETTE_BONUS = -40
+
+
+def _nyquist_ratio(context: ScoringContext) -> float:
+    return context.cutoff_freq / (context.audio_meta.sample_rate / 2.0)
+
+
+def _stream(context: ScoringContext):
+    """Streaming analysis of a large file, or None if the file is decoded whole."""
+    cache = context.cache
+    if cache is not None and cache.is_streaming():
+        return cache.get_stream()
+    return None
+
 
 class ScoringRule(ABC):
     """Abstract base class for a scoring rule strategy."""
 
+    rule_id: str = ""
+    inputs: Tuple[str, ...] = ()
+    refine_inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+    score_bounds: Tuple[int, int] = (0, 0)
+    cost: float = 0.01
+    needs_audio: bool = False
+
+    def applies_to(self, context: ScoringContext) -> bool:
+        """Static activation predicate (initial measurements only)."""
+        return True
+
+    def is_active(self, context: ScoringContext) -> bool:
+        """Dynamic activation predicate, evaluated once ``inputs`` are final."""
+        return True
+
+    def needs_refinement(self, context: ScoringContext) -> bool:
+        """Whether a late change of a ``refine_inputs`` field can change the result."""
+        return True
+
     @abstractmethod
+    def evaluate(self, context: ScoringContext) -> RuleResult:
+        """Compute the rule result without modifying the context."""
+
     def apply(self, context: ScoringContext) -> None:
-        """Apply the rule and update the context."""
+        """Evaluate the rule and merge its result into the context."""
+        if self.applies_to(context) and self.is_active(context):
+            context.apply_result(self.evaluate(context))
 
     @property
     def name(self) -> str:
@@ -34,10 +90,23 @@ class ScoringRule(ABC):
 
 
 class Rule1MP3Bitrate(ScoringRule):
-    def apply(self, context: ScoringContext) -> None:
+    rule_id = "R1"
+    inputs = ("cassette_detected",)
+    outputs = ("mp3_bitrate_detected",)
+    score_bounds = (0, 50)
+
+    def applies_to(self, context: ScoringContext) -> bool:
+        # Rule 1 never fires at/above 95% of Nyquist or above 21.5 kHz
+        return _nyquist_ratio(context) < 0.95 and context.cutoff_freq <= 21500
+
+    def is_active(self, context: ScoringContext) -> bool:
+        return not context.cassette_detected
+
+    def evaluate(self, context: ScoringContext) -> RuleResult:
         logger.debug(
-            f"Rule 1: real_bitrate={context.bitrate_metrics.real_bitrate:.1f} kbps | "
-            f"duration={context.audio_meta.duration:.3f}s"
+            "Rule 1: real_bitrate=%.1f kbps | duration=%.3fs",
+            context.bitrate_metrics.real_bitrate,
+            context.audio_meta.duration,
         )
         (score, reasons), estimated_bitrate = apply_rule_1_mp3_bitrate(
             context.cutoff_freq,
@@ -46,117 +115,196 @@ class Rule1MP3Bitrate(ScoringRule):
             context.audio_meta.sample_rate,
             context.energy_ratio,
         )
-        context.add_score(score, reasons)
-        context.mp3_bitrate_detected = estimated_bitrate
+        return RuleResult(score, reasons, {"mp3_bitrate_detected": estimated_bitrate})
 
 
 class Rule2Cutoff(ScoringRule):
-    def apply(self, context: ScoringContext) -> None:
+    rule_id = "R2"
+    score_bounds = (0, 30)
+
+    def applies_to(self, context: ScoringContext) -> bool:
+        return context.cutoff_freq < get_cutoff_threshold(context.audio_meta.sample_rate)
+
+    def evaluate(self, context: ScoringContext) -> RuleResult:
         score, reasons = apply_rule_2_cutoff(context.cutoff_freq, context.audio_meta.sample_rate)
-        context.add_score(score, reasons)
+        return RuleResult(score, reasons)
 
 
 class Rule3SourceVsContainer(ScoringRule):
-    def apply(self, context: ScoringContext) -> None:
+    rule_id = "R3"
+    inputs = ("mp3_bitrate_detected",)
+    score_bounds = (0, 50)
+
+    def is_active(self, context: ScoringContext) -> bool:
+        return context.mp3_bitrate_detected is not None
+
+    def evaluate(self, context: ScoringContext) -> RuleResult:
         score, reasons = apply_rule_3_source_vs_container(
             context.mp3_bitrate_detected, context.bitrate_metrics.real_bitrate
         )
-        context.add_score(score, reasons)
+        return RuleResult(score, reasons)
 
 
 class Rule424BitSuspect(ScoringRule):
-    def apply(self, context: ScoringContext) -> None:
+    # silence_ratio is only known after Rule 7, which runs after the fast
+    # short-circuits; Rule 4 deliberately does not wait for it.
+    rule_id = "R4"
+    inputs = ("mp3_bitrate_detected",)
+    score_bounds = (0, 30)
+
+    def applies_to(self, context: ScoringContext) -> bool:
+        return context.audio_meta.bit_depth == 24 and context.cutoff_freq < 19000
+
+    def is_active(self, context: ScoringContext) -> bool:
+        return context.mp3_bitrate_detected is not None
+
+    def evaluate(self, context: ScoringContext) -> RuleResult:
         score, reasons = apply_rule_4_24bit_suspect(
             context.audio_meta.bit_depth,
             context.mp3_bitrate_detected,
             context.cutoff_freq,
             context.silence_ratio,
         )
-        context.add_score(score, reasons)
+        return RuleResult(score, reasons)
 
 
 class Rule5HighVariance(ScoringRule):
-    def apply(self, context: ScoringContext) -> None:
+    rule_id = "R5"
+    score_bounds = (-40, 0)
+
+    def evaluate(self, context: ScoringContext) -> RuleResult:
         score, reasons = apply_rule_5_high_variance(
             context.bitrate_metrics.real_bitrate, context.bitrate_metrics.variance
         )
-        context.add_score(score, reasons)
+        return RuleResult(score, reasons)
 
 
 class Rule6HighQualityProtection(ScoringRule):
-    def apply(self, context: ScoringContext) -> None:
+    rule_id = "R6"
+    inputs = ("mp3_bitrate_detected",)
+    score_bounds = (-30, 0)
+
+    def applies_to(self, context: ScoringContext) -> bool:
+        return context.cutoff_freq >= 19000
+
+    def is_active(self, context: ScoringContext) -> bool:
+        return context.mp3_bitrate_detected is None
+
+    def evaluate(self, context: ScoringContext) -> RuleResult:
         score, reasons = apply_rule_6_variable_bitrate_protection(
             context.mp3_bitrate_detected,
             context.bitrate_metrics.real_bitrate,
             context.cutoff_freq,
             context.bitrate_metrics.variance,
         )
-        context.add_score(score, reasons)
+        return RuleResult(score, reasons)
 
 
 class Rule7SilenceAnalysis(ScoringRule):
-    def apply(self, context: ScoringContext) -> None:
-        # Check activation condition locally or rely on the inner function
-        # The inner function checks 19k-21.5k range
+    rule_id = "R7"
+    outputs = ("silence_ratio",)
+    score_bounds = (-50, 50)
+    cost = 400.0
+
+    def applies_to(self, context: ScoringContext) -> bool:
+        # Ambiguous zone handled by the rule itself: 19 kHz to 21.5 kHz
+        return 19000 <= context.cutoff_freq <= 21500
+
+    def evaluate(self, context: ScoringContext) -> RuleResult:
         score, reasons, ratio = apply_rule_7_silence_analysis(
-            str(context.filepath), context.cutoff_freq, context.audio_meta.sample_rate
+            str(context.filepath),
+            context.cutoff_freq,
+            context.audio_meta.sample_rate,
+            stream=_stream(context),
         )
-        context.add_score(score, reasons)
-        context.silence_ratio = ratio
+        return RuleResult(score, reasons, {"silence_ratio": ratio})
 
 
 class Rule8NyquistException(ScoringRule):
-    def apply(self, context: ScoringContext) -> None:
-        # This rule might be applied multiple times (initial and refined)
-        # The context handles score accumulation, so we need to be careful not to double count
-        # if this is called twice.
-        # However, the calculator logic handles the "refinement" by removing previous score.
-        # Here we just apply what we know.
+    # The silence_ratio safeguard only matters once an MP3 signature is known,
+    # so Rule 8 is re-evaluated when Rule 7 completes only in that case.
+    rule_id = "R8"
+    inputs = ("mp3_bitrate_detected",)
+    refine_inputs = ("silence_ratio",)
+    score_bounds = (-50, 0)
+
+    def applies_to(self, context: ScoringContext) -> bool:
+        # No bonus below 95% of Nyquist
+        return _nyquist_ratio(context) >= 0.95
+
+    def needs_refinement(self, context: ScoringContext) -> bool:
+        return context.mp3_bitrate_detected is not None
+
+    def evaluate(self, context: ScoringContext) -> RuleResult:
         score, reasons = apply_rule_8_nyquist_exception(
             context.cutoff_freq,
             context.audio_meta.sample_rate,
             context.mp3_bitrate_detected,
             context.silence_ratio,
         )
-        # Note: The caller (calculator) is responsible for managing the "update" logic
-        # (subtracting old score) if this is a re-run.
-        # Or we can make this rule smart enough to know?
-        # For now, let's assume the calculator handles the flow control.
-        context.add_score(score, reasons)
+        return RuleResult(score, reasons)
 
 
 class Rule9CompressionArtifacts(ScoringRule):
-    def apply(self, context: ScoringContext) -> None:
-        # Check activation condition
-        run_rule9 = context.cutoff_freq < 21000 or context.mp3_bitrate_detected is not None
-
-        if run_rule9:
-            score, reasons, details = apply_rule_9_compression_artifacts(
-                str(context.filepath),
-                context.cutoff_freq,
-                context.mp3_bitrate_detected,
-                audio_data=context.audio_data,
-                sample_rate=context.loaded_sample_rate,
-            )
-            context.add_score(score, reasons)
-            context.mp3_pattern_detected = details.get("mp3_noise_pattern", False)
-        else:
-            logger.debug("RULE 9: Skipped (cutoff >= 21000 and no MP3 detected)")
+    rule_id = "R9"
+    inputs = ("mp3_bitrate_detected",)
+    outputs = ("mp3_pattern_detected",)
+    score_bounds = (0, 40)
+    cost = 250.0
+    needs_audio = True
+
+    def is_active(self, context: ScoringContext) -> bool:
+        return context.cutoff_freq < 21000 or context.mp3_bitrate_detected is not None
+
+    def evaluate(self, context: ScoringContext) -> RuleResult:
+        # Large files: pre-echo over the whole file from the streaming pass
+        stream = _stream(context)
+        score, reasons, details = apply_rule_9_compression_artifacts(
+            str(context.filepath),
+            context.cutoff_freq,
+            context.mp3_bitrate_detected,
+            audio_data=context.audio_data,
+            sample_rate=context.loaded_sample_rate,
+            preecho=stream.transients.result() if stream is not None else None,
+        )
+        return RuleResult(
+            score, reasons, {"mp3_pattern_detected": details.get("mp3_noise_pattern", False)}
+        )
 
 
 class Rule10Consistency(ScoringRule):
-    def apply(self, context: ScoringContext) -> None:
+    rule_id = "R10"
+    inputs = ("current_score",)
+    score_bounds = (-30, 0)
+    cost = 150.0
+
+    def is_active(self, context: ScoringContext) -> bool:
+        # Only worth confirming files that are already suspect
+        return context.current_score > 30
+
+    def evaluate(self, context: ScoringContext) -> RuleResult:
         score, reasons = apply_rule_10_multi_segment_consistency(
             str(context.filepath),
             context.current_score,
             context.audio_meta.sample_rate,
             context.bitrate_metrics.real_bitrate,
         )
-        context.add_score(score, reasons)
+        return RuleResult(score, reasons)
 
 
 class Rule11CassetteDetection(ScoringRule):
-    def apply(self, context: ScoringContext) -> None:
+    # Reads mp3_pattern_detected (Rule 9C) when available but does not wait for
+    # it: Rule 1 depends on the cassette verdict, and Rule 9 on Rule 1.
+    rule_id = "R11"
+    outputs = ("cassette_detected",)
+    score_bounds = (CASSETTE_BONUS, 85)
+    cost = 300.0
+    needs_audio = True
+
+    def applies_to(self, context: ScoringContext) -> bool:
+        return context.cutoff_freq < 19000
+
+    def evaluate(self, context: ScoringContext) -> RuleResult:
         score, reasons = apply_rule_11_cassette_detection(
             str(context.filepath),
             context.cutoff_freq,
@@ -165,4 +313,15 @@ class Rule11CassetteDetection(ScoringRule):
             context.audio_meta.sample_rate,
             audio_data=context.audio_data,
         )
-        context.add_score(score, reasons)
+
+        if score < CASSETTE_SCORE_THRESHOLD:
+            return RuleResult(score, reasons, {"cassette_detected": False})
+
+        logger.info("R11: Signature MP3 annulée (source cassette détectée)")
+        logger.info(
+            "CASSETTE DETECTED (Score %s >= %s). Disabling Rule 1 (MP3 Bitrate).",
+            score,
+            CASSETTE_SCORE_THRESHOLD,
+        )
+        reasons = reasons + ["R11: Source cassette audio authentique (Bonus -40pts)"]
+        return RuleResult(score + CASSETTE_BONUS, reasons, {"cassette_detected": True})
@@ -0,0 +1,173 @@
+"""Decoding of long files by several threads at once.
+
+A two-hour FLAC decoded by one thread keeps one core busy for the whole
+decode, often at the tail of a scan while the rest of the pool sits idle.
+Long files (``PARALLEL_DECODE_MINUTES``), and shorter ones when idle pool
+workers lend their CPUs (``threads.spare_threads``), are split into sample
+ranges decoded by a thread each, straight into disjoint slices of the
+decode buffer (pooled, or memory-mapped for large files). The decoder
+releases the GIL, so the threads run in parallel.
+
+Range boundaries are moved to the nearest SEEKTABLE entry when the file
+has one, so each thread starts on a frame the decoder finds directly;
+otherwise the decoder scans to the frame holding the boundary. Each range
+is retried on its own after temporary decoder errors; if one still fails,
+the caller falls back to the sequential decode and its repair logic.
+"""
+
+import bisect
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Sequence, Tuple
+
+import numpy as np
+import soundfile as sf
+
+from .. import metrics
+from ..config import analysis_config
+from ..threads import fft_workers, spare_threads
+from .new_scoring.audio_loader import MUTAGEN_AVAILABLE, is_temporary_decoder_error
+
+if MUTAGEN_AVAILABLE:
+    from mutagen.flac import FLAC
+
+logger = logging.getLogger(__name__)
+
+# Shortest range worth a thread of its own
+MIN_RANGE_SECONDS = 30.0
+
+# Frames read per call (progress kept across retries)
+RANGE_BLOCKSIZE = 262144
+
+# SEEKTABLE placeholder points have this sample number
+_PLACEHOLDER = 0xFFFFFFFFFFFFFFFF
+
+
+def decode_threads(frames: int, sample_rate: int) -> int:
+    """Threads to decode a file with (1 = sequential decode).
+
+    Args:
+        frames: Frames of the file.
+        sample_rate: Sample rate in Hz.
+    """
+    minutes = analysis_config.PARALLEL_DECODE_MINUTES
+    if not minutes or sample_rate <= 0:
+        return 1
+    threads = spare_threads()
+    if frames < minutes * 60 * sample_rate and threads <= fft_workers():
+        # Not long, and no idle worker to borrow CPUs from
+        return 1
+    ranges = frames // int(MIN_RANGE_SECONDS * sample_rate)
+    return max(1, min(threads, ranges))
+
+
+def seek_points(file_path: str) -> List[int]:
+    """Sample numbers of the SEEKTABLE entries of a FLAC file (empty if none)."""
+    if not MUTAGEN_AVAILABLE:
+        return []
+    try:
+        table = FLAC(file_path).seektable
+    except Exception as e:
+        logger.debug("No seek table for %s: %s", file_path, e)
+        return []
+    if table is None:
+        return []
+    return sorted({p.first_sample for p in table.seekpoints if p.first_sample != _PLACEHOLDER})
+
+
+def split_ranges(
+    total_frames: int, parts: int, points: Sequence[int] = ()
+) -> List[Tuple[int, int]]:
+    """Split ``total_frames`` into about ``parts`` contiguous ranges.
+
+    Args:
+        total_frames: Frames to split.
+        parts: Number of ranges wanted.
+        points: Sorted frame numbers to align the boundaries to (seek points).
+
+    Returns:
+        List of (start, end) frame ranges covering the file in order.
+    """
+    inner = [p for p in points if 0 < p < total_frames]
+    boundaries = []
+    for index in range(1, parts):
+        boundary = index * total_frames // parts
+        if inner:
+            # Nearest seek point
+            position = bisect.bisect_left(inner, boundary)
+            candidates = inner[max(0, position - 1) : position + 1]
+            boundary = min(candidates, key=lambda p: abs(p - boundary))
+        boundaries.append(boundary)
+    edges = [0] + sorted(set(boundaries)) + [total_frames]
+    return [(start, end) for start, end in zip(edges, edges[1:]) if end > start]
+
+
+def decode_range(
+    file_path: str,
+    out: np.ndarray,
+    start: int,
+    end: int,
+    max_attempts: int = 5,
+    initial_delay: float = 0.2,
+    backoff_multiplier: float = 2.0,
+) -> bool:
+    """Decode frames ``start`` to ``end`` of a file into ``out[start:end]``.
+
+    The range is read through its own handle. After a temporary decoder
+    error the file is reopened at the first frame not read yet.
+
+    Returns:
+        True if the whole range was decoded.
+    """
+    current = start
+    attempt = 1
+    delay = initial_delay
+    while current < end:
+        try:
+            with sf.SoundFile(file_path, "r") as f:
+                f.seek(current)
+                while current < end:
+                    count = min(RANGE_BLOCKSIZE, end - current)
+                    chunk = f.read(count, dtype=out.dtype.name, out=out[current : current + count])
+                    if len(chunk) == 0:
+                        logger.debug("Unexpected end of %s at frame %s", file_path, current)
+                        return False
+                    current += len(chunk)
+                    attempt, delay = 1, initial_delay
+        except Exception as e:
+            error_msg = str(e)
+            if not is_temporary_decoder_error(error_msg) or attempt >= max_attempts:
+                logger.debug("Range %s-%s of %s failed: %s", start, end, file_path, error_msg)
+                return False
+            logger.debug(
+                "Temporary error on attempt %s reading from frame %s: %s",
+                attempt,
+                current,
+                error_msg,
+            )
+            metrics.inc("decode_retries_total")
+            time.sleep(delay)
+            delay *= backoff_multiplier
+            attempt += 1
+    return True
+
+
+def decode_parallel(file_path: str, out: np.ndarray, threads: int) -> bool:
+    """Decode a whole file into ``out`` with several threads.
+
+    Args:
+        file_path: Path to the audio file.
+        out: Array of shape (frames, channels) to decode into.
+        threads: Number of threads (and of ranges).
+
+    Returns:
+        True if every range was decoded; ``out`` is then the decoded audio.
+    """
+    ranges = split_ranges(len(out), threads, seek_points(file_path))
+    logger.debug("Decoding %s in %s ranges", file_path, len(ranges))
+    with ThreadPoolExecutor(max_workers=len(ranges), thread_name_prefix="decode") as executor:
+        results = list(executor.map(lambda r: decode_range(file_path, out, r[0], r[1]), ranges))
+    complete = all(results)
+    metrics.inc("parallel_decodes_total", outcome="complete" if complete else "failed")
+    return complete
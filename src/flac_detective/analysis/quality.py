@@ -7,15 +7,24 @@ a strategy pattern for different quality detectors.
 import logging
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import numpy as np
 import soundfile as sf
 
+from ..tracing import span
 from .new_scoring.audio_loader import is_temporary_decoder_error, sf_blocks
 
 logger = logging.getLogger(__name__)
 
+# Frames per block of the streaming detectors
+BLOCKSIZE = 16384
+
+
+def _block_buffer(info) -> np.ndarray:
+    """Allocate the block the streaming detectors read every chunk of a file into."""
+    return np.empty((BLOCKSIZE, info.channels), dtype=np.float32)
+
 
 # ============================================================================
 # SEVERITY CALCULATION HELPERS
@@ -138,6 +147,23 @@ class ClippingDetector(QualityDetector):
             "severity": severity,
         }
 
+    def detect_from_counts(self, clipped_samples: int, total_frames: int) -> Dict[str, Any]:
+        """Detect clipping from counts (streaming analysis of large files).
+
+        Args:
+            clipped_samples: Samples at or above the threshold, all channels.
+            total_frames: Frames of the file.
+        """
+        clipping_percentage = (clipped_samples / total_frames) * 100 if total_frames > 0 else 0
+        severity = _calculate_clipping_severity(clipping_percentage)
+
+        return {
+            "has_clipping": clipping_percentage > 0.01,
+            "clipping_percentage": round(clipping_percentage, 4),
+            "clipped_samples": clipped_samples,
+            "severity": severity,
+        }
+
     def detect(self, filepath: Path, **kwargs) -> Dict[str, Any]:
         """Detect clipping in audio data.
 
@@ -163,23 +189,13 @@ class ClippingDetector(QualityDetector):
                     "severity": "none",
                 }
 
-            # Use sf_blocks to iterate
-            for chunk in sf_blocks(str(filepath), dtype="float32"):
-                clipped_samples += int(np.sum(np.abs(chunk) >= self.threshold))
-
-            clipping_percentage = (
-                (clipped_samples / total_samples) * 100 if total_samples > 0 else 0
-            )
-            severity = _calculate_clipping_severity(clipping_percentage)
+            # Use sf_blocks to iterate (into one reused block, rectified in place)
+            for chunk in sf_blocks(str(filepath), dtype="float32", out=_block_buffer(info)):
+                clipped_samples += int(np.count_nonzero(np.abs(chunk, out=chunk) >= self.threshold))
 
-            return {
-                "has_clipping": clipping_percentage > 0.01,
-                "clipping_percentage": round(clipping_percentage, 4),
-                "clipped_samples": clipped_samples,
-                "severity": severity,
-            }
+            return self.detect_from_counts(clipped_samples, total_samples)
         except Exception as e:
-            logger.warning(f"Clipping detection failed for {filepath.name}: {e}")
+            logger.warning("Clipping detection failed for %s: %s", filepath.name, e)
             return {
                 "has_clipping": False,
                 "clipping_percentage": 0.0,
@@ -215,6 +231,23 @@ class DCOffsetDetector(QualityDetector):
             "severity": severity,
         }
 
+    def detect_from_sum(self, sum_of_samples: float, total_samples: int) -> Dict[str, Any]:
+        """Detect DC offset from the sum of the samples (streaming analysis of large files).
+
+        Args:
+            sum_of_samples: Sum of the samples of all channels.
+            total_samples: Number of samples, all channels.
+        """
+        dc_offset = sum_of_samples / total_samples if total_samples > 0 else 0.0
+        abs_offset = abs(dc_offset)
+        severity = _calculate_dc_offset_severity(abs_offset, self.threshold)
+
+        return {
+            "has_dc_offset": abs_offset >= self.threshold,
+            "dc_offset_value": round(dc_offset, 6),
+            "severity": severity,
+        }
+
     def detect(self, filepath: Path, **kwargs) -> Dict[str, Any]:
         """Detect DC offset in audio data.
 
@@ -238,21 +271,13 @@ class DCOffsetDetector(QualityDetector):
                     "severity": "none",
                 }
 
-            # Use sf_blocks to iterate
-            for chunk in sf_blocks(str(filepath), dtype="float32"):
+            # Use sf_blocks to iterate (into one reused block)
+            for chunk in sf_blocks(str(filepath), dtype="float32", out=_block_buffer(info)):
                 sum_of_samples += np.sum(chunk)
 
-            dc_offset = sum_of_samples / total_samples if total_samples > 0 else 0.0
-            abs_offset = abs(dc_offset)
-            severity = _calculate_dc_offset_severity(abs_offset, self.threshold)
-
-            return {
-                "has_dc_offset": abs_offset >= self.threshold,
-                "dc_offset_value": round(dc_offset, 6),
-                "severity": severity,
-            }
+            return self.detect_from_sum(sum_of_samples, total_samples)
         except Exception as e:
-            logger.warning(f"DC offset detection failed for {filepath.name}: {e}")
+            logger.warning("DC offset detection failed for %s: %s", filepath.name, e)
             return {
                 "has_dc_offset": False,
                 "dc_offset_value": 0.0,
@@ -305,7 +330,10 @@ class CorruptionDetector(QualityDetector):
             # If we read SOME frames before error, it's a partial read (not fully corrupt)
             if frames_read > 0:
                 logger.warning(
-                    f"Partial read for {filepath.name}: {frames_read} frames read before error: {error_msg}"
+                    "Partial read for %s: %s frames read before error: %s",
+                    filepath.name,
+                    frames_read,
+                    error_msg,
                 )
                 return {
                     "is_corrupted": False,  # NOT corrupted - just incomplete
@@ -317,7 +345,9 @@ class CorruptionDetector(QualityDetector):
             else:
                 # Zero frames read - truly corrupted
                 logger.error(
-                    f"Corruption check failed for {filepath.name}: {error_msg} (0 frames readable)"
+                    "Corruption check failed for %s: %s (0 frames readable)",
+                    filepath.name,
+                    error_msg,
                 )
                 return {
                     "is_corrupted": not is_temp,  # Only mark as corrupted if it's NOT a temporary error
@@ -380,6 +410,47 @@ class SilenceDetector(QualityDetector):
             "issue_type": issue_type,
         }
 
+    def detect_from_bounds(
+        self,
+        first_non_silent_frame: Optional[int],
+        last_non_silent_frame: Optional[int],
+        total_frames: int,
+        samplerate: int,
+    ) -> Dict[str, Any]:
+        """Detect silence from the first and last non-silent frames (None if all silent).
+
+        Args:
+            first_non_silent_frame: First frame above the threshold.
+            last_non_silent_frame: Last frame above the threshold.
+            total_frames: Frames of the file.
+            samplerate: Sampling rate.
+        """
+        if first_non_silent_frame is None:  # Entire file is silent
+            return {
+                "has_silence_issue": True,
+                "leading_silence_sec": total_frames / samplerate,
+                "trailing_silence_sec": 0.0,
+                "issue_type": "full_silence",
+            }
+
+        leading_silence = first_non_silent_frame / samplerate
+        trailing_silence = (total_frames - 1 - last_non_silent_frame) / samplerate
+
+        has_issue = bool(
+            leading_silence > self.silence_threshold_sec
+            or trailing_silence > self.silence_threshold_sec
+        )
+        issue_type = _calculate_silence_issue_type(
+            leading_silence, trailing_silence, self.silence_threshold_sec
+        )
+
+        return {
+            "has_silence_issue": has_issue,
+            "leading_silence_sec": round(float(leading_silence), 2),
+            "trailing_silence_sec": round(float(trailing_silence), 2),
+            "issue_type": issue_type,
+        }
+
     def detect(self, filepath: Path, **kwargs) -> Dict[str, Any]:
         """Detect abnormal silence in audio data.
 
@@ -408,12 +479,9 @@ class SilenceDetector(QualityDetector):
             last_non_silent_frame = None
             current_frame = 0
 
-            for chunk in sf_blocks(str(filepath), dtype="float32"):
-                # Convert to mono for silence detection
-                if chunk.ndim > 1:
-                    mono_chunk = np.mean(np.abs(chunk), axis=1)
-                else:
-                    mono_chunk = np.abs(chunk)
+            for chunk in sf_blocks(str(filepath), dtype="float32", out=_block_buffer(info)):
+                # Convert to mono for silence detection (rectified in place)
+                mono_chunk = np.mean(np.abs(chunk, out=chunk), axis=1)
 
                 non_silent_indices = np.where(mono_chunk > threshold)[0]
 
@@ -424,34 +492,12 @@ class SilenceDetector(QualityDetector):
 
                 current_frame += len(chunk)
 
-            if first_non_silent_frame is None:  # Entire file is silent
-                return {
-                    "has_silence_issue": True,
-                    "leading_silence_sec": total_frames / samplerate,
-                    "trailing_silence_sec": 0.0,
-                    "issue_type": "full_silence",
-                }
-
-            leading_silence = first_non_silent_frame / samplerate
-            trailing_silence = (total_frames - 1 - last_non_silent_frame) / samplerate
-
-            has_issue = bool(
-                leading_silence > self.silence_threshold_sec
-                or trailing_silence > self.silence_threshold_sec
-            )
-            issue_type = _calculate_silence_issue_type(
-                leading_silence, trailing_silence, self.silence_threshold_sec
+            return self.detect_from_bounds(
+                first_non_silent_frame, last_non_silent_frame, total_frames, samplerate
             )
 
-            return {
-                "has_silence_issue": has_issue,
-                "leading_silence_sec": round(float(leading_silence), 2),
-                "trailing_silence_sec": round(float(trailing_silence), 2),
-                "issue_type": issue_type,
-            }
-
         except Exception as e:
-            logger.warning(f"Silence detection failed for {filepath.name}: {e}")
+            logger.warning("Silence detection failed for %s: %s", filepath.name, e)
             return {
                 "has_silence_issue": False,
                 "leading_silence_sec": 0.0,
@@ -514,7 +560,7 @@ class BitDepthDetector(QualityDetector):
                 "details": "24-bit file contains only 16-bit data" if is_16bit else "True 24-bit",
             }
         except Exception as e:
-            logger.warning(f"Bit depth detection failed for {filepath.name}: {e}")
+            logger.warning("Bit depth detection failed for %s: %s", filepath.name, e)
             return {
                 "is_fake_high_res": False,
                 "estimated_depth": reported_depth,
@@ -600,7 +646,7 @@ class AudioQualityAnalyzer:
         # 1. Check corruption first
         # If cache is provided and has data, skip corruption check (cache already loaded data)
         if cache is not None:
-            logger.debug(f"Skipping corruption check for {filepath.name} - using cache")
+            logger.debug("Skipping corruption check for %s - using cache", filepath.name)
             corruption_result = {
                 "is_corrupted": False,
                 "readable": True,
@@ -620,32 +666,41 @@ class AudioQualityAnalyzer:
         # If partial_analysis but cache is provided, continue with partial data
         if corruption_result.get("partial_analysis") and cache is None:
             logger.warning(
-                f"Cannot perform full quality analysis for {filepath.name} due to temporary read errors."
+                "Cannot perform full quality analysis for %s due to temporary read errors.",
+                filepath.name,
             )
             return self._get_empty_results(
                 results, error_mode=True, error_msg="Partial analysis due to read errors"
             )
         elif corruption_result.get("partial_analysis") and cache is not None:
-            logger.info(f"Proceeding with partial data analysis for {filepath.name} using cache")
+            logger.info("Proceeding with partial data analysis for %s using cache", filepath.name)
 
         try:
             # No longer reading the full file here.
             # Detectors will read the file themselves in a memory-efficient way.
 
-            # 3. Clipping detection
-            results["clipping"] = self.detectors["clipping"].detect(filepath=filepath)
+            if cache is not None and cache.is_streaming():
+                # Large file: counters of the streaming pass
+                self._detect_from_stream(cache.get_stream(), results)
+            else:
+                # 3. Clipping detection
+                with span("quality.clipping"):
+                    results["clipping"] = self.detectors["clipping"].detect(filepath=filepath)
 
-            # 4. DC offset detection
-            results["dc_offset"] = self.detectors["dc_offset"].detect(filepath=filepath)
+                # 4. DC offset detection
+                with span("quality.dc_offset"):
+                    results["dc_offset"] = self.detectors["dc_offset"].detect(filepath=filepath)
 
-            # 5. Silence detection
-            results["silence"] = self.detectors["silence"].detect(filepath=filepath)
+                # 5. Silence detection
+                with span("quality.silence"):
+                    results["silence"] = self.detectors["silence"].detect(filepath=filepath)
 
             # 6. Fake High-Res detection
             reported_depth = self._get_reported_depth(metadata)
-            results["bit_depth"] = self.detectors["bit_depth"].detect(
-                filepath=filepath, reported_depth=reported_depth
-            )
+            with span("quality.bit_depth"):
+                results["bit_depth"] = self.detectors["bit_depth"].detect(
+                    filepath=filepath, reported_depth=reported_depth
+                )
 
             # 7. Upsampling detection - this one doesn't need audio data, just metadata
             # It needs the sample rate. Let's get it from sf.info to be safe.
@@ -660,11 +715,29 @@ class AudioQualityAnalyzer:
             )
 
         except Exception as e:
-            logger.error(f"Error analyzing quality for {filepath.name}: {e}")
+            logger.error("Error analyzing quality for %s: %s", filepath.name, e)
             return self._get_empty_results(results, error_mode=True, error_msg=str(e))
 
         return results
 
+    def _detect_from_stream(self, stream, results: Dict[str, Any]):
+        """Run the clipping, DC offset and silence detectors on a streaming analysis.
+
+        Args:
+            stream: ``StreamAnalysis`` of the file.
+            results: Results dictionary to fill.
+        """
+        levels = stream.levels
+        results["clipping"] = self.detectors["clipping"].detect_from_counts(
+            levels.clipped_samples, stream.frames
+        )
+        results["dc_offset"] = self.detectors["dc_offset"].detect_from_sum(
+            levels.sample_sum, levels.samples
+        )
+        results["silence"] = self.detectors["silence"].detect_from_bounds(
+            levels.first_sound, levels.last_sound, stream.frames, stream.sample_rate
+        )
+
     def _get_reported_depth(self, metadata: Dict | None) -> int:
         """Extract reported bit depth from metadata.
 
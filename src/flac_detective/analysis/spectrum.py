@@ -6,10 +6,14 @@ from typing import List, Tuple, TYPE_CHECKING
 
 import numpy as np
 import soundfile as sf
-from scipy.fft import rfft, rfftfreq, set_workers
+from scipy.fft import rfft, set_workers
 
 from ..config import spectral_config
-from .window_cache import get_hann_window
+from .. import metrics
+from ..threads import fft_workers
+from ..tracing import span
+from .buffer_pool import scratch_buffer
+from .window_cache import apply_window, get_rfft_freqs
 
 if TYPE_CHECKING:
     from .audio_cache import AudioCache
@@ -42,6 +46,16 @@ def analyze_spectrum(
             from .audio_cache import AudioCache
             cache = AudioCache(filepath)
 
+        # Large file: Welch spectra of the streaming pass, one per third of the file
+        if cache.is_streaming():
+            stream = cache.get_stream()
+            frequencies = stream.spectrum.frequencies
+            results = [
+                analyze_power_spectrum(frequencies, power, stream.sample_rate)
+                for power in stream.spectrum.spectra()
+            ]
+            return _combine_sample_results(results)
+
         # Get actual audio data to know real duration (handles partial files)
         full_audio, samplerate = cache.get_full_audio()
         actual_frames = len(full_audio)
@@ -51,16 +65,13 @@ def analyze_spectrum(
         is_partial = cache.is_partial()
         if is_partial:
             logger.warning(
-                f"Working with partial audio data: {actual_frames} frames ({total_duration:.1f}s)"
+                "Working with partial audio data: %s frames (%.1fs)", actual_frames, total_duration
             )
 
         # Take 3 samples: start, middle, end (or just 1 if too short)
         num_samples = 3 if total_duration > 90 else 1
         sample_duration = min(sample_duration, total_duration / num_samples)
 
-        cutoff_freqs = []
-        energy_ratios = []
-
         def _analyze_sample(i: int) -> Tuple[float, float]:
             """Analyze a single sample."""
             # Start position of this sample
@@ -73,71 +84,184 @@ def analyze_spectrum(
             if start_frame + frames_to_read > actual_frames:
                 frames_to_read = max(0, actual_frames - start_frame)
                 if frames_to_read == 0:
-                    logger.warning(f"Sample {i+1} beyond available data, skipping")
+                    logger.warning("Sample %s beyond available data, skipping", i + 1)
                     return 0.0, 0.0
 
             # Extract segment from cached full audio
-            logger.debug(f"⚡ CACHE: Extracting segment {i+1}/{num_samples} from cached audio")
+            logger.debug("⚡ CACHE: Extracting segment %s/%s from cached audio", i + 1, num_samples)
             data = full_audio[start_frame : start_frame + frames_to_read]
 
-            # Convert to mono if stereo
-            if data.shape[1] > 1:
-                data = np.mean(data, axis=1)
-            else:
-                data = data[:, 0]
+            return analyze_sample_spectrum(data, samplerate)
 
-            # Apply Hann window to reduce spectral leakage
-            # PHASE 2 OPTIMIZATION: Use cached window
-            window = get_hann_window(len(data))
-            data_windowed = data * window
+        # PHASE 4 OPTIMIZATION: Parallelize sample analysis
+        # Draw samples sequentially to avoid thread overhead
+        results = [_analyze_sample(i) for i in range(num_samples)]
+        return _combine_sample_results(results)
 
-            # Calculate FFT
-            # PHASE 3 OPTIMIZATION: Use parallel FFT
-            # Limit FFT to 1 worker to avoid thread explosion in multiprocess context
-            with set_workers(1):
-                fft_vals = rfft(data_windowed)
-            fft_freq = rfftfreq(len(data_windowed), 1 / samplerate)
+    except Exception as e:
+        logger.debug("Spectral analysis error: %s", e)
+        return 0, 0, 0
 
-            # Spectral magnitude (in dB)
-            magnitude = np.abs(fft_vals)
-            magnitude_db = 20 * np.log10(magnitude + 1e-10)
 
-            # Detect cutoff frequency (pass samplerate for adaptive detection)
-            cutoff_freq = detect_cutoff(fft_freq, magnitude_db, samplerate)
+def _combine_sample_results(results: List[Tuple[float, float]]) -> Tuple[float, float, float]:
+    """Combine per-sample results into the values used by the scoring system.
 
-            # Calculate high frequency energy ratio (> 16 kHz)
-            energy_ratio = calculate_high_frequency_energy(fft_freq, magnitude)
+    Args:
+        results: List of (cutoff_frequency, energy_ratio) per sample.
 
-            return cutoff_freq, energy_ratio
+    Returns:
+        Tuple (cutoff_frequency, energy_ratio, cutoff_std).
+    """
+    cutoff_freqs = [r[0] for r in results]
+    energy_ratios = [r[1] for r in results]
 
-        # PHASE 4 OPTIMIZATION: Parallelize sample analysis
-        # Draw samples sequentially to avoid thread overhead
-        results = [_analyze_sample(i) for i in range(num_samples)]
-        cutoff_freqs = [r[0] for r in results]
-        energy_ratios = [r[1] for r in results]
+    # Take the WORST value (min) for cutoff to be more strict
+    # A transcoded file will have a low cutoff in ALL samples
+    # We use min() because even one sample with low cutoff indicates transcoding
+    final_cutoff = min(cutoff_freqs)
 
-        # Take the WORST value (min) for cutoff to be more strict
-        # A transcoded file will have a low cutoff in ALL samples
-        # We use min() because even one sample with low cutoff indicates transcoding
-        final_cutoff = min(cutoff_freqs)
+    # For energy, we also take min() to be consistent
+    final_energy = min(energy_ratios)
 
-        # For energy, we also take min() to be consistent
-        final_energy = min(energy_ratios)
+    # Calculate standard deviation of cutoffs to detect variable spectral content
+    # Authentic FLACs often have high variance in cutoff frequency
+    cutoff_std = float(np.std(cutoff_freqs)) if len(cutoff_freqs) > 1 else 0.0
 
-        # Calculate standard deviation of cutoffs to detect variable spectral content
-        # Authentic FLACs often have high variance in cutoff frequency
-        cutoff_std = float(np.std(cutoff_freqs)) if len(cutoff_freqs) > 1 else 0.0
+    logger.info(
+        "Spectrum analysis: cutoff=%.0f Hz, energy_ratio=%.6f, cutoff_std=%.1f, samples=%s",
+        final_cutoff,
+        final_energy,
+        cutoff_std,
+        cutoff_freqs,
+    )
 
-        logger.info(
-            f"Spectrum analysis: cutoff={final_cutoff:.0f} Hz, "
-            f"energy_ratio={final_energy:.6f}, cutoff_std={cutoff_std:.1f}, samples={cutoff_freqs}"
-        )
+    return final_cutoff, final_energy, cutoff_std
 
-        return final_cutoff, final_energy, cutoff_std
 
-    except Exception as e:
-        logger.debug(f"Spectral analysis error: {e}")
-        return 0, 0, 0
+def windowed_spectrum(
+    data: np.ndarray, samplerate: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Computes the Hann-windowed magnitude spectrum of audio samples.
+
+    The mono mix, windowed samples and magnitudes are computed in place in the
+    thread's scratch buffers: the returned magnitudes are overwritten by the
+    next call in the same thread.
+
+    Args:
+        data: Audio samples, shape (frames, channels) or mono.
+        samplerate: Sample rate in Hz.
+
+    Returns:
+        Tuple (frequencies, magnitude, magnitude_db).
+    """
+    # Convert to mono and apply Hann window to reduce spectral leakage
+    # PHASE 2 OPTIMIZATION: Use cached window (into a reused scratch buffer)
+    data_windowed = apply_window(data)
+
+    # Calculate FFT
+    # PHASE 3 OPTIMIZATION: Use parallel FFT
+    # Within the process thread budget, to avoid thread explosion in multiprocess context
+    with set_workers(fft_workers()):
+        fft_vals = rfft(data_windowed, overwrite_x=True)
+    fft_freq = get_rfft_freqs(len(data_windowed), samplerate)
+
+    # Spectral magnitude (in dB)
+    magnitude = np.abs(fft_vals, out=scratch_buffer(len(fft_vals), "magnitude"))
+    magnitude_db = np.add(magnitude, 1e-10, out=scratch_buffer(len(fft_vals), "magnitude_db"))
+    np.log10(magnitude_db, out=magnitude_db)
+    magnitude_db *= 20
+
+    return fft_freq, magnitude, magnitude_db
+
+
+def analyze_sample_spectrum(data: np.ndarray, samplerate: int) -> Tuple[float, float]:
+    """Measures cutoff frequency and high-frequency energy of one audio sample.
+
+    Args:
+        data: Audio samples, shape (frames, channels).
+        samplerate: Sample rate in Hz.
+
+    Returns:
+        Tuple (cutoff_frequency, energy_ratio).
+    """
+    fft_freq, magnitude, magnitude_db = windowed_spectrum(data, samplerate)
+
+    # Detect cutoff frequency (pass samplerate for adaptive detection)
+    cutoff_freq = detect_cutoff(fft_freq, magnitude_db, samplerate)
+
+    # Calculate high frequency energy ratio (> 16 kHz)
+    energy_ratio = calculate_high_frequency_energy(fft_freq, magnitude)
+
+    return cutoff_freq, energy_ratio
+
+
+def analyze_power_spectrum(
+    frequencies: np.ndarray, power: np.ndarray, samplerate: int
+) -> Tuple[float, float]:
+    """Measures cutoff frequency and high-frequency energy of an averaged power spectrum.
+
+    The counterpart of ``analyze_sample_spectrum`` for Welch spectra (large
+    files analyzed in one streaming pass).
+
+    Args:
+        frequencies: Bin frequencies.
+        power: Average squared magnitude per bin.
+        samplerate: Sample rate in Hz.
+
+    Returns:
+        Tuple (cutoff_frequency, energy_ratio).
+    """
+    magnitude = np.sqrt(power)
+    magnitude_db = 20 * np.log10(magnitude + 1e-10)
+    cutoff_freq = detect_cutoff(frequencies, magnitude_db, samplerate)
+    energy_ratio = calculate_high_frequency_energy(frequencies, magnitude)
+    return cutoff_freq, energy_ratio
+
+
+def analyze_spectrum_excerpts(
+    filepath: Path, positions: Tuple[float, ...] = (0.25, 0.5, 0.75), excerpt_duration: float = 4.0
+) -> Tuple[float, float, float]:
+    """Analyzes the spectrum of a few short excerpts without decoding the whole file.
+
+    Used by the triage stage: each excerpt is decoded after a seek, so the cost
+    does not depend on the track length.
+
+    Args:
+        filepath: Path to the audio file.
+        positions: Relative positions (0-1) of the excerpt centers.
+        excerpt_duration: Duration of each excerpt in seconds.
+
+    Returns:
+        Tuple (cutoff_frequency, energy_ratio, cutoff_std).
+
+    Raises:
+        RuntimeError: If no excerpt could be decoded.
+    """
+    results = []
+    with sf.SoundFile(str(filepath), "r") as f:
+        samplerate = f.samplerate
+        total_frames = f.frames
+        frames_to_read = min(int(excerpt_duration * samplerate), total_frames)
+
+        # Short files: a single excerpt covers most of the file
+        if total_frames <= frames_to_read * len(positions):
+            positions = (0.5,)
+
+        for position in positions:
+            start_frame = int(total_frames * position) - frames_to_read // 2
+            start_frame = max(0, min(start_frame, total_frames - frames_to_read))
+            with span("spectrum_excerpt", position=position):
+                f.seek(start_frame)
+                data = f.read(frames_to_read, always_2d=True)
+                if len(data) == 0:
+                    continue
+                metrics.inc("decoded_bytes_total", data.nbytes)
+                results.append(analyze_sample_spectrum(data, samplerate))
+
+    if not results:
+        raise RuntimeError(f"No audio excerpt could be decoded from {filepath.name}")
+
+    return _combine_sample_results(results)
 
 
 def detect_cutoff(
@@ -177,18 +301,21 @@ def detect_cutoff(
         cutoff_scan_start = int(spectral_config.CUTOFF_SCAN_START * scale_factor)
 
     # Focus on frequencies > reference_freq_low
-    high_freq_mask = frequencies > reference_freq_low
-    if not np.any(high_freq_mask):
+    # (frequencies are ascending: bands are slices, located by binary search)
+    high_start = np.searchsorted(frequencies, reference_freq_low, side="right")
+    if high_start == len(frequencies):
         return float(frequencies[-1])
 
-    freq_high = frequencies[high_freq_mask]
-    mag_high = magnitude_db[high_freq_mask]
+    freq_high = frequencies[high_start:]
+    mag_high = magnitude_db[high_start:]
 
     # Aggressive smoothing to ignore temporal variations
     if len(mag_high) > 100:
         from scipy.ndimage import uniform_filter1d
 
-        mag_smooth = uniform_filter1d(mag_high, size=100)
+        mag_smooth = uniform_filter1d(
+            mag_high, size=100, output=scratch_buffer(len(mag_high), "smooth")
+        )
     else:
         mag_smooth = mag_high
 
@@ -197,9 +324,9 @@ def detect_cutoff(
     freq_max = freq_high[-1]
 
     # Calculate reference (median energy between reference_freq_low-reference_freq_high)
-    ref_mask = (freq_high >= reference_freq_low) & (freq_high <= reference_freq_high)
-    if np.any(ref_mask):
-        reference_energy = np.percentile(mag_smooth[ref_mask], 50)
+    ref_end = np.searchsorted(freq_high, reference_freq_high, side="right")
+    if ref_end > 0:
+        reference_energy = np.percentile(mag_smooth[:ref_end], 50)
     else:
         reference_energy = np.max(mag_smooth)
 
@@ -211,11 +338,13 @@ def detect_cutoff(
     consecutive_low = 0
 
     while current_freq < freq_max:
-        tranche_mask = (freq_high >= current_freq) & (freq_high < current_freq + tranche_size_hz)
+        tranche_start, tranche_end = np.searchsorted(
+            freq_high, (current_freq, current_freq + tranche_size_hz)
+        )
 
-        if np.any(tranche_mask):
+        if tranche_end > tranche_start:
             # Look at 75th percentile to ensure no peaks
-            tranche_energy = np.percentile(mag_smooth[tranche_mask], 75)
+            tranche_energy = np.percentile(mag_smooth[tranche_start:tranche_end], 75)
 
             # If this slice is very low
             if tranche_energy < cutoff_threshold:
@@ -226,8 +355,9 @@ def detect_cutoff(
                     # Return start of drop
                     detected_cutoff = current_freq - (tranche_size_hz * (consecutive_low - 1))
                     logger.debug(
-                        f"Cutoff detected at {detected_cutoff:.0f} Hz "
-                        f"({consecutive_low} consecutive low slices)"
+                        "Cutoff detected at %.0f Hz (%s consecutive low slices)",
+                        detected_cutoff,
+                        consecutive_low,
                     )
                     return detected_cutoff
             else:
@@ -237,13 +367,17 @@ def detect_cutoff(
 
     # No cutoff detected with slice method -> try energy-based fallback
     # This catches MP3 upscales that have noise in high frequencies
-    logger.debug(f"No cutoff detected with slice method, trying energy-based detection")
+    logger.debug("No cutoff detected with slice method, trying energy-based detection")
 
     # Energy-based detection: find where 90% of cumulative energy is reached
     # Convert dB back to linear magnitude: magnitude = 10^(magnitude_db/20)
-    magnitude_linear = 10 ** (magnitude_db / 20.0)
-    energy = magnitude_linear**2  # Energy is square of linear magnitude
-    cumulative_energy = np.cumsum(energy)
+    # (in place, in a scratch buffer)
+    cumulative_energy = np.divide(
+        magnitude_db, 20.0, out=scratch_buffer(len(magnitude_db), "energy")
+    )
+    np.power(10.0, cumulative_energy, out=cumulative_energy)
+    np.square(cumulative_energy, out=cumulative_energy)  # Energy is square of linear magnitude
+    np.cumsum(cumulative_energy, out=cumulative_energy)
     total_energy = cumulative_energy[-1]
 
     if total_energy > 0:
@@ -258,16 +392,16 @@ def detect_cutoff(
             # Very low cutoffs (< 10kHz) are usually just bass concentration, not transcoding
             if 15000 < energy_cutoff < nyquist_freq * 0.95:  # Realistic MP3 range
                 logger.debug(
-                    f"Energy-based cutoff detected at {energy_cutoff:.0f} Hz (90% energy threshold)"
+                    "Energy-based cutoff detected at %.0f Hz (90%% energy threshold)", energy_cutoff
                 )
                 return float(energy_cutoff)
             elif energy_cutoff < 15000:
-                logger.debug(f"Energy concentration at {energy_cutoff:.0f} Hz (bass, not cutoff)")
+                logger.debug("Energy concentration at %.0f Hz (bass, not cutoff)", energy_cutoff)
                 # Bass concentration but no MP3 cutoff signature - likely authentic
                 return float(freq_max)
 
     # If energy-based also didn't find anything suspicious, truly authentic
-    logger.debug(f"No cutoff detected, full spectrum up to {freq_max:.0f} Hz")
+    logger.debug("No cutoff detected, full spectrum up to %.0f Hz", freq_max)
     return float(freq_max)
 
 
@@ -283,17 +417,18 @@ def calculate_high_frequency_energy(frequencies: np.ndarray, magnitude: np.ndarr
     Returns:
         Average energy ratio in high frequencies.
     """
-    high_freq_idx = frequencies > spectral_config.HIGH_FREQ_THRESHOLD
-    if not np.any(high_freq_idx):
+    if frequencies[-1] <= spectral_config.HIGH_FREQ_THRESHOLD:
         return 0.0
 
-    # Analysis by 1 kHz slices
+    energy = np.square(magnitude, out=scratch_buffer(len(magnitude), "energy"))
+    total_energy = float(np.sum(energy))
+
+    # Analysis by 1 kHz slices (frequencies are ascending)
     tranche_energies: list[float] = []
     for f_start in range(spectral_config.HIGH_FREQ_THRESHOLD, int(frequencies[-1]), 1000):
-        f_mask = (frequencies >= f_start) & (frequencies < f_start + 1000)
-        if np.any(f_mask):
-            tranche_energy = float(np.sum(magnitude[f_mask] ** 2))
-            total_energy = float(np.sum(magnitude**2))
+        start, end = np.searchsorted(frequencies, (f_start, f_start + 1000))
+        if end > start:
+            tranche_energy = float(np.sum(energy[start:end]))
             tranche_energies.append(tranche_energy / total_energy if total_energy > 0 else 0.0)
 
     # A real FLAC has energy in ALL slices
@@ -348,38 +483,19 @@ def analyze_segment_consistency(
 
             try:
                 # OPTIMIZATION: Use cache instead of direct sf.read
-                logger.debug(f"⚡ CACHE: Reading segment at {center_ratio*100:.0f}% via cache")
+                logger.debug("⚡ CACHE: Reading segment at %.0f%% via cache", center_ratio * 100)
                 data, _ = cache.get_segment(start_frame, frames_to_read)
 
                 if len(data) < frames_to_read and len(data) == 0:
                     return 0.0
 
-                # Convert to mono
-                if data.shape[1] > 1:
-                    data = np.mean(data, axis=1)
-                else:
-                    data = data[:, 0]
-
-                # Windowing
-                # PHASE 2 OPTIMIZATION: Use cached window
-                window = get_hann_window(len(data))
-                data_windowed = data * window
-
-                # FFT
-                # PHASE 3 OPTIMIZATION: Use parallel FFT
-                # Limit FFT to 1 worker
-                with set_workers(1):
-                    fft_vals = rfft(data_windowed)
-                fft_freq = rfftfreq(len(data_windowed), 1 / samplerate)
-
-                magnitude = np.abs(fft_vals)
-                magnitude_db = 20 * np.log10(magnitude + 1e-10)
+                fft_freq, _, magnitude_db = windowed_spectrum(data, samplerate)
 
                 cutoff = detect_cutoff(fft_freq, magnitude_db)
                 return cutoff
 
             except Exception as e:
-                logger.warning(f"Error analyzing segment at {center_ratio*100:.0f}%: {e}")
+                logger.warning("Error analyzing segment at %.0f%%: %s", center_ratio * 100, e)
                 return 0.0
 
         # PHASE 1: Analyze Start + End (2 segments)
@@ -399,7 +515,10 @@ def analyze_segment_consistency(
         variance = float(np.std(valid_cutoffs))
 
         logger.debug(
-            f"OPTIMIZATION R10: Phase 1 - Start={cutoffs[0]:.0f} Hz, End={cutoffs[1]:.0f} Hz, Variance={variance:.1f} Hz"
+            "OPTIMIZATION R10: Phase 1 - Start=%.0f Hz, End=%.0f Hz, Variance=%.1f Hz",
+            cutoffs[0],
+            cutoffs[1],
+            variance,
         )
 
         # PHASE 2: Progressive decision
@@ -407,7 +526,8 @@ def analyze_segment_consistency(
             # If variance < 500 Hz, segments are coherent -> STOP
             if variance < 500:
                 logger.info(
-                    f"⚡ OPTIMIZATION R10: Early stop - Coherent segments (variance {variance:.1f} < 500 Hz)"
+                    "⚡ OPTIMIZATION R10: Early stop - Coherent segments (variance %.1f < 500 Hz)",
+                    variance,
                 )
                 # Return only 2 segments (optimization)
                 return cutoffs, variance
@@ -415,13 +535,14 @@ def analyze_segment_consistency(
             # If variance > 1000 Hz, already know it's dynamic -> STOP
             if variance > 1000:
                 logger.info(
-                    f"⚡ OPTIMIZATION R10: Early stop - High variance detected ({variance:.1f} > 1000 Hz)"
+                    "⚡ OPTIMIZATION R10: Early stop - High variance detected (%.1f > 1000 Hz)",
+                    variance,
                 )
                 return cutoffs, variance
 
             # Otherwise (500 <= variance <= 1000), need more data
             logger.info(
-                f"OPTIMIZATION R10: Expanding to 5 segments (variance {variance:.1f} in grey zone)"
+                "OPTIMIZATION R10: Expanding to 5 segments (variance %.1f in grey zone)", variance
             )
 
         # PHASE 3: Analyze middle segments (25%, 50%, 75%)
@@ -443,11 +564,11 @@ def analyze_segment_consistency(
             variance = 0.0
 
         logger.debug(
-            f"OPTIMIZATION R10: Phase 3 - All 5 segments analyzed, final variance={variance:.1f} Hz"
+            "OPTIMIZATION R10: Phase 3 - All 5 segments analyzed, final variance=%.1f Hz", variance
         )
 
         return cutoffs, variance
 
     except Exception as e:
-        logger.error(f"Segment consistency analysis failed: {e}")
+        logger.error("Segment consistency analysis failed: %s", e)
         return [], 0.0
@@ -0,0 +1,623 @@
+"""Single-pass analysis of long files with bounded memory.
+
+Hour-long DJ mixes, concerts and audiobooks are too large to decode whole
+(see ``LARGE_FILE_MB``). In the "stream" large-file mode the file is read
+once, block by block, and each block updates online accumulators:
+
+- ``SpectrumAccumulator``: a running Welch PSD per third of the file, for the
+  cutoff frequency and the high-frequency energy.
+- ``LevelAccumulator``: clipping and DC offset counters and the
+  leading/trailing silence of the quality detectors.
+- ``SilenceAccumulator``: the silent runs of Rule 7 and the high-frequency
+  band energies of its silences and music reference.
+- ``TransientAccumulator``: a reservoir of transient candidates, with their
+  pre-echo energies, for Rule 9A.
+- ``ClickAccumulator``: the vinyl click count of Rule 7 (Phase 3).
+- ``HeadAccumulator``: the first seconds of audio, for the analyses that only
+  look at the start of a file (Rule 9B/9C, vinyl noise texture).
+
+Memory use depends on the block size, not on the duration of the file. The
+results are estimates of the in-memory analyses, computed with the same
+thresholds, for the same decisions.
+"""
+
+import logging
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+import soundfile as sf
+from scipy import signal
+from scipy.fft import rfft, set_workers
+
+from .. import metrics
+from ..config import analysis_config
+from ..streaminfo import read_streaminfo
+from ..threads import fft_workers
+from .audio_md5 import AudioMD5
+from .new_scoring.audio_loader import sf_blocks
+from .window_cache import get_butter_sos, get_hann_window, get_rfft_freqs
+
+logger = logging.getLogger(__name__)
+
+# Frames per block read from the file
+STREAM_BLOCKSIZE = 65536
+
+# Welch segment at 44.1/48 kHz (scaled with the sample rate, ~2.7 Hz bins)
+WELCH_SEGMENT = 16384
+
+# Spectrum regions (start, middle and end thirds, like the in-memory samples)
+SPECTRUM_REGIONS = 3
+
+# Audio kept from the start of the file (seconds)
+HEAD_SECONDS = 30.0
+
+# Transient candidates kept for Rule 9A
+RESERVOIR_SIZE = 1024
+
+
+class Reservoir:
+    """Uniform random sample of a stream of items (Algorithm R)."""
+
+    def __init__(self, size: int, seed: int = 0):
+        """Initialize the reservoir.
+
+        Args:
+            size: Number of items kept.
+            seed: Random seed (results are reproducible).
+        """
+        self.size = size
+        self.items: list = []
+        self.seen = 0
+        self._rng = np.random.default_rng(seed)
+
+    def offer(self, item):
+        """Offer one item of the stream."""
+        self.seen += 1
+        if len(self.items) < self.size:
+            self.items.append(item)
+        else:
+            index = int(self._rng.integers(self.seen))
+            if index < self.size:
+                self.items[index] = item
+
+
+class LogHistogram:
+    """Counts of positive values in log-spaced bins, for whole-file medians.
+
+    The median of every sample of a file is only known at the end; the
+    histogram gives it to the bin resolution (0.23% at 1000 bins per decade)
+    in constant memory. Values below the floor count in the first bin.
+    """
+
+    BINS_PER_DECADE = 1000
+
+    def __init__(self, log_floor: float, log_ceiling: float):
+        """Initialize the histogram.
+
+        Args:
+            log_floor: log10 of the smallest value told apart.
+            log_ceiling: log10 of the largest value told apart.
+        """
+        self.log_floor = log_floor
+        self.size = int((log_ceiling - log_floor) * self.BINS_PER_DECADE)
+        self.counts = np.zeros(self.size, dtype=np.int64)
+
+    def bins(self, values: np.ndarray) -> np.ndarray:
+        """Bin indices of values."""
+        log = np.log10(np.maximum(values, 10 ** (self.log_floor - 2)))
+        bins = ((log - self.log_floor) * self.BINS_PER_DECADE).astype(np.int64)
+        return np.clip(bins, 0, self.size - 1)
+
+    def add(self, values: np.ndarray):
+        """Count values."""
+        self.counts += np.bincount(self.bins(values), minlength=self.size)
+
+    def median(self) -> Optional[float]:
+        """Median of the counted values (bin center), None if there are none."""
+        total = int(self.counts.sum())
+        if not total:
+            return None
+        median_bin = int(np.searchsorted(np.cumsum(self.counts), (total + 1) // 2))
+        return 10 ** (self.log_floor + (median_bin + 0.5) / self.BINS_PER_DECADE)
+
+
+class StreamAccumulator(ABC):
+    """Analysis updated block by block."""
+
+    @abstractmethod
+    def update(self, block: np.ndarray, mono: np.ndarray, start: int):
+        """Update with one block.
+
+        Args:
+            block: Samples, shape (frames, channels).
+            mono: Mono mix of the block.
+            start: Index of the block's first frame in the file.
+        """
+
+    def finish(self, frames: int):
+        """Complete the analysis after the last block.
+
+        Args:
+            frames: Frames read from the file.
+        """
+
+
+class _BandEnergy:
+    """Average band energy of consecutive Hann-windowed frames.
+
+    Frames are cut from the fed samples (the remainder is carried over to
+    the next call). Each frame's energy is computed as in
+    ``silence.calculate_spectral_energy``.
+    """
+
+    def __init__(self, frame: int, sample_rate: int, band: Tuple[int, int]):
+        self.frame = frame
+        freqs = get_rfft_freqs(frame, sample_rate)
+        self._band = slice(*np.searchsorted(freqs, band))
+        self._carry = np.empty(0)
+        self.total = 0.0
+        self.count = 0
+
+    def feed(self, samples: np.ndarray):
+        data = np.concatenate((self._carry, samples)) if len(self._carry) else samples
+        frames = len(data) // self.frame
+        if frames:
+            windowed = data[: frames * self.frame].reshape(frames, self.frame)
+            windowed = windowed * get_hann_window(self.frame)
+            with set_workers(fft_workers()):
+                spectra = rfft(windowed, axis=1)[:, self._band]
+            energy = np.square(np.abs(spectra)).sum(axis=1) / self.frame
+            self.total += float(energy.sum())
+            self.count += frames
+        self._carry = data[frames * self.frame :].copy()
+
+    def reset(self):
+        """Drop the carried samples and the energies."""
+        self._carry = np.empty(0)
+        self.total = 0.0
+        self.count = 0
+
+    def energy(self, samples: int) -> float:
+        """Band energy of ``samples`` samples, as one long windowed FFT would measure it.
+
+        ``calculate_spectral_energy`` normalizes by the segment length, which
+        leaves an energy proportional to it: the average frame energy is
+        scaled by the number of frames the samples span.
+        """
+        if not self.count:
+            return 0.0
+        return self.total / self.count * samples / self.frame
+
+
+class SpectrumAccumulator(StreamAccumulator):
+    """Running Welch power spectrum of each third of the file."""
+
+    def __init__(self, sample_rate: int, total_frames: int, regions: int = SPECTRUM_REGIONS):
+        """Initialize the accumulator.
+
+        Args:
+            sample_rate: Sample rate in Hz.
+            total_frames: Frames of the file (to locate the regions).
+            regions: Number of regions with their own spectrum.
+        """
+        self.sample_rate = sample_rate
+        self.total_frames = max(1, total_frames)
+        self.regions = regions
+        self.nperseg = WELCH_SEGMENT * max(1, sample_rate // 44100)
+        self.hop = self.nperseg // 2
+        self.power = np.zeros((regions, self.nperseg // 2 + 1))
+        self.segments = np.zeros(regions, dtype=np.int64)
+        self._carry = np.empty(0)
+        self._carry_start = 0
+
+    def update(self, block: np.ndarray, mono: np.ndarray, start: int):
+        data = np.concatenate((self._carry, mono)) if len(self._carry) else mono
+        count = (len(data) - self.nperseg) // self.hop + 1 if len(data) >= self.nperseg else 0
+        if count:
+            segments = np.lib.stride_tricks.sliding_window_view(data, self.nperseg)
+            windowed = segments[:: self.hop][:count] * get_hann_window(self.nperseg)
+            with set_workers(fft_workers()):
+                spectra = rfft(windowed, axis=1, overwrite_x=True)
+            starts = self._carry_start + self.hop * np.arange(count)
+            region = np.minimum(starts * self.regions // self.total_frames, self.regions - 1)
+            np.add.at(self.power, region, np.square(np.abs(spectra)))
+            np.add.at(self.segments, region, 1)
+        consumed = count * self.hop
+        self._carry = data[consumed:].copy()
+        self._carry_start += consumed
+
+    @property
+    def frequencies(self) -> np.ndarray:
+        """Bin frequencies of the spectra."""
+        return get_rfft_freqs(self.nperseg, self.sample_rate)
+
+    def spectra(self) -> List[np.ndarray]:
+        """Average power spectrum of each region with data."""
+        return [
+            self.power[index] / self.segments[index]
+            for index in range(self.regions)
+            if self.segments[index]
+        ]
+
+    def band_mean_square(self, sos: np.ndarray) -> float:
+        """Mean square of the signal filtered by ``sos``, over the whole file.
+
+        The averaged spectrum is weighted by the filter's power response, so
+        the result matches ``sosfilt`` applied to the decoded audio.
+        """
+        segments = int(self.segments.sum())
+        if not segments:
+            return 0.0
+        power = self.power.sum(axis=0) / segments
+        _, response = signal.sosfreqz(sos, worN=self.frequencies, fs=self.sample_rate)
+        window_power = float(np.sum(np.square(get_hann_window(self.nperseg))))
+        # One-sided PSD integrated over the filter's passband
+        weighted = float(np.sum(power * np.square(np.abs(response))))
+        return 2.0 * weighted / (self.nperseg * window_power)
+
+
+class LevelAccumulator(StreamAccumulator):
+    """Clipping and DC offset counters, and leading/trailing silence."""
+
+    def __init__(self, clip_threshold: float = 0.99, silence_threshold_db: float = -60.0):
+        """Initialize the accumulator.
+
+        Args:
+            clip_threshold: Level of a clipped sample.
+            silence_threshold_db: Level of silence (mean of the channels' levels).
+        """
+        self.clip_threshold = clip_threshold
+        self.silence_threshold = 10 ** (silence_threshold_db / 20)
+        self.samples = 0
+        self.clipped_samples = 0
+        self.sample_sum = 0.0
+        self.first_sound: Optional[int] = None
+        self.last_sound: Optional[int] = None
+
+    def update(self, block: np.ndarray, mono: np.ndarray, start: int):
+        self.samples += block.size
+        self.sample_sum += float(np.sum(block))
+        level = np.abs(block)
+        self.clipped_samples += int(np.count_nonzero(level >= self.clip_threshold))
+        sound = np.flatnonzero(np.mean(level, axis=1) > self.silence_threshold)
+        if sound.size:
+            if self.first_sound is None:
+                self.first_sound = start + int(sound[0])
+            self.last_sound = start + int(sound[-1])
+
+
+class SilenceAccumulator(StreamAccumulator):
+    """Silent runs and high-frequency band energies for Rule 7.
+
+    Follows ``silence.analyze_silence_ratio``: runs of samples below
+    ``threshold_db`` lasting ``min_duration`` or more are silences, and the
+    music reference is 10 s to 40 s into the file. Only the runs that may
+    reach ``min_duration`` are looked at sample by sample.
+    """
+
+    FRAME = 4096
+    BAND = (16000, 22000)
+    MUSIC_START = 10.0
+    MUSIC_END = 40.0
+
+    def __init__(self, sample_rate: int, threshold_db: float = -40.0, min_duration: float = 0.5):
+        """Initialize the accumulator.
+
+        Args:
+            sample_rate: Sample rate in Hz.
+            threshold_db: Silence threshold in dB (relative to full scale).
+            min_duration: Minimum duration of a silence in seconds.
+        """
+        self.sample_rate = sample_rate
+        self.threshold = 10 ** (threshold_db / 20)
+        self.min_samples = int(min_duration * sample_rate)
+        self.music_range = (int(self.MUSIC_START * sample_rate), int(self.MUSIC_END * sample_rate))
+        self.runs = 0
+        self.silence_samples = 0
+        self.music_samples = 0
+        self._silence = _BandEnergy(self.FRAME, sample_rate, self.BAND)
+        self._music = _BandEnergy(self.FRAME, sample_rate, self.BAND)
+        # Current run (open at the end of the previous block)
+        self._run = _BandEnergy(self.FRAME, sample_rate, self.BAND)
+        self._run_length = 0
+
+    def update(self, block: np.ndarray, mono: np.ndarray, start: int):
+        music_start = max(self.music_range[0] - start, 0)
+        music_end = min(self.music_range[1] - start, len(mono))
+        if music_end > music_start:
+            self._music.feed(mono[music_start:music_end])
+            self.music_samples += music_end - music_start
+
+        silent = np.abs(mono) < self.threshold
+        edges = np.diff(silent.view(np.int8), prepend=0, append=0)
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        if self._run_length and not (starts.size and starts[0] == 0):
+            self._close_run()
+
+        # Runs that continue one from the previous block, may continue in the
+        # next one, or are long enough by themselves
+        relevant = (ends - starts >= self.min_samples) | (ends == len(mono)) | (starts == 0)
+        for run_start, run_end in zip(starts[relevant], ends[relevant]):
+            if run_start > 0 or not self._run_length:
+                self._run.reset()
+            self._run.feed(mono[run_start:run_end])
+            self._run_length += run_end - run_start
+            if run_end < len(mono):
+                self._close_run()
+
+    def _close_run(self):
+        if self._run_length >= self.min_samples:
+            self.runs += 1
+            self.silence_samples += self._run_length
+            self._silence.total += self._run.total
+            self._silence.count += self._run.count
+        self._run.reset()
+        self._run_length = 0
+
+    def finish(self, frames: int):
+        self._close_run()
+
+    @property
+    def silence_energy(self) -> float:
+        """Band energy of the silences (see ``silence.calculate_spectral_energy``)."""
+        return self._silence.energy(self.silence_samples)
+
+    @property
+    def music_energy(self) -> float:
+        """Band energy of the music reference."""
+        return self._music.energy(self.music_samples)
+
+
+class TransientAccumulator(StreamAccumulator):
+    """Reservoir of transient candidates for the pre-echo test (Rule 9A).
+
+    Follows ``artifacts.detect_preecho_artifacts`` over the whole file: the
+    transients are envelope peaks within ``threshold_db`` of the peak level,
+    and a transient has pre-echo when the 10-20 kHz energy 20 to 10 ms before
+    it exceeds three times the median 10-20 kHz energy of every sample (a
+    log-spaced histogram, not a median of per-block medians, which drifts
+    far from it when silent and loud passages alternate). The peak level is
+    only known at the end, so candidates are kept against the running one
+    (never above it) and filtered when finishing.
+    """
+
+    def __init__(self, sample_rate: int, threshold_db: float = -3.0, seed: int = 0):
+        """Initialize the accumulator.
+
+        Args:
+            sample_rate: Sample rate in Hz.
+            threshold_db: Transient level relative to the peak level.
+            seed: Random seed of the reservoirs.
+        """
+        self.sample_rate = sample_rate
+        self.threshold = 10 ** (threshold_db / 20.0)
+        self.pre_window = int(0.020 * sample_rate)
+        self.post_window = int(0.010 * sample_rate)
+        self.distance = max(1, int(0.05 * sample_rate))
+        self.smooth = int(0.001 * sample_rate) | 1
+        self.peak_level = 0.0
+        self.candidates = Reservoir(RESERVOIR_SIZE, seed)
+        # 10-20 kHz energies, down to far below the 24-bit quantization step
+        self._energies = LogHistogram(-30.0, 1.0)
+
+        nyquist = sample_rate / 2
+        self.enabled = nyquist >= 10000
+        if self.enabled:
+            self._sos = get_butter_sos(
+                4, (10000, min(20000, nyquist - 100)), "bandpass", sample_rate
+            )
+            self._zi = np.zeros((self._sos.shape[0], 2))
+            # End of the previous block's filtered signal (pre-echo windows)
+            self._tail = np.zeros(self.pre_window)
+
+    def update(self, block: np.ndarray, mono: np.ndarray, start: int):
+        self.peak_level = max(self.peak_level, float(np.max(np.abs(mono))))
+        envelope = signal.medfilt(np.abs(signal.hilbert(mono)), self.smooth)
+        peaks, _ = signal.find_peaks(
+            envelope, height=self.threshold * self.peak_level, distance=self.distance
+        )
+
+        if not self.enabled:
+            for peak in peaks:
+                self.candidates.offer((float(envelope[peak]), None))
+            return
+
+        hf, self._zi = signal.sosfilt(self._sos, mono, zi=self._zi)
+        hf_energy = np.square(hf)
+        self._energies.add(hf_energy)
+        extended = np.concatenate((np.square(self._tail), hf_energy))
+        for peak in peaks:
+            pre_energy = None
+            if start + peak >= self.pre_window + self.post_window:
+                offset = peak + len(self._tail)
+                pre_energy = float(
+                    np.mean(extended[offset - self.pre_window : offset - self.post_window])
+                )
+            self.candidates.offer((float(envelope[peak]), pre_energy))
+        self._tail = np.concatenate((self._tail, hf))[-self.pre_window :]
+
+    def result(self) -> Tuple[float, int, int]:
+        """Pre-echo estimate, as ``detect_preecho_artifacts`` returns it.
+
+        Returns:
+            Tuple of (percentage_affected, num_transients, num_with_preecho)
+        """
+        items = self.candidates.items
+        height = self.threshold * self.peak_level
+        transients = [pre_energy for level, pre_energy in items if level >= height]
+        if not transients:
+            return 0.0, 0, 0
+        num_transients = round(self.candidates.seen * len(transients) / len(items))
+        if not self.enabled:
+            return 0.0, num_transients, 0
+
+        baseline = self._energies.median() or 0.0
+        affected = sum(1 for e in transients if e is not None and e > baseline * 3)
+        percentage = affected / len(transients) * 100
+        return percentage, num_transients, round(num_transients * affected / len(transients))
+
+
+class ClickAccumulator(StreamAccumulator):
+    """Vinyl click count (Rule 7, Phase 3), as ``silence_utils.detect_transients``.
+
+    Clicks are peaks of the 1 kHz high-passed envelope, 10 ms apart, above
+    three times its median. The median of the whole file is only known at
+    the end, so the envelope levels and the peak heights go into log-spaced
+    histograms and the peaks are counted against the threshold in
+    ``finish``. Peaks below the threshold never suppress higher ones, so
+    the count is the one over the decoded file, to the bin resolution.
+    """
+
+    def __init__(self, sample_rate: int):
+        """Initialize the accumulator.
+
+        Args:
+            sample_rate: Sample rate in Hz.
+        """
+        self.sample_rate = sample_rate
+        self.smooth = int(0.0005 * sample_rate) | 1
+        self.distance = max(1, int(0.01 * sample_rate))
+        self.levels = LogHistogram(-10.0, 1.0)
+        self.peaks = LogHistogram(-10.0, 1.0)
+        self.clicks = 0
+        self.duration = 0.0
+        self._sos = get_butter_sos(4, 1000, "highpass", sample_rate)
+        self._zi = np.zeros((self._sos.shape[0], 2))
+
+    def update(self, block: np.ndarray, mono: np.ndarray, start: int):
+        filtered, self._zi = signal.sosfilt(self._sos, mono, zi=self._zi)
+        envelope = np.abs(signal.hilbert(filtered))
+        if self.smooth >= 3:
+            envelope = signal.medfilt(envelope, self.smooth)
+        peaks, _ = signal.find_peaks(envelope, distance=self.distance)
+        self.levels.add(envelope)
+        self.peaks.add(envelope[peaks])
+
+    def finish(self, frames: int):
+        self.duration = frames / self.sample_rate
+        median = self.levels.median()
+        if median is None:
+            return
+        threshold_bin = int(self.peaks.bins(np.array([median * 3]))[0])
+        self.clicks = int(self.peaks.counts[threshold_bin + 1 :].sum())
+
+    def result(self) -> Tuple[int, float]:
+        """Click count, as ``detect_transients`` returns it.
+
+        Returns:
+            Tuple of (num_clicks, clicks_per_minute)
+        """
+        if self.duration < 10:
+            return 0, 0.0
+        return self.clicks, self.clicks / self.duration * 60
+
+
+class HeadAccumulator(StreamAccumulator):
+    """First seconds of the file, kept as decoded."""
+
+    def __init__(self, frames: int, channels: int):
+        """Initialize the accumulator.
+
+        Args:
+            frames: Frames to keep.
+            channels: Channels of the file.
+        """
+        self.data = np.empty((frames, channels))
+        self.frames = 0
+
+    def update(self, block: np.ndarray, mono: np.ndarray, start: int):
+        count = min(len(block), len(self.data) - start)
+        if count > 0:
+            self.data[start : start + count] = block[:count]
+            self.frames = start + count
+
+    @property
+    def audio(self) -> np.ndarray:
+        """The kept samples, shape (frames, channels)."""
+        return self.data[: self.frames]
+
+
+class StreamAnalysis:
+    """Results of the single pass over a file."""
+
+    def __init__(self, sample_rate: int, total_frames: int, channels: int):
+        """Set up the accumulators for a file.
+
+        Args:
+            sample_rate: Sample rate in Hz.
+            total_frames: Frames of the file, from its stream info.
+            channels: Channels of the file.
+        """
+        self.sample_rate = sample_rate
+        self.total_frames = total_frames
+        self.frames = 0
+        self.md5: Optional[bytes] = None  # STREAMINFO MD5 of the audio read (VERIFY_MD5)
+        self.spectrum = SpectrumAccumulator(sample_rate, total_frames)
+        self.levels = LevelAccumulator()
+        self.silence = SilenceAccumulator(sample_rate)
+        self.transients = TransientAccumulator(sample_rate)
+        self.clicks = ClickAccumulator(sample_rate)
+        self.head = HeadAccumulator(min(total_frames, int(HEAD_SECONDS * sample_rate)), channels)
+        self.accumulators: List[StreamAccumulator] = [
+            self.spectrum,
+            self.levels,
+            self.silence,
+            self.transients,
+            self.clicks,
+            self.head,
+        ]
+
+    @property
+    def duration(self) -> float:
+        """Duration read, in seconds."""
+        return self.frames / self.sample_rate
+
+    @property
+    def complete(self) -> bool:
+        """Whether the whole file was read."""
+        return self.frames >= self.total_frames
+
+
+def analyze_stream(filepath: Path, blocksize: int = STREAM_BLOCKSIZE) -> StreamAnalysis:
+    """Read a file once, block by block, updating all the accumulators.
+
+    Args:
+        filepath: Path to the audio file.
+        blocksize: Frames per block.
+
+    Returns:
+        The analysis (covering the frames read before any read error).
+    """
+    info = sf.info(str(filepath))
+    analysis = StreamAnalysis(info.samplerate, info.frames, info.channels)
+    block_buffer = np.empty((blocksize, info.channels))
+    mono_buffer = np.empty(blocksize)
+    md5 = None
+    if analysis_config.VERIFY_MD5:
+        header = read_streaminfo(filepath)
+        if header is not None and any(header.md5):
+            md5 = AudioMD5(header.bits_per_sample)
+
+    start = 0
+    for block in sf_blocks(str(filepath), blocksize=blocksize, dtype="float64", out=block_buffer):
+        mono = np.mean(block, axis=1, out=mono_buffer[: len(block)])
+        for accumulator in analysis.accumulators:
+            accumulator.update(block, mono, start)
+        if md5 is not None:
+            md5.update(block)
+        start += len(block)
+
+    analysis.frames = start
+    if md5 is not None:
+        analysis.md5 = md5.digest()
+    for accumulator in analysis.accumulators:
+        accumulator.finish(start)
+    metrics.inc("decoded_bytes_total", start * info.channels * block_buffer.itemsize)
+
+    logger.debug(
+        "STREAM: Analyzed %s in one pass (%s/%s frames)", filepath.name, start, info.frames
+    )
+    return analysis
@@ -0,0 +1,75 @@
+"""Worker warm-up: build the per-process DSP state before the first file.
+
+A fresh worker process otherwise pays, on its first file, for the Hann
+windows, the FFT plans, the fixed filter designs and the scratch buffers,
+which shows up as first-file latency and per-file variance in a scan.
+``warm_up`` builds them ahead of time for the common sample rates; the
+worker initializer calls it when ``WARM_WORKERS`` is enabled.
+"""
+
+import logging
+import time
+from typing import Sequence, Tuple
+
+from ..config import analysis_config, triage_config
+
+logger = logging.getLogger(__name__)
+
+# Sample rates prepared ahead of time (CD and DAT/video rates)
+WARM_SAMPLE_RATES: Tuple[int, ...] = (44100, 48000)
+
+# Fixed filter designs (order, cutoff(s), type) for a given Nyquist frequency,
+# as used by the compression artifact (Rule 9) and click (Rule 7) detectors.
+# Keep in sync with those modules: a missing design only costs a cache miss.
+_FIXED_FILTERS = (
+    (4, lambda nyq: (10000, min(20000, nyq - 100)), "bandpass"),
+    (4, lambda nyq: (10000, 15000), "bandpass"),
+    (4, lambda nyq: (15000, min(20000, nyq - 100)), "bandpass"),
+    (4, lambda nyq: (16000, min(20000, nyq - 100)), "bandpass"),
+    (4, lambda nyq: 1000, "highpass"),
+)
+
+
+def _fft_durations() -> Tuple[float, ...]:
+    """Lengths (seconds) of the windowed FFTs of the analysis.
+
+    The spectrum sample, the 10 s consistency segments (and cached spectrum)
+    and the triage excerpts.
+    """
+    return tuple(sorted({analysis_config.SAMPLE_DURATION, 10.0, triage_config.EXCERPT_DURATION}))
+
+
+def warm_up(sample_rates: Sequence[int] = WARM_SAMPLE_RATES) -> float:
+    """Build windows, FFT plans, filter designs and scratch buffers.
+
+    Args:
+        sample_rates: Sample rates to prepare.
+
+    Returns:
+        Time spent in seconds.
+    """
+    start = time.perf_counter()
+    # Imported here: the DSP stack is only needed in the workers
+    import numpy as np
+
+    from .spectrum import windowed_spectrum
+    from .window_cache import get_butter_sos
+
+    # Largest first, so the scratch buffers are allocated once at full size
+    sizes = sorted(
+        ((int(duration * rate), rate) for rate in sample_rates for duration in _fft_durations()),
+        reverse=True,
+    )
+    for size, rate in sizes:
+        # Builds the window, plans the FFT (scipy keeps the plan cached) and
+        # caches the bin frequencies
+        windowed_spectrum(np.zeros(size), rate)
+
+    for rate in sample_rates:
+        nyquist = rate / 2
+        for order, cutoff, btype in _FIXED_FILTERS:
+            get_butter_sos(order, cutoff(nyquist), btype, rate)
+
+    elapsed = time.perf_counter() - start
+    logger.debug("Worker warm-up done in %.0f ms", elapsed * 1000)
+    return elapsed
@@ -1,13 +1,19 @@
 """Window cache for optimized signal processing.
 
 Phase 2 Optimization: Pre-calculate and cache Hann windows to avoid
-redundant calculations.
+redundant calculations. Filter designs and FFT frequency bins are cached the
+same way.
 """
 
 import logging
-from typing import Dict
+from functools import lru_cache
+from typing import Dict, Tuple, Union
+
 import numpy as np
 from scipy import signal
+from scipy.fft import rfftfreq
+
+from .buffer_pool import scratch_buffer
 
 logger = logging.getLogger(__name__)
 
@@ -27,10 +33,10 @@ def get_hann_window(size: int) -> np.ndarray:
         Hann window array
     """
     if size not in _window_cache:
-        logger.debug(f"⚡ WINDOW CACHE: Creating Hann window of size {size}")
+        logger.debug("⚡ WINDOW CACHE: Creating Hann window of size %s", size)
         _window_cache[size] = signal.windows.hann(size)
     else:
-        logger.debug(f"⚡ WINDOW CACHE: Using cached Hann window of size {size}")
+        logger.debug("⚡ WINDOW CACHE: Using cached Hann window of size %s", size)
 
     return _window_cache[size]
 
@@ -47,20 +53,75 @@ def get_hanning_window(size: int) -> np.ndarray:
         Hanning window array
     """
     if size not in _window_cache:
-        logger.debug(f"⚡ WINDOW CACHE: Creating Hanning window of size {size}")
+        logger.debug("⚡ WINDOW CACHE: Creating Hanning window of size %s", size)
         _window_cache[size] = np.hanning(size)
     else:
-        logger.debug(f"⚡ WINDOW CACHE: Using cached Hanning window of size {size}")
+        logger.debug("⚡ WINDOW CACHE: Using cached Hanning window of size %s", size)
 
     return _window_cache[size]
 
 
+@lru_cache(maxsize=256)
+def _butter_sos(
+    order: int, cutoff: Union[float, Tuple[float, float]], btype: str, sample_rate: int
+) -> np.ndarray:
+    return signal.butter(order, cutoff, btype, fs=sample_rate, output="sos")
+
+
+def get_butter_sos(
+    order: int,
+    cutoff: Union[float, Tuple[float, float]],
+    btype: str,
+    sample_rate: int,
+) -> np.ndarray:
+    """Get a cached Butterworth filter design (second-order sections).
+
+    Args:
+        order: Filter order.
+        cutoff: Cutoff frequency, or (low, high) band edges, in Hz.
+        btype: "lowpass", "highpass", "bandpass" or "bandstop".
+        sample_rate: Sample rate in Hz.
+
+    Returns:
+        SOS array for ``signal.sosfilt``, shared between callers (do not modify).
+    """
+    if not np.isscalar(cutoff):
+        cutoff = tuple(float(f) for f in cutoff)
+    return _butter_sos(order, cutoff, btype, sample_rate)
+
+
+@lru_cache(maxsize=32)
+def get_rfft_freqs(size: int, sample_rate: int) -> np.ndarray:
+    """Get the cached (read-only) bin frequencies of a real FFT of ``size`` samples."""
+    freqs = rfftfreq(size, 1 / sample_rate)
+    freqs.setflags(write=False)
+    return freqs
+
+
+def apply_window(data: np.ndarray) -> np.ndarray:
+    """Mix down to mono and multiply by a cached Hann window.
+
+    Args:
+        data: Mono samples, or samples of shape (frames, channels).
+
+    Returns:
+        The windowed mono samples, in the thread's scratch buffer.
+    """
+    size = len(data)
+    out = scratch_buffer(size)
+    if data.ndim > 1:
+        data = np.mean(data, axis=1, out=out) if data.shape[1] > 1 else data[:, 0]
+    return np.multiply(data, get_hann_window(size), out=out)
+
+
 def clear_window_cache():
     """Clear the window cache to free memory."""
     global _window_cache
     size = len(_window_cache)
     _window_cache.clear()
-    logger.debug(f"⚡ WINDOW CACHE: Cleared {size} cached windows")
+    _butter_sos.cache_clear()
+    get_rfft_freqs.cache_clear()
+    logger.debug("⚡ WINDOW CACHE: Cleared %s cached windows", size)
 
 
 def get_cache_stats() -> Dict[str, int]:
@@ -0,0 +1,31 @@
+"""Benchmark tooling: synthetic labelled corpus, scaling benchmark, hardware calibration."""
+
+from .calibrate import calibrate, format_calibration, recommend
+from .corpus import CorpusSpec, build_corpus, default_corpus, duration_corpus, generate_file
+from .scaling import (
+    build_library,
+    compare_to_baseline,
+    format_runs,
+    format_schedule_runs,
+    run_scaling_benchmark,
+    run_schedule_benchmark,
+    save_results,
+)
+
+__all__ = [
+    "CorpusSpec",
+    "build_corpus",
+    "build_library",
+    "calibrate",
+    "compare_to_baseline",
+    "default_corpus",
+    "duration_corpus",
+    "format_calibration",
+    "format_runs",
+    "format_schedule_runs",
+    "generate_file",
+    "recommend",
+    "run_scaling_benchmark",
+    "run_schedule_benchmark",
+    "save_results",
+]
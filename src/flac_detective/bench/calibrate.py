@@ -0,0 +1,237 @@
+"""Hardware calibration for ``flac-detective bench``.
+
+Measures, on generated files (and optionally a sample of the real library),
+the decode throughput, FFT throughput, copy-to-temp and direct read
+bandwidth, and the scan throughput per worker count. ``recommend`` turns the
+measurements into runtime settings (see ``profile``): worker processes, rule
+threads, staging mode and the worker memory budget.
+"""
+
+import logging
+import os
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import soundfile as sf
+from scipy.fft import rfft, set_workers
+
+from ..profile import Settings
+from ..utils import find_flac_files
+from .corpus import CorpusSpec, build_corpus
+from .scaling import build_library, run_once
+
+logger = logging.getLogger(__name__)
+
+# Minimum time spent on each micro-benchmark (seconds)
+MIN_MEASURE_SECONDS = 0.5
+
+# Files of the real library used for the I/O measurements
+LIBRARY_SAMPLE_SIZE = 8
+
+# Library files per worker for the scaling runs
+FILES_PER_WORKER = 4
+
+# Worker count reaching this fraction of the best throughput is recommended
+SCALING_TOLERANCE = 0.95
+
+# Staging copy is kept while it costs less than this fraction of the analysis time
+MAX_COPY_OVERHEAD = 0.10
+
+
+def _repeat(fn) -> float:
+    """Run fn until MIN_MEASURE_SECONDS elapsed; return calls per second."""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_MEASURE_SECONDS:
+            return calls / elapsed
+
+
+def measure_decode(paths: Sequence[Path]) -> float:
+    """Decode throughput in MB of FLAC per second (float32 output)."""
+    size = sum(path.stat().st_size for path in paths)
+    start = time.perf_counter()
+    for path in paths:
+        sf.read(str(path), dtype="float32")
+    return size / 1e6 / (time.perf_counter() - start)
+
+
+def measure_fft(size: int = 65536) -> float:
+    """Single-threaded real FFTs per second on float32 windows of ``size`` samples."""
+    window = np.random.default_rng(0).standard_normal(size).astype(np.float32)
+    with set_workers(1):
+        return _repeat(lambda: rfft(window))
+
+
+def measure_io(paths: Sequence[Path]) -> Dict[str, float]:
+    """Copy-to-temp and direct read bandwidth (MB/s) on the given files.
+
+    Files read shortly before are likely in the page cache: sample files of
+    the real library are measured first, on their first read.
+    """
+    size = sum(path.stat().st_size for path in paths) / 1e6
+
+    start = time.perf_counter()
+    for path in paths:
+        with open(path, "rb") as f:
+            while f.read(1 << 20):
+                pass
+    read_mb_per_s = size / (time.perf_counter() - start)
+
+    with tempfile.TemporaryDirectory(prefix="flac_detective_bench_") as tmp:
+        start = time.perf_counter()
+        for index, path in enumerate(paths):
+            shutil.copy2(path, Path(tmp) / f"{index}.flac")
+        copy_mb_per_s = size / (time.perf_counter() - start)
+
+    return {"read_mb_per_s": read_mb_per_s, "copy_mb_per_s": copy_mb_per_s}
+
+
+def _worker_ladder(max_workers: int) -> List[int]:
+    counts = [1]
+    while counts[-1] * 2 < max_workers:
+        counts.append(counts[-1] * 2)
+    if max_workers > 1:
+        counts.append(max_workers)
+    return counts
+
+
+def measure_scaling(work_dir: Path, max_workers: int) -> List[Dict[str, float]]:
+    """Scan throughput of a small generated library per worker count."""
+    counts = _worker_ladder(max_workers)
+    library = build_library(work_dir / "library", FILES_PER_WORKER * counts[-1], "short")
+    runs = []
+    for workers in counts:
+        logger.info(f"Calibration: scan with {workers} worker(s)")
+        runs.append({"workers": workers, **run_once(library, workers, work_dir / "output")})
+    return runs
+
+
+def _total_memory_mb() -> Optional[float]:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 1e6
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def calibrate(
+    work_dir: Path, library: Optional[Path] = None, max_workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """Run all measurements.
+
+    Args:
+        work_dir: Scratch directory.
+        library: Real library to sample for the I/O and decode measurements.
+        max_workers: Largest worker count to try (default: CPU count).
+
+    Returns:
+        Measurements dict.
+    """
+    cpu_count = os.cpu_count() or 1
+    max_workers = max_workers or cpu_count
+    measurements: Dict[str, Any] = {
+        "cpu_count": cpu_count,
+        "total_memory_mb": _total_memory_mb(),
+    }
+
+    if library is not None:
+        library_files = find_flac_files(library)
+        sample = random.Random(0).sample(
+            library_files, min(LIBRARY_SAMPLE_SIZE, len(library_files))
+        )
+        if sample:
+            # I/O first: the decode pass would warm the page cache
+            measurements["library_io"] = measure_io(sample)
+            measurements["library_decode_mb_per_s"] = measure_decode(sample)
+
+    specs = [
+        CorpusSpec("calibration_44k", "authentic", "music", 44100, 16, 30.0),
+        CorpusSpec("calibration_96k", "authentic", "music", 96000, 24, 30.0),
+    ]
+    generated = [path for _, path in build_corpus(specs)]
+    measurements["io"] = measure_io(generated)
+    measurements["decode_mb_per_s"] = measure_decode(generated)
+    measurements["fft_per_s"] = measure_fft()
+    measurements["scaling"] = measure_scaling(work_dir, max_workers)
+    return measurements
+
+
+def recommend(measurements: Dict[str, Any]) -> Settings:
+    """Derive runtime settings from the measurements.
+
+    - MAX_WORKERS: fewest workers reaching 95% of the best scan throughput.
+    - RULE_WORKERS: threads for expensive rules on the cores left per worker.
+    - STAGING: "copy" unless copying costs over 10% of the analysis time
+      (library figures preferred to the generated files).
+    - MAX_WORKER_RSS_MB: twice the observed worker peak (at least 512 MB),
+      capped so all workers fit in 80% of the memory.
+    - LARGE_FILE_MB: half the worker memory budget, so longer files are
+      analyzed in large-file mode rather than decoded past the budget.
+    """
+    scaling = measurements["scaling"]
+    best = max(run["megabytes_per_second"] for run in scaling)
+    chosen = min(
+        (run for run in scaling if run["megabytes_per_second"] >= SCALING_TOLERANCE * best),
+        key=lambda run: run["workers"],
+    )
+    workers = chosen["workers"]
+    rule_workers = max(1, min(3, measurements["cpu_count"] // workers))
+
+    io = measurements.get("library_io", measurements["io"])
+    single = next(run for run in scaling if run["workers"] == 1)
+    copy_overhead = single["megabytes_per_second"] / io["copy_mb_per_s"]
+    staging = "copy" if copy_overhead <= MAX_COPY_OVERHEAD else "direct"
+
+    budget = max(2 * max(run["worker_peak_rss_mb"] for run in scaling), 512)
+    total_memory = measurements.get("total_memory_mb")
+    if total_memory:
+        budget = min(budget, 0.8 * total_memory / workers)
+    budget = int(budget // 64 * 64) or 64
+
+    return {
+        "analysis": {
+            "MAX_WORKERS": workers,
+            "RULE_WORKERS": rule_workers,
+            "STAGING": staging,
+            "MAX_WORKER_RSS_MB": budget,
+            "LARGE_FILE_MB": budget // 2,
+        }
+    }
+
+
+def format_calibration(measurements: Dict[str, Any], settings: Settings) -> str:
+    """Format the measurements and the recommended settings."""
+    lines = [
+        f"CPU cores: {measurements['cpu_count']}",
+        f"Decode: {measurements['decode_mb_per_s']:.1f} MB/s (generated files)",
+        f"FFT (65536 points, 1 thread): {measurements['fft_per_s']:.0f}/s",
+        f"Read: {measurements['io']['read_mb_per_s']:.0f} MB/s, "
+        f"copy to temp: {measurements['io']['copy_mb_per_s']:.0f} MB/s (generated files)",
+    ]
+    if "library_io" in measurements:
+        lines.append(
+            f"Library read: {measurements['library_io']['read_mb_per_s']:.0f} MB/s, "
+            f"copy to temp: {measurements['library_io']['copy_mb_per_s']:.0f} MB/s, "
+            f"decode: {measurements['library_decode_mb_per_s']:.1f} MB/s"
+        )
+    lines.append("")
+    lines.append(f"{'workers':>7} {'files/s':>9} {'MB/s':>8} {'worker RSS':>11}")
+    for run in measurements["scaling"]:
+        lines.append(
+            f"{run['workers']:>7} {run['files_per_second']:>9.2f} "
+            f"{run['megabytes_per_second']:>8.1f} {run['worker_peak_rss_mb']:>9.0f}MB"
+        )
+    lines.append("")
+    lines.append("Recommended settings:")
+    for section, values in settings.items():
+        for name, value in values.items():
+            lines.append(f"  {section}.{name} = {value}")
+    return "\n".join(lines)
@@ -0,0 +1,269 @@
+"""Synthetic benchmark corpus with realistic transcode signatures.
+
+Generates labelled FLAC files covering the analysis paths: sample rates from
+44.1 to 192 kHz, 16/24-bit, durations from seconds to hours, MP3 encoder
+low-pass cutoffs (``MP3_SIGNATURES``), dither in silent passages, tape hiss
+with high-frequency roll-off, upsampled "hi-res" and fake 24-bit files.
+
+Files are generated block by block (constant memory, so multi-hour files are
+fine), are fully determined by their spec and the seed, and are cached on
+disk under a key derived from both: a second run reuses them.
+"""
+
+import hashlib
+import logging
+import os
+import zlib
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import soundfile as sf
+from scipy import signal
+
+from ..analysis.new_scoring.constants import MP3_SIGNATURES
+
+logger = logging.getLogger(__name__)
+
+# Bump when the generated audio changes, to invalidate cached files
+GENERATOR_VERSION = 1
+
+DEFAULT_SEED = 42
+
+# Generation block (seconds): bounds memory for long files
+BLOCK_SECONDS = 10.0
+
+CACHE_ENV_VAR = "FLAC_DETECTIVE_CORPUS_CACHE"
+
+
+class CorpusSpec(NamedTuple):
+    """One generated file.
+
+    Attributes:
+        name: File name stem (unique within a corpus).
+        label: Expected class, "authentic" or "fake".
+        kind: Signal model: "music" (full band), "mp3" (encoder low-pass),
+            "dither" (MP3 low-pass with TPDF dither in the silent passages),
+            "tape" (hiss and gentle roll-off), "upsampled" (low-pass far below
+            Nyquist) or "fake_24bit" (MP3 low-pass, 16-bit samples in a 24-bit
+            container).
+        sample_rate: Sample rate (Hz).
+        bit_depth: 16 or 24.
+        duration: Duration (seconds).
+        cutoff: Low-pass cutoff (Hz) for "mp3", "tape" and "upsampled".
+        mp3_bitrate: Simulated MP3 bitrate (kbps) for "mp3"; sets the noise
+            floor so the FLAC bitrate lands in the range of a real transcode.
+    """
+
+    name: str
+    label: str
+    kind: str
+    sample_rate: int
+    bit_depth: int = 16
+    duration: float = 30.0
+    cutoff: Optional[float] = None
+    mp3_bitrate: Optional[int] = None
+
+    @property
+    def group(self) -> str:
+        """Class used to aggregate benchmark figures (e.g. "mp3", "authentic_96k")."""
+        if self.kind == "music":
+            return f"authentic_{self.sample_rate // 1000}k_{self.bit_depth}bit"
+        return self.kind
+
+
+def _mp3_specs(duration: float) -> List[CorpusSpec]:
+    """One file per MP3 bitrate signature, cut off near the low end of its range."""
+    specs = []
+    for bitrate, low, _ in MP3_SIGNATURES:
+        cutoff = max(low, 14700) + 500.0
+        specs.append(
+            CorpusSpec(f"mp3_{bitrate}k", "fake", "mp3", 44100, 16, duration, cutoff, bitrate)
+        )
+    return specs
+
+
+def default_corpus(duration: float = 30.0) -> List[CorpusSpec]:
+    """Corpus exercising every scoring rule path (one file per class).
+
+    Args:
+        duration: Duration of each file (seconds).
+
+    Returns:
+        List of specs.
+    """
+    specs = [
+        CorpusSpec(f"authentic_{rate}_{depth}", "authentic", "music", rate, depth, duration)
+        for rate, depth in (
+            (44100, 16),
+            (48000, 24),
+            (88200, 24),
+            (96000, 24),
+            (176400, 24),
+            (192000, 24),
+        )
+    ]
+    specs += _mp3_specs(duration)
+    specs += [
+        CorpusSpec("dither_silence", "fake", "dither", 48000, 16, duration, 19500.0),
+        CorpusSpec("tape_hiss", "authentic", "tape", 44100, 16, duration, 14000.0),
+        CorpusSpec("upsampled_96k", "fake", "upsampled", 96000, 24, duration, 21000.0),
+        CorpusSpec("fake_24bit", "fake", "fake_24bit", 44100, 24, duration, 16800.0, 192),
+    ]
+    return specs
+
+
+def duration_corpus(durations: Sequence[float] = (5.0, 60.0, 600.0, 7200.0)) -> List[CorpusSpec]:
+    """Authentic and MP3-transcoded files of increasing durations (up to 2 hours)."""
+    specs = []
+    for duration in durations:
+        specs.append(
+            CorpusSpec(f"authentic_{int(duration)}s", "authentic", "music", 44100, 16, duration)
+        )
+        specs.append(
+            CorpusSpec(
+                f"mp3_320k_{int(duration)}s", "fake", "mp3", 44100, 16, duration, 20500.0, 320
+            )
+        )
+    return specs
+
+
+def default_cache_dir() -> Path:
+    """Cache directory (``$FLAC_DETECTIVE_CORPUS_CACHE`` or ~/.cache/flac_detective/corpus)."""
+    configured = os.environ.get(CACHE_ENV_VAR)
+    if configured:
+        return Path(configured)
+    return Path.home() / ".cache" / "flac_detective" / "corpus"
+
+
+def _cache_key(spec: CorpusSpec, seed: int) -> str:
+    return hashlib.blake2b(
+        repr((GENERATOR_VERSION, seed, tuple(spec))).encode(), digest_size=6
+    ).hexdigest()
+
+
+class _SignalModel:
+    """Stateful block generator for one spec (filters keep their state across blocks)."""
+
+    def __init__(self, spec: CorpusSpec, seed: int):
+        self.spec = spec
+        self.rng = np.random.default_rng([seed, zlib.crc32(spec.name.encode())])
+        self.position = 0
+        rate = spec.sample_rate
+
+        # Music-like content: low-frequency weighted noise plus a few partials,
+        # over a broadband floor reaching Nyquist
+        self.pink_sos = signal.butter(2, 500, fs=rate, output="sos")
+        self.pink_zi = np.zeros((self.pink_sos.shape[0], 2, 2))
+        self.partials = self.rng.uniform(110, 3520, size=6)
+        self.floor = 0.003
+        if spec.mp3_bitrate is not None:
+            # Lower bitrates discard more detail: quieter floor, smaller FLAC
+            self.floor = 0.0005 + 0.001 * spec.mp3_bitrate / 320
+        elif spec.kind == "dither":
+            # Dense content around the silent passages, above MP3 container bitrates
+            self.floor = 0.01
+
+        self.lowpass_sos = None
+        if spec.cutoff is not None:
+            if spec.kind == "tape":
+                # Gentle playback roll-off
+                self.lowpass_sos = signal.butter(5, spec.cutoff, fs=rate, output="sos")
+            else:
+                # Brick-wall encoder / resampler low-pass (100 dB stop band)
+                self.lowpass_sos = signal.ellip(10, 0.1, 100, spec.cutoff, fs=rate, output="sos")
+            self.lowpass_zi = np.zeros((self.lowpass_sos.shape[0], 2, 2))
+
+    def block(self, frames: int) -> np.ndarray:
+        """Generate the next block of stereo float audio in [-1, 1]."""
+        spec = self.spec
+        rate = spec.sample_rate
+        t = (self.position + np.arange(frames)) / rate
+
+        noise = self.rng.standard_normal((frames, 2))
+        pink, self.pink_zi = signal.sosfilt(self.pink_sos, noise, axis=0, zi=self.pink_zi)
+        audio = 0.3 * pink + self.floor * self.rng.standard_normal((frames, 2))
+        for index, freq in enumerate(self.partials):
+            envelope = 0.5 + 0.5 * np.sin(2 * np.pi * (0.1 + 0.05 * index) * t)
+            tone = 0.04 * envelope * np.sin(2 * np.pi * freq * t)
+            audio[:, 0] += tone
+            audio[:, 1] += np.roll(tone, index)
+
+        if spec.kind == "tape":
+            # Constant hiss floor under the roll-off
+            audio += 0.01 * self.rng.standard_normal((frames, 2))
+        if self.lowpass_sos is not None:
+            audio, self.lowpass_zi = signal.sosfilt(
+                self.lowpass_sos, audio, axis=0, zi=self.lowpass_zi
+            )
+        if spec.kind == "dither":
+            # One second of silence every 5 s, filled with TPDF dither at 16-bit LSB level
+            silent = (t % 5.0) >= 4.0
+            lsb = 1.0 / 32768
+            tpdf = self.rng.uniform(-lsb, lsb, (frames, 2)) + self.rng.uniform(
+                -lsb, lsb, (frames, 2)
+            )
+            audio[silent] = tpdf[silent]
+
+        self.position += frames
+        audio = np.clip(audio, -0.99, 0.99)
+        if spec.kind == "fake_24bit":
+            # 16-bit content in a 24-bit container: lower 8 bits always zero
+            audio = np.round(audio * 32768) / 32768
+        return audio
+
+
+def generate_file(spec: CorpusSpec, path: Path, seed: int = DEFAULT_SEED) -> Path:
+    """Write one corpus file.
+
+    Args:
+        spec: File description.
+        path: Destination FLAC file.
+        seed: Random seed (same seed and spec = same audio).
+
+    Returns:
+        The destination path.
+    """
+    model = _SignalModel(spec, seed)
+    block_frames = int(spec.sample_rate * BLOCK_SECONDS)
+    remaining = int(spec.sample_rate * spec.duration)
+    subtype = "PCM_24" if spec.bit_depth == 24 else "PCM_16"
+
+    tmp_path = path.with_name(path.name + ".part")
+    with sf.SoundFile(tmp_path, "w", spec.sample_rate, 2, subtype=subtype, format="FLAC") as output:
+        while remaining > 0:
+            frames = min(block_frames, remaining)
+            output.write(model.block(frames))
+            remaining -= frames
+    os.replace(tmp_path, path)
+    return path
+
+
+def build_corpus(
+    specs: Sequence[CorpusSpec],
+    cache_dir: Optional[Path] = None,
+    seed: int = DEFAULT_SEED,
+) -> List[Tuple[CorpusSpec, Path]]:
+    """Generate (or reuse from the cache) the files of a corpus.
+
+    Args:
+        specs: Files to generate.
+        cache_dir: Cache directory (default: ``default_cache_dir()``).
+        seed: Random seed.
+
+    Returns:
+        List of (spec, path) pairs in spec order.
+    """
+    cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    corpus = []
+    for spec in specs:
+        path = cache_dir / f"{spec.name}_{_cache_key(spec, seed)}.flac"
+        if path.exists():
+            logger.debug(f"⚡ CACHE: Reusing corpus file {path.name}")
+        else:
+            logger.info(f"Generating corpus file {path.name} ({spec.duration:.0f}s)")
+            generate_file(spec, path, seed)
+        corpus.append((spec, path))
+    return corpus
@@ -0,0 +1,434 @@
+"""Scaling benchmark of the parallel scan.
+
+Runs the real pipeline (``scan_files``, ``run_analysis_loop``, text report)
+on generated libraries, sweeping worker counts, file-size mixes and library
+sizes. Libraries of tiny files isolate the orchestration overhead (submit,
+result handling, progress tracking) from the analysis itself.
+
+Each run records throughput, peak parent and worker RSS, the worker threads
+(peak count, and runnable threads per CPU: above 1 the workers
+oversubscribe the CPUs), the time spent in
+the parent-side phases (the ``scan``, ``submit``, ``tracker`` and ``report``
+spans), the first-task latency and per-task variance of the workers (from
+the ``task`` spans of the scan's trace) and the scaling efficiency relative
+to one worker. Results are saved
+as JSON so runs on different commits can be compared with
+``compare_to_baseline``.
+
+``run_schedule_benchmark`` scans one library with each submission order
+(``SCHEDULE``) and reports the makespan of each against discovery order.
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from .. import tracing
+from ..analysis.diagnostic_tracker import reset_tracker
+from ..config import analysis_config
+from ..reporting import TextReporter
+from ..worker_pool import rss_bytes
+from .corpus import CorpusSpec, build_corpus
+
+logger = logging.getLogger(__name__)
+
+# File durations (seconds) of each mix; files cycle through the list
+FILE_MIXES: Dict[str, Sequence[float]] = {
+    "tiny": (1.0,),
+    "short": (10.0,),
+    "mixed": (1.0, 30.0, 240.0),
+    "album": (240.0,),
+    # Mostly short files and a few long ones, for the scheduling policies
+    "skewed": (5.0,) * 15 + (600.0,),
+}
+
+PHASES = ("scan", "submit", "tracker", "report")
+
+
+def build_library(
+    root: Path, size: int, mix: str = "tiny", cache_dir: Optional[Path] = None
+) -> Path:
+    """Create a library of ``size`` FLAC files following a file-size mix.
+
+    Template files come from the corpus cache; library files are hard links
+    to them (copies where links are not supported), so large libraries are
+    cheap to create.
+
+    Args:
+        root: Directory to create (emptied first).
+        size: Number of files.
+        mix: Key of ``FILE_MIXES``.
+        cache_dir: Corpus cache directory.
+
+    Returns:
+        The library directory.
+    """
+    specs = [
+        CorpusSpec(f"library_{int(duration)}s", "authentic", "music", 44100, 16, duration)
+        for duration in FILE_MIXES[mix]
+    ]
+    templates = [path for _, path in build_corpus(specs, cache_dir)]
+
+    if root.exists():
+        shutil.rmtree(root)
+    for index in range(size):
+        # 1000 files per directory, like album folders
+        directory = root / f"{index // 1000:04d}"
+        directory.mkdir(parents=True, exist_ok=True)
+        target = directory / f"{index:06d}.flac"
+        template = templates[index % len(templates)]
+        try:
+            os.link(template, target)
+        except OSError:
+            shutil.copyfile(template, target)
+    return root
+
+
+def _thread_states(pid: int) -> List[str]:
+    """Scheduler states ("R" = runnable) of the threads of a process (Linux only)."""
+    states = []
+    try:
+        for task in os.scandir(f"/proc/{pid}/task"):
+            try:
+                with open(f"{task.path}/stat", "r") as f:
+                    # The state follows the parenthesized command name
+                    states.append(f.read().rpartition(")")[2].split()[0])
+            except (OSError, IndexError):
+                continue
+    except OSError:
+        pass
+    return states
+
+
+class _ProcessSampler:
+    """Samples the peak RSS of this process and of its worker processes.
+
+    Also samples the worker threads: the peak total and the mean number of
+    runnable ones, which exceeds the CPU count when workers oversubscribe.
+    """
+
+    def __init__(self, interval: float = 0.2):
+        self.interval = interval
+        self.parent_peak = 0
+        self.worker_peak = 0
+        self.threads_peak = 0
+        self._runnable: List[int] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="process-sampler", daemon=True)
+
+    @property
+    def runnable_mean(self) -> float:
+        return statistics.fmean(self._runnable) if self._runnable else 0.0
+
+    def _sample(self):
+        self.parent_peak = max(self.parent_peak, rss_bytes() or 0)
+        threads = runnable = 0
+        for child in multiprocessing.active_children():
+            self.worker_peak = max(self.worker_peak, rss_bytes(child.pid) or 0)
+            states = _thread_states(child.pid)
+            threads += len(states)
+            runnable += states.count("R")
+        self.threads_peak = max(self.threads_peak, threads)
+        if threads:
+            self._runnable.append(runnable)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self) -> "_ProcessSampler":
+        self._sample()
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+
+def _task_figures(output_dir: Path) -> Dict[str, float]:
+    """First-task latency and per-task variance from the scan's Chrome trace.
+
+    ``first_task_s`` is the mean duration of the first task of each worker
+    process (cold start); ``task_p50_s`` and ``task_cv`` (standard deviation
+    over mean) describe all the tasks.
+    """
+    trace_files = sorted(output_dir.glob("flac_trace_*.json"))
+    if not trace_files:
+        return {"first_task_s": 0.0, "task_p50_s": 0.0, "task_cv": 0.0}
+    events = json.loads(trace_files[-1].read_text(encoding="utf-8"))["traceEvents"]
+    tasks = [e for e in events if e["name"] == "task" and e["ph"] == "X"]
+    if not tasks:
+        return {"first_task_s": 0.0, "task_p50_s": 0.0, "task_cv": 0.0}
+
+    first_by_worker: Dict[int, Dict] = {}
+    for event in tasks:
+        first = first_by_worker.get(event["pid"])
+        if first is None or event["ts"] < first["ts"]:
+            first_by_worker[event["pid"]] = event
+    durations = [e["dur"] / 1e6 for e in tasks]
+    mean = statistics.fmean(durations)
+    return {
+        "first_task_s": statistics.fmean(e["dur"] / 1e6 for e in first_by_worker.values()),
+        "task_p50_s": statistics.median(durations),
+        "task_cv": statistics.pstdev(durations) / mean if mean else 0.0,
+    }
+
+
+def run_once(
+    library: Path, workers: int, output_dir: Path, schedule: Optional[str] = None
+) -> Dict[str, float]:
+    """Scan a library once with a given number of workers.
+
+    Args:
+        library: Library directory.
+        workers: Worker processes.
+        output_dir: Directory for progress file and report (emptied first).
+        schedule: Submission order (default: the current ``SCHEDULE``).
+
+    Returns:
+        Dict with files, elapsed_s, files_per_second, megabytes_per_second,
+        parent/worker peak RSS (MB), worker_threads_peak,
+        runnable_threads_mean and oversubscription (runnable worker threads
+        per CPU), the phase times (``<phase>_s``) and first_task_s,
+        task_p50_s and task_cv.
+    """
+    # Imported lazily: the CLI module pulls in Rich and the whole pipeline
+    from ..main import run_analysis_loop, scan_files
+
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+    output_dir.mkdir(parents=True)
+
+    saved_workers = analysis_config.MAX_WORKERS
+    saved_trace = analysis_config.TRACE
+    saved_schedule = analysis_config.SCHEDULE
+    was_enabled = tracing.is_enabled()
+    analysis_config.MAX_WORKERS = workers
+    analysis_config.SCHEDULE = schedule or saved_schedule
+    analysis_config.TRACE = True  # Worker task spans, see _task_figures
+    reset_tracker()
+    tracing.collect()
+    tracing.enable()
+    try:
+        with _ProcessSampler() as sampler:
+            start = time.perf_counter()
+            flac_files, non_flac_files = scan_files([library])
+            results = run_analysis_loop(flac_files, non_flac_files, output_dir)
+            with tracing.span("report"):
+                TextReporter().generate_report(results, output_dir / "flac_report.txt")
+            elapsed = time.perf_counter() - start
+        spans = tracing.collect()
+    finally:
+        analysis_config.MAX_WORKERS = saved_workers
+        analysis_config.TRACE = saved_trace
+        analysis_config.SCHEDULE = saved_schedule
+        tracing.enable(was_enabled)
+
+    size = sum(path.stat().st_size for path in flac_files)
+    figures = {
+        "files": len(flac_files),
+        "elapsed_s": elapsed,
+        "files_per_second": len(flac_files) / elapsed,
+        "megabytes_per_second": size / 1e6 / elapsed,
+        "parent_peak_rss_mb": sampler.parent_peak / 1e6,
+        "worker_peak_rss_mb": sampler.worker_peak / 1e6,
+        "worker_threads_peak": sampler.threads_peak,
+        "runnable_threads_mean": sampler.runnable_mean,
+        "oversubscription": sampler.runnable_mean / (os.cpu_count() or 1),
+    }
+    for phase in PHASES:
+        figures[f"{phase}_s"] = sum(s.duration_us for s in spans if s.name == phase) / 1e6
+    figures.update(_task_figures(output_dir))
+    return figures
+
+
+def run_scaling_benchmark(
+    work_dir: Path,
+    worker_counts: Sequence[int],
+    library_sizes: Sequence[int] = (200,),
+    mixes: Sequence[str] = ("tiny",),
+    cache_dir: Optional[Path] = None,
+) -> List[Dict]:
+    """Sweep worker counts x library sizes x file-size mixes.
+
+    Args:
+        work_dir: Scratch directory for libraries and scan outputs.
+        worker_counts: Worker counts to measure (1 is added for the efficiency baseline).
+        library_sizes: Numbers of files per library.
+        mixes: Keys of ``FILE_MIXES``.
+        cache_dir: Corpus cache directory.
+
+    Returns:
+        One dict per run (mix, library_size, workers, figures of ``run_once``
+        and scaling_efficiency = throughput / (workers x throughput with 1 worker)).
+    """
+    worker_counts = sorted(set(worker_counts) | {1})
+    runs = []
+    for mix in mixes:
+        for library_size in library_sizes:
+            library = build_library(work_dir / "library", library_size, mix, cache_dir)
+            single = None
+            for workers in worker_counts:
+                logger.info(f"Scaling benchmark: {mix} x {library_size} files, {workers} worker(s)")
+                figures = run_once(library, workers, work_dir / "output")
+                if workers == 1:
+                    single = figures["files_per_second"]
+                figures["scaling_efficiency"] = figures["files_per_second"] / (workers * single)
+                runs.append(
+                    {"mix": mix, "library_size": library_size, "workers": workers, **figures}
+                )
+    return runs
+
+
+def run_schedule_benchmark(
+    work_dir: Path,
+    workers: int,
+    library_size: int = 64,
+    mix: str = "skewed",
+    policies: Sequence[str] = ("discovery", "largest", "smallest"),
+    cache_dir: Optional[Path] = None,
+) -> List[Dict]:
+    """Scan one library with each submission order.
+
+    Args:
+        work_dir: Scratch directory for the library and scan outputs.
+        workers: Worker processes.
+        library_size: Number of files.
+        mix: Key of ``FILE_MIXES`` (the default mixes a few long files in).
+        policies: ``SCHEDULE`` policies to compare ("discovery" is the baseline).
+        cache_dir: Corpus cache directory.
+
+    Returns:
+        One dict per policy (schedule, mix, library_size, workers, figures of
+        ``run_once``, makespan_s and improvement_pct: makespan saved over
+        discovery order, when measured).
+    """
+    library = build_library(work_dir / "library", library_size, mix, cache_dir)
+    # Unreported first scan: warms the page cache for the measured ones
+    run_once(library, workers, work_dir / "output")
+    runs = []
+    for policy in policies:
+        logger.info(f"Schedule benchmark: {mix} x {library_size} files, {policy} first")
+        figures = run_once(library, workers, work_dir / "output", schedule=policy)
+        runs.append(
+            {
+                "schedule": policy,
+                "mix": mix,
+                "library_size": library_size,
+                "workers": workers,
+                "makespan_s": figures["elapsed_s"],
+                **figures,
+            }
+        )
+    baseline = next((run["makespan_s"] for run in runs if run["schedule"] == "discovery"), None)
+    for run in runs:
+        if baseline:
+            run["improvement_pct"] = (baseline - run["makespan_s"]) / baseline * 100.0
+    return runs
+
+
+def format_schedule_runs(runs: List[Dict]) -> str:
+    """Format schedule benchmark runs as a table."""
+    lines = [f"{'schedule':<10} {'files':>7} {'workers':>7} {'makespan':>9} {'vs discovery':>12}"]
+    for run in runs:
+        improvement = run.get("improvement_pct")
+        lines.append(
+            f"{run['schedule']:<10} {run['library_size']:>7} {run['workers']:>7} "
+            f"{run['makespan_s']:>8.1f}s "
+            + (f"{0.0 - improvement:>+11.1f}%" if improvement is not None else f"{'-':>12}")
+        )
+    return "\n".join(lines)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(runs: List[Dict], path: Path) -> Path:
+    """Save benchmark runs as JSON, with the commit and host they ran on."""
+    document = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "host": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        },
+        "runs": runs,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(document, indent=2), encoding="utf-8")
+    return path
+
+
+def compare_to_baseline(
+    runs: List[Dict], baseline_path: Path, max_regression_pct: float
+) -> List[str]:
+    """Compare throughput with a previous results file.
+
+    Args:
+        runs: Current runs.
+        baseline_path: JSON file written by ``save_results``.
+        max_regression_pct: Allowed throughput drop (percent).
+
+    Returns:
+        Descriptions of the runs whose throughput dropped more than allowed.
+    """
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    previous = {(r["mix"], r["library_size"], r["workers"]): r for r in baseline["runs"]}
+
+    regressions = []
+    for run in runs:
+        key = (run["mix"], run["library_size"], run["workers"])
+        if key not in previous:
+            continue
+        before = previous[key]["files_per_second"]
+        drop_pct = (before - run["files_per_second"]) / before * 100.0
+        if drop_pct > max_regression_pct:
+            regressions.append(
+                f"{run['mix']} x {run['library_size']} files, {run['workers']} worker(s): "
+                f"{run['files_per_second']:.1f} files/s vs {before:.1f} (-{drop_pct:.0f}%)"
+            )
+    return regressions
+
+
+def format_runs(runs: List[Dict]) -> str:
+    """Format benchmark runs as a table."""
+    lines = [
+        f"{'mix':<7} {'files':>7} {'workers':>7} {'files/s':>9} {'MB/s':>8} {'eff':>6} "
+        f"{'parent':>8} {'worker':>8} "
+        + " ".join(f"{phase:>8}" for phase in PHASES)
+        + f" {'first':>8} {'cv':>6} {'threads':>7} {'oversub':>7}"
+    ]
+    for run in runs:
+        lines.append(
+            f"{run['mix']:<7} {run['library_size']:>7} {run['workers']:>7} "
+            f"{run['files_per_second']:>9.1f} {run['megabytes_per_second']:>8.1f} "
+            f"{run['scaling_efficiency']:>6.0%} {run['parent_peak_rss_mb']:>6.0f}MB "
+            f"{run['worker_peak_rss_mb']:>6.0f}MB "
+            + " ".join(f"{run[f'{phase}_s']:>7.2f}s" for phase in PHASES)
+            + f" {run.get('first_task_s', 0.0):>7.2f}s {run.get('task_cv', 0.0):>6.2f}"
+            + f" {run.get('worker_threads_peak', 0):>7} {run.get('oversubscription', 0.0):>7.2f}"
+        )
+    return "\n".join(lines)
@@ -2,6 +2,7 @@
 
 import os
 from dataclasses import dataclass
+from typing import Tuple
 
 
 @dataclass
@@ -14,9 +15,106 @@ class AnalysisConfig:
     # Number of workers for multi-processing (defaults to CPU count)
     MAX_WORKERS: int = os.cpu_count() or 4
 
+    # Submission order of the files: "largest" (estimated cost first, shortest
+    # tail), "smallest" (early results) or "discovery" (see schedule.py)
+    SCHEDULE: str = "largest"
+
+    # Threads for independent expensive scoring rules within a file (1 = sequential)
+    RULE_WORKERS: int = 3
+
+    # Native threads (FFT, BLAS) per worker process; 0 = share the CPUs
+    # between the files analyzed concurrently (see threads.py)
+    THREADS_PER_WORKER: int = 0
+
+    # How files are read: "copy" to a local temp file first (protects against
+    # flaky external drives) or "direct" (in place, for fast local storage)
+    STAGING: str = "copy"
+
+    # Directory of the staged copies ("" = system temp directory)
+    STAGING_DIR: str = ""
+
+    # Total size of the staged copies, all processes included (MB, 0 = unlimited)
+    STAGING_MB: int = 4096
+
+    # Seconds a copy waits for room in STAGING_MB before the file is read in place
+    STAGING_WAIT: float = 30.0
+
+    # Check the decoded audio against the STREAMINFO MD5 (no extra read); a
+    # staged copy that fails it, or does not decode, is compared with a second
+    # read of the source and copied again if they differ (see staging.py)
+    VERIFY_MD5: bool = True
+
+    # Files staged ahead of the workers by I/O threads of the parent: copied
+    # (STAGING = "copy") or read ahead ("direct") while the current files are
+    # analyzed (0 = each worker stages its own file, see staging.py)
+    PREFETCH_DEPTH: int = 4
+
+    # Total size of the files staged or being analyzed (MB)
+    PREFETCH_MB: int = 2048
+
+    # I/O threads of the prefetch stage
+    PREFETCH_THREADS: int = 2
+
+    # Only check the integrity of the files (frame CRCs, see integrity.py)
+    # instead of analyzing them (--integrity-only), also decoding them to check
+    # the STREAMINFO MD5 with INTEGRITY_MD5 (--integrity-md5)
+    INTEGRITY_ONLY: bool = False
+    INTEGRITY_MD5: bool = False
+
     # Auto-save interval (number of files)
     SAVE_INTERVAL: int = 50
 
+    # Wall-clock deadline per file (seconds, 0 = no limit), plus
+    # TASK_TIMEOUT_PER_MSAMPLE seconds per million decoded samples (all
+    # channels, from STREAMINFO) so that hour-long hi-res files get the time
+    # their analysis takes; the worker is killed and the file reported as TIMEOUT
+    TASK_TIMEOUT: float = 600.0
+    TASK_TIMEOUT_PER_MSAMPLE: float = 1.0
+
+    # Recycle a worker after this many files (0 = never)
+    MAX_TASKS_PER_WORKER: int = 200
+
+    # Recycle a worker whose resident memory exceeds this (MB, 0 = no limit)
+    MAX_WORKER_RSS_MB: int = 2048
+
+    # Build windows, FFT plans and filter designs when a worker starts
+    # rather than on its first file (see analysis.warmup)
+    WARM_WORKERS: bool = True
+
+    # Decode buffers kept for reuse by the next file, per process (MB, 0 = none)
+    BUFFER_POOL_MB: int = 512
+
+    # Files decoding to more than this (MB as float64 PCM, 0 = never), e.g.
+    # hour-long mixes, are analyzed in large-file mode
+    LARGE_FILE_MB: int = 1024
+
+    # Large-file mode: "stream" (one pass over the file with bounded memory,
+    # see analysis.streaming) or "spill" (the in-memory analyses, on audio
+    # decoded into a memory-mapped temporary file). Full decodes of large
+    # files always spill.
+    LARGE_FILE_MODE: str = "stream"
+
+    # Files longer than this (minutes, 0 = never) are decoded by several
+    # threads over seek-point-aligned ranges, as are shorter ones while pool
+    # workers sit idle (see analysis.parallel_decode)
+    PARALLEL_DECODE_MINUTES: float = 10.0
+
+    # Directory of the memory-mapped temporary files ("" = system temp
+    # directory; /dev/shm keeps them in RAM-backed tmpfs)
+    SPILL_DIR: str = ""
+
+    # Serve Prometheus metrics on http://127.0.0.1:<port>/metrics (0 = disabled)
+    METRICS_PORT: int = 0
+
+    # Write a Chrome trace of the stage timing spans and log per-stage percentiles
+    TRACE: bool = False
+
+    # Profile rule costs and short-circuits (report flac_rule_profile_*.txt)
+    PROFILE_RULES: bool = False
+
+    # Log file level: "summary" (one line per file), "info", "debug" or "warning"
+    LOG_LEVEL: str = "summary"
+
 
 @dataclass
 class ScoringConfig:
@@ -71,8 +169,36 @@ class RepairConfig:
     # Tolerance for duration difference (samples)
     DURATION_TOLERANCE_SAMPLES: int = 588  # ~1 MP3 frame at 44.1kHz
 
-    # Timeout for re-encoding operations (seconds)
-    REENCODE_TIMEOUT: int = 300
+    # Deadline of one repair in the repair stage (seconds), well above the
+    # 300 s its decode, encode and verify steps may take together
+    REENCODE_TIMEOUT: int = 600
+
+    # Queue damaged files for the repair stage after the scan instead of
+    # repairing them inside the analysis workers
+    DEFERRED: bool = True
+
+    # Repair stage: concurrent repairs, process niceness (POSIX) and whether to
+    # only report what would be repaired (--repair-dry-run)
+    REPAIR_WORKERS: int = 1
+    REPAIR_NICENESS: int = 10
+    DRY_RUN: bool = False
+
+
+@dataclass
+class TriageConfig:
+    """Configuration for the cheap triage stage."""
+
+    # Run the triage stage before the full analysis (opt-in, --triage)
+    ENABLED: bool = False
+
+    # Excerpts decoded per file: duration (seconds) and relative positions
+    EXCERPT_DURATION: float = 4.0
+    EXCERPT_POSITIONS: Tuple[float, ...] = (0.25, 0.5, 0.75)
+
+    # Uncertain band: provisional scores in [AUTHENTIC_BELOW, FAKE_AT) are
+    # escalated to the full analysis
+    AUTHENTIC_BELOW: int = 10
+    FAKE_AT: int = 86
 
 
 # Instances globales (singleton pattern)
@@ -80,3 +206,4 @@ analysis_config = AnalysisConfig()
 scoring_config = ScoringConfig()
 spectral_config = SpectralConfig()
 repair_config = RepairConfig()
+triage_config = TriageConfig()
@@ -0,0 +1,545 @@
+"""Integrity check of FLAC files from their bitstream checksums.
+
+Every FLAC frame carries a CRC-8 of its header and a CRC-16 of the whole
+frame. Checking them finds damaged frames without decoding any audio, so a
+library can be verified at about the speed it is read. ``check_integrity``:
+
+1. finds the frames: sync codes whose header parses, matches the STREAMINFO
+   block and passes its CRC-8, chained by frame (or sample) number so that
+   sync-like bytes inside the audio data are skipped;
+2. checks the CRC-16 of all the frames at once with numpy (see
+   ``frame_residues``);
+3. optionally decodes the file and checks the STREAMINFO MD5 of the audio.
+
+It reports the byte offset and first sample of the first bad frame. The
+``--integrity-only`` scan runs it on every file with the worker pool
+(``run_integrity_stage``) instead of the authenticity analysis.
+"""
+
+import logging
+from concurrent.futures import as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List, NamedTuple, Optional
+
+import numpy as np
+
+from .config import analysis_config
+from .schedule import order_files
+from .streaminfo import StreamInfo, id3_size, read_streaminfo
+from .worker_pool import TaskTimeoutError, WorkerCrashedError, WorkerPool
+
+logger = logging.getLogger(__name__)
+
+# Bytes searched for sync codes at once
+SCAN_CHUNK = 8 * 1024 * 1024
+
+# Bytes of frames checked at once by the vectorized CRC-16
+CRC_BATCH = 4 * 1024 * 1024
+
+# Longer frames (far above real ones, e.g. several frames merged by a
+# destroyed header) are checked byte by byte
+MAX_VECTOR_FRAME = 1 << 16
+
+# Frames decoded at once for the MD5 check
+MD5_BLOCKSIZE = 65536
+
+# Longest frame header: sync and codes, 7-byte number, block size, sample rate, CRC-8
+_MAX_HEADER = 16
+
+_SAMPLE_RATES = {
+    1: 88200,
+    2: 176400,
+    3: 192000,
+    4: 8000,
+    5: 16000,
+    6: 22050,
+    7: 24000,
+    8: 32000,
+    9: 44100,
+    10: 48000,
+    11: 96000,
+}
+_SAMPLE_SIZES = {1: 8, 2: 12, 4: 16, 5: 20, 6: 24, 7: 32}
+
+
+def _crc_table(poly: int, width: int) -> List[int]:
+    """Table of a non-reflected CRC (zero initial value), indexed by byte."""
+    top = 1 << (width - 1)
+    mask = (1 << width) - 1
+    table = []
+    for byte in range(256):
+        crc = byte << (width - 8)
+        for _ in range(8):
+            crc = ((crc << 1) ^ poly if crc & top else crc << 1) & mask
+        table.append(crc)
+    return table
+
+
+_CRC8 = _crc_table(0x07, 8)
+_CRC16 = _crc_table(0x8005, 16)
+
+
+def crc8(data: bytes) -> int:
+    """CRC-8 of a frame header (polynomial 0x07)."""
+    crc = 0
+    for byte in data:
+        crc = _CRC8[crc ^ byte]
+    return crc
+
+
+def crc16(data: bytes) -> int:
+    """CRC-16 of a frame (polynomial 0x8005), byte by byte."""
+    crc = 0
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFF) ^ _CRC16[(crc >> 8) ^ byte]
+    return crc
+
+
+class _Contributions:
+    """CRC-16 contribution of each byte value at each distance from the end of a frame.
+
+    With a zero initial value the CRC is linear: the CRC of a frame is the
+    XOR of the contributions of its bytes, row ``d`` holding the CRC of a
+    byte followed by ``d`` zero bytes. Rows are added as longer frames come.
+    """
+
+    def __init__(self):
+        self.rows = np.array([_CRC16], dtype=np.uint16)
+
+    def table(self, length: int) -> np.ndarray:
+        """Get the table with at least ``length`` rows."""
+        count = len(self.rows)
+        if count < length:
+            length = max(length, 2 * count)
+            rows = np.empty((length, 256), dtype=np.uint16)
+            rows[:count] = self.rows
+            table = np.array(_CRC16, dtype=np.uint16)
+            for distance in range(count, length):
+                previous = rows[distance - 1]
+                rows[distance] = (previous << 8) ^ table[previous >> 8]
+            self.rows = rows
+        return self.rows
+
+
+_contributions = _Contributions()
+
+
+def frame_residues(buf: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """CRC-16 of frames including their CRC footer: 0 for intact frames.
+
+    Args:
+        buf: Bytes of the file.
+        starts: Offsets of the frames.
+        ends: Offsets just past the frames.
+
+    Returns:
+        The residue of each frame.
+    """
+    residues = np.zeros(len(starts), dtype=np.uint16)
+    lengths = ends - starts
+    vectorized = []
+    for index in range(len(starts)):
+        if lengths[index] > MAX_VECTOR_FRAME:
+            residues[index] = crc16(bytes(buf[starts[index] : ends[index]]))
+        else:
+            vectorized.append(index)
+    if not vectorized:
+        return residues
+    table = _contributions.table(int(lengths[vectorized].max())).ravel()
+
+    batch_start = 0
+    while batch_start < len(vectorized):
+        # Frames of about CRC_BATCH bytes
+        batch_end = batch_start
+        size = 0
+        while batch_end < len(vectorized) and size < CRC_BATCH:
+            size += int(lengths[vectorized[batch_end]])
+            batch_end += 1
+        batch = np.asarray(vectorized[batch_start:batch_end])
+        batch_lengths = lengths[batch]
+        data = np.concatenate([buf[starts[i] : ends[i]] for i in batch])
+        offsets = np.concatenate(([0], np.cumsum(batch_lengths)[:-1]))
+        # Distance of each byte to the last byte of its frame
+        distance = np.repeat(offsets + batch_lengths - 1, batch_lengths) - np.arange(len(data))
+        contributions = table[distance * 256 + data]
+        residues[batch] = np.bitwise_xor.reduceat(contributions, offsets)
+        batch_start = batch_end
+    return residues
+
+
+class FrameHeader(NamedTuple):
+    """Fields of a frame header needed to chain and locate frames."""
+
+    offset: int
+    number: int  # Frame number (fixed block size) or first sample (variable)
+    blocksize: int
+    variable: bool
+
+    @property
+    def next_number(self) -> int:
+        """Number of the frame that follows."""
+        return self.number + (self.blocksize if self.variable else 1)
+
+
+def parse_frame_header(data: bytes, offset: int, info: StreamInfo) -> Optional[FrameHeader]:
+    """Parse a frame header starting with a sync code.
+
+    Args:
+        data: Bytes from the sync code (up to 16).
+        offset: Offset of the sync code in the file.
+        info: STREAMINFO of the file, which the header must agree with.
+
+    Returns:
+        The header, or None if the bytes are not a valid header (bad fields,
+        mismatch with the stream, or CRC-8 error).
+    """
+    if len(data) < 6:
+        return None
+    block_code, rate_code = data[2] >> 4, data[2] & 0x0F
+    channel_code, size_code = data[3] >> 4, (data[3] >> 1) & 0x07
+    if not block_code or rate_code == 15 or channel_code > 10 or size_code == 3 or data[3] & 1:
+        return None
+    if (channel_code + 1 if channel_code < 8 else 2) != info.channels:
+        return None
+    if size_code and _SAMPLE_SIZES[size_code] != info.bits_per_sample:
+        return None
+
+    # Frame or sample number, UTF-8 style
+    first = data[4]
+    if first < 0x80:
+        extra, number = 0, first
+    elif 0xC0 <= first <= 0xFE:
+        extra = 1
+        while first & (0x40 >> extra):
+            extra += 1
+        number = first & (0x3F >> extra)
+    else:
+        return None
+    position = 5 + extra
+    if len(data) < position + 4:
+        return None
+    for byte in data[5:position]:
+        if byte & 0xC0 != 0x80:
+            return None
+        number = (number << 6) | (byte & 0x3F)
+
+    if block_code == 1:
+        blocksize = 192
+    elif block_code <= 5:
+        blocksize = 576 << (block_code - 2)
+    elif block_code == 6:
+        blocksize = data[position] + 1
+        position += 1
+    elif block_code == 7:
+        blocksize = (data[position] << 8 | data[position + 1]) + 1
+        position += 2
+    else:
+        blocksize = 256 << (block_code - 8)
+
+    if rate_code == 12:
+        rate = data[position] * 1000
+        position += 1
+    elif rate_code in (13, 14):
+        rate = (data[position] << 8 | data[position + 1]) * (10 if rate_code == 14 else 1)
+        position += 2
+    else:
+        rate = _SAMPLE_RATES.get(rate_code, info.sample_rate)
+    if rate != info.sample_rate or len(data) <= position:
+        return None
+    if crc8(data[:position]) != data[position]:
+        return None
+    return FrameHeader(offset, number, blocksize, bool(data[1] & 1))
+
+
+def audio_offset(buf: np.ndarray) -> Optional[int]:
+    """Offset of the first frame: past the ``fLaC`` marker and the metadata blocks."""
+    position = id3_size(bytes(buf[:10]))
+    if bytes(buf[position : position + 4]) != b"fLaC":
+        return None
+    position += 4
+    while position + 4 <= len(buf):
+        header = bytes(buf[position : position + 4])
+        position += 4 + int.from_bytes(header[1:4], "big")
+        if header[0] & 0x80:  # Last metadata block
+            return position
+    return None
+
+
+def find_frames(buf: np.ndarray, start: int, info: StreamInfo) -> List[FrameHeader]:
+    """Find the frames of a stream, in order.
+
+    Candidates are the sync codes with a valid header. A candidate is taken
+    when it has the number expected after the previous frame, or a larger
+    one (frames lost) that the next frame confirms; other candidates are
+    sync-like bytes inside the audio data.
+    """
+    candidates = []
+    for chunk_start in range(start, len(buf), SCAN_CHUNK):
+        chunk = np.asarray(buf[chunk_start : chunk_start + SCAN_CHUNK + _MAX_HEADER])
+        limit = min(SCAN_CHUNK, len(chunk) - 1)
+        syncs = np.flatnonzero((chunk[:limit] == 0xFF) & ((chunk[1 : limit + 1] | 1) == 0xF9))
+        raw = chunk.tobytes()
+        for position in syncs.tolist():
+            header = parse_frame_header(
+                raw[position : position + _MAX_HEADER], chunk_start + position, info
+            )
+            if header is not None:
+                candidates.append(header)
+
+    numbers = {c.number for c in candidates}
+    frames: List[FrameHeader] = []
+    expected = 0
+    for candidate in candidates:
+        if candidate.number != expected and (
+            candidate.number < expected or candidate.next_number not in numbers
+        ):
+            continue
+        if frames and frames[-1].variable != candidate.variable:
+            continue
+        frames.append(candidate)
+        expected = candidate.next_number
+    return frames
+
+
+# Data some taggers append after the audio
+_TRAILERS = (b"TAG", b"ID3", b"APETAGEX", b"LYRICSBEGIN")
+
+
+def _is_trailer(data: bytes) -> bool:
+    return data.startswith(_TRAILERS) or not data.strip(b"\x00")
+
+
+def _is_sync(data: bytes) -> bool:
+    return data[:1] == b"\xff" and data[1:2] in (b"\xf8", b"\xf9")
+
+
+def _intact_end(
+    buf: np.ndarray, start: int, stop: int, follows: Callable[[bytes], bool]
+) -> Optional[int]:
+    """End of an intact frame at ``start`` followed by other data before ``stop``.
+
+    The running CRC-16 of a frame comes out at zero right after its footer; the
+    first such position that ``follows`` accepts the bytes after is taken as
+    the end of the frame (None if there is none).
+    """
+    data = bytes(buf[start:stop])
+    crc = 0
+    for position, byte in enumerate(data, 1):
+        crc = ((crc << 8) & 0xFFFF) ^ _CRC16[(crc >> 8) ^ byte]
+        if not crc and position > 4 and follows(data[position:]):
+            return start + position
+    return None
+
+
+@dataclass
+class IntegrityResult:
+    """Outcome of the integrity check of a file."""
+
+    filepath: str
+    frames: int = 0  # Frames found
+    bad_frames: int = 0  # Frames failing their CRC-16 or lost
+    first_bad_offset: Optional[int] = None  # Byte offset of the first bad frame
+    first_bad_sample: Optional[int] = None  # Its first sample (per channel)
+    md5_ok: Optional[bool] = None  # None = not checked, or no MD5 in STREAMINFO
+    error: Optional[str] = None  # Not checkable (not FLAC, truncated, decode error...)
+    bytes_checked: int = 0
+
+    @property
+    def ok(self) -> bool:
+        """True if no problem was found."""
+        return self.error is None and not self.bad_frames and self.md5_ok is not False
+
+    def describe(self) -> str:
+        """Describe the problems found, in one line."""
+        problems = []
+        if self.bad_frames:
+            problems.append(
+                f"{self.bad_frames}/{self.frames} bad frame(s), first at byte "
+                f"{self.first_bad_offset} (sample {self.first_bad_sample})"
+            )
+        if self.error:
+            problems.append(self.error)
+        if self.md5_ok is False:
+            problems.append("decoded audio does not match the STREAMINFO MD5")
+        return "; ".join(problems) or "OK"
+
+
+def _first_sample(frame: FrameHeader, info: StreamInfo) -> int:
+    return frame.number if frame.variable else frame.number * info.max_blocksize
+
+
+def _check_md5(filepath: Path, info: StreamInfo, result: IntegrityResult):
+    """Decode the file and compare the MD5 of its audio with STREAMINFO."""
+    import soundfile as sf
+
+    from .analysis.audio_md5 import AudioMD5
+
+    md5 = AudioMD5(info.bits_per_sample)
+    frames = 0
+    try:
+        with sf.SoundFile(str(filepath)) as f:
+            for block in f.blocks(blocksize=MD5_BLOCKSIZE, dtype="float64", always_2d=True):
+                md5.update(block)
+                frames += len(block)
+    except Exception as e:
+        result.error = result.error or f"Decoding failed at sample {frames}: {e}"
+        return
+    if not info.total_samples or frames == info.total_samples:
+        result.md5_ok = md5.digest() == info.md5
+
+
+def check_integrity(filepath: Path, verify_md5: bool = False) -> IntegrityResult:
+    """Check the frame checksums (and optionally the audio MD5) of a FLAC file.
+
+    Args:
+        filepath: Path to the FLAC file.
+        verify_md5: Also decode the audio and check the STREAMINFO MD5.
+
+    Returns:
+        The outcome of the check.
+    """
+    result = IntegrityResult(str(filepath))
+    info = read_streaminfo(filepath)
+    if info is None:
+        result.error = "Not a FLAC file (no STREAMINFO block)"
+        return result
+    try:
+        buf = np.memmap(filepath, dtype=np.uint8, mode="r")
+    except (OSError, ValueError) as e:
+        result.error = f"Cannot read the file: {e}"
+        return result
+
+    start = audio_offset(buf)
+    frames = find_frames(buf, start, info) if start is not None else []
+    if not frames:
+        result.error = "No audio frame found"
+        return result
+    result.frames = len(frames)
+    result.bytes_checked = len(buf)
+
+    starts = np.array([frame.offset for frame in frames], dtype=np.int64)
+    ends = np.append(starts[1:], len(buf))
+    residues = frame_residues(buf, starts, ends)
+    if residues[-1] and _intact_end(buf, int(starts[-1]), len(buf), _is_trailer) is not None:
+        # Data after the last frame (e.g. an ID3v1 tag)
+        residues[-1] = 0
+
+    # (offset, first sample, frames) of each damaged stretch
+    damaged = []
+    if frames[0].offset > start:
+        # Bytes before the first frame found: frames whose header is damaged
+        lost = 1 if frames[0].variable else max(1, frames[0].number)
+        damaged.append((start, 0, lost))
+    for k in np.flatnonzero(residues):
+        frame = frames[int(k)]
+        following = frames[int(k) + 1] if k + 1 < len(frames) else None
+        if following is not None and following.number != frame.next_number:
+            # Frames lost between the two: a damaged header merged them into
+            # this frame's extent, which may itself be intact
+            end = _intact_end(buf, frame.offset, following.offset, _is_sync)
+            if end is not None:
+                lost = 1 if frame.variable else max(1, following.number - frame.next_number)
+                damaged.append((end, _first_sample(frame, info) + frame.blocksize, lost))
+                continue
+        damaged.append((frame.offset, _first_sample(frame, info), 1))
+    if damaged:
+        result.bad_frames = sum(lost for _, _, lost in damaged)
+        result.first_bad_offset, result.first_bad_sample = damaged[0][:2]
+
+    covered = _first_sample(frames[-1], info) + frames[-1].blocksize
+    if info.total_samples and covered < info.total_samples:
+        result.error = f"Stream ends at sample {covered} of {info.total_samples} (truncated)"
+        if result.first_bad_offset is None:
+            result.first_bad_offset, result.first_bad_sample = len(buf), covered
+
+    if verify_md5 and any(info.md5):
+        _check_md5(filepath, info, result)
+    return result
+
+
+def run_integrity_stage(
+    files: List[Path],
+    max_workers: Optional[int] = None,
+    verify_md5: Optional[bool] = None,
+    on_result: Optional[Callable[[IntegrityResult], None]] = None,
+) -> List[IntegrityResult]:
+    """Check the integrity of files with the worker pool.
+
+    Args:
+        files: FLAC files to check.
+        max_workers: Worker processes (defaults to ``MAX_WORKERS``).
+        verify_md5: Also check the audio MD5 (defaults to ``INTEGRITY_MD5``).
+        on_result: Callback invoked as each check completes (progress).
+
+    Returns:
+        List of results, in completion order.
+    """
+    if verify_md5 is None:
+        verify_md5 = analysis_config.INTEGRITY_MD5
+    if not files:
+        return []
+
+    workers = min(max_workers or analysis_config.MAX_WORKERS, len(files))
+    logger.info(f"Integrity check: {len(files)} file(s), {workers} worker(s)")
+    pool = WorkerPool(
+        max_workers=workers,
+        task_timeout=analysis_config.TASK_TIMEOUT,
+        preload=("flac_detective.integrity",),
+    )
+    results = []
+    with pool:
+        futures = {
+            pool.submit(check_integrity, filepath, verify_md5): filepath
+            for filepath in order_files(files, analysis_config.SCHEDULE)
+        }
+        for future in as_completed(futures):
+            filepath = futures[future]
+            try:
+                result = future.result()
+            except (TaskTimeoutError, WorkerCrashedError) as e:
+                result = IntegrityResult(str(filepath), error=str(e))
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+    return results
+
+
+def generate_integrity_report(results: List[IntegrityResult], elapsed: float) -> str:
+    """Generate the integrity check report.
+
+    Args:
+        results: Results returned by ``run_integrity_stage``.
+        elapsed: Duration of the check (seconds).
+
+    Returns:
+        Formatted report as string
+    """
+    damaged = sorted((r for r in results if not r.ok), key=lambda r: r.filepath)
+    checked_mb = sum(r.bytes_checked for r in results) / 1e6
+
+    lines = []
+    lines.append("=" * 80)
+    lines.append("INTEGRITY REPORT - Frame CRCs and STREAMINFO MD5")
+    lines.append("=" * 80)
+    lines.append("")
+    lines.append(f"  Files checked: {len(results)}")
+    lines.append(f"  Damaged files: {len(damaged)}")
+    lines.append(
+        f"  Data checked: {checked_mb:.0f} MB in {elapsed:.1f}s "
+        f"({checked_mb / max(elapsed, 1e-9):.0f} MB/s)"
+    )
+    lines.append(f"  MD5 checked: {sum(1 for r in results if r.md5_ok is not None)} file(s)")
+
+    if damaged:
+        lines.append("")
+        lines.append("DAMAGED FILES:")
+        lines.append("-" * 80)
+        for result in damaged:
+            lines.append(f"\n{Path(result.filepath).name}")
+            lines.append(f"  Path: {result.filepath}")
+            lines.append(f"  {result.describe()}")
+
+    lines.append("")
+    lines.append("=" * 80)
+    return "\n".join(lines)
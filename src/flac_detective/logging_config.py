@@ -5,38 +5,44 @@ This module provides a unified logging setup for the entire application with:
 - Rich console output (when available)
 - File-based logging for persistence
 - Structured log formatting
+- Batched forwarding of worker process records to the parent's handlers
 """
 
+import importlib.util
 import logging
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from typing import Optional
 from datetime import datetime
 
-# Try to import Rich for beautiful console output
-try:
-    from rich.console import Console
-    from rich.logging import RichHandler
-    from rich.theme import Theme
-
-    # Custom theme for FLAC Detective
-    custom_theme = Theme(
-        {
-            "info": "dim cyan",
-            "warning": "yellow",
-            "error": "bold red",
-            "success": "bold green",
-            "fake": "bold red",
-            "suspicious": "bold yellow",
-            "authentic": "bold green",
-        }
-    )
-
-    console = Console(theme=custom_theme)
-    HAS_RICH = True
-except ImportError:
-    HAS_RICH = False
-    console = None
+# Rich is imported on first use (it is slow to import): only check it is installed
+HAS_RICH = importlib.util.find_spec("rich") is not None
+
+_console = None
+
+
+def get_console():
+    """Get the shared Rich console with the FLAC Detective theme (None without Rich)."""
+    global _console
+    if _console is None and HAS_RICH:
+        from rich.console import Console
+        from rich.theme import Theme
+
+        # Custom theme for FLAC Detective
+        custom_theme = Theme(
+            {
+                "info": "dim cyan",
+                "warning": "yellow",
+                "error": "bold red",
+                "success": "bold green",
+                "fake": "bold red",
+                "suspicious": "bold yellow",
+                "authentic": "bold green",
+            }
+        )
+        _console = Console(theme=custom_theme)
+    return _console
 
 
 class LogLevel:
@@ -49,6 +55,9 @@ class LogLevel:
         INFO: General informational messages about program flow.
               Used for file processing, analysis results, progress updates.
 
+        SUMMARY: One line per analyzed file (verdict and score) and run-level
+                 reports. Production level: keeps the log to a line per file.
+
         WARNING: Warnings about potential issues that don't prevent execution.
                  Used for missing metadata, unusual file formats, degraded quality.
 
@@ -61,11 +70,23 @@ class LogLevel:
 
     DEBUG = logging.DEBUG  # 10
     INFO = logging.INFO  # 20
+    SUMMARY = 25
     WARNING = logging.WARNING  # 30
     ERROR = logging.ERROR  # 40
     CRITICAL = logging.CRITICAL  # 50
 
 
+logging.addLevelName(LogLevel.SUMMARY, "SUMMARY")
+
+# Names accepted by --log-level
+LOG_LEVELS = {
+    "debug": LogLevel.DEBUG,
+    "info": LogLevel.INFO,
+    "summary": LogLevel.SUMMARY,
+    "warning": LogLevel.WARNING,
+}
+
+
 def setup_logging(
     output_dir: Optional[Path] = None,
     log_level: int = LogLevel.INFO,
@@ -137,9 +158,11 @@ def setup_logging(
     # Console Handler
     if enable_console_logging:
         if HAS_RICH:
+            from rich.logging import RichHandler
+
             # Rich Handler for beautiful console output
             rich_handler = RichHandler(
-                console=console,
+                console=get_console(),
                 show_time=True,
                 omit_repeated_times=False,
                 show_path=False,
@@ -204,3 +227,61 @@ def set_log_level(level: int) -> None:
 
     logger = logging.getLogger(__name__)
     logger.info(f"Log level changed to {logging.getLevelName(level)}")
+
+
+class BatchingQueueHandler(QueueHandler):
+    """Queue handler sending records in batches (lists).
+
+    Used in worker processes: records are formatted once (only those passing
+    the level check), buffered, and enqueued when the batch is full, when a
+    WARNING or worse is logged (so it survives a killed worker), or on
+    ``flush()`` (after each task).
+    """
+
+    def __init__(self, queue, batch_size: int = 200):
+        """Initialize the handler.
+
+        Args:
+            queue: Object with a ``put_nowait`` method receiving lists of records.
+            batch_size: Records buffered before a batch is sent.
+        """
+        super().__init__(queue)
+        self.batch_size = batch_size
+        self.buffer: list = []
+
+    def emit(self, record: logging.LogRecord):
+        """Buffer a record, sending the batch if full or the record is a warning."""
+        try:
+            self.buffer.append(self.prepare(record))
+        except Exception:
+            self.handleError(record)
+            return
+        if len(self.buffer) >= self.batch_size or record.levelno >= logging.WARNING:
+            self.flush()
+
+    def flush(self):
+        """Send the buffered records."""
+        self.acquire()
+        try:
+            batch, self.buffer = self.buffer, []
+            if batch:
+                try:
+                    self.enqueue(batch)
+                except Exception:
+                    pass  # Parent gone: records are dropped
+        finally:
+            self.release()
+
+    def close(self):
+        """Send the buffered records and close the handler."""
+        self.flush()
+        super().close()
+
+
+class BatchQueueListener(QueueListener):
+    """Queue listener writing the batches of a ``BatchingQueueHandler``."""
+
+    def handle(self, batch: list):
+        """Pass each record of a batch to the handlers."""
+        for record in batch:
+            super().handle(record)
@@ -13,51 +13,41 @@ Multi-criteria detection:
 import logging
 import os
 import sys
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
+from concurrent.futures import FIRST_COMPLETED, wait
 from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import Optional
-
-# RICH INTEGRATION
-try:
-    from rich.console import Console
-    from rich.logging import RichHandler
-    from rich.progress import (
-        BarColumn,
-        Progress,
-        SpinnerColumn,
-        TaskProgressColumn,
-        TextColumn,
-        TimeRemainingColumn,
-    )
-    from rich.theme import Theme
-
-    # Custom theme for FLAC Detective
-    custom_theme = Theme(
-        {
-            "info": "dim cyan",
-            "warning": "yellow",
-            "error": "bold red",
-            "success": "bold green",
-            "fake": "bold red",
-            "suspicious": "bold yellow",
-            "authentic": "bold green",
-        }
-    )
-
-    console = Console(theme=custom_theme)
-    HAS_RICH = True
-except ImportError:
-    HAS_RICH = False
-    console = None
-
-from .analysis import FLACAnalyzer
-from .analysis.diagnostic_tracker import get_tracker, reset_tracker
+from typing import TYPE_CHECKING, Optional
+
+# Only light modules at import time: scanning, resuming and reporting start
+# fast. The analysis stack (numpy, scipy, soundfile, mutagen) is imported by
+# the workers (see WORKER_PRELOAD), Rich and optional stages on first use.
+from . import metrics, tracing
+from .metrics import MetricsServer, ScanMetrics
+from .analysis.diagnostic_tracker import IssueType, get_tracker, reset_tracker
 from .colors import Colors, colorize
-from .config import analysis_config
+from .config import analysis_config, repair_config, triage_config
+from .logging_config import HAS_RICH, LOG_LEVELS, LogLevel, get_console
+from .profile import DEFAULT_PROFILE_PATH, current_settings, init_worker, load_profile
 from .reporting import TextReporter
+from .schedule import POLICIES, order_files, task_deadline
+from .staging import Prefetcher, get_staging_area
+from .threads import export_budget, thread_allowance
 from .tracker import ProgressTracker
 from .utils import LOGO, find_flac_files, find_non_flac_audio_files
+from .worker_pool import TaskTimeoutError, WorkerCrashedError, WorkerPool
+
+if TYPE_CHECKING:
+    from .analysis import FLACAnalyzer
+    from .analysis.new_scoring.profiler import RuleProfiler
+
+# Modules analysis workers import once at start (in the fork server where available)
+WORKER_PRELOAD = (
+    "flac_detective.analysis.analyzer",
+    "flac_detective.analysis.warmup",
+    "scipy.ndimage",
+)
 
 # Fix Windows console encoding for UTF-8 support (Standard approach)
 if sys.platform == "win32":
@@ -97,9 +87,11 @@ def setup_logging(output_dir: Path) -> Path:
 
     # Console Handler
     if HAS_RICH:
+        from rich.logging import RichHandler
+
         # Rich Handler for beautiful output
         rich_handler = RichHandler(
-            console=console,
+            console=get_console(),
             show_time=True,
             omit_repeated_times=False,
             show_path=False,
@@ -120,7 +112,7 @@ def setup_logging(output_dir: Path) -> Path:
     if not HAS_RICH:
         logger.info(f"Console log will be saved to: {log_file}")
     else:
-        console.print(f"[dim]Log file: {log_file}[/dim]")
+        get_console().print(f"[dim]Log file: {log_file}[/dim]")
 
     return log_file
 
@@ -236,11 +228,14 @@ def setup_logging(output_dir: Path) -> Path:
     log_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     log_file = output_dir / f"flac_console_log_{log_timestamp}.txt"
 
+    level = LOG_LEVELS[analysis_config.LOG_LEVEL]
     file_handler = logging.FileHandler(log_file, encoding="utf-8")
-    file_handler.setLevel(logging.INFO)
+    file_handler.setLevel(level)
     formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s", datefmt="%H:%M:%S")
     file_handler.setFormatter(formatter)
-    logging.getLogger().addHandler(file_handler)
+    root_log = logging.getLogger()
+    root_log.setLevel(level)
+    root_log.addHandler(file_handler)
 
     logger.info(f"Console log will be saved to: {log_file}")
     return log_file
@@ -252,9 +247,96 @@ def parse_arguments() -> list[Path]:
     Returns:
         List of paths to analyze.
     """
-    if len(sys.argv) > 1:
+    args = sys.argv[1:]
+    # Runtime profile first: the flags below override it
+    profile_path = DEFAULT_PROFILE_PATH if DEFAULT_PROFILE_PATH.exists() else None
+    if "--profile" in args:
+        index = args.index("--profile")
+        try:
+            profile_path = Path(args[index + 1])
+        except IndexError:
+            logger.error("--profile requires a file path")
+            sys.exit(1)
+        del args[index : index + 2]
+    if profile_path is not None:
+        try:
+            load_profile(profile_path)
+        except ValueError as e:
+            logger.error(str(e))
+            sys.exit(1)
+    if "--triage" in args:
+        # Cheap triage stage, full analysis only for uncertain files
+        triage_config.ENABLED = True
+        args = [arg for arg in args if arg != "--triage"]
+    if "--trace" in args:
+        # Stage timing spans: Chrome trace file and per-stage percentiles
+        analysis_config.TRACE = True
+        args = [arg for arg in args if arg != "--trace"]
+    if "--profile-rules" in args:
+        # Rule cost / short-circuit profile with threshold what-if estimates
+        analysis_config.PROFILE_RULES = True
+        args = [arg for arg in args if arg != "--profile-rules"]
+    if "--metrics-port" in args:
+        # Live Prometheus metrics for long scans
+        index = args.index("--metrics-port")
+        try:
+            analysis_config.METRICS_PORT = int(args[index + 1])
+        except (IndexError, ValueError):
+            logger.error("--metrics-port requires a port number")
+            sys.exit(1)
+        del args[index : index + 2]
+    if "--log-level" in args:
+        # Log file detail, "summary" (default) keeps one line per file
+        index = args.index("--log-level")
+        level = args[index + 1].lower() if index + 1 < len(args) else None
+        if level not in LOG_LEVELS:
+            logger.error(f"--log-level requires one of: {', '.join(LOG_LEVELS)}")
+            sys.exit(1)
+        analysis_config.LOG_LEVEL = level
+        del args[index : index + 2]
+    if "--staging-dir" in args:
+        # Directory of the staged copies (default: system temp directory)
+        index = args.index("--staging-dir")
+        try:
+            analysis_config.STAGING_DIR = args[index + 1]
+        except IndexError:
+            logger.error("--staging-dir requires a directory path")
+            sys.exit(1)
+        del args[index : index + 2]
+    if "--staging-mb" in args:
+        # Budget of the staged copies
+        index = args.index("--staging-mb")
+        try:
+            analysis_config.STAGING_MB = int(args[index + 1])
+        except (IndexError, ValueError):
+            logger.error("--staging-mb requires a size in MB")
+            sys.exit(1)
+        del args[index : index + 2]
+    if "--schedule" in args:
+        # Submission order of the files
+        index = args.index("--schedule")
+        policy = args[index + 1].lower() if index + 1 < len(args) else None
+        if policy not in POLICIES:
+            logger.error(f"--schedule requires one of: {', '.join(POLICIES)}")
+            sys.exit(1)
+        analysis_config.SCHEDULE = policy
+        del args[index : index + 2]
+    if "--integrity-only" in args:
+        # Frame CRC check of every file instead of the analysis
+        analysis_config.INTEGRITY_ONLY = True
+        args = [arg for arg in args if arg != "--integrity-only"]
+    if "--integrity-md5" in args:
+        # Integrity check: also decode the audio and check the STREAMINFO MD5
+        analysis_config.INTEGRITY_MD5 = True
+        args = [arg for arg in args if arg != "--integrity-md5"]
+    if "--repair-dry-run" in args:
+        # Report the files the repair stage would modify, without touching them
+        repair_config.DRY_RUN = True
+        args = [arg for arg in args if arg != "--repair-dry-run"]
+
+    if args:
         # Command line mode: all arguments are paths
-        paths = [Path(arg) for arg in sys.argv[1:]]
+        paths = [Path(arg) for arg in args]
         invalid_paths = [p for p in paths if not p.exists()]
         if invalid_paths:
             logger.error(f"Invalid paths : {', '.join(str(p) for p in invalid_paths)}")
@@ -278,25 +360,47 @@ def scan_files(paths: list[Path]) -> tuple[list[Path], list[Path]]:
     all_flac_files = []
     all_non_flac_files = []
 
-    for path in paths:
-        if path.is_file() and path.suffix.lower() == ".flac":
-            # It's a FLAC file directly
-            all_flac_files.append(path)
-            logger.info(f"File added : {path.name}")
-        elif path.is_dir():
-            # It's a folder, scan recursively for FLAC
-            flac_files = find_flac_files(path)
-            all_flac_files.extend(flac_files)
-
-            # Also scan for non-FLAC audio files
-            non_flac_files = find_non_flac_audio_files(path)
-            all_non_flac_files.extend(non_flac_files)
-        else:
-            logger.warning(f"Ignored (not a FLAC file or folder) : {path}")
+    with tracing.span("scan"):
+        for path in paths:
+            if path.is_file() and path.suffix.lower() == ".flac":
+                # It's a FLAC file directly
+                all_flac_files.append(path)
+                logger.info(f"File added : {path.name}")
+            elif path.is_dir():
+                # It's a folder, scan recursively for FLAC
+                flac_files = find_flac_files(path)
+                all_flac_files.extend(flac_files)
+
+                # Also scan for non-FLAC audio files
+                non_flac_files = find_non_flac_audio_files(path)
+                all_non_flac_files.extend(non_flac_files)
+            else:
+                logger.warning(f"Ignored (not a FLAC file or folder) : {path}")
 
     return all_flac_files, all_non_flac_files
 
 
+def _create_progress():
+    """Create the Rich progress bar used by the analysis and repair stages."""
+    from rich.progress import (
+        BarColumn,
+        Progress,
+        SpinnerColumn,
+        TaskProgressColumn,
+        TextColumn,
+        TimeRemainingColumn,
+    )
+
+    return Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        TaskProgressColumn(),
+        TimeRemainingColumn(),
+        console=get_console(),
+    )
+
+
 def _get_score_icon(score: int) -> str:
     """Get colored icon based on score.
 
@@ -355,12 +459,12 @@ def _log_formatted_result(result: dict, processed: int, total: int):
         # We rely on RichHandler for the timestamp and base formatting
         # Here we just construct the nice message content
         msg = f"[{style}]{icon} {verdict:<12} {score:>3}/100[/]  {filename}"
-        logger.info(msg, extra={"markup": True})
+        logger.log(LogLevel.SUMMARY, msg, extra={"markup": True})
     else:
         # Fallback for standard logging
         score_str = f"{score}/100"
         msg = f"[{processed:03d}/{total:03d}] {icon} {verdict:<12} {score_str:>7}  {filename}"
-        logger.info(msg)
+        logger.log(LogLevel.SUMMARY, msg)
 
 
 def _create_non_flac_result(non_flac_file: Path) -> dict:
@@ -406,71 +510,247 @@ def _create_non_flac_result(non_flac_file: Path) -> dict:
     }
 
 
+def _create_timeout_result(filepath: Path, error: Exception) -> dict:
+    """Create a result dictionary for a file whose analysis was aborted.
+
+    The diagnostic issues recorded before the worker was stopped reach the
+    diagnostic tracker with the task (see ``_process_flac_files``).
+
+    Args:
+        filepath: Path to the FLAC file.
+        error: TaskTimeoutError or WorkerCrashedError raised by the pool.
+
+    Returns:
+        Result dictionary.
+    """
+    tracker = get_tracker()
+    if isinstance(error, TaskTimeoutError):
+        verdict = "TIMEOUT"
+        tracker.record_issue(str(filepath), IssueType.TIMEOUT, str(error))
+    else:
+        verdict = "ERROR"
+        tracker.record_issue(str(filepath), IssueType.CORRUPTED, str(error))
+
+    return {
+        "filepath": str(filepath),
+        "filename": filepath.name,
+        "score": 0,
+        "verdict": verdict,
+        "confidence": "N/A",
+        "reason": f"Analysis aborted: {error}",
+        "cutoff_freq": 0,
+        "sample_rate": "N/A",
+        "bit_depth": "N/A",
+        "encoder": "N/A",
+        "duration_mismatch": "Error",
+        "duration_metadata": "N/A",
+        "duration_real": "N/A",
+        "duration_diff": "N/A",
+        "has_clipping": False,
+        "clipping_severity": "error",
+        "clipping_percentage": 0.0,
+        "has_dc_offset": False,
+        "dc_offset_severity": "error",
+        "dc_offset_value": 0.0,
+        "is_corrupted": True,
+        "corruption_error": str(error),
+        "has_silence_issue": False,
+        "silence_issue_type": "error",
+        "is_fake_high_res": False,
+        "estimated_bit_depth": 0,
+        "is_upsampled": False,
+        "suspected_original_rate": 0,
+        "repair_candidate": tracker.has_issue(str(filepath), IssueType.REPAIR_PENDING),
+    }
+
+
 def _process_flac_files(
-    files_to_process: list[Path], tracker: ProgressTracker, analyzer: FLACAnalyzer
+    files_to_process: list[Path],
+    tracker: ProgressTracker,
+    analyzer: "FLACAnalyzer",
+    trace: Optional[tracing.TraceCollector] = None,
+    scan_metrics: Optional[ScanMetrics] = None,
+    rule_profiler: Optional["RuleProfiler"] = None,
 ):
     """Process FLAC files with multi-processing and rich progress.
 
+    With triage enabled, every file first goes through the cheap triage stage;
+    files left in the uncertain band are queued for the full analysis in the
+    same worker pool.
+
+    Files are submitted in the ``SCHEDULE`` order (largest estimated cost
+    first by default, see ``schedule.py``), through the prefetch stage
+    (``PREFETCH_DEPTH``) which stages them ahead of the workers.
+
+    Each file has a wall-clock deadline (``TASK_TIMEOUT``, scaled with its
+    decoded size, see ``schedule.task_deadline``): a stuck worker is killed
+    and replaced, and the file reported as TIMEOUT. Workers are
+    recycled after ``MAX_TASKS_PER_WORKER`` files or above
+    ``MAX_WORKER_RSS_MB``.
+
     Args:
         files_to_process: List of FLAC files to analyze.
         tracker: Progress tracker instance.
         analyzer: FLAC analyzer instance.
+        trace: Collector for the timing spans shipped back by the workers.
+        scan_metrics: Live metrics fed with each result and the pool gauges.
+        rule_profiler: Rule profiler fed with the same timing spans.
     """
     total_files = len(files_to_process)
-
-    # Define Progress Bar Columns
-    columns = [
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        BarColumn(),
-        TaskProgressColumn(),
-        TimeRemainingColumn(),
-    ]
+    use_triage = analyzer.triage.ENABLED
 
     # Use Rich Progress if available
     if HAS_RICH:
-        progress_ctx = Progress(*columns, console=console)
+        progress_ctx = _create_progress()
     else:
         # Dummy context manager for no-rich mode
-        from contextlib import nullcontext
-
         progress_ctx = nullcontext()
 
-    with ProcessPoolExecutor(max_workers=analysis_config.MAX_WORKERS) as executor:
-        futures = {executor.submit(analyzer.analyze_file, f): f for f in files_to_process}
+    # Thread budget: exported before the pool (and its fork server) starts
+    threads = analysis_config.THREADS_PER_WORKER or thread_allowance(
+        min(analysis_config.MAX_WORKERS, total_files)
+    )
+    export_budget(threads)
+    logger.info(f"Thread budget: {threads} thread(s) per worker")
+
+    root_log = logging.getLogger()
+    pool = WorkerPool(
+        max_workers=analysis_config.MAX_WORKERS,
+        task_timeout=analysis_config.TASK_TIMEOUT,
+        max_tasks_per_worker=analysis_config.MAX_TASKS_PER_WORKER,
+        max_rss_mb=analysis_config.MAX_WORKER_RSS_MB,
+        # Workers start from the defaults: hand them the parent's settings
+        initializer=partial(
+            init_worker,
+            current_settings(),
+            tracing.is_enabled(),
+            analysis_config.WARM_WORKERS,
+            threads,
+        ),
+        # Worker records go through the parent's log handlers, once configured
+        log_level=root_log.getEffectiveLevel() if root_log.handlers else None,
+        preload=WORKER_PRELOAD,
+    )
+    if scan_metrics is not None:
+        scan_metrics.pool = pool
+    # Worker and parent counters, for the live metrics and the staging summary
+    counters = scan_metrics if scan_metrics is not None else ScanMetrics()
+    # Prefetch stage: I/O threads stage the next files while the workers
+    # analyze the current ones (the triage stage reads the sources itself)
+    prefetcher = None
+    if analysis_config.PREFETCH_DEPTH:
+        prefetcher = Prefetcher(
+            slots=analysis_config.MAX_WORKERS + analysis_config.PREFETCH_DEPTH,
+            max_bytes=analysis_config.PREFETCH_MB * 1024 * 1024,
+            threads=analysis_config.PREFETCH_THREADS,
+            copy=analysis_config.STAGING == "copy",
+        )
+    futures = {}
+
+    def submit_analysis(filepath: Path):
+        if prefetcher is None:
+            future = pool.submit(analyzer.analyze_file, filepath, timeout=task_deadline(filepath))
+            futures[future] = filepath
+        else:
+            prefetcher.add(filepath)
+
+    with pool, prefetcher or nullcontext():
+        with tracing.span("submit"):
+            ordered = order_files(files_to_process, analysis_config.SCHEDULE)
+            for f in ordered:
+                if use_triage:
+                    futures[pool.submit(analyzer.triage_file, f)] = f
+                else:
+                    submit_analysis(f)
+        escalated: set[Path] = set()
+        diagnostics = get_tracker()
 
         processed_count = 0
 
-        # Start Progress Block
-        if HAS_RICH:
-            with progress_ctx as progress:
+        with progress_ctx as progress:
+            if progress is not None:
                 task_id = progress.add_task("[cyan]Analyzing audio files...", total=total_files)
 
-                for future in as_completed(futures):
-                    result = future.result()
-                    tracker.add_result(result)
+            while futures or (prefetcher is not None and prefetcher.pending):
+                staging = list(prefetcher.pending) if prefetcher is not None else []
+                done, _ = wait([*futures, *staging], return_when=FIRST_COMPLETED)
+                for future in done:
+                    if prefetcher is not None and future in prefetcher.pending:
+                        # Staged: hand the local copy to a worker
+                        filepath, staged = prefetcher.staged(future)
+                        analysis = pool.submit(
+                            analyzer.analyze_file, filepath, staged, timeout=task_deadline(filepath)
+                        )
+                        futures[analysis] = filepath
+                        continue
+                    filepath = futures.pop(future)
+                    if prefetcher is not None:
+                        prefetcher.release(filepath)
+                    # Merge the issues the worker recorded for this file
+                    diagnostics.add_issues(future.issues)
+                    if trace is not None:
+                        trace.add(future.spans)
+                    if rule_profiler is not None:
+                        rule_profiler.add(future.spans)
+                    counters.merge(future.counters)
+                    try:
+                        result = future.result()
+                    except (TaskTimeoutError, WorkerCrashedError) as e:
+                        logger.error(f"Analysis aborted {filepath.name}: {e}")
+                        result = _create_timeout_result(filepath, e)
+
+                    # Stage 2 queue: full analysis for files the triage could not settle
+                    if result.get("triage") == "escalated" and filepath not in escalated:
+                        escalated.add(filepath)
+                        submit_analysis(filepath)
+                        continue
+                    if filepath in escalated:
+                        result["triage"] = "escalated"
+                    if result.get("verdict") not in ("ERROR", "TIMEOUT"):
+                        diagnostics.increment_files_analyzed()
+
+                    with tracing.span("tracker"):
+                        tracker.add_result(result)
                     processed_count += 1
+                    if scan_metrics is not None:
+                        scan_metrics.record_result(
+                            result, diagnostics.get_issues_for_file(str(filepath))
+                        )
 
                     # Update Progress
-                    progress.update(task_id, advance=1)
+                    if progress is not None:
+                        progress.update(task_id, advance=1)
 
                     # Log result (will appear above progress bar thanks to RichHandler)
                     _log_formatted_result(result, processed_count, total_files)
 
                     # Periodic save
                     if processed_count % analysis_config.SAVE_INTERVAL == 0:
-                        tracker.save()
-        else:
-            # Fallback for standard console
-            for future in as_completed(futures):
-                result = future.result()
-                tracker.add_result(result)
-                processed_count += 1
-
-                _log_formatted_result(result, processed_count, total_files)
-
-                if processed_count % analysis_config.SAVE_INTERVAL == 0:
-                    tracker.save()
+                        with tracing.span("tracker"):
+                            tracker.save()
+                # Prefetch stage counters (parent process)
+                counters.merge(metrics.collect())
+
+    # Copies of the workers killed at the deadline or recycled mid-file
+    get_staging_area().sweep_orphans()
+    staged_mb = counters.total("staged_bytes_total") / 1e6
+    fallbacks = counters.total("staging_fallbacks_total")
+    if staged_mb or fallbacks:
+        logger.info(
+            f"Staging: {staged_mb:.0f} MB copied, "
+            f"{counters.total('staging_wait_seconds_total'):.1f}s waiting for room, "
+            f"{fallbacks:.0f} file(s) read in place"
+        )
+    if pool.tasks_timed_out or pool.workers_recycled:
+        logger.info(
+            f"POOL: {pool.tasks_timed_out} file(s) timed out, "
+            f"{pool.workers_recycled} worker(s) recycled"
+        )
+    if use_triage and total_files:
+        logger.info(
+            f"Triage: {len(escalated)}/{total_files} files escalated to full analysis "
+            f"({len(escalated) / total_files:.0%})"
+        )
 
 
 def _add_non_flac_results(all_non_flac_files: list[Path], tracker: ProgressTracker):
@@ -502,7 +782,6 @@ def run_analysis_loop(
         List of result dictionaries.
     """
     # Initialization
-    analyzer = FLACAnalyzer(sample_duration=analysis_config.SAMPLE_DURATION)
     tracker = ProgressTracker(progress_file=output_dir / "progress.json")
 
     # Filter already processed files
@@ -520,11 +799,61 @@ def run_analysis_loop(
         logger.info(f"Multi-processing: {analysis_config.MAX_WORKERS} workers")
         print()
 
+        # Copies left behind by crashed runs
+        swept = get_staging_area().sweep_orphans()
+        if swept:
+            logger.info(f"Removed {swept} staged file(s) left by interrupted runs")
+
+        # Only needed (and imported) when there is something to analyze
+        from .analysis import FLACAnalyzer
+
+        analyzer = FLACAnalyzer(sample_duration=analysis_config.SAMPLE_DURATION)
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        trace = None
+        rule_profiler = None
+        if analysis_config.TRACE or analysis_config.PROFILE_RULES:
+            tracing.enable()
+        if analysis_config.TRACE:
+            trace_path = output_dir / f"flac_trace_{timestamp}.json"
+            trace = tracing.TraceCollector(trace_path)
+        if analysis_config.PROFILE_RULES:
+            from .analysis.new_scoring.profiler import RuleProfiler
+
+            rule_profiler = RuleProfiler()
+
+        scan_metrics = None
+        metrics_server = None
+        if analysis_config.METRICS_PORT:
+            scan_metrics = ScanMetrics()
+            metrics_server = MetricsServer(scan_metrics, analysis_config.METRICS_PORT)
+
         # Multi-process analysis
-        _process_flac_files(files_to_process, tracker, analyzer)
+        try:
+            _process_flac_files(
+                files_to_process, tracker, analyzer, trace, scan_metrics, rule_profiler
+            )
+        finally:
+            if trace is not None:
+                # Parent-side stages (submit, tracker)
+                trace.add(tracing.collect())
+                trace.close()
+            if metrics_server is not None:
+                metrics_server.close()
+
+        if trace is not None:
+            logger.log(LogLevel.SUMMARY, f"\nStage timings:\n{trace.format_summary()}")
+            logger.log(LogLevel.SUMMARY, f"Chrome trace saved to: {trace.trace_path.name}")
+        if rule_profiler is not None:
+            report = rule_profiler.format_report()
+            profile_path = output_dir / f"flac_rule_profile_{timestamp}.txt"
+            profile_path.write_text(report + "\n", encoding="utf-8")
+            logger.log(LogLevel.SUMMARY, f"\n{report}")
+            logger.log(LogLevel.SUMMARY, f"Rule profile saved to: {profile_path.name}")
 
         # Final save
-        tracker.save()
+        with tracing.span("tracker"):
+            tracker.save()
 
     # Add non-FLAC audio files to results
     _add_non_flac_results(all_non_flac_files, tracker)
@@ -535,6 +864,105 @@ def run_analysis_loop(
     return tracker.get_results()
 
 
+def run_deferred_repairs(results: list[dict], output_dir: Path) -> Optional[Path]:
+    """Repair the files whose decoding failed during the scan.
+
+    Runs after the analysis with its own (small, low-priority) worker pool and
+    progress bar, and writes a repair report (a plan only with --repair-dry-run).
+
+    Args:
+        results: List of analysis results.
+        output_dir: Directory to save the repair report.
+
+    Returns:
+        Path to the repair report, or None if there was nothing to repair.
+    """
+    candidates = [r["filepath"] for r in results if r.get("repair_candidate")]
+    if not candidates:
+        return None
+
+    from .repair import generate_repair_report, run_repair_stage
+
+    dry_run = repair_config.DRY_RUN
+    if HAS_RICH:
+        progress_ctx = _create_progress()
+    else:
+        progress_ctx = nullcontext()
+
+    with progress_ctx as progress:
+        on_outcome = None
+        if progress is not None:
+            description = "Planning repairs..." if dry_run else "Repairing damaged files..."
+            task_id = progress.add_task(f"[magenta]{description}", total=len(candidates))
+
+            def on_outcome(outcome):
+                progress.update(task_id, advance=1)
+
+        outcomes = run_repair_stage(candidates, dry_run=dry_run, on_outcome=on_outcome)
+
+    report_path = output_dir / f"flac_repair_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+    with open(report_path, "w", encoding="utf-8") as f:
+        f.write(generate_repair_report(outcomes, dry_run))
+
+    if dry_run:
+        logger.info(f"{len(outcomes)} file(s) would be repaired (dry run)")
+    else:
+        repaired = sum(1 for o in outcomes if o.status == "repaired")
+        logger.info(f"Repaired {repaired}/{len(outcomes)} file(s)")
+    logger.info(f"Repair report saved to: {report_path.name}")
+    return report_path
+
+
+def run_integrity_scan(all_flac_files: list[Path], output_dir: Path, log_file: Path):
+    """``--integrity-only``: check the frame CRCs of every file and report the damaged ones.
+
+    Args:
+        all_flac_files: List of FLAC files to check.
+        output_dir: Directory to save the integrity report.
+        log_file: Path to the console log file.
+    """
+    import time
+
+    from .integrity import generate_integrity_report, run_integrity_stage
+
+    if HAS_RICH:
+        progress_ctx = _create_progress()
+    else:
+        progress_ctx = nullcontext()
+
+    started = time.monotonic()
+    with progress_ctx as progress:
+        on_result = None
+        if progress is not None:
+            task_id = progress.add_task("[cyan]Checking integrity...", total=len(all_flac_files))
+
+            def on_result(result):
+                progress.update(task_id, advance=1)
+                if not result.ok:
+                    logger.warning(f"DAMAGED {Path(result.filepath).name}: {result.describe()}")
+
+        results = run_integrity_stage(all_flac_files, on_result=on_result)
+    elapsed = time.monotonic() - started
+
+    report_path = output_dir / f"flac_integrity_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+    with open(report_path, "w", encoding="utf-8") as f:
+        f.write(generate_integrity_report(results, elapsed))
+
+    damaged = sum(1 for r in results if not r.ok)
+    log_file_kept = _cleanup_console_log_if_empty(log_file)
+
+    print()
+    print(colorize("=" * 70, Colors.CYAN))
+    print(f"  {colorize('INTEGRITY CHECK COMPLETE', Colors.BRIGHT_GREEN)}")
+    print(colorize("=" * 70, Colors.CYAN))
+    print(f"  FLAC files checked: {len(results)}")
+    print(f"  {colorize('Damaged files', Colors.RED if damaged else Colors.GREEN)}: {damaged}")
+    print(f"  Integrity report: {report_path.name}")
+    if log_file_kept:
+        print(f"  Console log: {log_file.name}")
+    print(colorize("=" * 70, Colors.CYAN))
+
+
 def _cleanup_console_log_if_empty(log_file: Path) -> bool:
     """Delete console log file if it's empty or contains no errors/warnings.
 
@@ -567,7 +995,8 @@ def _cleanup_console_log_if_empty(log_file: Path) -> bool:
             return False
 
         # Check if there are any ERROR or WARNING messages
-        has_errors = "ERROR" in content or "WARNING" in content
+        # (level field of the log format: verdicts and file names may contain the words)
+        has_errors = " - ERROR - " in content or " - WARNING - " in content
 
         if not has_errors:
             # No errors or warnings, safe to delete
@@ -605,7 +1034,8 @@ def generate_final_report(
 
     output_file = output_dir / f"flac_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
     reporter = TextReporter()
-    reporter.generate_report(results, output_file, scan_paths=input_paths)
+    with tracing.span("report"):
+        reporter.generate_report(results, output_file, scan_paths=input_paths)
 
     # Generate diagnostic report if there were issues
     tracker = get_tracker()
@@ -630,12 +1060,12 @@ def generate_final_report(
     suspicious_flac = [
         r
         for r in results
-        if r.get("score", 0) >= 50 and r.get("verdict") not in ["NON_FLAC", "ERROR"]
+        if r.get("score", 0) >= 50 and r.get("verdict") not in ["NON_FLAC", "ERROR", "TIMEOUT"]
     ]
     fake_certain = [
         r
         for r in results
-        if r.get("score", 0) >= 80 and r.get("verdict") not in ["NON_FLAC", "ERROR"]
+        if r.get("score", 0) >= 80 and r.get("verdict") not in ["NON_FLAC", "ERROR", "TIMEOUT"]
     ]
     non_flac_count = len(all_non_flac_files)
 
@@ -659,6 +1089,18 @@ def generate_final_report(
             f"  {colorize('⚠️  Files with reading issues', Colors.YELLOW)}: {stats['files_with_issues']} ({stats['critical_failures']} critical)"
         )
 
+    timed_out = sum(1 for r in results if r.get("verdict") == "TIMEOUT")
+    if timed_out:
+        print(f"  {colorize('Files aborted (deadline exceeded)', Colors.YELLOW)}: {timed_out}")
+
+    triaged = [r for r in results if r.get("triage")]
+    if triaged:
+        escalated = sum(1 for r in triaged if r["triage"] == "escalated")
+        print(
+            f"  Triage: {escalated}/{len(triaged)} files escalated to full analysis "
+            f"({escalated / len(triaged):.0%})"
+        )
+
     print(f"  Text report: {output_file.name}")
     if diagnostic_report_path:
         print(f"  {colorize('Diagnostic report', Colors.YELLOW)}: {diagnostic_report_path.name}")
@@ -667,8 +1109,53 @@ def generate_final_report(
     print(colorize("=" * 70, Colors.CYAN))
 
 
+def run_bench_command(args: list[str]):
+    """``flac-detective bench``: calibrate this host and write a runtime profile.
+
+    Options: ``--sample DIR`` (also measure I/O and decoding on files of a
+    real library), ``--output FILE`` (default: the default profile path) and
+    ``--max-workers N`` (largest worker count to try).
+    """
+    import tempfile
+
+    from .bench import calibrate, format_calibration, recommend
+    from .profile import save_profile
+
+    options = {"--sample": None, "--output": str(DEFAULT_PROFILE_PATH), "--max-workers": None}
+    while args:
+        option = args.pop(0)
+        if option not in options or not args:
+            logger.error(
+                "Usage: flac-detective bench [--sample DIR] [--output FILE] [--max-workers N]"
+            )
+            sys.exit(1)
+        options[option] = args.pop(0)
+
+    library = Path(options["--sample"]) if options["--sample"] else None
+    if library is not None and not library.is_dir():
+        logger.error(f"Invalid sample directory: {library}")
+        sys.exit(1)
+    max_workers = int(options["--max-workers"]) if options["--max-workers"] else None
+
+    print(LOGO)
+    print("Calibrating (a few minutes)...")
+    with tempfile.TemporaryDirectory(prefix="flac_detective_bench_") as work_dir:
+        measurements = calibrate(Path(work_dir), library, max_workers)
+    settings = recommend(measurements)
+    print(format_calibration(measurements, settings))
+
+    profile_path = save_profile(settings, Path(options["--output"]), measurements)
+    print(f"\nProfile written to {profile_path}")
+    if profile_path != DEFAULT_PROFILE_PATH:
+        print(f"Use it with: flac-detective --profile {profile_path} <paths>")
+
+
 def main():
     """Main function."""
+    if sys.argv[1:2] == ["bench"]:
+        run_bench_command(sys.argv[2:])
+        return
+
     # Reset diagnostic tracker at the start of analysis
     reset_tracker()
 
@@ -694,8 +1181,15 @@ def main():
 
     log_file = setup_logging(output_dir)
 
+    if analysis_config.INTEGRITY_ONLY:
+        run_integrity_scan(all_flac_files, output_dir, log_file)
+        return
+
     results = run_analysis_loop(all_flac_files, all_non_flac_files, output_dir)
 
+    # Deferred repairs of files that failed to decode during the scan
+    run_deferred_repairs(results, output_dir)
+
     generate_final_report(results, output_dir, all_flac_files, all_non_flac_files, log_file, paths)
 
 
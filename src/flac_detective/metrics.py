@@ -0,0 +1,209 @@
+"""Live scan metrics in the Prometheus text format.
+
+Analysis code counts events with ``inc("name", value, label=...)`` into a
+per-process buffer (cheap, always on). Worker processes ship their counters
+back with each task result (see ``worker_pool``); the parent merges them in
+``ScanMetrics`` together with per-verdict and per-issue counters and the
+pool gauges (in-flight tasks, queue depth, worker RSS).
+
+``MetricsServer`` exposes ``ScanMetrics`` on ``http://127.0.0.1:<port>/metrics``
+from a background thread (opt-in, ``--metrics-port``), so long scans can be
+scraped and alerted on.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "flac_detective_"
+
+Labels = Tuple[Tuple[str, str], ...]
+CounterKey = Tuple[str, Labels]
+
+# Metric name -> (type, help)
+METRIC_HELP: Dict[str, Tuple[str, str]] = {
+    "files_processed_total": ("counter", "Files processed, by verdict."),
+    "files_per_second": ("gauge", "Average files processed per second since the scan started."),
+    "decoded_bytes_total": ("counter", "Bytes of PCM audio decoded."),
+    "decoded_megabytes_per_second": ("gauge", "Average decoded MB/s since the scan started."),
+    "bytes_read_total": ("counter", "Bytes of FLAC files read."),
+    "staged_bytes_total": ("counter", "Bytes of FLAC files copied to the staging area, by stage."),
+    "staging_wait_seconds_total": ("counter", "Time spent waiting for room in the staging area."),
+    "staging_fallbacks_total": ("counter", "Files read in place for lack of staging room."),
+    "md5_checks_total": (
+        "counter",
+        "Decoded audio checked against the STREAMINFO MD5, by outcome.",
+    ),
+    "copy_verifications_total": (
+        "counter",
+        "Staged copies compared with a second read of the source, by outcome.",
+    ),
+    "tasks_in_flight": ("gauge", "Tasks currently running in the worker pool."),
+    "queue_depth": ("gauge", "Tasks waiting for a worker."),
+    "worker_rss_bytes": ("gauge", "Resident memory of each worker process."),
+    "rule_executions_total": ("counter", "Scoring rule executions, by rule."),
+    "short_circuits_total": ("counter", "Rule engine early exits, by kind."),
+    "decode_retries_total": ("counter", "Decoder retries after temporary errors."),
+    "decode_spills_total": ("counter", "Files decoded into a memory-mapped temporary file."),
+    "parallel_decodes_total": ("counter", "Files decoded by several threads, by outcome."),
+    "diagnostic_issues_total": ("counter", "Diagnostic issues recorded, by type."),
+    "tasks_timed_out_total": ("counter", "Files aborted at the per-file deadline."),
+    "workers_recycled_total": ("counter", "Worker processes recycled."),
+}
+
+_counters: Dict[CounterKey, float] = {}
+_lock = threading.Lock()
+
+
+def inc(name: str, value: float = 1.0, **labels: Any):
+    """Increment a counter of the current process.
+
+    Args:
+        name: Metric name without prefix (e.g. "rule_executions_total").
+        value: Increment.
+        **labels: Label values.
+    """
+    key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0.0) + value
+
+
+def collect() -> Dict[CounterKey, float]:
+    """Take the counters of the current process accumulated since the last call."""
+    global _counters
+    with _lock:
+        counters, _counters = _counters, {}
+    return counters
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_sample(name: str, labels: Labels, value: float) -> str:
+    label_str = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+    if label_str:
+        label_str = "{" + label_str + "}"
+    return f"{PREFIX}{name}{label_str} {value:g}"
+
+
+class ScanMetrics:
+    """Scan-wide metrics, updated by the main loop and read by the HTTP thread."""
+
+    def __init__(self):
+        """Initialize empty metrics."""
+        self.started = time.monotonic()
+        self.pool = None  # WorkerPool providing the live gauges
+        self._counters: Dict[CounterKey, float] = {}
+        self._lock = threading.Lock()
+
+    def _add(self, key: CounterKey, value: float):
+        self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def merge(self, counters: Dict[CounterKey, float]):
+        """Merge counters shipped back by a worker (or collected in-process)."""
+        with self._lock:
+            for key, value in counters.items():
+                self._add(key, value)
+
+    def record_result(self, result: Dict, issues: Iterable = ()):
+        """Count a processed file and the diagnostic issues recorded for it."""
+        with self._lock:
+            self._add(("files_processed_total", (("verdict", str(result.get("verdict"))),)), 1)
+            for issue in issues:
+                self._add(("diagnostic_issues_total", (("type", issue.issue_type.value),)), 1)
+
+    def _value(self, name: str) -> float:
+        return sum(v for (n, _), v in self._counters.items() if n == name)
+
+    def total(self, name: str) -> float:
+        """Get the total of a counter over all its labels."""
+        with self._lock:
+            return self._value(name)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            samples: Dict[str, List[Tuple[Labels, float]]] = {}
+            for (name, labels), value in self._counters.items():
+                samples.setdefault(name, []).append((labels, value))
+
+            elapsed = max(time.monotonic() - self.started, 1e-9)
+            samples["files_per_second"] = [((), self._value("files_processed_total") / elapsed)]
+            samples["decoded_megabytes_per_second"] = [
+                ((), self._value("decoded_bytes_total") / 1e6 / elapsed)
+            ]
+
+        pool = self.pool
+        if pool is not None:
+            stats = pool.stats()
+            samples["tasks_in_flight"] = [((), stats["in_flight"])]
+            samples["queue_depth"] = [((), stats["queued"])]
+            samples["worker_rss_bytes"] = [
+                ((("pid", str(pid)),), rss) for pid, rss in sorted(stats["worker_rss"].items())
+            ]
+            samples["tasks_timed_out_total"] = [((), pool.tasks_timed_out)]
+            samples["workers_recycled_total"] = [((), pool.workers_recycled)]
+
+        lines = []
+        for name in sorted(samples):
+            metric_type, help_text = METRIC_HELP.get(name, ("untyped", name))
+            lines.append(f"# HELP {PREFIX}{name} {help_text}")
+            lines.append(f"# TYPE {PREFIX}{name} {metric_type}")
+            for labels, value in sorted(samples[name]):
+                lines.append(_format_sample(name, labels, value))
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Serves ``ScanMetrics`` over HTTP from a daemon thread."""
+
+    def __init__(self, scan_metrics: ScanMetrics, port: int, host: str = "127.0.0.1"):
+        """Start the server.
+
+        Args:
+            scan_metrics: Metrics to expose.
+            port: TCP port (0 = any free port, see ``port`` attribute).
+            host: Interface to bind (local only by default).
+        """
+        # Imported here: http.server is slow to import and rarely needed
+        from http.server import ThreadingHTTPServer
+
+        self._server = ThreadingHTTPServer((host, port), _handler_class(scan_metrics))
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="flac-detective-metrics", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Metrics available at http://{host}:{self.port}/metrics")
+
+    def close(self):
+        """Stop the server."""
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def _handler_class(scan_metrics: ScanMetrics):
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = scan_metrics.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Scrapes every few seconds would flood the console log
+            pass
+
+    return MetricsHandler
@@ -0,0 +1,138 @@
+"""Runtime profiles: tuned settings for the host, written by ``flac-detective bench``.
+
+A profile is a JSON file with the recommended values of the tunable
+settings (``TUNABLE``) and the measurements they were derived from. The CLI
+applies ``--profile PATH``, or the default profile if one exists, to the
+global configuration; worker processes receive the same settings through
+``init_worker``.
+"""
+
+import json
+import logging
+from dataclasses import fields
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from . import tracing
+from .config import analysis_config
+from .threads import apply_budget
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE_PATH = Path.home() / ".config" / "flac_detective" / "profile.json"
+
+# Settings a profile may set, per configuration section
+TUNABLE = {
+    "analysis": (
+        "MAX_WORKERS",
+        "RULE_WORKERS",
+        "STAGING",
+        "STAGING_DIR",
+        "STAGING_MB",
+        "STAGING_WAIT",
+        "VERIFY_MD5",
+        "MAX_WORKER_RSS_MB",
+        "LARGE_FILE_MB",
+        "LARGE_FILE_MODE",
+        "PARALLEL_DECODE_MINUTES",
+    ),
+}
+
+# Allowed values of string settings
+CHOICES = {"STAGING": ("copy", "direct"), "LARGE_FILE_MODE": ("stream", "spill")}
+
+_SECTIONS = {"analysis": analysis_config}
+
+Settings = Dict[str, Dict[str, Any]]
+
+
+def current_settings() -> Settings:
+    """Get the current values of the tunable settings."""
+    return {
+        section: {name: getattr(_SECTIONS[section], name) for name in names}
+        for section, names in TUNABLE.items()
+    }
+
+
+def apply_settings(settings: Settings):
+    """Apply tunable settings to the global configuration.
+
+    Unknown sections or settings and invalid choices are ignored with a
+    warning; values are converted to the type of the setting.
+    """
+    for section, values in settings.items():
+        if section not in TUNABLE:
+            logger.warning(f"Profile: unknown section '{section}' ignored")
+            continue
+        config = _SECTIONS[section]
+        types = {f.name: f.type for f in fields(config)}
+        for name, value in values.items():
+            if name not in TUNABLE[section]:
+                logger.warning(f"Profile: unknown setting '{section}.{name}' ignored")
+                continue
+            if name in CHOICES and value not in CHOICES[name]:
+                logger.warning(f"Profile: invalid value {value!r} for '{section}.{name}' ignored")
+                continue
+            setattr(config, name, types[name](value))
+
+
+def save_profile(
+    settings: Settings, path: Path, measurements: Optional[Dict[str, Any]] = None
+) -> Path:
+    """Write a profile.
+
+    Args:
+        settings: Recommended settings per section.
+        path: Destination JSON file.
+        measurements: Calibration figures the settings were derived from.
+
+    Returns:
+        The destination path.
+    """
+    document = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "settings": settings,
+        "measurements": measurements or {},
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(document, indent=2), encoding="utf-8")
+    return path
+
+
+def load_profile(path: Path) -> Settings:
+    """Read a profile and apply its settings.
+
+    Args:
+        path: Profile JSON file.
+
+    Returns:
+        The applied settings.
+
+    Raises:
+        ValueError: If the file is not a valid profile.
+    """
+    try:
+        document = json.loads(path.read_text(encoding="utf-8"))
+        settings = document["settings"]
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid profile {path}: {e}") from e
+    apply_settings(settings)
+    logger.info(f"Loaded runtime profile {path}")
+    return settings
+
+
+def init_worker(settings: Settings, trace: bool = False, warm: bool = False, threads: int = 1):
+    """Worker process initializer: apply the parent's settings (and tracing).
+
+    Also applies the worker's thread budget (``threads``) and, with ``warm``,
+    builds the analysis DSP state (``analysis.warmup``).
+    """
+    apply_settings(settings)
+    apply_budget(threads)
+    if trace:
+        tracing.enable()
+    if warm:
+        from .analysis.warmup import warm_up
+
+        warm_up()
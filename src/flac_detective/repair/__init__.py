@@ -4,6 +4,7 @@ This module provides tools to automatically repair
 duration issues in FLAC files.
 """
 
+from .deferred import RepairOutcome, generate_repair_report, run_repair_stage
 from .fixer import FLACDurationFixer
 
-__all__ = ["FLACDurationFixer"]
+__all__ = ["FLACDurationFixer", "RepairOutcome", "generate_repair_report", "run_repair_stage"]
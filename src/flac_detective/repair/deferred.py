@@ -0,0 +1,194 @@
+"""Deferred repair stage.
+
+Files that could not be decoded during the scan are only recorded as repair
+candidates (see ``RepairConfig.DEFERRED``): the analysis continues with
+partial data and the repairs (decode through errors, re-encode, verify,
+replace the source) run after the scan, in a small pool of low-priority
+workers.
+"""
+
+import filecmp
+import logging
+import os
+import shutil
+from concurrent.futures import as_completed
+from dataclasses import dataclass
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from ..analysis.diagnostic_tracker import IssueType, get_tracker
+from ..analysis.new_scoring.audio_loader import repair_flac_file
+from ..config import repair_config
+from ..worker_pool import WorkerPool
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RepairOutcome:
+    """Result of one repair (or of its dry-run plan)."""
+
+    filepath: str
+    status: str  # "repaired", "failed" or "planned" (dry run)
+    message: str = ""
+
+
+def _lower_priority(niceness: int):
+    """Worker initializer: yield the CPU to the analysis (POSIX only)."""
+    if niceness and hasattr(os, "nice"):
+        try:
+            os.nice(niceness)
+        except OSError:
+            pass
+
+
+def _failed(filepath: str, message: str) -> RepairOutcome:
+    """Record a failed repair for the diagnostic report and describe it."""
+    get_tracker().record_issue(
+        filepath=filepath,
+        issue_type=IssueType.REPAIR_FAILED,
+        message=f"Repair failed: {message}",
+    )
+    return RepairOutcome(filepath, "failed", message)
+
+
+def repair_file(filepath: str) -> RepairOutcome:
+    """Repair a damaged FLAC file in place (a backup is kept).
+
+    Args:
+        filepath: Path to the damaged FLAC file.
+
+    Returns:
+        RepairOutcome describing what happened.
+    """
+    repaired_path = repair_flac_file(
+        corrupted_path=filepath, source_path=filepath, replace_source=True
+    )
+    if not repaired_path:
+        return _failed(filepath, "repair process returned no file")
+
+    try:
+        replaced = filecmp.cmp(repaired_path, filepath, shallow=False)
+    except OSError:
+        replaced = False
+    if not replaced:
+        # Keep the re-encode: it is the only good copy of the audio
+        return _failed(filepath, f"source not replaced, repaired copy kept: {repaired_path}")
+
+    os.remove(repaired_path)
+    return RepairOutcome(filepath, "repaired", f"backup: {Path(filepath).name}.corrupted.bak")
+
+
+def plan_repairs(candidates: List[str]) -> List[RepairOutcome]:
+    """Describe the repairs without touching any file (dry run).
+
+    Args:
+        candidates: Paths of the files to repair.
+
+    Returns:
+        One "planned" outcome per file.
+    """
+    flac_missing = shutil.which("flac") is None
+    outcomes = []
+    for filepath in candidates:
+        try:
+            size_mb = os.path.getsize(filepath) / (1024 * 1024)
+            message = f"{size_mb:.1f} MB would be re-encoded"
+        except OSError as e:
+            message = f"not accessible: {e}"
+        if flac_missing:
+            message += " (flac command-line tool not found)"
+        outcomes.append(RepairOutcome(filepath, "planned", message))
+    return outcomes
+
+
+def run_repair_stage(
+    candidates: List[str],
+    max_workers: Optional[int] = None,
+    dry_run: Optional[bool] = None,
+    on_outcome: Optional[Callable[[RepairOutcome], None]] = None,
+) -> List[RepairOutcome]:
+    """Repair the candidates collected during the scan.
+
+    Args:
+        candidates: Paths of the files to repair.
+        max_workers: Concurrent repairs (defaults to ``REPAIR_WORKERS``).
+        dry_run: Only plan the repairs (defaults to ``DRY_RUN``).
+        on_outcome: Callback invoked as each repair completes (progress).
+
+    Returns:
+        List of outcomes, in completion order.
+    """
+    if dry_run is None:
+        dry_run = repair_config.DRY_RUN
+    if dry_run:
+        outcomes = plan_repairs(candidates)
+        if on_outcome is not None:
+            for outcome in outcomes:
+                on_outcome(outcome)
+        return outcomes
+
+    if not candidates:
+        return []
+
+    workers = min(max_workers or repair_config.REPAIR_WORKERS, len(candidates))
+    logger.info(f"Repair stage: {len(candidates)} file(s), {workers} worker(s)")
+    pool = WorkerPool(
+        max_workers=workers,
+        task_timeout=repair_config.REENCODE_TIMEOUT,
+        initializer=partial(_lower_priority, repair_config.REPAIR_NICENESS),
+    )
+    outcomes = []
+    with pool:
+        futures = {pool.submit(repair_file, filepath): filepath for filepath in candidates}
+        for future in as_completed(futures):
+            filepath = futures[future]
+            # Issues recorded by the worker (repair_flac_file, repair_file)
+            get_tracker().add_issues(future.issues)
+            try:
+                outcome = future.result()
+            except Exception as e:
+                # TaskTimeoutError, WorkerCrashedError or an unexpected repair error
+                outcome = _failed(filepath, str(e))
+            outcomes.append(outcome)
+            if on_outcome is not None:
+                on_outcome(outcome)
+    return outcomes
+
+
+def generate_repair_report(outcomes: List[RepairOutcome], dry_run: bool) -> str:
+    """Generate the repair stage report.
+
+    Args:
+        outcomes: Outcomes returned by ``run_repair_stage``.
+        dry_run: True if the outcomes are a dry-run plan.
+
+    Returns:
+        Formatted report as string
+    """
+    lines = []
+    lines.append("=" * 80)
+    title = "REPAIR PLAN (dry run - no file modified)" if dry_run else "REPAIR REPORT"
+    lines.append(f"{title} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    lines.append("=" * 80)
+    lines.append("")
+
+    counts = {}
+    for outcome in outcomes:
+        counts[outcome.status] = counts.get(outcome.status, 0) + 1
+    lines.append("SUMMARY:")
+    lines.append(f"  Files: {len(outcomes)}")
+    for status, count in sorted(counts.items()):
+        lines.append(f"  {status}: {count}")
+    lines.append("")
+
+    for outcome in sorted(outcomes, key=lambda o: o.filepath):
+        lines.append(f"[{outcome.status.upper()}] {outcome.filepath}")
+        if outcome.message:
+            lines.append(f"  {outcome.message}")
+
+    lines.append("")
+    lines.append("=" * 80)
+    return "\n".join(lines)
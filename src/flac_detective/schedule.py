@@ -0,0 +1,70 @@
+"""Order in which the files of a scan are handed to the worker pool.
+
+Files used to be submitted in discovery (``rglob``) order, so a few huge
+hi-res files often started last and kept one worker busy for minutes after
+all the others had finished. The ``SCHEDULE`` policies:
+
+- "largest": largest estimated cost first (the longest-processing-time rule:
+  the big files overlap with the small ones and the scan ends evenly).
+- "smallest": smallest first, for early results on most of the library.
+- "discovery": the order the files were found in.
+
+The cost of a file is its number of decoded samples, from the STREAMINFO
+header: decoding and the spectral analysis both scale with it, whatever the
+compression ratio. Files without a readable STREAMINFO count their size in
+bytes, about one byte per sample for 16-bit FLAC. The same estimate scales
+the wall-clock deadline of each file (``task_deadline``): a streamed
+four-hour 192 kHz file takes far longer than an album track.
+"""
+
+from pathlib import Path
+from typing import Sequence
+
+from .config import analysis_config
+from .streaminfo import read_streaminfo
+
+POLICIES = ("largest", "smallest", "discovery")
+
+
+def estimate_cost(filepath: Path) -> float:
+    """Estimate the analysis cost of a file, in decoded samples."""
+    info = read_streaminfo(filepath)
+    if info is not None and info.total_samples:
+        return float(info.total_samples * info.channels)
+    try:
+        return float(filepath.stat().st_size)
+    except OSError:
+        return 0.0
+
+
+def task_deadline(filepath: Path) -> float:
+    """Get the wall-clock deadline of a file's analysis (seconds, 0 = no limit).
+
+    ``TASK_TIMEOUT`` plus ``TASK_TIMEOUT_PER_MSAMPLE`` seconds per million
+    decoded samples.
+    """
+    if not analysis_config.TASK_TIMEOUT:
+        return 0.0
+    allowance = estimate_cost(filepath) / 1e6 * analysis_config.TASK_TIMEOUT_PER_MSAMPLE
+    return analysis_config.TASK_TIMEOUT + allowance
+
+
+def order_files(files: Sequence[Path], policy: str = "largest") -> list[Path]:
+    """Order files for submission.
+
+    Args:
+        files: Files to analyze, in discovery order.
+        policy: One of ``POLICIES``.
+
+    Returns:
+        The files in submission order (ties keep the discovery order).
+
+    Raises:
+        ValueError: If the policy is unknown.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown schedule {policy!r} (expected one of {', '.join(POLICIES)})")
+    if policy == "discovery":
+        return list(files)
+    costs = {path: estimate_cost(path) for path in files}
+    return sorted(files, key=costs.__getitem__, reverse=policy == "largest")
@@ -0,0 +1,402 @@
+"""Staging of the source files for the analysis, ahead of the workers.
+
+With ``STAGING = "copy"`` each file is copied to a local temporary file
+before it is analyzed (protection against flaky USB/NAS sources). Done by
+the worker itself, the copy and the analysis alternate: on a slow source the
+CPUs sit idle during copies, on a fast one the copies still serialize with
+the analysis. The ``Prefetcher`` moves the copies to a few I/O threads of
+the parent, which stage the next files while the current ones are analyzed:
+workers receive files already staged. In "direct" mode nothing is copied;
+the prefetcher asks the kernel to read the next files ahead instead.
+
+Reads use ``posix_fadvise`` where available: sequential access for the
+copies (larger readahead), ``WILLNEED`` for the files read in place.
+
+The copies, made by the prefetcher or by the workers, go to a
+``StagingArea``: a directory (``STAGING_DIR``) shared by all the processes,
+with a byte budget (``STAGING_MB``) so that a batch of hi-res albums cannot
+fill a small ``/tmp`` or tmpfs. A copy waits for room up to
+``STAGING_WAIT`` seconds, then the file is read in place. Copies are named
+after the process that made them (``flac_detective_<pid>_*.flac``):
+``sweep_orphans`` deletes those left behind by killed workers or crashed
+runs, at startup and after each scan.
+
+Each copy is hashed (BLAKE2) while it streams. The analysis checks the
+decoded copy against its STREAMINFO MD5; when that fails, or the copy does
+not decode, ``verify_copy`` reads the source again and compares digests, to
+tell a copy spoiled by a flaky drive from a file that is corrupt on disk.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Deque, Dict, Iterator, NamedTuple, Optional, Tuple
+
+from . import metrics
+from .config import analysis_config
+from .tracing import span
+
+try:
+    import fcntl
+except ImportError:  # Windows: budget checks are not serialized between processes
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Copy buffer size
+COPY_BUFFER = 1024 * 1024
+
+# Staged copies: flac_detective_<pid>_<random>.flac
+STAGED_PREFIX = "flac_detective_"
+_STAGED_NAME = re.compile(r"flac_detective_(\d+)_.*\.flac$")
+LOCK_NAME = ".flac_detective_staging.lock"
+
+# Seconds between two checks for room in the budget
+WAIT_INTERVAL = 0.1
+
+# Age of the orphans swept where process liveness cannot be checked
+STALE_SECONDS = 24 * 3600
+
+
+def _advise(fd: int, advice_name: str):
+    """Give the kernel an access hint for a whole file (no-op where unsupported)."""
+    advice = getattr(os, advice_name, None)
+    if advice is None or not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, advice)
+    except OSError as e:
+        logger.debug("posix_fadvise(%s) failed: %s", advice_name, e)
+
+
+def prefetch_file(filepath: Path):
+    """Ask the kernel to read a file into the page cache, in the background."""
+    try:
+        fd = os.open(filepath, os.O_RDONLY)
+    except OSError as e:
+        logger.debug("Cannot prefetch %s: %s", filepath, e)
+        return
+    try:
+        _advise(fd, "POSIX_FADV_WILLNEED")
+    finally:
+        os.close(fd)
+
+
+class StagedFile(NamedTuple):
+    """A staged copy and the digest of the bytes copied."""
+
+    path: Path
+    digest: bytes
+
+
+def _new_digest():
+    return hashlib.blake2b(digest_size=16)
+
+
+def _copy_hashed(source, target) -> bytes:
+    """Copy a file object to another, hashing the bytes on the way."""
+    digest = _new_digest()
+    buffer = bytearray(COPY_BUFFER)
+    view = memoryview(buffer)
+    while size := source.readinto(buffer):
+        digest.update(view[:size])
+        target.write(view[:size])
+    return digest.digest()
+
+
+def file_digest(filepath: Path, uncached: bool = False) -> bytes:
+    """Hash a file like the staging copies are hashed.
+
+    Args:
+        filepath: File to hash.
+        uncached: Drop the file from the page cache first, so its data is
+            read from the drive again (``POSIX_FADV_DONTNEED``).
+    """
+    digest = _new_digest()
+    with open(filepath, "rb") as f:
+        if uncached:
+            _advise(f.fileno(), "POSIX_FADV_DONTNEED")
+        _advise(f.fileno(), "POSIX_FADV_SEQUENTIAL")
+        while chunk := f.read(COPY_BUFFER):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def verify_copy(filepath: Path, staged: StagedFile) -> bool:
+    """Read a source again and compare it with its staged copy.
+
+    Returns:
+        True if the source still has the digest of the copy (the copy is
+        good, any problem is in the file itself).
+    """
+    matches = file_digest(filepath, uncached=True) == staged.digest
+    metrics.inc("copy_verifications_total", outcome="good_copy" if matches else "bad_copy")
+    return matches
+
+
+def _pid_alive(pid: int) -> Optional[bool]:
+    """Check if a process exists (None where this cannot be checked)."""
+    if os.name != "posix":
+        return None
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class StagingArea:
+    """Directory of the staged copies, with a byte budget shared by all processes.
+
+    The budget covers the sizes of the staged copies present in the
+    directory, whichever process made them. Each copy reserves its full
+    size up front (a sparse file), under a lock file, so concurrent
+    processes see each other's reservations.
+    """
+
+    def __init__(self, directory: str = "", max_bytes: int = 0, wait: float = 0.0):
+        """Initialize the staging area.
+
+        Args:
+            directory: Directory of the copies ("" = system temp directory).
+            max_bytes: Budget in bytes (0 = unlimited).
+            wait: Seconds a copy waits for room before giving up.
+        """
+        self.directory = Path(directory or tempfile.gettempdir())
+        self.max_bytes = max_bytes
+        self.wait = wait
+
+    def _staged_files(self) -> Iterator[Path]:
+        return (
+            p for p in self.directory.glob(f"{STAGED_PREFIX}*.flac") if _STAGED_NAME.match(p.name)
+        )
+
+    def used_bytes(self) -> int:
+        """Total size of the staged copies in the directory."""
+        total = 0
+        for path in self._staged_files():
+            try:
+                total += path.stat().st_size
+            except OSError:
+                continue  # Deleted meanwhile
+        return total
+
+    @contextmanager
+    def _locked(self):
+        if fcntl is None:
+            yield
+            return
+        with open(self.directory / LOCK_NAME, "a+b") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _reserve(self, size: int) -> Optional[Path]:
+        """Create a copy of ``size`` bytes when the budget has room (None after ``wait``)."""
+        deadline = time.monotonic() + self.wait
+        started = time.monotonic()
+        while True:
+            with self._locked():
+                used = self.used_bytes() if self.max_bytes else 0
+                # A file larger than the whole budget still goes alone
+                if not self.max_bytes or not used or used + size <= self.max_bytes:
+                    fd, name = tempfile.mkstemp(
+                        prefix=f"{STAGED_PREFIX}{os.getpid()}_", suffix=".flac", dir=self.directory
+                    )
+                    os.ftruncate(fd, size)
+                    os.close(fd)
+                    break
+            if time.monotonic() >= deadline:
+                name = None
+                break
+            time.sleep(WAIT_INTERVAL)
+        metrics.inc("staging_wait_seconds_total", time.monotonic() - started)
+        return Path(name) if name else None
+
+    def stage(self, filepath: Path, by: str = "worker") -> Optional[StagedFile]:
+        """Copy a file into the staging area.
+
+        The source is read sequentially (``POSIX_FADV_SEQUENTIAL``) and
+        hashed as it is copied. The caller owns the copy and deletes it.
+
+        Args:
+            filepath: Source file.
+            by: Stage making the copy, for the metrics ("worker" or "prefetch").
+
+        Returns:
+            The copy, or None if the budget had no room in time (read the
+            source in place).
+        """
+        size = filepath.stat().st_size
+        staged = self._reserve(size)
+        if staged is None:
+            logger.info(f"Staging area full, reading {filepath.name} in place")
+            metrics.inc("staging_fallbacks_total")
+            return None
+        try:
+            with open(filepath, "rb") as source, open(staged, "r+b") as target:
+                _advise(source.fileno(), "POSIX_FADV_SEQUENTIAL")
+                digest = _copy_hashed(source, target)
+                target.truncate()
+        except BaseException:
+            staged.unlink(missing_ok=True)
+            raise
+        metrics.inc("staged_bytes_total", size, by=by)
+        return StagedFile(staged, digest)
+
+    def sweep_orphans(self) -> int:
+        """Delete the copies of processes that no longer exist.
+
+        Returns:
+            Number of copies deleted.
+        """
+        swept = 0
+        now = time.time()
+        for path in self._staged_files():
+            pid = int(_STAGED_NAME.match(path.name).group(1))
+            if pid == os.getpid():
+                continue
+            alive = _pid_alive(pid)
+            try:
+                if alive is False or (alive is None and now - path.stat().st_mtime > STALE_SECONDS):
+                    path.unlink()
+                    swept += 1
+            except OSError:
+                continue
+        return swept
+
+
+def get_staging_area() -> StagingArea:
+    """Get the staging area of the current settings."""
+    return StagingArea(
+        analysis_config.STAGING_DIR,
+        analysis_config.STAGING_MB * 1024 * 1024,
+        analysis_config.STAGING_WAIT,
+    )
+
+
+def stage_copy(filepath: Path, by: str = "worker") -> Optional[StagedFile]:
+    """Copy a file into the staging area (see ``StagingArea.stage``)."""
+    return get_staging_area().stage(filepath, by)
+
+
+def _file_size(filepath: Path) -> int:
+    try:
+        return filepath.stat().st_size
+    except OSError:
+        return 0
+
+
+class Prefetcher:
+    """Stages files ahead of the workers with a few I/O threads.
+
+    Files are staged in the order they are added. At most ``slots`` files
+    are staged or being analyzed at once, within ``max_bytes`` (a file
+    larger than the budget is still staged when nothing else is). Each
+    staged file is handed out once (``staged``) and released by the caller
+    when its analysis is over (``release``), which deletes the copy.
+    """
+
+    def __init__(self, slots: int, max_bytes: int, threads: int = 2, copy: bool = True):
+        """Initialize the prefetcher.
+
+        Args:
+            slots: Files staged or in analysis at once.
+            max_bytes: Total size of those files.
+            threads: I/O threads.
+            copy: Copy the files to temporary files (False: only read them ahead).
+        """
+        self.slots = max(1, slots)
+        self.max_bytes = max_bytes
+        self.copy = copy
+        self._queue: Deque[Path] = deque()
+        self._sizes: Dict[Path, int] = {}
+        self._staged: Dict[Path, Optional[StagedFile]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="prefetch")
+        self.pending: Dict[Future, Path] = {}
+
+    def add(self, filepath: Path):
+        """Queue a file for staging (starts it if a slot is free)."""
+        self._queue.append(filepath)
+        self._top_up()
+
+    def _top_up(self):
+        with self._lock:
+            while self._queue and len(self._sizes) < self.slots:
+                size = _file_size(self._queue[0])
+                if self._sizes and self._bytes + size > self.max_bytes:
+                    break
+                filepath = self._queue.popleft()
+                self._sizes[filepath] = size
+                self._bytes += size
+                self.pending[self._executor.submit(self._stage, filepath)] = filepath
+
+    def _stage(self, filepath: Path) -> Optional[StagedFile]:
+        with span("prefetch"):
+            if not self.copy:
+                prefetch_file(filepath)
+                return None
+            return stage_copy(filepath, by="prefetch")
+
+    def staged(self, future: Future) -> Tuple[Path, Optional[StagedFile]]:
+        """Take a finished staging job.
+
+        Returns:
+            (source, staged copy); the copy is None in read-ahead mode or if
+            the copy failed or found no room (the worker then copies or
+            reads the source itself).
+        """
+        filepath = self.pending.pop(future)
+        try:
+            staged = future.result()
+        except Exception as e:
+            logger.warning(f"Prefetch of {filepath.name} failed, the worker will read it: {e}")
+            staged = None
+        with self._lock:
+            self._staged[filepath] = staged
+        return filepath, staged
+
+    def release(self, filepath: Path):
+        """Free the slot of an analyzed file and delete its copy."""
+        with self._lock:
+            staged = self._staged.pop(filepath, None)
+            self._bytes -= self._sizes.pop(filepath, 0)
+        if staged is not None:
+            staged.path.unlink(missing_ok=True)
+        self._top_up()
+
+    def __enter__(self) -> "Prefetcher":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """Stop staging and delete the copies still held."""
+        self._queue.clear()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        for future in list(self.pending):
+            if not future.cancelled() and future.exception() is None and future.result():
+                future.result().path.unlink(missing_ok=True)
+        self.pending.clear()
+        with self._lock:
+            staged, self._staged = list(self._staged.values()), {}
+            self._sizes.clear()
+            self._bytes = 0
+        for copy in staged:
+            if copy is not None:
+                copy.path.unlink(missing_ok=True)
@@ -0,0 +1,94 @@
+"""Thread budget: how many native threads each analysis process may use.
+
+Files are analyzed in parallel worker processes. If each of them also let
+the FFTs and the BLAS/OpenMP libraries use every CPU, N workers would start
+N x N threads thrashing over N CPUs. The budget splits the CPUs between the
+processes analyzing files concurrently instead: with as many files in flight
+as CPUs each worker gets one thread, while a single-file or low-concurrency
+run lets each worker use several for its FFTs and BLAS calls.
+
+The FFT call sites ask ``fft_workers()`` for their ``scipy.fft.set_workers``
+value. BLAS libraries read their limit from the environment when numpy is
+first imported, so the parent exports it (``export_budget``) before the
+worker pool, and its fork server, start; workers apply it again at start
+(``apply_budget``), through the optional ``threadpoolctl`` package where
+numpy is already loaded.
+
+At the tail of a scan the pool runs out of files and workers sit idle while
+the last ones are analyzed. The pool tells each worker how many workers were
+idle when its task was dispatched (``set_idle_workers``): work that can be
+split, such as decoding a long file, may borrow their share of the CPUs
+(``spare_threads``).
+"""
+
+import os
+from typing import Optional
+
+# Thread limits read by the native libraries numpy/scipy may load
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+# scipy.fft workers of this process
+_fft_workers = 1
+
+# Pool workers left idle when the current task of this process was dispatched
+_idle_workers = 0
+
+
+def thread_allowance(concurrency: int, cpus: Optional[int] = None) -> int:
+    """Threads each of ``concurrency`` processes may use.
+
+    Args:
+        concurrency: Processes analyzing files at the same time.
+        cpus: CPUs to share (defaults to ``os.cpu_count()``).
+    """
+    cpus = cpus or os.cpu_count() or 1
+    return max(1, cpus // max(1, concurrency))
+
+
+def fft_workers() -> int:
+    """Get the ``scipy.fft`` workers this process may use."""
+    return _fft_workers
+
+
+def set_idle_workers(idle: int):
+    """Record the pool workers left idle when the current task was dispatched."""
+    global _idle_workers
+    _idle_workers = max(0, idle)
+
+
+def spare_threads() -> int:
+    """Threads the current task may use: this process's budget and the idle workers' ones."""
+    return _fft_workers * (1 + _idle_workers)
+
+
+def export_budget(threads: int):
+    """Export the BLAS/OpenMP limit for libraries loaded, and processes started, later."""
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(threads)
+
+
+def apply_budget(threads: int) -> bool:
+    """Apply a thread budget to this process.
+
+    Args:
+        threads: Threads allowed for the FFTs and the native libraries.
+
+    Returns:
+        True if the limit also reached native libraries already loaded
+        (requires ``threadpoolctl``).
+    """
+    global _fft_workers
+    _fft_workers = max(1, threads)
+    export_budget(_fft_workers)
+    try:
+        from threadpoolctl import threadpool_limits  # Optional dependency
+    except ImportError:
+        return False
+    threadpool_limits(limits=_fft_workers)
+    return True
@@ -0,0 +1,258 @@
+"""Stage-level timing spans.
+
+Wrap analysis stages in ``span("stage")`` blocks; when tracing is enabled
+(``--trace``) each block records a ``Span`` in a per-process buffer. Worker
+processes ship their buffer back with each task result (see
+``worker_pool``), and the parent feeds the spans to a ``TraceCollector``
+which streams them to a Chrome trace-event JSON file (open it in
+chrome://tracing or https://ui.perfetto.dev) and aggregates per-stage
+percentiles.
+
+When tracing is disabled ``span()`` returns a shared no-op context manager,
+so instrumentation can stay in the hot path. Results known only at the end
+of a stage are attached with ``annotate()``, a no-op on disabled spans.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+_enabled = False
+_buffer: List["Span"] = []
+
+
+class Span(NamedTuple):
+    """A timed stage (``kind`` "X") or an instant decision (``kind`` "i")."""
+
+    name: str
+    kind: str
+    start_us: float
+    duration_us: float
+    pid: int
+    tid: int
+    args: Optional[Dict[str, Any]] = None
+    cpu_us: float = 0.0  # CPU time of the recording thread
+
+
+class _NullSpan:
+    """Shared context manager used while tracing is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def annotate(self, **args: Any):
+        """Ignore the details (tracing disabled)."""
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _ActiveSpan:
+    """Context manager recording one span on exit."""
+
+    __slots__ = ("name", "args", "start", "cpu_start")
+
+    def __init__(self, name: str, args: Optional[Dict[str, Any]]):
+        self.name = name
+        self.args = args
+        self.start = 0
+        self.cpu_start = 0
+
+    def __enter__(self) -> "_ActiveSpan":
+        self.cpu_start = time.thread_time_ns()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        cpu_end = time.thread_time_ns()
+        _buffer.append(
+            Span(
+                self.name,
+                "X",
+                self.start / 1000.0,
+                (end - self.start) / 1000.0,
+                os.getpid(),
+                threading.get_native_id(),
+                self.args,
+                (cpu_end - self.cpu_start) / 1000.0,
+            )
+        )
+        return False
+
+    def annotate(self, **args: Any):
+        """Attach details known only once the stage ran (e.g. a rule's score)."""
+        self.args = {**(self.args or {}), **args}
+
+
+def enable(enabled: bool = True):
+    """Enable or disable span recording in the current process."""
+    global _enabled
+    _enabled = enabled
+
+
+def is_enabled() -> bool:
+    """Check whether spans are recorded in the current process."""
+    return _enabled
+
+
+def span(name: str, /, **args: Any):
+    """Time a stage.
+
+    Args:
+        name: Stage name (e.g. "decode", "rule.R8").
+        **args: Extra details shown in the trace viewer.
+
+    Returns:
+        Context manager recording the span (no-op when tracing is disabled).
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _ActiveSpan(name, args or None)
+
+
+def instant(name: str, /, **args: Any):
+    """Record an instant event (e.g. a short-circuit decision)."""
+    if _enabled:
+        _buffer.append(
+            Span(
+                name,
+                "i",
+                time.perf_counter_ns() / 1000.0,
+                0.0,
+                os.getpid(),
+                threading.get_native_id(),
+                args or None,
+            )
+        )
+
+
+def collect() -> List[Span]:
+    """Take the spans recorded in the current process since the last call."""
+    global _buffer
+    spans, _buffer = _buffer, []
+    return spans
+
+
+class StageHistogram:
+    """Log-bucketed duration histogram (constant memory, ~12% resolution)."""
+
+    BUCKETS_PER_DECADE = 20
+
+    def __init__(self):
+        """Initialize an empty histogram."""
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total_us = 0.0
+        self.max_us = 0.0
+
+    def add(self, duration_us: float):
+        """Add a duration (microseconds)."""
+        bucket = int(math.floor(math.log10(max(duration_us, 1.0)) * self.BUCKETS_PER_DECADE))
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total_us += duration_us
+        self.max_us = max(self.max_us, duration_us)
+
+    def percentile(self, q: float) -> float:
+        """Get the q-th percentile (0-100) in microseconds (bucket upper bound)."""
+        if not self.count:
+            return 0.0
+        rank = q / 100.0 * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(10 ** ((bucket + 1) / self.BUCKETS_PER_DECADE), self.max_us)
+        return self.max_us
+
+
+class TraceCollector:
+    """Aggregates spans from all workers; optionally streams a Chrome trace."""
+
+    def __init__(self, trace_path: Optional[Path] = None):
+        """Initialize the collector.
+
+        Args:
+            trace_path: Chrome trace-event JSON file to write (None = percentiles only).
+        """
+        self.trace_path = trace_path
+        self.histograms: Dict[str, StageHistogram] = {}
+        self._file = None
+        self._first_event = True
+        if trace_path is not None:
+            self._file = open(trace_path, "w", encoding="utf-8")
+            self._file.write('{"displayTimeUnit": "ms", "traceEvents": [\n')
+
+    def add(self, spans: List[Span]):
+        """Add spans shipped back by a worker (or collected in-process)."""
+        for s in spans:
+            if s.kind == "X":
+                histogram = self.histograms.get(s.name)
+                if histogram is None:
+                    histogram = self.histograms[s.name] = StageHistogram()
+                histogram.add(s.duration_us)
+            if self._file is not None:
+                event = {
+                    "name": s.name,
+                    "cat": "flac_detective",
+                    "ph": s.kind,
+                    "ts": s.start_us,
+                    "pid": s.pid,
+                    "tid": s.tid,
+                }
+                if s.kind == "X":
+                    event["dur"] = s.duration_us
+                    event["tdur"] = s.cpu_us
+                else:
+                    event["s"] = "t"
+                if s.args:
+                    event["args"] = s.args
+                if not self._first_event:
+                    self._file.write(",\n")
+                self._file.write(json.dumps(event, default=str))
+                self._first_event = False
+
+    def close(self):
+        """Terminate the trace file."""
+        if self._file is not None:
+            self._file.write("\n]}\n")
+            self._file.close()
+            self._file = None
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Per-stage statistics in milliseconds (count, mean, p50, p95, p99, max)."""
+        return {
+            name: {
+                "count": h.count,
+                "mean_ms": h.total_us / h.count / 1000.0,
+                "p50_ms": h.percentile(50) / 1000.0,
+                "p95_ms": h.percentile(95) / 1000.0,
+                "p99_ms": h.percentile(99) / 1000.0,
+                "max_ms": h.max_us / 1000.0,
+            }
+            for name, h in self.histograms.items()
+        }
+
+    def format_summary(self) -> str:
+        """Format the per-stage statistics as a table, slowest total first."""
+        stats = self.summary()
+        lines = [
+            f"{'stage':<24} {'count':>7} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}"
+        ]
+        for name in sorted(stats, key=lambda n: -stats[n]["count"] * stats[n]["mean_ms"]):
+            s = stats[name]
+            lines.append(
+                f"{name:<24} {s['count']:>7} {s['mean_ms']:>7.1f}ms {s['p50_ms']:>7.1f}ms "
+                f"{s['p95_ms']:>7.1f}ms {s['p99_ms']:>7.1f}ms {s['max_ms']:>7.1f}ms"
+            )
+        return "\n".join(lines)
@@ -2,12 +2,11 @@
 
 import json
 import logging
+import sys
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Tuple
 
-import numpy as np
-
 logger = logging.getLogger(__name__)
 
 
@@ -20,15 +19,19 @@ def _convert_numpy_types(obj: Any) -> Any:
     Returns:
         Object with numpy types converted to Python native types.
     """
-    if isinstance(obj, np.bool_):
-        return bool(obj)
-    elif isinstance(obj, np.integer):
-        return int(obj)
-    elif isinstance(obj, np.floating):
-        return float(obj)
-    elif isinstance(obj, np.ndarray):
-        return obj.tolist()
-    elif isinstance(obj, dict):
+    # Not imported here: numpy values only exist once numpy is loaded (by
+    # unpickling worker results), and the parent starts faster without it
+    np = sys.modules.get("numpy")
+    if np is not None:
+        if isinstance(obj, np.bool_):
+            return bool(obj)
+        elif isinstance(obj, np.integer):
+            return int(obj)
+        elif isinstance(obj, np.floating):
+            return float(obj)
+        elif isinstance(obj, np.ndarray):
+            return obj.tolist()
+    if isinstance(obj, dict):
         return {key: _convert_numpy_types(value) for key, value in obj.items()}
     elif isinstance(obj, (list, tuple)):
         return [_convert_numpy_types(item) for item in obj]
@@ -0,0 +1,540 @@
+"""Process pool with per-task deadlines and worker recycling.
+
+``concurrent.futures.ProcessPoolExecutor`` cannot stop a single stuck task:
+one damaged file looping through decoder retries and repair attempts pins a
+worker for minutes. ``WorkerPool`` runs each worker on its own pipe so the
+scheduler can:
+
+- kill a worker whose task exceeds its wall-clock deadline (the pool's, or
+  one given with the task), fail the task
+  with ``TaskTimeoutError`` (carrying the diagnostic issues recorded so far)
+  and start a replacement worker;
+- recycle workers after a number of tasks or above a resident memory
+  ceiling, to contain leaks in native decoders.
+
+``submit`` returns ``TaskFuture`` objects (standard futures, so callers can
+keep using ``wait``/``as_completed``) carrying the diagnostic issues, timing
+spans and metric counters the worker recorded for the task, to be merged in
+the parent. With ``log_level`` set, workers also forward their log records,
+in batches, to the parent's root handlers. Tasks dispatched once the queue is
+empty learn how many workers sit idle (``threads.set_idle_workers``), so they
+can borrow their CPUs.
+"""
+
+import importlib
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing.connection import Connection, wait
+from multiprocessing.context import BaseContext
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from . import metrics, threads, tracing
+from .analysis.diagnostic_tracker import FileIssue, get_tracker
+from .logging_config import BatchingQueueHandler, BatchQueueListener
+
+logger = logging.getLogger(__name__)
+
+
+class TaskTimeoutError(Exception):
+    """A task exceeded its deadline and its worker was killed."""
+
+    def __init__(self, label: str, elapsed: float, issues: List[FileIssue]):
+        """Initialize the error.
+
+        Args:
+            label: Task label (file path for analysis tasks).
+            elapsed: Wall-clock time spent before the worker was killed (seconds).
+            issues: Diagnostic issues recorded by the worker for this task.
+        """
+        super().__init__(f"{label}: deadline exceeded after {elapsed:.0f}s")
+        self.label = label
+        self.elapsed = elapsed
+        self.issues = issues
+
+
+class WorkerCrashedError(Exception):
+    """The worker running a task exited unexpectedly."""
+
+
+class TaskFuture(Future):
+    """Future of a pool task, with the telemetry recorded while it ran."""
+
+    def __init__(self):
+        super().__init__()
+        self.issues: List[FileIssue] = []
+        self.spans: List[tracing.Span] = []
+        self.counters: Dict[metrics.CounterKey, float] = {}
+
+
+def rss_bytes(pid: Optional[int] = None) -> Optional[int]:
+    """Get the resident set size of a process, if available.
+
+    Args:
+        pid: Process id (None = current process).
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            with open(f"/proc/{pid or 'self'}/statm", "r") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return None
+    try:
+        import psutil  # Optional dependency
+
+        return psutil.Process(pid).memory_info().rss
+    except Exception:
+        return None
+
+
+class _ConnectionQueue:
+    """Queue interface over the worker's pipe, for ``BatchingQueueHandler``."""
+
+    def __init__(self, send: Callable[[Tuple], None]):
+        self.send = send
+
+    def put_nowait(self, records: List[logging.LogRecord]):
+        self.send(("log", records))
+
+
+def _worker_main(
+    conn: Connection,
+    initializer: Optional[Callable[[], None]],
+    max_tasks: Optional[int],
+    max_rss_bytes: Optional[int],
+    log_level: Optional[int] = None,
+    preload: Sequence[str] = (),
+):
+    """Worker loop: run tasks received on ``conn`` until told to stop or retired."""
+    # Rule threads log and record issues concurrently with the main thread
+    send_lock = threading.Lock()
+
+    def send(message: Tuple):
+        with send_lock:
+            conn.send(message)
+
+    log_handler = None
+    if log_level is not None:
+        log_handler = BatchingQueueHandler(_ConnectionQueue(send))
+        root = logging.getLogger()
+        root.handlers = [log_handler]
+        root.setLevel(log_level)
+
+    # No-op for modules the fork server already imported
+    for module in preload:
+        importlib.import_module(module)
+    if initializer is not None:
+        initializer()
+
+    current_task: List[Optional[int]] = [None]
+
+    # Stream diagnostic issues to the parent as they are recorded, so they
+    # survive if this worker has to be killed
+    def _forward_issue(issue: FileIssue):
+        try:
+            send(("issue", current_task[0], issue))
+        except Exception:
+            pass
+
+    get_tracker().listener = _forward_issue
+
+    tasks_done = 0
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+        if message is None:
+            return
+
+        task_id, fn, args, label, idle = message
+        current_task[0] = task_id
+        threads.set_idle_workers(idle)
+        try:
+            with tracing.span("task", label=label):
+                ok, payload = True, fn(*args)
+        except BaseException as e:  # Report any failure to the parent
+            ok, payload = False, e
+        current_task[0] = None
+        if log_handler is not None:
+            # The task's records reach the parent before its result
+            log_handler.flush()
+
+        rss = rss_bytes()
+        telemetry = (tracing.collect(), metrics.collect(), rss)
+        try:
+            send(("done", task_id, ok, payload, telemetry))
+        except Exception as e:
+            # Unpicklable result or exception
+            send(("done", task_id, False, RuntimeError(repr(e)), telemetry))
+
+        # Issues already reached the parent: keep the worker's tracker empty
+        get_tracker().clear()
+
+        tasks_done += 1
+        if (max_tasks and tasks_done >= max_tasks) or (
+            max_rss_bytes and rss and rss > max_rss_bytes
+        ):
+            send(("retire", tasks_done, rss))
+            return
+
+
+def _default_context() -> BaseContext:
+    """Get the multiprocessing context used for workers."""
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+class _Task:
+    """A submitted task and its bookkeeping."""
+
+    __slots__ = ("task_id", "fn", "args", "label", "future", "timeout", "started")
+
+    def __init__(
+        self,
+        task_id: int,
+        fn: Callable,
+        args: Tuple,
+        label: str,
+        future: TaskFuture,
+        timeout: Optional[float],
+    ):
+        self.task_id = task_id
+        self.fn = fn
+        self.args = args
+        self.label = label
+        self.future = future
+        self.timeout = timeout
+        self.started = 0.0
+
+
+class _Worker:
+    """A worker process and the task it is running."""
+
+    __slots__ = ("process", "conn", "task")
+
+    def __init__(self, process: multiprocessing.Process, conn: Connection):
+        self.process = process
+        self.conn = conn
+        self.task: Optional[_Task] = None
+
+
+class WorkerPool:
+    """Process pool enforcing per-task deadlines and recycling workers."""
+
+    def __init__(
+        self,
+        max_workers: int,
+        task_timeout: Optional[float] = None,
+        max_tasks_per_worker: Optional[int] = None,
+        max_rss_mb: Optional[int] = None,
+        initializer: Optional[Callable[[], None]] = None,
+        mp_context: Optional[BaseContext] = None,
+        log_level: Optional[int] = None,
+        preload: Sequence[str] = (),
+    ):
+        """Initialize the pool and start the workers.
+
+        Args:
+            max_workers: Number of worker processes.
+            task_timeout: Wall-clock deadline per task in seconds (None = no limit).
+            max_tasks_per_worker: Recycle a worker after this many tasks (None = never).
+            max_rss_mb: Recycle a worker whose resident memory exceeds this (None = never).
+            initializer: Callable run once in each new worker.
+            mp_context: Multiprocessing context (defaults to ``forkserver`` where
+                available, ``spawn`` otherwise: replacement workers are started
+                from a threaded parent, where plain ``fork`` is unsafe).
+            log_level: Forward worker records at or above this level to the
+                handlers of this process's root logger, written by a listener
+                thread (None = workers keep the default logging setup).
+            preload: Modules each worker imports before its first task. With
+                ``forkserver`` they are imported once in the fork server (if
+                this pool starts it) and inherited by every worker.
+        """
+        self.max_workers = max(1, max_workers)
+        self.task_timeout = task_timeout or None
+        self.max_tasks_per_worker = max_tasks_per_worker or None
+        self.max_rss_bytes = max_rss_mb * 1024 * 1024 if max_rss_mb else None
+        self.initializer = initializer
+        self._context = mp_context or _default_context()
+        self.log_level = log_level
+        self.preload = tuple(preload)
+        if self.preload and self._context.get_start_method() == "forkserver":
+            self._context.set_forkserver_preload(list(self.preload))
+
+        self._log_listener = None
+        if log_level is not None:
+            self._log_records: "queue.SimpleQueue[List[logging.LogRecord]]" = queue.SimpleQueue()
+            self._log_listener = BatchQueueListener(
+                self._log_records, *logging.getLogger().handlers, respect_handler_level=True
+            )
+            self._log_listener.start()
+
+        self.workers_started = 0
+        self.workers_recycled = 0
+        self.tasks_timed_out = 0
+
+        self._worker_rss: Dict[int, int] = {}
+        self._queue: Deque[_Task] = deque()
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._shutdown = False
+        self._wakeup_r, self._wakeup_w = multiprocessing.Pipe(duplex=False)
+        self._workers: List[_Worker] = [self._spawn() for _ in range(self.max_workers)]
+
+        self._manager = threading.Thread(
+            target=self._manage, name="flac-detective-pool", daemon=True
+        )
+        self._manager.start()
+
+    def __enter__(self) -> "WorkerPool":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown(cancel_pending=exc_type is not None)
+
+    def submit(
+        self,
+        fn: Callable,
+        *args: Any,
+        label: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> TaskFuture:
+        """Schedule ``fn(*args)`` on a worker.
+
+        Args:
+            fn: Picklable callable.
+            *args: Picklable arguments.
+            label: Name used in timeout errors (defaults to the first argument).
+            timeout: Wall-clock deadline of this task in seconds (defaults to
+                the pool's ``task_timeout``).
+
+        Returns:
+            Future resolved with the result, or failed with ``TaskTimeoutError``
+            / ``WorkerCrashedError`` / the exception raised by ``fn``.
+        """
+        future = TaskFuture()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot submit after shutdown")
+            task_label = label if label is not None else (str(args[0]) if args else repr(fn))
+            task_timeout = timeout or self.task_timeout
+            self._queue.append(_Task(self._next_id, fn, args, task_label, future, task_timeout))
+            self._next_id += 1
+        self._wakeup()
+        return future
+
+    def stats(self) -> Dict[str, Any]:
+        """Get live pool figures (safe to call from any thread).
+
+        Returns:
+            Dict with in_flight and queued task counts, and worker_rss
+            (last reported resident memory per worker pid).
+        """
+        workers = list(self._workers)
+        live_pids = {worker.process.pid for worker in workers}
+        return {
+            "in_flight": sum(1 for worker in workers if worker.task is not None),
+            "queued": len(self._queue),
+            "worker_rss": {
+                pid: rss for pid, rss in list(self._worker_rss.items()) if pid in live_pids
+            },
+        }
+
+    def shutdown(self, cancel_pending: bool = False):
+        """Stop the pool once running (and, unless cancelled, queued) tasks are done."""
+        with self._lock:
+            self._shutdown = True
+            if cancel_pending:
+                while self._queue:
+                    self._queue.popleft().future.cancel()
+        self._wakeup()
+        self._manager.join()
+        if self._log_listener is not None:
+            self._log_listener.stop()
+
+    # ------------------------------------------------------------------
+    # Manager thread
+    # ------------------------------------------------------------------
+
+    def _wakeup(self):
+        try:
+            self._wakeup_w.send(None)
+        except OSError:
+            pass
+
+    def _spawn(self) -> _Worker:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(
+                child_conn,
+                self.initializer,
+                self.max_tasks_per_worker,
+                self.max_rss_bytes,
+                self.log_level,
+                self.preload,
+            ),
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        self.workers_started += 1
+        return _Worker(process, parent_conn)
+
+    def _replace(self, worker: _Worker, kill: bool = False):
+        if kill and worker.process.is_alive():
+            worker.process.kill()
+        worker.process.join(timeout=5)
+        worker.conn.close()
+        self._worker_rss.pop(worker.process.pid, None)
+        index = self._workers.index(worker)
+        with self._lock:
+            stopping = self._shutdown and not self._queue
+        if stopping:
+            del self._workers[index]
+        else:
+            self._workers[index] = self._spawn()
+
+    def _dispatch(self):
+        for worker in self._workers:
+            if worker.task is not None:
+                continue
+            with self._lock:
+                task = None
+                while self._queue and task is None:
+                    candidate = self._queue.popleft()
+                    # Requeued tasks (see _handle_message) are already running
+                    if (
+                        candidate.future.running()
+                        or candidate.future.set_running_or_notify_cancel()
+                    ):
+                        task = candidate
+            if task is None:
+                return
+            task.started = time.monotonic()
+            worker.task = task
+            with self._lock:
+                # Last tasks of the queue: the idle workers lend their CPUs
+                idle = 0 if self._queue else sum(w.task is None for w in self._workers)
+            try:
+                worker.conn.send((task.task_id, task.fn, task.args, task.label, idle))
+            except OSError:
+                # Worker is exiting: _service requeues or fails the task
+                pass
+
+    def _next_timeout(self) -> Optional[float]:
+        deadlines = [
+            worker.task.started + worker.task.timeout
+            for worker in self._workers
+            if worker.task is not None and worker.task.timeout is not None
+        ]
+        if not deadlines:
+            return None
+        return max(0.0, min(deadlines) - time.monotonic())
+
+    def _handle_message(self, worker: _Worker, message: Tuple):
+        kind = message[0]
+        if kind == "log":
+            self._log_records.put(message[1])
+        elif kind == "issue":
+            if worker.task is not None and message[1] == worker.task.task_id:
+                worker.task.future.issues.append(message[2])
+        elif kind == "done":
+            _, task_id, ok, payload, (spans, counters, rss) = message
+            if rss:
+                self._worker_rss[worker.process.pid] = rss
+            task, worker.task = worker.task, None
+            if task is not None and task.task_id == task_id:
+                task.future.spans = spans
+                task.future.counters = counters
+                if ok:
+                    task.future.set_result(payload)
+                else:
+                    task.future.set_exception(payload)
+        elif kind == "retire":
+            _, tasks_done, rss = message
+            rss_str = f", RSS {rss / 1024 / 1024:.0f} MB" if rss else ""
+            logger.debug(f"POOL: Recycling worker after {tasks_done} tasks{rss_str}")
+            self.workers_recycled += 1
+            # A task dispatched after the worker decided to retire never started
+            if worker.task is not None:
+                with self._lock:
+                    self._queue.appendleft(worker.task)
+                worker.task = None
+            self._replace(worker)
+
+    def _service(self, worker: _Worker):
+        """Handle pending messages from a worker, then detect a crashed worker."""
+        try:
+            while worker in self._workers and worker.conn.poll():
+                self._handle_message(worker, worker.conn.recv())
+        except (EOFError, OSError):
+            pass
+
+        if worker in self._workers and not worker.process.is_alive():
+            task, worker.task = worker.task, None
+            if task is not None:
+                task.future.set_exception(
+                    WorkerCrashedError(
+                        f"{task.label}: worker exited with code {worker.process.exitcode}"
+                    )
+                )
+            self._replace(worker)
+
+    def _expire(self, now: float):
+        for worker in list(self._workers):
+            task = worker.task
+            if task is None or task.timeout is None or now - task.started < task.timeout:
+                continue
+            elapsed = now - task.started
+            logger.warning(
+                f"POOL: Task {task.label} exceeded {task.timeout:.0f}s deadline, " "killing worker"
+            )
+            worker.task = None
+            self.tasks_timed_out += 1
+            self._replace(worker, kill=True)
+            task.future.set_exception(TaskTimeoutError(task.label, elapsed, task.future.issues))
+
+    def _manage(self):
+        while True:
+            self._dispatch()
+
+            with self._lock:
+                idle = not self._queue and all(w.task is None for w in self._workers)
+                if self._shutdown and idle:
+                    break
+
+            conns: Dict[Any, _Worker] = {}
+            for worker in self._workers:
+                conns[worker.conn] = worker
+                conns[worker.process.sentinel] = worker
+            ready = wait(list(conns) + [self._wakeup_r], timeout=self._next_timeout())
+
+            for worker in {conns[obj] for obj in ready if obj is not self._wakeup_r}:
+                if worker in self._workers:  # Not replaced while handling another event
+                    self._service(worker)
+            if self._wakeup_r in ready:
+                while self._wakeup_r.poll():
+                    self._wakeup_r.recv()
+
+            self._expire(time.monotonic())
+
+        for worker in self._workers:
+            try:
+                worker.conn.send(None)
+            except OSError:
+                pass
+        for worker in self._workers:
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.kill()
+            worker.conn.close()
+        self._workers = []
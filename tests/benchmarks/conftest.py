@@ -7,6 +7,8 @@ import numpy as np
 import pytest
 import soundfile as sf
 
+from flac_detective.bench import build_corpus, default_corpus
+
 
 @pytest.fixture(scope="session")
 def benchmark_audio_file():
@@ -88,3 +90,12 @@ def benchmark_config():
         "warmup": True,
         "sample_duration": 30.0,
     }
+
+
+@pytest.fixture(scope="session")
+def synthetic_corpus():
+    """Labelled synthetic corpus covering every rule path (cached on disk).
+
+    Cached under $FLAC_DETECTIVE_CORPUS_CACHE (default ~/.cache/flac_detective/corpus).
+    """
+    return build_corpus(default_corpus(duration=30.0))
@@ -0,0 +1,100 @@
+"""Throughput per signal class on the synthetic labelled corpus.
+
+Analyzes every corpus file (hi-res, MP3 cutoffs, dither in silence, tape
+hiss, upsampled, fake 24-bit) and reports files/s and MB/s per class, plus
+accuracy against the labels. The corpus is built to reach every scoring
+rule; the test fails if a rule is no longer exercised.
+
+Long files (up to 2 hours) are opt-in:
+
+    FLAC_DETECTIVE_BENCH_LONG=1 pytest tests/benchmarks/test_corpus_throughput.py -s
+"""
+
+import os
+import time
+from typing import Dict, List
+
+import pytest
+
+from flac_detective import tracing
+from flac_detective.analysis.analyzer import FLACAnalyzer
+from flac_detective.analysis.new_scoring.calculator import _build_rules
+from flac_detective.analysis.new_scoring.profiler import RuleProfiler
+from flac_detective.bench import build_corpus, duration_corpus
+
+FAKE_VERDICTS = ("SUSPICIOUS", "FAKE_CERTAIN")
+
+
+def _run(corpus, analyzer: FLACAnalyzer, profiler: RuleProfiler) -> Dict[str, Dict[str, float]]:
+    """Analyze the corpus and aggregate figures per class."""
+    groups: Dict[str, List[float]] = {}
+    tracing.collect()
+    tracing.enable()
+    try:
+        for spec, path in corpus:
+            start = time.perf_counter()
+            result = analyzer.analyze_file(path)
+            elapsed = time.perf_counter() - start
+            profiler.add(tracing.collect())
+
+            correct = (result["verdict"] in FAKE_VERDICTS) == (spec.label == "fake")
+            figures = groups.setdefault(spec.group, [0, 0.0, 0, 0])
+            figures[0] += 1
+            figures[1] += elapsed
+            figures[2] += path.stat().st_size
+            figures[3] += correct
+    finally:
+        tracing.enable(False)
+        tracing.collect()
+
+    return {
+        group: {
+            "files": files,
+            "files_per_second": files / elapsed,
+            "megabytes_per_second": size / 1e6 / elapsed,
+            "accuracy": correct / files,
+        }
+        for group, (files, elapsed, size, correct) in groups.items()
+    }
+
+
+def _print_table(stats: Dict[str, Dict[str, float]]):
+    print()
+    print(f"{'class':<24} {'files':>6} {'files/s':>9} {'MB/s':>9} {'accuracy':>9}")
+    for group in sorted(stats):
+        s = stats[group]
+        print(
+            f"{group:<24} {s['files']:>6} {s['files_per_second']:>9.2f} "
+            f"{s['megabytes_per_second']:>9.2f} {s['accuracy']:>9.1%}"
+        )
+
+
+def test_throughput_per_class(synthetic_corpus):
+    """Report throughput per class and check that every rule path is covered."""
+    profiler = RuleProfiler()
+    stats = _run(synthetic_corpus, FLACAnalyzer(sample_duration=30.0), profiler)
+    _print_table(stats)
+    print(profiler.format_report())
+
+    executed = set(profiler.rule_table())
+    assert executed == {rule.rule_id for rule in _build_rules()}
+
+
+@pytest.mark.slow
+def test_throughput_per_duration(tmp_path_factory):
+    """Report throughput from 5 s to 10 min files (2 hours with FLAC_DETECTIVE_BENCH_LONG=1)."""
+    durations = (5.0, 60.0, 600.0, 7200.0)
+    if not os.environ.get("FLAC_DETECTIVE_BENCH_LONG"):
+        durations = durations[:3]
+    corpus = build_corpus(duration_corpus(durations))
+
+    stats = {}
+    for spec, path in corpus:
+        stats.update(
+            {
+                f"{spec.kind}_{int(spec.duration)}s": s
+                for s in _run([(spec, path)], FLACAnalyzer(), RuleProfiler()).values()
+            }
+        )
+    _print_table(stats)
+    assert len(stats) == len(corpus)
@@ -0,0 +1,51 @@
+"""Memory soak test: worker RSS must stay flat over many files.
+
+Analyzes corpus files over and over in one process, like a long-lived
+worker, and checks that the resident memory after the first files does not
+keep growing. Configure with environment variables:
+
+    FLAC_DETECTIVE_SOAK_FILES     files to analyze (default 100; e.g. 10000)
+    FLAC_DETECTIVE_SOAK_MAX_MB    allowed RSS growth after warm-up (default 64)
+
+    FLAC_DETECTIVE_SOAK_FILES=10000 pytest tests/benchmarks/test_memory_soak.py -s
+"""
+
+import os
+
+import pytest
+
+from flac_detective.analysis.analyzer import FLACAnalyzer
+from flac_detective.analysis.buffer_pool import get_buffer_pool
+from flac_detective.bench import CorpusSpec, build_corpus
+from flac_detective.worker_pool import rss_bytes
+
+WARMUP_FILES = 10
+
+
+@pytest.mark.slow
+def test_rss_stays_flat():
+    """RSS growth between the warm-up and the last file stays within budget."""
+    files = int(os.environ.get("FLAC_DETECTIVE_SOAK_FILES", "100"))
+    max_growth_mb = float(os.environ.get("FLAC_DETECTIVE_SOAK_MAX_MB", "64"))
+    if rss_bytes() is None:
+        pytest.skip("RSS not available on this platform")
+
+    specs = [
+        CorpusSpec("soak_authentic", "authentic", "music", 44100, 16, 60.0),
+        CorpusSpec("soak_mp3", "fake", "mp3", 44100, 16, 45.0, cutoff=16000, mp3_bitrate=192),
+    ]
+    paths = [path for _, path in build_corpus(specs)]
+    analyzer = FLACAnalyzer()
+
+    baseline = None
+    for index in range(files):
+        analyzer.analyze_file(paths[index % len(paths)])
+        if index + 1 == WARMUP_FILES:
+            baseline = rss_bytes()
+    growth_mb = (rss_bytes() - baseline) / 1e6
+
+    print(
+        f"\n{files} files: RSS growth after warm-up {growth_mb:+.1f} MB, "
+        f"buffer pool {get_buffer_pool().get_stats()}"
+    )
+    assert growth_mb < max_growth_mb
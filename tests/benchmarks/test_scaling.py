@@ -0,0 +1,61 @@
+"""Scaling benchmark of the parallel scan (run_analysis_loop).
+
+Sweeps worker counts, library sizes and file-size mixes on generated
+libraries and writes the results to JSON. Configure with environment
+variables:
+
+    FLAC_DETECTIVE_BENCH_WORKERS        worker counts (default "1,2,4")
+    FLAC_DETECTIVE_BENCH_LIBRARY_SIZES  files per library (default "200";
+                                        e.g. "1000,10000,100000")
+    FLAC_DETECTIVE_BENCH_MIXES          file-size mixes (default "tiny";
+                                        "tiny,mixed,album")
+    FLAC_DETECTIVE_BENCH_RESULTS        JSON results file to write
+    FLAC_DETECTIVE_BENCH_BASELINE       previous JSON results to compare with
+    FLAC_DETECTIVE_BENCH_MAX_REGRESSION allowed throughput drop in percent (default 10)
+
+    FLAC_DETECTIVE_BENCH_BASELINE=main.json pytest tests/benchmarks/test_scaling.py -s
+"""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from flac_detective.bench import (
+    compare_to_baseline,
+    format_runs,
+    run_scaling_benchmark,
+    save_results,
+)
+
+
+def _env_list(name: str, default: str, cast=int):
+    return [cast(value) for value in os.environ.get(name, default).split(",") if value]
+
+
+@pytest.mark.slow
+def test_scaling(tmp_path):
+    """Report throughput, memory and phase times per worker count."""
+    worker_counts = _env_list("FLAC_DETECTIVE_BENCH_WORKERS", "1,2,4")
+    runs = run_scaling_benchmark(
+        tmp_path,
+        worker_counts,
+        library_sizes=_env_list("FLAC_DETECTIVE_BENCH_LIBRARY_SIZES", "200"),
+        mixes=_env_list("FLAC_DETECTIVE_BENCH_MIXES", "tiny", cast=str),
+    )
+    results_path = Path(
+        os.environ.get("FLAC_DETECTIVE_BENCH_RESULTS", tmp_path / "scaling_results.json")
+    )
+    save_results(runs, results_path)
+
+    print()
+    print(format_runs(runs))
+    print(f"Results saved to {results_path}")
+
+    assert all(run["files"] == run["library_size"] for run in runs)
+
+    baseline = os.environ.get("FLAC_DETECTIVE_BENCH_BASELINE")
+    if baseline:
+        max_regression = float(os.environ.get("FLAC_DETECTIVE_BENCH_MAX_REGRESSION", "10"))
+        regressions = compare_to_baseline(runs, Path(baseline), max_regression)
+        assert not regressions, "Throughput regressions:\n" + "\n".join(regressions)
@@ -0,0 +1,33 @@
+"""Schedule benchmark: makespan of each submission order on a mixed library.
+
+Scans a library of mostly short files with a few long ones, once per
+``SCHEDULE`` policy, and reports the makespan against discovery order.
+Configure with environment variables:
+
+    FLAC_DETECTIVE_SCHEDULE_WORKERS       worker processes (default: CPU count, max 4)
+    FLAC_DETECTIVE_SCHEDULE_LIBRARY_SIZE  files in the library (default 64)
+
+    FLAC_DETECTIVE_SCHEDULE_WORKERS=8 pytest tests/benchmarks/test_schedule.py -s
+"""
+
+import os
+
+import pytest
+
+from flac_detective.bench import format_schedule_runs, run_schedule_benchmark
+
+
+@pytest.mark.slow
+def test_largest_first_shortens_the_tail(tmp_path):
+    """Largest-first finishes no later than discovery order."""
+    workers = int(os.environ.get("FLAC_DETECTIVE_SCHEDULE_WORKERS", min(4, os.cpu_count() or 1)))
+    library_size = int(os.environ.get("FLAC_DETECTIVE_SCHEDULE_LIBRARY_SIZE", "64"))
+    runs = run_schedule_benchmark(tmp_path, workers, library_size)
+
+    print()
+    print(format_schedule_runs(runs))
+
+    assert all(run["files"] == library_size for run in runs)
+    makespans = {run["schedule"]: run["makespan_s"] for run in runs}
+    # Timing noise: only a clear regression fails
+    assert makespans["largest"] <= makespans["discovery"] * 1.1
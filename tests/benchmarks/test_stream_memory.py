@@ -0,0 +1,69 @@
+"""Streaming memory test: a long hi-res file is analyzed in bounded memory.
+
+Writes a synthetic long 96 kHz/24-bit stereo file block by block (every
+accumulator active: the 10-20 kHz pre-echo band and the 16-22 kHz silence
+band need a high sample rate), runs the single-pass analysis under
+tracemalloc and checks that the peak of the allocations stays far below the
+size of the decoded audio. The pass must also keep its throughput, and
+finish within the deadline the scan gives the file (``task_deadline``).
+Configure with environment variables:
+
+    FLAC_DETECTIVE_STREAM_HOURS     duration of the file (default 0.5)
+    FLAC_DETECTIVE_STREAM_MAX_MB    allowed peak of the allocations (default 64)
+    FLAC_DETECTIVE_STREAM_MIN_MSPS  minimum throughput, million samples (all
+                                    channels) per second (default 2)
+
+    FLAC_DETECTIVE_STREAM_HOURS=4 pytest tests/benchmarks/test_stream_memory.py -s
+"""
+
+import os
+import time
+import tracemalloc
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from flac_detective.analysis.streaming import analyze_stream
+from flac_detective.schedule import task_deadline
+
+SAMPLE_RATE = 96000
+CHANNELS = 2
+WRITE_BLOCK = SAMPLE_RATE * 60
+
+
+@pytest.mark.slow
+def test_long_file_streams_in_bounded_memory(tmp_path):
+    """Peak allocations of the pass do not depend on the duration."""
+    hours = float(os.environ.get("FLAC_DETECTIVE_STREAM_HOURS", "0.5"))
+    max_mb = float(os.environ.get("FLAC_DETECTIVE_STREAM_MAX_MB", "64"))
+    min_msps = float(os.environ.get("FLAC_DETECTIVE_STREAM_MIN_MSPS", "2"))
+    frames = int(hours * 3600 * SAMPLE_RATE)
+
+    path = tmp_path / "long.flac"
+    rng = np.random.default_rng(0)
+    with sf.SoundFile(path, "w", SAMPLE_RATE, CHANNELS, subtype="PCM_24") as handle:
+        for start in range(0, frames, WRITE_BLOCK):
+            count = min(WRITE_BLOCK, frames - start)
+            handle.write(0.1 * rng.standard_normal((count, CHANNELS)))
+
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        stream = analyze_stream(path)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    decoded_mb = frames * CHANNELS * 8 / 1e6
+    msps = frames * CHANNELS / 1e6 / elapsed
+    print(
+        f"\n{hours:g} h: peak {peak / 1e6:.1f} MB for {decoded_mb:.0f} MB of decoded audio, "
+        f"{elapsed:.1f}s ({msps:.1f} M samples/s, deadline {task_deadline(path):.0f}s)"
+    )
+    assert stream.complete and stream.frames == frames
+    assert peak / 1e6 < max_mb
+    # Throughput measured under tracemalloc (about 10% slower)
+    assert msps >= min_msps
+    assert elapsed < task_deadline(path)
@@ -0,0 +1,112 @@
+"""Accuracy-vs-throughput evaluation of the triage stage.
+
+Compares the full analysis with the two-stage pipeline (triage, then full
+analysis of escalated files) on a labelled corpus:
+- accuracy against the labels (fake = SUSPICIOUS or FAKE_CERTAIN)
+- agreement of the two pipelines
+- throughput (files per second) and fraction of files escalated
+
+The corpus defaults to a small synthetic one. Point the
+FLAC_DETECTIVE_LABELLED_CORPUS environment variable to a directory with
+``authentic/`` and ``fake/`` sub-directories to evaluate a real library:
+
+    FLAC_DETECTIVE_LABELLED_CORPUS=/music/labelled pytest tests/benchmarks/test_triage_evaluation.py -s
+"""
+
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pytest
+import soundfile as sf
+from scipy import signal
+
+from flac_detective.analysis.analyzer import FLACAnalyzer
+from flac_detective.config import TriageConfig
+
+FAKE_VERDICTS = ("SUSPICIOUS", "FAKE_CERTAIN")
+
+
+def _load_corpus(root: Path) -> List[Tuple[Path, bool]]:
+    """Load (path, is_fake) pairs from authentic/ and fake/ sub-directories."""
+    return [
+        (path, label == "fake")
+        for label in ("authentic", "fake")
+        for path in sorted((root / label).rglob("*.flac"))
+    ]
+
+
+@pytest.fixture(scope="module")
+def labelled_corpus(tmp_path_factory) -> List[Tuple[Path, bool]]:
+    """Labelled corpus: real one if configured, synthetic otherwise."""
+    configured = os.environ.get("FLAC_DETECTIVE_LABELLED_CORPUS")
+    if configured:
+        return _load_corpus(Path(configured))
+
+    root = tmp_path_factory.mktemp("labelled")
+    rng = np.random.default_rng(7)
+    corpus = []
+    for sample_rate in (44100, 48000):
+        audio = rng.standard_normal((sample_rate * 15, 2)) * 0.1
+        authentic = root / f"authentic_{sample_rate}.flac"
+        sf.write(authentic, audio, sample_rate, subtype="PCM_16")
+        corpus.append((authentic, False))
+
+        # Low-pass at typical MP3 encoder cutoffs
+        for cutoff in (16000, 19500):
+            sos = signal.butter(12, cutoff, fs=sample_rate, output="sos")
+            fake = root / f"fake_{sample_rate}_{cutoff}.flac"
+            sf.write(fake, signal.sosfilt(sos, audio, axis=0), sample_rate, subtype="PCM_16")
+            corpus.append((fake, True))
+    return corpus
+
+
+def evaluate(
+    corpus: List[Tuple[Path, bool]], analyzer: FLACAnalyzer, use_triage: bool
+) -> Dict[str, object]:
+    """Run one pipeline over the corpus and collect accuracy/throughput figures."""
+    verdicts = {}
+    escalated = 0
+    start = time.perf_counter()
+    for path, _ in corpus:
+        result = analyzer.triage_file(path) if use_triage else {"triage": "escalated"}
+        if result["triage"] == "escalated":
+            escalated += 1
+            result = analyzer.analyze_file(path)
+        verdicts[path] = result["verdict"]
+    elapsed = time.perf_counter() - start
+
+    correct = sum((verdicts[path] in FAKE_VERDICTS) == is_fake for path, is_fake in corpus)
+    return {
+        "verdicts": verdicts,
+        "accuracy": correct / len(corpus),
+        "files_per_second": len(corpus) / elapsed,
+        "escalation_fraction": escalated / len(corpus),
+    }
+
+
+def test_triage_accuracy_vs_throughput(labelled_corpus):
+    """Report accuracy and throughput of both pipelines."""
+    analyzer = FLACAnalyzer(sample_duration=30.0, triage=TriageConfig(ENABLED=True))
+
+    full = evaluate(labelled_corpus, analyzer, use_triage=False)
+    triaged = evaluate(labelled_corpus, analyzer, use_triage=True)
+
+    agreement = sum(
+        full["verdicts"][path] == triaged["verdicts"][path] for path, _ in labelled_corpus
+    ) / len(labelled_corpus)
+
+    print()
+    print(f"{'pipeline':<10} {'accuracy':>9} {'files/s':>9} {'escalated':>10}")
+    for name, figures in (("full", full), ("triage", triaged)):
+        print(
+            f"{name:<10} {figures['accuracy']:>9.1%} {figures['files_per_second']:>9.2f} "
+            f"{figures['escalation_fraction']:>10.1%}"
+        )
+    print(f"verdict agreement: {agreement:.1%}")
+
+    assert full["escalation_fraction"] == 1.0
+    assert 0.0 <= triaged["escalation_fraction"] <= 1.0
+    assert triaged["accuracy"] >= full["accuracy"] - 0.1
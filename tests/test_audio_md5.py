@@ -0,0 +1,96 @@
+"""Tests for the STREAMINFO MD5 checks and the staged copy verification."""
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from flac_detective.analysis import FLACAnalyzer
+from flac_detective.analysis.audio_cache import AudioCache
+from flac_detective.analysis.audio_md5 import AudioMD5, md5_matches
+from flac_detective.analysis.diagnostic_tracker import IssueType, get_tracker, reset_tracker
+from flac_detective.config import analysis_config
+from flac_detective.staging import StagedFile, file_digest
+from flac_detective.streaminfo import read_streaminfo
+
+# Offset of the MD5 in a file without ID3 tag: marker, block header, 18 bytes of STREAMINFO
+MD5_OFFSET = 4 + 4 + 18
+
+
+def write_noise(path, subtype="PCM_16", frames=44100 * 3):
+    audio = np.random.default_rng(7).uniform(-0.5, 0.5, (frames, 2))
+    sf.write(path, audio, 44100, subtype=subtype)
+    return path
+
+
+def spoil_md5(path):
+    data = bytearray(path.read_bytes())
+    data[MD5_OFFSET] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+
+@pytest.mark.parametrize("subtype", ["PCM_16", "PCM_24"])
+def test_md5_of_decoded_audio_matches_header(tmp_path, subtype):
+    path = write_noise(tmp_path / "noise.flac", subtype)
+    info = read_streaminfo(path)
+    data, _ = sf.read(path, always_2d=True)
+    assert md5_matches(data, info)
+
+    # Block by block, as the streaming pass does
+    md5 = AudioMD5(info.bits_per_sample)
+    for start in range(0, len(data), 10000):
+        md5.update(data[start : start + 10000])
+    assert md5.digest() == info.md5
+
+    data[1000, 0] += 2 / 2**info.bits_per_sample
+    assert md5_matches(data, info) is False
+    assert md5_matches(data[:-1], info) is None
+
+
+@pytest.mark.parametrize("mode", ["full", "stream"])
+def test_cache_verify_md5(tmp_path, monkeypatch, mode):
+    if mode == "stream":
+        monkeypatch.setattr(analysis_config, "LARGE_FILE_MB", 1)
+        monkeypatch.setattr(analysis_config, "LARGE_FILE_MODE", "stream")
+    path = write_noise(tmp_path / "noise.flac", frames=44100 * 4)
+
+    def verify():
+        cache = AudioCache(path)
+        assert cache.verify_md5() is None  # Nothing decoded yet
+        if cache.is_streaming():
+            cache.get_stream()
+        else:
+            cache.get_full_audio()
+        try:
+            return cache.verify_md5()
+        finally:
+            cache.clear()
+
+    assert verify() is True
+    spoil_md5(path)
+    assert verify() is False
+
+
+def test_bad_copy_is_copied_again(tmp_path):
+    source = write_noise(tmp_path / "noise.flac")
+    # A copy spoiled in transit: decodes, but not to its header's MD5
+    bad = tmp_path / "bad_copy.flac"
+    bad.write_bytes(source.read_bytes())
+    spoil_md5(bad)
+    staged = StagedFile(bad, file_digest(bad))
+
+    reset_tracker()
+    result = FLACAnalyzer().analyze_file(source, staged)
+    assert result["verdict"] != "ERROR"
+    assert not bad.exists()
+    issues = get_tracker().get_issues_for_file(str(source))
+    assert [issue.issue_type for issue in issues] == [IssueType.BAD_COPY]
+
+
+def test_corrupt_source_is_reported(tmp_path):
+    source = write_noise(tmp_path / "noise.flac")
+    spoil_md5(source)
+
+    reset_tracker()
+    FLACAnalyzer().analyze_file(source)
+    assert get_tracker().has_issue(str(source), IssueType.MD5_MISMATCH)
+    assert not get_tracker().has_issue(str(source), IssueType.BAD_COPY)
@@ -0,0 +1,47 @@
+"""Tests for the synthetic benchmark corpus generator."""
+
+import numpy as np
+import soundfile as sf
+
+from flac_detective.bench import CorpusSpec, build_corpus, default_corpus
+from flac_detective.analysis.new_scoring.constants import MP3_SIGNATURES
+
+
+def test_default_corpus_covers_the_signatures():
+    specs = default_corpus()
+
+    assert len({spec.name for spec in specs}) == len(specs)
+    assert {spec.sample_rate for spec in specs} >= {44100, 48000, 96000, 192000}
+    assert {spec.mp3_bitrate for spec in specs} >= {b for b, _, _ in MP3_SIGNATURES}
+    for spec in specs:
+        if spec.kind == "mp3":
+            _, low, high = next(s for s in MP3_SIGNATURES if s[0] == spec.mp3_bitrate)
+            assert low <= spec.cutoff <= high
+
+
+def test_generation_is_deterministic_and_cached(tmp_path):
+    specs = [
+        CorpusSpec("mp3", "fake", "mp3", 44100, 16, 12.0, 16000.0, 160),
+        CorpusSpec("fake24", "fake", "fake_24bit", 48000, 24, 1.0, 16000.0, 160),
+    ]
+    (spec, path), (_, fake24_path) = build_corpus(specs, tmp_path / "a", seed=1)
+    (_, same_path), _ = build_corpus(specs, tmp_path / "b", seed=1)
+    (_, other_seed_path), _ = build_corpus(specs, tmp_path / "b", seed=2)
+
+    audio, sample_rate = sf.read(path)
+    assert sample_rate == 44100 and audio.shape == (12 * 44100, 2)
+    assert path.read_bytes() == same_path.read_bytes()
+    assert path.read_bytes() != other_seed_path.read_bytes()
+
+    # Cached: not regenerated
+    mtime = path.stat().st_mtime_ns
+    assert build_corpus(specs, tmp_path / "a", seed=1)[0][1].stat().st_mtime_ns == mtime
+
+    # Low-pass: next to no energy above the cutoff
+    spectrum = np.abs(np.fft.rfft(audio[:, 0])) ** 2
+    freqs = np.fft.rfftfreq(len(audio), 1 / sample_rate)
+    assert spectrum[freqs > 17000].sum() < 1e-6 * spectrum.sum()
+
+    # Fake 24-bit: the 8 low bits are always zero
+    samples, _ = sf.read(fake24_path, dtype="int32")
+    assert not np.any((samples >> 8) & 0xFF)
@@ -0,0 +1,45 @@
+"""Tests for the scaling benchmark helpers."""
+
+from flac_detective.bench import (
+    build_library,
+    compare_to_baseline,
+    format_schedule_runs,
+    save_results,
+)
+
+
+def run(workers, files_per_second):
+    return {
+        "mix": "tiny",
+        "library_size": 100,
+        "workers": workers,
+        "files_per_second": files_per_second,
+    }
+
+
+def test_compare_to_baseline(tmp_path):
+    baseline = save_results([run(1, 100.0), run(4, 300.0)], tmp_path / "baseline.json")
+
+    assert compare_to_baseline([run(1, 95.0), run(4, 280.0)], baseline, 10) == []
+    regressions = compare_to_baseline([run(1, 95.0), run(4, 240.0), run(8, 1.0)], baseline, 10)
+    assert len(regressions) == 1 and "4 worker(s)" in regressions[0]
+
+
+def test_build_library(tmp_path):
+    library = build_library(tmp_path / "library", 5, "tiny", cache_dir=tmp_path / "cache")
+
+    files = sorted(library.rglob("*.flac"))
+    assert len(files) == 5
+    assert len({f.read_bytes() for f in files}) == 1
+
+
+def test_format_schedule_runs():
+    runs = [
+        {"schedule": "discovery", "library_size": 64, "workers": 4, "makespan_s": 20.0},
+        {"schedule": "largest", "library_size": 64, "workers": 4, "makespan_s": 15.0},
+    ]
+    runs[0]["improvement_pct"], runs[1]["improvement_pct"] = 0.0, 25.0
+
+    lines = format_schedule_runs(runs).splitlines()
+    assert len(lines) == 3
+    assert lines[2].split()[-1] == "-25.0%"
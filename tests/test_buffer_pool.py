@@ -0,0 +1,132 @@
+"""Tests for the buffer pool, large-file spilling and the in-place spectral helpers."""
+
+import numpy as np
+import soundfile as sf
+from scipy import signal
+
+from flac_detective.analysis import FLACAnalyzer
+from flac_detective.analysis.audio_cache import AudioCache
+from flac_detective.analysis.buffer_pool import BufferPool, get_buffer_pool, spill_buffer
+from flac_detective.analysis.new_scoring.audio_loader import sf_blocks, sf_blocks_partial
+from flac_detective.analysis.spectrum import (
+    calculate_high_frequency_energy,
+    detect_cutoff,
+    windowed_spectrum,
+)
+from flac_detective.config import analysis_config
+
+
+def test_released_buffer_is_reused():
+    pool = BufferPool(max_bytes=1 << 20)
+    first = pool.acquire((1000, 2))
+    assert first.shape == (1000, 2) and first.dtype == np.float64
+    pool.release(first)
+
+    second = pool.acquire((500, 2))
+    assert np.shares_memory(first, second)
+    assert pool.get_stats()["hits"] == 1
+
+
+def test_pool_keeps_buffers_within_limit():
+    pool = BufferPool(max_bytes=10_000)
+    pool.release(pool.acquire((2000,)))  # 16 kB: not kept
+    assert pool.get_stats()["free_buffers"] == 0
+
+    pool.release(pool.acquire((1000,)))
+    assert pool.get_stats()["free_bytes"] == 8000
+
+
+def test_oversize_buffer_does_not_evict_smaller_ones():
+    pool = BufferPool(max_bytes=10_000)
+    small = pool.acquire((500,))
+    pool.release(pool.acquire((2000,)))  # 16 kB: skipped
+    pool.release(small)
+    assert pool.get_stats()["free_bytes"] == 4000
+
+    pool.release(pool.acquire((3000,)))  # 24 kB, larger than the kept buffer: skipped
+    assert pool.get_stats()["free_bytes"] == 4000
+
+
+def test_audio_cache_returns_decode_buffer_on_clear(tmp_path):
+    path = tmp_path / "tone.flac"
+    audio = 0.5 * np.sin(np.linspace(0, 2000, 44100 * 2)).reshape(-1, 2)
+    sf.write(path, audio, 44100, subtype="PCM_16")
+    get_buffer_pool().clear()
+
+    cache = AudioCache(path)
+    data, sample_rate = cache.get_full_audio()
+    np.testing.assert_allclose(data, sf.read(path, always_2d=True)[0])
+    assert sample_rate == 44100
+
+    cache.clear()
+    assert get_buffer_pool().get_stats()["free_buffers"] == 1
+
+
+def test_sf_blocks_reads_into_out(tmp_path):
+    path = tmp_path / "noise.flac"
+    audio = np.random.default_rng(0).uniform(-0.5, 0.5, (50000, 2))
+    sf.write(path, audio, 44100, subtype="PCM_16")
+    out = np.empty((16384, 2), dtype=np.float32)
+
+    chunks = [chunk.copy() for chunk in sf_blocks(str(path), out=out)]
+    assert all(np.shares_memory(chunk, out) for chunk in sf_blocks(str(path), out=out))
+    np.testing.assert_array_equal(np.concatenate(chunks), sf.read(path, dtype="float32")[0])
+
+
+def test_windowed_spectrum_matches_reference():
+    rng = np.random.default_rng(1)
+    data = rng.standard_normal((44100, 2))
+    freqs, magnitude, magnitude_db = windowed_spectrum(data, 44100)
+
+    mono = np.mean(data, axis=1) * signal.windows.hann(44100)
+    expected = np.abs(np.fft.rfft(mono))
+    np.testing.assert_allclose(magnitude, expected, rtol=1e-6, atol=1e-9)
+    np.testing.assert_allclose(magnitude_db, 20 * np.log10(expected + 1e-10), atol=1e-6)
+    np.testing.assert_allclose(freqs, np.fft.rfftfreq(44100, 1 / 44100))
+
+    # Results only depend on the values, not on the scratch buffers
+    cutoff = detect_cutoff(freqs, magnitude_db, 44100)
+    energy = calculate_high_frequency_energy(freqs, magnitude)
+    assert detect_cutoff(freqs, magnitude_db.copy(), 44100) == cutoff
+    assert calculate_high_frequency_energy(freqs, magnitude.copy()) == energy
+
+
+def test_spill_buffer_is_file_backed(tmp_path):
+    spill = spill_buffer((1000, 2), directory=str(tmp_path))
+    assert isinstance(spill, np.memmap) and not spill.any()
+    spill[:] = 1.0
+    assert spill[10:20].sum() == 20.0
+    # Anonymous file: nothing to clean up
+    assert not list(tmp_path.iterdir())
+
+
+def test_large_file_analysis_matches_in_memory(tmp_path, monkeypatch):
+    path = tmp_path / "noise.flac"
+    audio = 0.1 * np.random.default_rng(2).standard_normal((44100 * 12, 2))
+    sf.write(path, audio, 44100, subtype="PCM_16")
+    analyzer = FLACAnalyzer(sample_duration=10.0)
+    expected = analyzer.analyze_file(path)
+
+    # Spill everything over 1 MB (this file decodes to ~8.5 MB)
+    monkeypatch.setattr(analysis_config, "LARGE_FILE_MB", 1)
+    monkeypatch.setattr(analysis_config, "LARGE_FILE_MODE", "spill")
+    cache = AudioCache(path)
+    data, _ = cache.get_full_audio()
+    assert isinstance(data, np.memmap)
+    np.testing.assert_array_equal(data, sf.read(path, always_2d=True)[0])
+    cache.clear()
+
+    result = analyzer.analyze_file(path)
+    for key in ("verdict", "score", "cutoff_freq"):
+        assert result[key] == expected[key]
+
+
+def test_partial_read_fills_out(tmp_path):
+    path = tmp_path / "noise.flac"
+    audio = np.random.default_rng(3).uniform(-0.5, 0.5, (50000, 2))
+    sf.write(path, audio, 44100, subtype="PCM_16")
+    out = spill_buffer((50000, 2), directory=str(tmp_path))
+
+    data, sample_rate, complete = sf_blocks_partial(str(path), out=out)
+    assert complete and sample_rate == 44100 and np.shares_memory(data, out)
+    np.testing.assert_array_equal(data, sf.read(path)[0])
@@ -0,0 +1,69 @@
+"""Tests for diagnostic aggregation across analysis workers."""
+
+import numpy as np
+import soundfile as sf
+
+from flac_detective.analysis.diagnostic_tracker import (
+    DiagnosticTracker,
+    FileIssue,
+    IssueType,
+    get_tracker,
+    reset_tracker,
+)
+
+
+def test_merged_issues_update_counters():
+    tracker = DiagnosticTracker()
+    tracker.record_issue("/music/a.flac", IssueType.PARTIAL_READ, "lost sync")
+    tracker.add_issues(
+        [
+            FileIssue("/music/b.flac", IssueType.READ_FAILED, "unreadable"),
+            FileIssue("/music/b.flac", IssueType.REPAIR_PENDING, "queued"),
+        ]
+    )
+
+    stats = tracker.get_statistics()
+    assert stats["files_with_issues"] == 2
+    assert stats["critical_failures"] == 1
+    assert stats["issue_types"] == {"partial_read": 1, "read_failed": 1, "repair_pending": 1}
+    assert tracker.has_critical_issues("/music/b.flac")
+    assert not tracker.has_critical_issues("/music/a.flac")
+
+    tracker.clear()
+    assert tracker.get_statistics()["issue_types"] == {}
+
+
+def test_bad_copy_voids_earlier_issues():
+    tracker = DiagnosticTracker()
+    tracker.record_issue("/music/a.flac", IssueType.READ_FAILED, "lost sync")
+    tracker.record_issue("/music/a.flac", IssueType.REPAIR_PENDING, "queued")
+    tracker.record_issue("/music/b.flac", IssueType.READ_FAILED, "unreadable")
+    tracker.record_issue("/music/a.flac", IssueType.BAD_COPY, "copied again")
+
+    stats = tracker.get_statistics()
+    assert stats["files_with_issues"] == 2
+    assert stats["critical_failures"] == 1
+    assert stats["issue_types"] == {"read_failed": 1, "bad_copy": 1}
+    assert not tracker.has_issue("/music/a.flac", IssueType.REPAIR_PENDING)
+
+
+def test_worker_issues_reach_the_parent_report(tmp_path, monkeypatch):
+    from flac_detective import main
+    from flac_detective.config import analysis_config
+
+    monkeypatch.setattr(analysis_config, "MAX_WORKERS", 2)
+    good = tmp_path / "good.flac"
+    sf.write(good, np.zeros((44100, 2)), 44100, subtype="PCM_16")
+    broken = tmp_path / "broken.flac"
+    broken.write_bytes(b"fLaC" + b"\x00" * 1024)
+
+    reset_tracker()
+    main.run_analysis_loop([good, broken], [], output_dir=tmp_path)
+
+    tracker = get_tracker()
+    assert tracker.get_files_with_issues() == [str(broken)]
+    assert tracker.get_statistics()["total_files"] == 1
+    assert IssueType.REPAIR_PENDING in {
+        issue.issue_type for issue in tracker.get_issues_for_file(str(broken))
+    }
+    reset_tracker()
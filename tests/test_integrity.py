@@ -0,0 +1,132 @@
+"""Tests for the frame CRC / STREAMINFO MD5 integrity check."""
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from flac_detective import integrity
+from flac_detective.integrity import (
+    audio_offset,
+    check_integrity,
+    crc16,
+    find_frames,
+    frame_residues,
+    generate_integrity_report,
+    run_integrity_stage,
+)
+from flac_detective.streaminfo import read_streaminfo
+
+
+def write_noise(path, subtype="PCM_16", seconds=10, sample_rate=44100):
+    audio = 0.3 * np.random.default_rng(5).standard_normal((sample_rate * seconds, 2))
+    sf.write(path, audio, sample_rate, subtype=subtype)
+    return path
+
+
+def frames_of(path):
+    buf = np.memmap(path, dtype=np.uint8, mode="r")
+    info = read_streaminfo(path)
+    return buf, info, find_frames(buf, audio_offset(buf), info)
+
+
+def damage(path, offset, tmp_path):
+    data = bytearray(path.read_bytes())
+    data[offset] ^= 0x10
+    damaged = tmp_path / "damaged.flac"
+    damaged.write_bytes(bytes(data))
+    return damaged
+
+
+@pytest.mark.parametrize("subtype", ["PCM_16", "PCM_24"])
+def test_intact_file(tmp_path, subtype):
+    path = write_noise(tmp_path / "noise.flac", subtype)
+    result = check_integrity(path, verify_md5=True)
+    assert result.ok and result.md5_ok
+    info = read_streaminfo(path)
+    assert result.frames == -(-info.total_samples // info.max_blocksize)
+
+
+def test_residues_match_bytewise_crc(tmp_path, monkeypatch):
+    path = write_noise(tmp_path / "noise.flac")
+    buf, _, frames = frames_of(path)
+    starts = np.array([frame.offset for frame in frames])
+    ends = np.append(starts[1:], len(buf))
+    ends[3] -= 1  # A frame without its last byte
+    expected = [crc16(bytes(buf[s:e])) for s, e in zip(starts, ends)]
+
+    assert frame_residues(buf, starts, ends).tolist() == expected
+    assert expected[3] and not any(expected[:3])
+    # Long frames go through the bytewise path
+    monkeypatch.setattr(integrity, "MAX_VECTOR_FRAME", int(np.median(ends - starts)))
+    monkeypatch.setattr(integrity, "CRC_BATCH", 50_000)
+    assert frame_residues(buf, starts, ends).tolist() == expected
+
+
+def test_damaged_frame_is_located(tmp_path):
+    path = write_noise(tmp_path / "noise.flac")
+    _, info, frames = frames_of(path)
+    target = frames[len(frames) // 2]
+    following = frames[len(frames) // 2 + 1]
+
+    for offset in (following.offset - 100, target.offset + 3):  # Audio data, then header
+        result = check_integrity(damage(path, offset, tmp_path))
+        assert not result.ok and result.bad_frames == 1
+        assert result.first_bad_offset == target.offset
+        assert result.first_bad_sample == target.number * info.max_blocksize
+
+
+def test_damaged_first_frame(tmp_path):
+    path = write_noise(tmp_path / "noise.flac")
+    _, _, frames = frames_of(path)
+    result = check_integrity(damage(path, frames[0].offset + 2, tmp_path))
+    assert result.bad_frames == 1
+    assert (result.first_bad_offset, result.first_bad_sample) == (frames[0].offset, 0)
+
+
+def test_truncated_file(tmp_path):
+    path = write_noise(tmp_path / "noise.flac")
+    truncated = tmp_path / "truncated.flac"
+    truncated.write_bytes(path.read_bytes()[: path.stat().st_size // 2])
+    result = check_integrity(truncated)
+    assert not result.ok and "truncated" in result.error
+
+
+def test_trailing_tag_is_not_damage(tmp_path):
+    path = write_noise(tmp_path / "noise.flac")
+    tagged = tmp_path / "tagged.flac"
+    tagged.write_bytes(path.read_bytes() + b"TAG" + b"\x00" * 125)
+    assert check_integrity(tagged).ok
+
+    # Other trailing data leaves the last frame failing its CRC
+    garbage = tmp_path / "garbage.flac"
+    garbage.write_bytes(path.read_bytes() + b"\x01\x02\x03")
+    assert check_integrity(garbage).bad_frames == 1
+
+
+def test_md5_mismatch(tmp_path):
+    path = write_noise(tmp_path / "noise.flac")
+    data = bytearray(path.read_bytes())
+    data[4 + 4 + 18] ^= 0xFF  # STREAMINFO MD5
+    path.write_bytes(bytes(data))
+
+    assert check_integrity(path).ok  # Frames intact
+    result = check_integrity(path, verify_md5=True)
+    assert result.md5_ok is False and not result.ok
+
+
+def test_not_flac(tmp_path):
+    path = tmp_path / "fake.flac"
+    path.write_bytes(b"RIFF" + b"\x00" * 100)
+    result = check_integrity(path)
+    assert not result.ok and "Not a FLAC" in result.error
+
+
+def test_integrity_stage(tmp_path):
+    good = write_noise(tmp_path / "good.flac", seconds=3)
+    _, _, frames = frames_of(good)
+    bad = damage(good, frames[1].offset + 50, tmp_path)
+
+    results = run_integrity_stage([good, bad], max_workers=2)
+    assert {r.filepath: r.ok for r in results} == {str(good): True, str(bad): False}
+    report = generate_integrity_report(results, elapsed=1.0)
+    assert "Damaged files: 1" in report and str(bad) in report
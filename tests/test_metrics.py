@@ -0,0 +1,77 @@
+"""Tests for the live Prometheus metrics endpoint."""
+
+import urllib.error
+import urllib.request
+
+import pytest
+
+from flac_detective import metrics
+from flac_detective.analysis.diagnostic_tracker import FileIssue, IssueType
+from flac_detective.metrics import MetricsServer, ScanMetrics
+from flac_detective.worker_pool import WorkerPool
+
+
+def counting_task(rule_id):
+    metrics.inc("rule_executions_total", rule=rule_id)
+    return rule_id
+
+
+def test_counters_are_collected_per_process():
+    metrics.collect()
+    metrics.inc("rule_executions_total", rule="R1")
+    metrics.inc("rule_executions_total", rule="R1")
+    metrics.inc("decoded_bytes_total", 1024)
+
+    assert metrics.collect() == {
+        ("rule_executions_total", (("rule", "R1"),)): 2.0,
+        ("decoded_bytes_total", ()): 1024.0,
+    }
+    assert metrics.collect() == {}
+
+
+def test_render_prometheus_text():
+    scan_metrics = ScanMetrics()
+    scan_metrics.merge({("short_circuits_total", (("kind", "fast_fake"),)): 3.0})
+    issue = FileIssue("/music/a.flac", IssueType.PARTIAL_READ, "lost sync")
+    scan_metrics.record_result({"verdict": "AUTHENTIC"}, [issue])
+    scan_metrics.record_result({"verdict": "FAKE_CERTAIN"})
+
+    text = scan_metrics.render()
+
+    assert "# TYPE flac_detective_files_processed_total counter" in text
+    assert 'flac_detective_files_processed_total{verdict="AUTHENTIC"} 1' in text
+    assert 'flac_detective_short_circuits_total{kind="fast_fake"} 3' in text
+    assert 'flac_detective_diagnostic_issues_total{type="partial_read"} 1' in text
+    assert "flac_detective_files_per_second " in text
+
+
+def test_pool_ships_counters_and_exposes_gauges():
+    scan_metrics = ScanMetrics()
+    with WorkerPool(max_workers=1) as pool:
+        scan_metrics.pool = pool
+        future = pool.submit(counting_task, "R8")
+        assert future.result(timeout=30) == "R8"
+        stats = pool.stats()
+        scan_metrics.merge(future.counters)
+        text = scan_metrics.render()
+
+    assert future.counters == {("rule_executions_total", (("rule", "R8"),)): 1.0}
+    assert stats["in_flight"] == 0 and stats["queued"] == 0
+    assert list(stats["worker_rss"].values())[0] > 0
+    assert 'flac_detective_rule_executions_total{rule="R8"} 1' in text
+    assert "flac_detective_worker_rss_bytes{pid=" in text
+
+
+def test_http_endpoint():
+    scan_metrics = ScanMetrics()
+    scan_metrics.record_result({"verdict": "AUTHENTIC"})
+    server = MetricsServer(scan_metrics, port=0)
+    try:
+        url = f"http://127.0.0.1:{server.port}"
+        with urllib.request.urlopen(f"{url}/metrics", timeout=10) as response:
+            assert response.headers["Content-Type"].startswith("text/plain")
+            assert b'files_processed_total{verdict="AUTHENTIC"} 1' in response.read()
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"{url}/other", timeout=10)
+    finally:
+        server.close()
@@ -0,0 +1,81 @@
+"""Tests for the multi-threaded decoding of long files."""
+
+import numpy as np
+import pytest
+import soundfile as sf
+from mutagen.flac import FLAC, SeekPoint, SeekTable
+
+from flac_detective import metrics, threads
+from flac_detective.analysis import parallel_decode
+from flac_detective.analysis.audio_cache import AudioCache
+from flac_detective.analysis.parallel_decode import (
+    decode_parallel,
+    decode_threads,
+    seek_points,
+    split_ranges,
+)
+from flac_detective.config import analysis_config
+
+
+@pytest.fixture
+def noise_file(tmp_path):
+    path = tmp_path / "noise.flac"
+    audio = np.random.default_rng(0).uniform(-0.5, 0.5, (44100 * 20, 2))
+    sf.write(path, audio, 44100, subtype="PCM_16")
+    return path
+
+
+def test_split_ranges_cover_the_file():
+    assert split_ranges(100, 4) == [(0, 25), (25, 50), (50, 75), (75, 100)]
+    # Boundaries move to the nearest seek point; duplicates merge
+    assert split_ranges(100, 4, [0, 20, 48, 90]) == [(0, 20), (20, 48), (48, 90), (90, 100)]
+    assert split_ranges(100, 4, [0, 49]) == [(0, 49), (49, 100)]
+
+
+def test_seek_points_skip_placeholders(noise_file):
+    assert seek_points(str(noise_file)) == []
+
+    flac = FLAC(noise_file)
+    table = SeekTable(None)
+    table.seekpoints = [SeekPoint(0, 0, 4096), SeekPoint(0xFFFFFFFFFFFFFFFF, 0, 0)]
+    flac.metadata_blocks.append(table)
+    flac.save()
+    assert seek_points(str(noise_file)) == [0]
+
+
+def test_decode_threads_needs_a_long_file_or_idle_workers(monkeypatch):
+    monkeypatch.setattr(analysis_config, "PARALLEL_DECODE_MINUTES", 10.0)
+    monkeypatch.setattr(threads, "_fft_workers", 4)
+    monkeypatch.setattr(threads, "_idle_workers", 0)
+    hour = 3600 * 44100
+
+    assert decode_threads(hour, 44100) == 4
+    assert decode_threads(hour // 12, 44100) == 1
+    # Idle workers lend their threads, one range per 30 s at most
+    monkeypatch.setattr(threads, "_idle_workers", 1)
+    assert decode_threads(hour // 12, 44100) == 8
+    assert decode_threads(60 * 44100, 44100) == 2
+
+    monkeypatch.setattr(analysis_config, "PARALLEL_DECODE_MINUTES", 0.0)
+    assert decode_threads(hour, 44100) == 1
+
+
+def test_decode_parallel_matches_sequential_read(noise_file):
+    out = np.empty((44100 * 20, 2))
+
+    assert decode_parallel(str(noise_file), out, 4)
+    np.testing.assert_array_equal(out, sf.read(noise_file)[0])
+
+
+def test_audio_cache_decodes_in_parallel(noise_file, monkeypatch):
+    monkeypatch.setattr(analysis_config, "PARALLEL_DECODE_MINUTES", 0.1)
+    monkeypatch.setattr(parallel_decode, "MIN_RANGE_SECONDS", 5.0)
+    monkeypatch.setattr(threads, "_fft_workers", 2)
+    metrics.collect()
+
+    cache = AudioCache(noise_file)
+    data, sample_rate = cache.get_full_audio()
+    assert sample_rate == 44100
+    np.testing.assert_array_equal(data, sf.read(noise_file)[0])
+    assert metrics.collect()[("parallel_decodes_total", (("outcome", "complete"),))] == 1
+    cache.clear()
@@ -0,0 +1,78 @@
+"""Tests for runtime profiles and the calibration recommendations."""
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from flac_detective.analysis import FLACAnalyzer
+from flac_detective.bench import recommend
+from flac_detective.config import analysis_config
+from flac_detective.profile import current_settings, load_profile, save_profile
+
+
+@pytest.fixture
+def restore_settings():
+    saved = current_settings()
+    yield
+    for name, value in saved["analysis"].items():
+        setattr(analysis_config, name, value)
+
+
+def test_profile_round_trip(tmp_path, restore_settings, caplog):
+    settings = {
+        "analysis": {"MAX_WORKERS": "3", "STAGING": "direct", "BOGUS": 1},
+        "other": {},
+    }
+    path = save_profile(settings, tmp_path / "profile.json", {"cpu_count": 4})
+
+    load_profile(path)
+
+    assert analysis_config.MAX_WORKERS == 3
+    assert analysis_config.STAGING == "direct"
+    assert "BOGUS" in caplog.text and "other" in caplog.text
+
+    save_profile({"analysis": {"STAGING": "mmap"}}, path)
+    load_profile(path)
+    assert analysis_config.STAGING == "direct"
+
+    path.write_text("{}", encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_profile(path)
+
+
+def test_recommend():
+    def run(workers, mb_per_s, rss_mb=200.0):
+        return {"workers": workers, "megabytes_per_second": mb_per_s, "worker_peak_rss_mb": rss_mb}
+
+    measurements = {
+        "cpu_count": 8,
+        "total_memory_mb": 4000.0,
+        "io": {"read_mb_per_s": 500.0, "copy_mb_per_s": 400.0},
+        "scaling": [run(1, 10.0), run(2, 19.0), run(4, 35.0), run(8, 36.0, 400.0)],
+    }
+
+    analysis = recommend(measurements)["analysis"]
+    assert analysis["MAX_WORKERS"] == 4
+    assert analysis["RULE_WORKERS"] == 2
+    assert analysis["STAGING"] == "copy"
+    assert analysis["MAX_WORKER_RSS_MB"] == 768
+    assert analysis["LARGE_FILE_MB"] == 384
+
+    # Slow copies (e.g. USB drive of the sampled library) favour direct reads
+    measurements["library_io"] = {"read_mb_per_s": 40.0, "copy_mb_per_s": 30.0}
+    assert recommend(measurements)["analysis"]["STAGING"] == "direct"
+
+
+def test_direct_staging_matches_copy(tmp_path, restore_settings):
+    rng = np.random.default_rng(0)
+    path = tmp_path / "noise.flac"
+    sf.write(path, 0.1 * rng.standard_normal((44100 * 5, 2)), 44100, subtype="PCM_16")
+
+    analyzer = FLACAnalyzer(sample_duration=5.0)
+    analysis_config.STAGING = "copy"
+    copied = analyzer.analyze_file(path)
+    analysis_config.STAGING = "direct"
+    direct = analyzer.analyze_file(path)
+
+    assert direct["score"] == copied["score"]
+    assert direct["cutoff_freq"] == copied["cutoff_freq"]
@@ -0,0 +1,242 @@
+"""Tests for the declarative rule engine (scheduling, short-circuits, pruning)."""
+
+import functools
+import threading
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+import pytest
+
+from flac_detective.analysis import FLACAnalyzer
+from flac_detective.analysis.new_scoring import calculator
+from flac_detective.analysis.new_scoring.engine import (
+    FAST_STAGE,
+    FINAL_STAGE,
+    RuleCostModel,
+    RuleEngine,
+    ShortCircuit,
+)
+from flac_detective.analysis.new_scoring.models import (
+    AudioMetadata,
+    BitrateMetrics,
+    RuleResult,
+    ScoringContext,
+)
+from flac_detective.analysis.new_scoring.strategies import ScoringRule
+from flac_detective.bench import build_corpus, default_corpus
+
+
+def make_context(cutoff_freq: float = 16000) -> ScoringContext:
+    return ScoringContext(
+        filepath=Path("dummy.flac"),
+        audio_meta=AudioMetadata(sample_rate=44100, bit_depth=16, channels=2, duration=180.0),
+        bitrate_metrics=BitrateMetrics(real_bitrate=800, apparent_bitrate=1411, variance=0),
+        cutoff_freq=cutoff_freq,
+    )
+
+
+class FakeRule(ScoringRule):
+    """Configurable rule recording its executions."""
+
+    def __init__(
+        self,
+        rule_id: str,
+        score: int,
+        cost: float = 0.01,
+        inputs: Tuple[str, ...] = (),
+        outputs: Tuple[str, ...] = (),
+        bounds: Tuple[int, int] = None,
+        active: bool = True,
+    ):
+        self.rule_id = rule_id
+        self.score = score
+        self.cost = cost
+        self.inputs = inputs
+        self.outputs = outputs
+        self.score_bounds = bounds or (-100, 100)
+        self.active = active
+        self.calls = 0
+
+    def is_active(self, context: ScoringContext) -> bool:
+        return self.active
+
+    def evaluate(self, context: ScoringContext) -> RuleResult:
+        self.calls += 1
+        return RuleResult(self.score, [self.rule_id], {name: True for name in self.outputs})
+
+
+class BarrierRule(FakeRule):
+    """Expensive rule that only completes if its peers run at the same time."""
+
+    def __init__(self, rule_id: str, score: int, barrier: threading.Barrier, **kwargs):
+        super().__init__(rule_id, score, cost=100, **kwargs)
+        self.barrier = barrier
+
+    def evaluate(self, context: ScoringContext) -> RuleResult:
+        self.barrier.wait()
+        return super().evaluate(context)
+
+
+def run(rules, short_circuits=(), max_workers=None):
+    context = make_context()
+    engine = RuleEngine(
+        rules, short_circuits=short_circuits, cost_model=RuleCostModel(), max_workers=max_workers
+    )
+    score, reasons = engine.run(context)
+    return context, score, reasons
+
+
+class TestScheduling:
+    def test_cheap_rules_run_before_expensive_ones(self):
+        expensive = FakeRule("E", 5, cost=100)
+        cheap = FakeRule("C", 5)
+        context, score, reasons = run([expensive, cheap])
+        assert context.executed_rules == ["C", "E"]
+        # Reasons keep the canonical order regardless of execution order
+        assert reasons == ["E", "C"]
+        assert score == 10
+
+    def test_dependencies_are_respected(self):
+        consumer = FakeRule("B", 10, inputs=("flag",))
+        producer = FakeRule("A", 10, cost=100, outputs=("flag",))
+        context, _, _ = run([consumer, producer])
+        assert context.executed_rules == ["A", "B"]
+        assert context.flag is True
+
+    def test_merge_is_independent_of_execution_order(self):
+        # Clamping at 0 makes the fold order-sensitive: -20 then +30 gives 30
+        negative = FakeRule("N", -20, cost=100)
+        positive = FakeRule("P", 30)
+        _, score, _ = run([negative, positive])
+        assert score == 30
+
+    def test_inactive_rule_is_skipped(self):
+        rule = FakeRule("X", 50, active=False)
+        context, score, _ = run([rule])
+        assert rule.calls == 0
+        assert score == 0
+        assert context.executed_rules == []
+
+    def test_score_consumer_runs_last(self):
+        last = FakeRule("L", 0, inputs=("current_score",))
+        other = FakeRule("O", 0, cost=500)
+        context, _, _ = run([last, other])
+        assert context.executed_rules == ["O", "L"]
+
+
+class TestShortCircuits:
+    def test_fast_stage_skips_expensive_rules(self):
+        expensive = FakeRule("E", 10, cost=100)
+        cheap = FakeRule("C", 90)
+        stop = ShortCircuit("stop", FAST_STAGE, lambda ctx: ctx.current_score >= 86, "fast")
+        context, score, reasons = run([cheap, expensive], [stop])
+        assert expensive.calls == 0
+        assert score == 90
+        assert reasons == ["C", "fast"]
+
+    def test_final_stage_skips_score_consumers(self):
+        consumer = FakeRule("Z", -30, cost=100, inputs=("current_score",))
+        rule = FakeRule("A", 90, cost=100)
+        stop = ShortCircuit("stop", FINAL_STAGE, lambda ctx: ctx.current_score >= 86)
+        context, score, reasons = run([rule, consumer], [stop])
+        assert consumer.calls == 0
+        assert reasons == ["A"]
+
+
+class TestBranchAndBound:
+    def test_settled_verdict_skips_remaining_expensive_rules(self):
+        # 0 + [0, 20] stays AUTHENTIC whatever the expensive rule returns
+        expensive = FakeRule("E", 0, cost=100, bounds=(0, 20))
+        context, score, _ = run([FakeRule("C", 0), expensive])
+        assert expensive.calls == 0
+        assert score == 0
+
+    def test_open_verdict_runs_expensive_rules(self):
+        expensive = FakeRule("E", 40, cost=100, bounds=(0, 40))
+        context, score, _ = run([FakeRule("C", 0), expensive])
+        assert expensive.calls == 1
+        assert score == 40
+
+    def test_pruning_keeps_the_verdicts_of_the_real_rules(self, tmp_path, monkeypatch):
+        # Without short-circuits, so that the score bounds of R1-R11 decide what is skipped
+        executed = []
+
+        class RecordingEngine(RuleEngine):
+            def run(self, context):
+                outcome = super().run(context)
+                executed.append(set(context.executed_rules))
+                return outcome
+
+        outcomes = {}
+        for prune in (True, False):
+            engine = functools.partial(RecordingEngine, short_circuits=(), prune=prune)
+            monkeypatch.setattr(calculator, "RuleEngine", engine)
+            outcomes[prune] = [
+                FLACAnalyzer().analyze_file(path)
+                for _, path in build_corpus(default_corpus(5.0), tmp_path)
+            ]
+
+        pruned_runs, full_runs = executed[: len(executed) // 2], executed[len(executed) // 2 :]
+        assert any(pruned < full for pruned, full in zip(pruned_runs, full_runs))
+        for pruned, full, pruned_rules, full_rules in zip(
+            outcomes[True], outcomes[False], pruned_runs, full_runs
+        ):
+            assert pruned["verdict"] == full["verdict"], full["filepath"]
+            if pruned_rules == full_rules:
+                assert pruned["score"] == full["score"], full["filepath"]
+
+
+class TestConcurrentRules:
+    def test_independent_expensive_rules_run_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+        first = BarrierRule("A", 10, barrier, outputs=("flag_a",))
+        second = BarrierRule("B", 20, barrier, outputs=("flag_b",))
+        context, score, reasons = run([first, second, FakeRule("C", 0)], max_workers=2)
+        assert score == 30
+        # Published in canonical order, whatever the thread scheduling
+        assert reasons == ["A", "B", "C"]
+        assert context.executed_rules == ["C", "A", "B"]
+        assert context.flag_a is True and context.flag_b is True
+
+    def test_sequential_when_single_worker(self):
+        rules = [FakeRule("A", 10, cost=100), FakeRule("B", 20, cost=200)]
+        context, score, _ = run(rules, max_workers=1)
+        assert score == 30
+        assert context.executed_rules == ["A", "B"]
+
+    def test_results_are_frozen(self):
+        rule = FakeRule("A", 10, outputs=("flag",))
+        engine = RuleEngine([rule], short_circuits=(), cost_model=RuleCostModel())
+        context = make_context()
+        engine.run(context)
+        result = engine._execute(rule, context)
+        assert isinstance(result.reasons, tuple)
+        with pytest.raises(TypeError):
+            result.outputs["flag"] = False
+
+    def test_audio_buffer_is_shared_read_only(self):
+        audio = np.zeros((100, 2))
+
+        class Cache:
+            def is_streaming(self):
+                return False
+
+            def get_full_audio(self):
+                return audio, 44100
+
+        context = make_context()
+        context.cache = Cache()
+        RuleEngine([], cost_model=RuleCostModel())._ensure_audio(context)
+        assert not context.audio_data.flags.writeable
+        assert audio.flags.writeable
+
+
+class TestRuleCostModel:
+    def test_prior_then_moving_average(self):
+        model = RuleCostModel(smoothing=0.5)
+        rule = FakeRule("R", 0, cost=42)
+        assert model.estimate(rule) == 42
+        model.observe("R", 10)
+        model.observe("R", 20)
+        assert model.estimate(rule) == 15
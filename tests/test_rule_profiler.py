@@ -0,0 +1,63 @@
+"""Tests for the rule cost and short-circuit profiler."""
+
+import pytest
+
+from flac_detective.analysis.new_scoring.profiler import RuleProfiler
+from flac_detective.tracing import Span
+
+
+def rule(rule_id, wall_ms, score):
+    return Span(
+        f"rule.{rule_id}", "X", 0.0, wall_ms * 1000.0, 1, 1, {"score": score}, wall_ms * 500.0
+    )
+
+
+def instant(name, /, **args):
+    return Span(name, "i", 0.0, 0.0, 1, 1, args)
+
+
+def scoring_run(fast_score, final_score, expensive_ms=None):
+    spans = [rule("R1", 1.0, fast_score)]
+    spans.append(instant("stage_complete", stage="fast", score=fast_score, mp3_detected=False))
+    if expensive_ms is None:
+        spans.append(instant("short_circuit", name="fast_authentic"))
+    else:
+        spans.append(rule("R8", expensive_ms, final_score - fast_score))
+    spans.append(instant("scoring_done", score=final_score))
+    return spans
+
+
+@pytest.fixture
+def profiler():
+    profiler = RuleProfiler()
+    profiler.add(scoring_run(5, 5))
+    profiler.add(scoring_run(20, 20, expensive_ms=40.0))
+    # Two scoring runs in one task (triage then full analysis)
+    profiler.add(scoring_run(70, 90, expensive_ms=40.0) + scoring_run(25, 35, expensive_ms=17.0))
+    return profiler
+
+
+def test_rule_table(profiler):
+    table = profiler.rule_table()
+
+    assert len(profiler.runs) == 4
+    assert table["R1"]["activation_rate"] == 1.0
+    assert table["R8"]["activation_rate"] == 0.75
+    assert table["R8"]["mean_wall_ms"] == pytest.approx(32.33, abs=0.01)
+    assert table["R8"]["mean_cpu_ms"] == pytest.approx(16.17, abs=0.01)
+    assert table["R8"]["cost_share"] == pytest.approx(97 / 101)
+    assert table["R8"]["nonzero_rate"] == pytest.approx(2 / 3)
+    assert profiler.short_circuit_rates() == {"fast_authentic": 0.25}
+
+
+def test_what_if_thresholds(profiler):
+    # Stopping as FAKE_CERTAIN at 61 would have skipped R8 on one file,
+    # at the cost of changing its verdict (SUSPICIOUS instead of FAKE_CERTAIN)
+    assert profiler.what_if("fake", 61) == (1, 40.0, 1)
+    # Stopping as AUTHENTIC below 31 changes the verdict of the 25 -> 35 file
+    assert profiler.what_if("authentic", 31) == (2, 57.0, 1)
+    assert profiler.what_if("authentic", 10) == (0, 0.0, 0)
+
+    report = profiler.format_report()
+    assert "R8" in report and "fast_authentic" in report
+    assert "FAKE_CERTAIN at fast score >= 61" in report
@@ -0,0 +1,83 @@
+"""Tests for the STREAMINFO reader, the submission order and the deadlines of the files."""
+
+import time
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from flac_detective.analysis import FLACAnalyzer
+from flac_detective.config import analysis_config
+from flac_detective.schedule import estimate_cost, order_files, task_deadline
+from flac_detective.streaminfo import read_streaminfo
+
+
+def write_flac(path, seconds, sample_rate=44100, channels=2):
+    sf.write(path, np.zeros((int(seconds * sample_rate), channels)), sample_rate, subtype="PCM_24")
+    return path
+
+
+def test_read_streaminfo(tmp_path):
+    path = write_flac(tmp_path / "hires.flac", 1.5, 96000)
+
+    info = read_streaminfo(path)
+    assert info[:4] == (96000, 2, 24, 144000)
+    assert info.duration == 1.5 and len(info.md5) == 16
+
+
+def test_read_streaminfo_skips_id3_and_rejects_other_files(tmp_path):
+    flac = write_flac(tmp_path / "tone.flac", 1.0).read_bytes()
+    # ID3v2 header with a 20-byte (syncsafe) tag
+    tagged = tmp_path / "tagged.flac"
+    tagged.write_bytes(b"ID3\x04\x00\x00\x00\x00\x00\x14" + bytes(20) + flac)
+    assert read_streaminfo(tagged).total_samples == 44100
+
+    (tmp_path / "song.mp3").write_bytes(b"\xff\xfb" + bytes(100))
+    assert read_streaminfo(tmp_path / "song.mp3") is None
+    assert read_streaminfo(tmp_path / "missing.flac") is None
+
+
+def test_order_files_by_cost(tmp_path):
+    short = write_flac(tmp_path / "short.flac", 1.0)
+    hires = write_flac(tmp_path / "hires.flac", 1.0, 192000)
+    mono = write_flac(tmp_path / "mono.flac", 3.0, channels=1)
+    files = [short, hires, mono]
+
+    assert estimate_cost(hires) == 2 * 192000
+    assert order_files(files, "largest") == [hires, mono, short]
+    assert order_files(files, "smallest") == [short, mono, hires]
+    assert order_files(files, "discovery") == files
+    with pytest.raises(ValueError):
+        order_files(files, "random")
+
+
+def with_total_samples(path, target, total_samples):
+    """Copy a FLAC file, changing the length in its STREAMINFO block."""
+    data = bytearray(path.read_bytes())
+    packed = int.from_bytes(data[18:26], "big")
+    packed = (packed & ~((1 << 36) - 1)) | total_samples
+    data[18:26] = packed.to_bytes(8, "big")
+    target.write_bytes(bytes(data))
+    return target
+
+
+def test_long_hires_file_gets_the_time_its_analysis_takes(tmp_path, monkeypatch):
+    # Time the streaming analysis of 10 s of 192 kHz audio at the default settings
+    monkeypatch.setattr(analysis_config, "LARGE_FILE_MB", 1)
+    path = tmp_path / "hires.flac"
+    audio = 0.3 * np.random.default_rng(6).standard_normal((192000 * 10, 2))
+    sf.write(path, audio, 192000, subtype="PCM_24")
+    start = time.perf_counter()
+    FLACAnalyzer().analyze_file(path)
+    elapsed = time.perf_counter() - start
+
+    # A four-hour mix at the same rate takes 1440 times as long
+    mix = with_total_samples(path, tmp_path / "mix.flac", 4 * 3600 * 192000)
+    assert read_streaminfo(mix).duration == 4 * 3600
+    assert task_deadline(mix) > elapsed * 1440
+    assert task_deadline(path) < task_deadline(mix)
+
+
+def test_task_deadline_disabled(tmp_path, monkeypatch):
+    monkeypatch.setattr(analysis_config, "TASK_TIMEOUT", 0)
+    assert task_deadline(write_flac(tmp_path / "track.flac", 1.0)) == 0
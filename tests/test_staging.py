@@ -0,0 +1,149 @@
+"""Tests for the staging copies and the prefetch stage."""
+
+import os
+import subprocess
+import sys
+import threading
+from concurrent.futures import wait
+
+import pytest
+
+from flac_detective import metrics
+from flac_detective.staging import (
+    Prefetcher,
+    StagingArea,
+    file_digest,
+    stage_copy,
+    verify_copy,
+)
+
+
+def make_files(tmp_path, sizes):
+    files = []
+    for index, size in enumerate(sizes):
+        path = tmp_path / f"{index}.flac"
+        path.write_bytes(bytes([index]) * size)
+        files.append(path)
+    return files
+
+
+def drain(prefetcher):
+    """Stage everything, releasing each file once staged; returns the copies' contents."""
+    contents = {}
+    while prefetcher.pending:
+        assert len(prefetcher.pending) <= prefetcher.slots
+        done, _ = wait(list(prefetcher.pending))
+        for future in done:
+            source, staged = prefetcher.staged(future)
+            contents[source] = staged.path.read_bytes() if staged else None
+            prefetcher.release(source)
+            assert staged is None or not staged.path.exists()
+    return contents
+
+
+def test_stage_copy(tmp_path):
+    (source,) = make_files(tmp_path, [3_000_000])
+    staged = stage_copy(source)
+    try:
+        assert staged.path.name.startswith(f"flac_detective_{os.getpid()}_")
+        assert staged.path.read_bytes() == source.read_bytes()
+        assert staged.digest == file_digest(source)
+        assert verify_copy(source, staged)
+
+        # The source reads differently the second time
+        source.write_bytes(b"\xff" + source.read_bytes()[1:])
+        assert not verify_copy(source, staged)
+    finally:
+        staged.path.unlink()
+
+
+def test_prefetcher_stages_within_slots(tmp_path):
+    files = make_files(tmp_path, [1000] * 6)
+    with Prefetcher(slots=2, max_bytes=1 << 20) as prefetcher:
+        for path in files:
+            prefetcher.add(path)
+        assert len(prefetcher.pending) == 2
+
+        contents = drain(prefetcher)
+    assert contents == {path: path.read_bytes() for path in files}
+
+
+def test_prefetcher_byte_budget(tmp_path):
+    files = make_files(tmp_path, [600, 600, 2000])
+    with Prefetcher(slots=3, max_bytes=1000) as prefetcher:
+        for path in files:
+            prefetcher.add(path)
+        # The second file would exceed the budget; a file over budget still goes alone
+        assert list(prefetcher.pending.values()) == files[:1]
+        assert set(drain(prefetcher)) == set(files)
+
+
+def test_prefetcher_read_ahead_and_close(tmp_path):
+    files = make_files(tmp_path, [1000, 1000])
+    with Prefetcher(slots=2, max_bytes=1 << 20, copy=False) as prefetcher:
+        prefetcher.add(files[0])
+        assert drain(prefetcher) == {files[0]: None}
+
+    prefetcher = Prefetcher(slots=2, max_bytes=1 << 20)
+    prefetcher.add(files[1])
+    wait(list(prefetcher.pending))
+    _, staged = prefetcher.staged(next(iter(prefetcher.pending)))
+    prefetcher.close()
+    assert not staged.path.exists()
+
+
+def test_staging_area_falls_back_when_full(tmp_path):
+    source_dir = tmp_path / "src"
+    source_dir.mkdir()
+    first, second = make_files(source_dir, [600, 600])
+    area = StagingArea(str(tmp_path), max_bytes=1000, wait=0.2)
+    metrics.collect()
+
+    staged = area.stage(first)
+    assert area.used_bytes() == 600
+    # No room for the second file: read in place after the wait
+    assert area.stage(second) is None
+    counters = metrics.collect()
+    assert counters[("staging_fallbacks_total", ())] == 1
+    assert counters[("staging_wait_seconds_total", ())] >= 0.2
+    assert counters[("staged_bytes_total", (("by", "worker"),))] == 600
+
+    # A file over the whole budget goes alone
+    staged.path.unlink()
+    (large,) = make_files(source_dir, [5000])
+    assert area.stage(large).path.read_bytes() == large.read_bytes()
+
+
+def test_staging_area_waits_for_room(tmp_path):
+    source_dir = tmp_path / "src"
+    source_dir.mkdir()
+    first, second = make_files(source_dir, [600, 600])
+    area = StagingArea(str(tmp_path), max_bytes=1000, wait=10.0)
+    staged = area.stage(first)
+
+    timer = threading.Timer(0.3, staged.path.unlink)
+    timer.start()
+    try:
+        copy = area.stage(second)
+    finally:
+        timer.join()
+    assert copy.path.read_bytes() == second.read_bytes()
+
+
+@pytest.mark.skipif(os.name != "posix", reason="process liveness check")
+def test_sweep_orphans(tmp_path):
+    # A process that has exited, and a live one
+    dead = subprocess.run(
+        [sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True
+    )
+    dead_pid = int(dead.stdout)
+    orphan = tmp_path / f"flac_detective_{dead_pid}_abc.flac"
+    live = tmp_path / f"flac_detective_{os.getppid()}_abc.flac"
+    own = tmp_path / f"flac_detective_{os.getpid()}_abc.flac"
+    other = tmp_path / "flac_detective_notes.flac"
+    for path in (orphan, live, own, other):
+        path.write_bytes(b"x")
+
+    assert StagingArea(str(tmp_path)).sweep_orphans() == 1
+    assert not orphan.exists()
+    assert live.exists() and own.exists() and other.exists()
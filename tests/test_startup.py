@@ -0,0 +1,52 @@
+"""CLI startup: the parent must not import the analysis stack.
+
+The ``python -X importtime`` profile of ``import flac_detective.main`` is
+written to ``$FLAC_DETECTIVE_IMPORTTIME`` (default: the test's temp dir) so
+CI can keep it as an artifact.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import flac_detective
+
+HEAVY_MODULES = ("numpy", "scipy", "soundfile", "mutagen", "rich", "http.server")
+
+SRC_DIR = str(Path(flac_detective.__file__).resolve().parents[1])
+
+
+def test_cli_import_is_light(tmp_path):
+    code = (
+        "import sys, flac_detective.main\n"
+        f"print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([SRC_DIR, os.environ.get("PYTHONPATH", "")])}
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+
+    profile_path = Path(os.environ.get("FLAC_DETECTIVE_IMPORTTIME", tmp_path / "importtime.txt"))
+    profile_path.parent.mkdir(parents=True, exist_ok=True)
+    profile_path.write_text(completed.stderr, encoding="utf-8")
+
+    assert completed.stdout.split() == []
+    total_us = [
+        int(line.split("|")[1])
+        for line in completed.stderr.splitlines()
+        if line.rstrip().endswith("| flac_detective.main")
+    ]
+    print(f"import flac_detective.main: {total_us[0] / 1000:.0f} ms ({profile_path})")
+
+
+def test_lazy_exports():
+    from flac_detective import FLACAnalyzer, find_flac_files
+    from flac_detective.analysis.analyzer import FLACAnalyzer as analyzer_class
+
+    assert FLACAnalyzer is analyzer_class
+    assert callable(find_flac_files)
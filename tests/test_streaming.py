@@ -0,0 +1,99 @@
+"""Tests for the single-pass analysis of large files."""
+
+import numpy as np
+import pytest
+import soundfile as sf
+from scipy import signal
+
+from flac_detective.analysis import FLACAnalyzer
+from flac_detective.analysis.audio_cache import AudioCache
+from flac_detective.analysis.new_scoring.artifacts import detect_preecho_artifacts
+from flac_detective.analysis.new_scoring.silence_utils import band_sos, detect_transients
+from flac_detective.analysis.quality import analyze_audio_quality
+from flac_detective.analysis.streaming import Reservoir, analyze_stream
+from flac_detective.bench import build_corpus, default_corpus
+from flac_detective.config import analysis_config
+
+
+def test_reservoir_keeps_a_uniform_sample():
+    reservoir = Reservoir(100, seed=0)
+    for value in range(10000):
+        reservoir.offer(value)
+
+    assert len(reservoir.items) == 100 and reservoir.seen == 10000
+    assert 3500 < np.mean(reservoir.items) < 6500
+
+
+def test_band_energy_matches_filtered_audio(tmp_path):
+    path = tmp_path / "noise.flac"
+    audio = 0.1 * np.random.default_rng(0).standard_normal((44100 * 5, 2))
+    sf.write(path, audio, 44100, subtype="PCM_24")
+
+    stream = analyze_stream(path, blocksize=8192)
+    sos = band_sos(44100, 16000)
+    expected = np.mean(signal.sosfilt(sos, np.mean(sf.read(path)[0], axis=1)) ** 2)
+    assert stream.complete
+    assert abs(stream.spectrum.band_mean_square(sos) / expected - 1) < 0.05
+
+
+def test_clicks_match_in_memory(tmp_path):
+    path = tmp_path / "clicks.flac"
+    rng = np.random.default_rng(1)
+    audio = 0.05 * rng.standard_normal(44100 * 12)
+    audio[rng.integers(0, len(audio), 40)] += 0.6
+    sf.write(path, audio, 44100, subtype="PCM_24")
+
+    stream = analyze_stream(path, blocksize=16384)
+    assert stream.clicks.result() == detect_transients(sf.read(path)[0], 44100)
+
+
+def test_preecho_matches_in_memory_across_silent_passages(tmp_path):
+    # Dither in the silent passages: the median energy of the whole file is far
+    # below the median of the per-block medians
+    spec = next(spec for spec in default_corpus(10.0) if spec.kind == "dither")
+    ((_, path),) = build_corpus([spec], tmp_path)
+
+    stream = analyze_stream(path)
+    expected = detect_preecho_artifacts(sf.read(path)[0], spec.sample_rate)
+    assert expected[2] > 0
+    assert stream.transients.result() == expected
+
+
+def test_quality_counters_match_in_memory(tmp_path, monkeypatch):
+    path = tmp_path / "clipped.flac"
+    audio = 0.3 * np.random.default_rng(2).standard_normal((44100 * 12, 2)) + 0.02
+    audio[: 44100 * 2] = 0.0
+    sf.write(path, audio.clip(-1, 1), 44100, subtype="PCM_16")
+    expected = analyze_audio_quality(path, cache=AudioCache(path))
+
+    # Stream everything over 1 MB (this file decodes to ~8.5 MB)
+    monkeypatch.setattr(analysis_config, "LARGE_FILE_MB", 1)
+    monkeypatch.setattr(analysis_config, "LARGE_FILE_MODE", "stream")
+    cache = AudioCache(path)
+    assert cache.is_streaming()
+    result = analyze_audio_quality(path, cache=cache)
+
+    for key in ("clipping", "dc_offset", "silence"):
+        assert result[key].keys() == expected[key].keys()
+        for field, value in expected[key].items():
+            if isinstance(value, str):
+                assert result[key][field] == value
+            else:
+                assert np.isclose(result[key][field], value, rtol=1e-6), (key, field)
+
+
+@pytest.mark.slow
+def test_stream_and_spill_modes_score_the_corpus_alike(tmp_path, monkeypatch):
+    # Every file goes through the large-file path (they decode to a few MB)
+    monkeypatch.setattr(analysis_config, "LARGE_FILE_MB", 1)
+    for spec, path in build_corpus(default_corpus(20.0), tmp_path):
+        results = {}
+        for mode in ("spill", "stream"):
+            monkeypatch.setattr(analysis_config, "LARGE_FILE_MODE", mode)
+            results[mode] = FLACAnalyzer().analyze_file(path)
+        assert results["stream"]["score"] == results["spill"]["score"], (
+            spec.name,
+            results["spill"]["reason"],
+            results["stream"]["reason"],
+        )
+        assert results["stream"]["verdict"] == results["spill"]["verdict"], spec.name
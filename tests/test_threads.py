@@ -0,0 +1,38 @@
+"""Tests for the per-worker thread budget."""
+
+import pytest
+
+from flac_detective import threads
+from flac_detective.profile import current_settings, init_worker
+
+
+@pytest.fixture
+def budget(monkeypatch):
+    # apply_budget exports the limit: restore the environment afterwards
+    for var in threads.THREAD_ENV_VARS:
+        monkeypatch.setenv(var, "")
+    yield
+    threads.apply_budget(1)
+
+
+def test_thread_allowance_shares_cpus():
+    assert threads.thread_allowance(8, cpus=8) == 1
+    assert threads.thread_allowance(2, cpus=8) == 4
+    assert threads.thread_allowance(1, cpus=8) == 8
+    # More workers than CPUs still get one thread each
+    assert threads.thread_allowance(16, cpus=8) == 1
+    assert threads.thread_allowance(0, cpus=4) == 4
+
+
+def test_apply_budget_sets_fft_workers_and_env(budget):
+    threads.apply_budget(3)
+
+    assert threads.fft_workers() == 3
+    for var in threads.THREAD_ENV_VARS:
+        assert threads.os.environ[var] == "3"
+
+
+def test_init_worker_applies_budget(budget):
+    init_worker(current_settings(), threads=2)
+
+    assert threads.fft_workers() == 2
@@ -0,0 +1,93 @@
+"""Tests for stage timing spans and the Chrome trace export."""
+
+import json
+import time
+
+import pytest
+
+from flac_detective import tracing
+from flac_detective.worker_pool import WorkerPool
+
+
+@pytest.fixture
+def enabled():
+    tracing.collect()
+    tracing.enable()
+    yield
+    tracing.enable(False)
+    tracing.collect()
+
+
+def traced_task(x):
+    with tracing.span("work", x=x):
+        tracing.instant("decision")
+    return x
+
+
+def test_disabled_spans_record_nothing():
+    assert not tracing.is_enabled()
+    with tracing.span("decode"):
+        tracing.instant("short_circuit")
+    assert tracing.collect() == []
+
+
+def test_disabled_span_overhead_is_negligible():
+    start = time.perf_counter()
+    for _ in range(100_000):
+        with tracing.span("rule.R1"):
+            pass
+    per_span_us = (time.perf_counter() - start) / 100_000 * 1e6
+    assert per_span_us < 5
+
+
+def test_nested_spans_and_instants(enabled):
+    with tracing.span("outer", file="a.flac"):
+        with tracing.span("inner"):
+            time.sleep(0.01)
+        tracing.instant("short_circuit", name="fast")
+
+    spans = tracing.collect()
+    assert [(s.name, s.kind) for s in spans] == [
+        ("inner", "X"),
+        ("short_circuit", "i"),
+        ("outer", "X"),
+    ]
+    inner, _, outer = spans
+    assert inner.duration_us >= 10_000
+    assert outer.start_us <= inner.start_us
+    assert outer.args == {"file": "a.flac"}
+    assert tracing.collect() == []
+
+
+def test_histogram_percentiles():
+    histogram = tracing.StageHistogram()
+    for duration_ms in range(1, 101):
+        histogram.add(duration_ms * 1000.0)
+    assert histogram.count == 100
+    assert histogram.percentile(50) == pytest.approx(50_000, rel=0.15)
+    assert histogram.percentile(99) == pytest.approx(99_000, rel=0.15)
+    assert histogram.percentile(100) == 100_000
+
+
+def test_chrome_trace_export(enabled, tmp_path):
+    with tracing.span("decode"):
+        tracing.instant("short_circuit")
+    trace_path = tmp_path / "trace.json"
+    collector = tracing.TraceCollector(trace_path)
+    collector.add(tracing.collect())
+    collector.close()
+
+    events = json.loads(trace_path.read_text())["traceEvents"]
+    assert [event["ph"] for event in events] == ["i", "X"]
+    assert events[1]["name"] == "decode" and "dur" in events[1]
+    assert set(collector.summary()) == {"decode"}
+    assert "decode" in collector.format_summary()
+
+
+def test_spans_travel_with_worker_results():
+    with WorkerPool(max_workers=1, initializer=tracing.enable) as pool:
+        future = pool.submit(traced_task, 7)
+        assert future.result(timeout=30) == 7
+
+    assert [s.name for s in future.spans] == ["decision", "work", "task"]
+    assert future.spans[-1].args == {"label": "7"}
@@ -0,0 +1,83 @@
+"""Tests for the cheap triage stage and the stage-2 escalation queue."""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+import soundfile as sf
+from scipy import signal
+
+from flac_detective.analysis import FLACAnalyzer
+from flac_detective.config import TriageConfig
+
+SAMPLE_RATE = 44100
+
+
+@pytest.fixture(scope="module")
+def corpus(tmp_path_factory):
+    """Full-band noise (authentic) and the same noise low-passed at 16 kHz."""
+    root = tmp_path_factory.mktemp("triage")
+    rng = np.random.default_rng(0)
+    audio = rng.standard_normal((SAMPLE_RATE * 20, 2)) * 0.1
+
+    authentic = root / "authentic.flac"
+    sf.write(authentic, audio, SAMPLE_RATE, subtype="PCM_16")
+
+    sos = signal.butter(12, 16000, fs=SAMPLE_RATE, output="sos")
+    lowpassed = root / "lowpassed.flac"
+    sf.write(lowpassed, signal.sosfilt(sos, audio, axis=0), SAMPLE_RATE, subtype="PCM_16")
+
+    return {"authentic": authentic, "lowpassed": lowpassed}
+
+
+def test_full_band_file_is_resolved(corpus):
+    result = FLACAnalyzer().triage_file(corpus["authentic"])
+    assert result["triage"] == "resolved"
+    assert result["verdict"] == "AUTHENTIC"
+
+
+def test_resolved_result_has_full_analysis_fields(corpus):
+    analyzer = FLACAnalyzer()
+    triage = analyzer.triage_file(corpus["authentic"])
+    full = analyzer.analyze_file(corpus["authentic"])
+    assert set(triage) - {"triage"} == set(full)
+
+
+def test_cassette_range_cutoff_is_escalated(corpus):
+    # Cutoff below 19 kHz needs the (expensive) cassette rule before any decision
+    result = FLACAnalyzer().triage_file(corpus["lowpassed"])
+    assert result["triage"] == "escalated"
+    assert "score" not in result
+
+
+def test_thresholds_are_configurable(corpus):
+    analyzer = FLACAnalyzer(triage=TriageConfig(AUTHENTIC_BELOW=0))
+    assert analyzer.triage_file(corpus["authentic"])["triage"] == "escalated"
+
+
+def test_unreadable_file_is_escalated(tmp_path):
+    broken = tmp_path / "broken.flac"
+    broken.write_bytes(b"not a flac file")
+    result = FLACAnalyzer().triage_file(broken)
+    assert result == {
+        "filepath": str(broken),
+        "filename": "broken.flac",
+        "triage": "escalated",
+    }
+
+
+def test_analysis_loop_reports_triage_stage(corpus, tmp_path, monkeypatch):
+    from flac_detective import main
+    from flac_detective.config import analysis_config, triage_config
+
+    monkeypatch.setattr(analysis_config, "MAX_WORKERS", 2)
+    monkeypatch.setattr(triage_config, "ENABLED", True)
+
+    results = main.run_analysis_loop(
+        [corpus["authentic"], corpus["lowpassed"]], [], output_dir=tmp_path
+    )
+
+    stages = {Path(r["filepath"]).name: r["triage"] for r in results}
+    assert stages == {"authentic.flac": "resolved", "lowpassed.flac": "escalated"}
+    # Escalated files carry the full analysis result
+    assert all("verdict" in r for r in results)
@@ -0,0 +1,41 @@
+"""Tests for the worker warm-up and the shared DSP caches."""
+
+import numpy as np
+from scipy import signal
+
+from flac_detective.analysis import window_cache
+from flac_detective.analysis.warmup import warm_up
+from flac_detective.profile import current_settings, init_worker
+
+
+def test_butter_sos_is_cached_and_matches_scipy():
+    window_cache.clear_window_cache()
+    sos = window_cache.get_butter_sos(4, [10000, 15000], "bandpass", 44100)
+
+    assert window_cache.get_butter_sos(4, (10000.0, 15000.0), "bandpass", 44100) is sos
+    expected = signal.butter(4, [10000, 15000], "bandpass", fs=44100, output="sos")
+    np.testing.assert_allclose(sos, expected)
+
+
+def test_apply_window_reuses_scratch_buffer():
+    data = np.random.default_rng(0).standard_normal(4096).astype(np.float32)
+
+    windowed = window_cache.apply_window(data)
+    np.testing.assert_allclose(windowed, data * signal.windows.hann(4096))
+    assert np.shares_memory(window_cache.apply_window(data[:1024]), windowed)
+
+
+def test_warm_up_builds_windows_for_common_rates():
+    window_cache.clear_window_cache()
+    warm_up(sample_rates=(44100,))
+
+    # Spectrum sample, consistency segments and triage excerpts
+    assert window_cache.get_cache_stats()["cached_windows"] == 3
+    assert window_cache._butter_sos.cache_info().currsize >= 4
+
+
+def test_init_worker_warms_up():
+    window_cache.clear_window_cache()
+    init_worker(current_settings(), warm=True)
+
+    assert window_cache.get_cache_stats()["cached_windows"] > 0
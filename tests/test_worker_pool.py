@@ -0,0 +1,169 @@
+"""Tests for the deadline-enforcing, recycling worker pool."""
+
+import logging
+import os
+import time
+from concurrent.futures import wait
+
+import pytest
+
+from flac_detective import threads
+from flac_detective.analysis.diagnostic_tracker import IssueType, get_tracker
+from flac_detective.logging_config import LogLevel
+from flac_detective.worker_pool import TaskTimeoutError, WorkerCrashedError, WorkerPool
+
+
+def square(x):
+    return x * x
+
+
+def worker_pid(_):
+    return os.getpid()
+
+
+def fail(message):
+    raise ValueError(message)
+
+
+def hang_after_issue(filepath):
+    get_tracker().record_issue(filepath, IssueType.PARTIAL_READ, "decoder lost sync")
+    time.sleep(60)
+
+
+def nap(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def crash(_):
+    os._exit(3)
+
+
+def spare(_):
+    return threads.spare_threads()
+
+
+def test_results_and_exceptions_are_returned():
+    with WorkerPool(max_workers=2) as pool:
+        futures = [pool.submit(square, i) for i in range(5)]
+        failing = pool.submit(fail, "boom")
+        assert [f.result(timeout=30) for f in futures] == [0, 1, 4, 9, 16]
+        with pytest.raises(ValueError, match="boom"):
+            failing.result(timeout=30)
+
+
+def test_deadline_kills_worker_and_keeps_partial_diagnostic():
+    with WorkerPool(max_workers=1, task_timeout=2) as pool:
+        stuck = pool.submit(hang_after_issue, "/music/damaged.flac")
+        after = pool.submit(square, 3)
+
+        with pytest.raises(TaskTimeoutError) as excinfo:
+            stuck.result(timeout=30)
+        # The replacement worker keeps processing the queue
+        assert after.result(timeout=30) == 9
+
+    error = excinfo.value
+    assert error.label == "/music/damaged.flac"
+    assert error.elapsed >= 2
+    assert [issue.issue_type for issue in error.issues] == [IssueType.PARTIAL_READ]
+    assert pool.tasks_timed_out == 1
+    assert pool.workers_started == 2
+
+
+def test_task_deadline_overrides_the_pool_deadline():
+    with WorkerPool(max_workers=2, task_timeout=1) as pool:
+        long_file = pool.submit(nap, 3, timeout=30)
+        stuck = pool.submit(hang_after_issue, "/music/stuck.flac", timeout=2)
+
+        assert long_file.result(timeout=30) == 3
+        with pytest.raises(TaskTimeoutError) as excinfo:
+            stuck.result(timeout=30)
+    assert excinfo.value.elapsed >= 2
+
+
+def test_workers_are_recycled_after_max_tasks():
+    with WorkerPool(max_workers=1, max_tasks_per_worker=2) as pool:
+        futures = [pool.submit(worker_pid, i) for i in range(6)]
+        wait(futures, timeout=60)
+        pids = [f.result() for f in futures]
+
+    assert len(set(pids)) == 3
+    # The last retirement may race with shutdown
+    assert pool.workers_recycled >= 2
+
+
+def test_crashed_worker_fails_task_and_is_replaced():
+    with WorkerPool(max_workers=1) as pool:
+        crashed = pool.submit(crash, None)
+        after = pool.submit(square, 4)
+        with pytest.raises(WorkerCrashedError):
+            crashed.result(timeout=30)
+        assert after.result(timeout=30) == 16
+
+
+def test_timeout_result_is_a_critical_failure():
+    from pathlib import Path
+
+    from flac_detective.analysis.diagnostic_tracker import reset_tracker
+    from flac_detective.main import _create_timeout_result
+
+    reset_tracker()
+    error = TaskTimeoutError("/music/damaged.flac", 601.0, [])
+
+    result = _create_timeout_result(Path("/music/damaged.flac"), error)
+
+    assert result["verdict"] == "TIMEOUT"
+    assert result["is_corrupted"] is True
+    issues = get_tracker().get_issues_for_file("/music/damaged.flac")
+    assert [i.issue_type for i in issues] == [IssueType.TIMEOUT]
+    assert get_tracker().has_critical_issues("/music/damaged.flac")
+    reset_tracker()
+
+
+def record_issue(filepath):
+    get_tracker().record_issue(filepath, IssueType.PARTIAL_READ, "decoder lost sync")
+    return len(get_tracker().get_files_with_issues())
+
+
+def test_issues_travel_with_the_task():
+    with WorkerPool(max_workers=1) as pool:
+        futures = [pool.submit(record_issue, f"/music/{i}.flac") for i in range(3)]
+        # The worker's tracker is emptied after each task
+        assert [f.result(timeout=30) for f in futures] == [1, 1, 1]
+
+    for i, future in enumerate(futures):
+        assert [issue.filepath for issue in future.issues] == [f"/music/{i}.flac"]
+
+
+def log_messages(name):
+    log = logging.getLogger("flac_detective.test_worker")
+    log.debug("hidden %s", name)
+    log.info("analyzed %s", name)
+    log.log(LogLevel.SUMMARY, "summary %s", name)
+    return name
+
+
+def test_worker_records_reach_parent_handlers():
+    records = []
+
+    class ListHandler(logging.Handler):
+        def emit(self, record):
+            records.append(record.getMessage())
+
+    handler = ListHandler()
+    root = logging.getLogger()
+    root.addHandler(handler)
+    try:
+        with WorkerPool(max_workers=2, log_level=LogLevel.SUMMARY) as pool:
+            futures = [pool.submit(log_messages, f"{i}.flac") for i in range(3)]
+            wait(futures, timeout=30)
+    finally:
+        root.removeHandler(handler)
+
+    assert sorted(records) == ["summary 0.flac", "summary 1.flac", "summary 2.flac"]
+
+
+def test_last_task_borrows_idle_workers():
+    with WorkerPool(max_workers=3) as pool:
+        # Nothing else queued: the two other workers are idle
+        assert pool.submit(spare, None).result(timeout=30) == 3